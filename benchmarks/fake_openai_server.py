@@ -0,0 +1,218 @@
+# benchmarks/fake_openai_server.py
+
+"""Local stand-in for the OpenAI chat and embeddings API used by benchmarks."""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+from config.logging_config import get_module_logger
+
+# Create a logger for this module
+logger = get_module_logger("fake_openai_server")
+
+def deterministic_embedding(text: str, dimensions: int = 1536) -> List[float]:
+    """Get a unit-length pseudo-random embedding that depends only on the text.
+
+    Args:
+        text: Input text
+        dimensions: Embedding size
+
+    Returns:
+        Embedding vector
+    """
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+def _count_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+class FakeOpenAIServer:
+    """OpenAI-compatible HTTP server with configurable latency.
+
+    Serves `/v1/chat/completions`, `/v1/embeddings` and `/v1/models`.
+    Chat responses are a fixed-length deterministic text and embeddings are
+    derived from a hash of the input, so runs are repeatable. Each request
+    sleeps for `latency` seconds plus up to `jitter` seconds, plus
+    `per_token_latency` for every completion token, to imitate a remote model.
+    """
+
+    def __init__(self,
+                 latency: float = 0.05,
+                 jitter: float = 0.0,
+                 per_token_latency: float = 0.0,
+                 completion_tokens: int = 200,
+                 embedding_dimensions: int = 1536,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 seed: int = 0):
+        """Initialize the server (call `start` to begin serving).
+
+        Args:
+            latency: Base delay per request in seconds
+            jitter: Maximum extra random delay per request in seconds
+            per_token_latency: Extra delay per generated completion token
+            completion_tokens: Approximate length of chat completions in tokens
+            embedding_dimensions: Size of returned embeddings
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            seed: Seed for the jitter generator
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.per_token_latency = per_token_latency
+        self.completion_tokens = completion_tokens
+        self.embedding_dimensions = embedding_dimensions
+        self.host = host
+        self.port = port
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        # Request counters by endpoint
+        self.requests: Dict[str, int] = {"chat": 0, "embeddings": 0}
+        self.embedded_texts = 0
+
+    @property
+    def base_url(self) -> str:
+        """Base URL to give OpenAI clients (ends in /v1)."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _delay(self, completion_tokens: int = 0) -> None:
+        """Sleep for the configured latency."""
+        with self._random_lock:
+            extra = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+        time.sleep(self.latency + extra + self.per_token_latency * completion_tokens)
+
+    def _chat_response(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a chat completion response."""
+        messages = request.get("messages", [])
+        prompt = "\n".join(str(message.get("content", "")) for message in messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+        # Fixed-length answer that still differs per prompt
+        words = ["benchmark", "response", digest] * (self.completion_tokens // 3 + 1)
+        content = " ".join(words[:self.completion_tokens])
+        self._delay(self.completion_tokens)
+
+        prompt_tokens = _count_tokens(prompt)
+        return {
+            "id": f"chatcmpl-{digest}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": prompt_tokens + self.completion_tokens
+            }
+        }
+
+    def _embeddings_response(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build an embeddings response."""
+        inputs = request.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        # Token-id inputs are hashed by their string form
+        texts = [item if isinstance(item, str) else json.dumps(item) for item in inputs]
+        dimensions = request.get("dimensions") or self.embedding_dimensions
+
+        self._delay()
+        self.embedded_texts += len(texts)
+        return {
+            "object": "list",
+            "model": request.get("model", "fake-embedding"),
+            "data": [
+                {"object": "embedding", "index": i, "embedding": deterministic_embedding(text, dimensions)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {
+                "prompt_tokens": sum(_count_tokens(text) for text in texts),
+                "total_tokens": sum(_count_tokens(text) for text in texts)
+            }
+        }
+
+    def _make_handler(self) -> type:
+        """Create the request handler class bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [
+                        {"id": "fake-model", "object": "model", "owned_by": "benchmark"}
+                    ]})
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+
+                path = self.path.split("?")[0].rstrip("/")
+                if path.endswith("/chat/completions"):
+                    server.requests["chat"] += 1
+                    self._send_json(200, server._chat_response(request))
+                elif path.endswith("/embeddings"):
+                    server.requests["embeddings"] += 1
+                    self._send_json(200, server._embeddings_response(request))
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self) -> "FakeOpenAIServer":
+        """Start serving from a background thread.
+
+        Returns:
+            The server, for chaining
+        """
+        if self._server is None:
+            self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, name="fake-openai", daemon=True).start()
+            logger.info(f"Fake OpenAI server listening at {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
@@ -0,0 +1,158 @@
+# benchmarks/import_profile.py
+
+"""Import-time profile of application entry points.
+
+Each module is imported in a fresh interpreter with `python -X importtime`,
+so every measurement is a cold import. The report lists each module's total
+import time and the slowest modules it pulled in, and fails when a module
+exceeds the target:
+
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile --module core.rag.rag_pipeline --top 25 --target 1.0
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Any, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by command line and batch entry points
+DEFAULT_MODULES = [
+    "cli",
+    "config.app_config",
+    "core.llm.llm_client",
+    "core.rag.rag_pipeline",
+    "core.rag.evaluation",
+    "core.embeddings.vector_store",
+    "core.document_processing.document_loader",
+    "core.assessment.assessment_processor"
+]
+
+# Cold import budget in seconds
+DEFAULT_TARGET = 1.0
+
+def profile_import(module: str) -> Dict[str, Any]:
+    """Import a module in a new interpreter and parse its import-time log.
+
+    Args:
+        module: Dotted module name
+
+    Returns:
+        Dictionary with the module's cumulative import seconds (None if the
+        import failed), per-module timings and any error output
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+    # Configuration is resolved lazily, but give it a key in case an import needs it
+    env.setdefault("OPENAI_API_KEY", "import-profile")
+
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+
+    timings = []
+    errors = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            errors.append(line)
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Header line
+        name = parts[2].rstrip()
+        timings.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_seconds": int(parts[0]) / 1e6,
+            "cumulative_seconds": int(parts[1]) / 1e6
+        })
+
+    # The requested module is the last top-level entry with its name
+    total = None
+    if process.returncode == 0:
+        for timing in reversed(timings):
+            if timing["module"] == module and timing["depth"] <= 1:
+                total = timing["cumulative_seconds"]
+                break
+
+    return {
+        "module": module,
+        "seconds": total,
+        "timings": timings,
+        "error": "\n".join(errors[-5:]) if process.returncode else None
+    }
+
+def format_report(results: List[Dict[str, Any]], top: int, target: float) -> str:
+    """Format profiles as a text report.
+
+    Args:
+        results: Output of `profile_import` per module
+        top: Number of slowest dependencies listed per module
+        target: Cold import budget in seconds
+
+    Returns:
+        Report text
+    """
+    lines = []
+    for result in results:
+        if result["seconds"] is None:
+            lines.append(f"{result['module']}: import failed")
+            lines.extend(f"    {line}" for line in (result["error"] or "").splitlines())
+            continue
+
+        status = "ok" if result["seconds"] <= target else f"over {target:g}s target"
+        lines.append(f"{result['module']}: {result['seconds'] * 1000:.0f} ms ({status})")
+        slowest = sorted(result["timings"], key=lambda t: t["cumulative_seconds"], reverse=True)
+        for timing in [t for t in slowest if t["module"] != result["module"]][:top]:
+            lines.append(
+                f"    {timing['cumulative_seconds'] * 1000:8.1f} ms cumulative"
+                f" {timing['self_seconds'] * 1000:8.1f} ms self  {timing['module']}"
+            )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Profile imports and print the report.
+
+    Args:
+        argv: Command line arguments (default: sys.argv)
+
+    Returns:
+        Exit status (1 if any import failed or exceeded the target)
+    """
+    parser = argparse.ArgumentParser(description="Profile cold import time of application modules.")
+    parser.add_argument("--module", action="append", help="Module to profile (repeatable; default: entry points)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest dependencies listed per module")
+    parser.add_argument("--target", type=float, default=DEFAULT_TARGET, help="Cold import budget in seconds")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON instead of text")
+    args = parser.parse_args(argv)
+
+    results = [profile_import(module) for module in args.module or DEFAULT_MODULES]
+
+    if args.json:
+        print(json.dumps({
+            "target_seconds": args.target,
+            "modules": [
+                {
+                    "module": result["module"],
+                    "seconds": result["seconds"],
+                    "error": result["error"],
+                    "slowest": sorted(
+                        result["timings"], key=lambda t: t["cumulative_seconds"], reverse=True
+                    )[:args.top]
+                }
+                for result in results
+            ]
+        }, indent=2))
+    else:
+        print(format_report(results, args.top, args.target))
+
+    failed = [r for r in results if r["seconds"] is None or r["seconds"] > args.target]
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,706 @@
+# benchmarks/run_benchmarks.py
+
+"""End-to-end performance benchmarks.
+
+Every suite runs the application's own components against a local
+OpenAI-compatible server (see `fake_openai_server.py`) inside a temporary
+working directory, so results depend only on this code and the configured
+fake latency. Results are written as JSON and can be compared against a
+stored baseline:
+
+    python -m benchmarks.run_benchmarks --output benchmarks/results.json
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json --tolerance 0.2
+
+`benchmarks/baseline.json` is the default baseline: runs compare against it
+whenever it exists, and `--update-baseline` records the current run there
+instead (skipped if a suite failed; suites not run keep their stored
+results when the workload matches). Record it on the machine that will run
+the comparison; numbers from other hardware are not comparable.
+
+The `search` suite compares unfiltered and metadata-filtered search latency
+on FAISS and Chroma (Chroma is skipped when it is not installed).
+
+Metrics ending in `_seconds` are better when lower and metrics ending in
+`_per_second` are better when higher; other metrics are informational.
+The exit status is 1 when any metric regresses beyond the tolerance.
+"""
+
+import argparse
+import csv
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+
+# Make the application importable when run as a script
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Suites in the order they run; chat reuses the index built by ingest
+SUITE_NAMES = ["ingest", "chat", "search", "iep", "assessment", "state"]
+
+# Baseline compared against by default and written by --update-baseline
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Vector store backends measured by the search suite
+SEARCH_BACKENDS = ("faiss", "chroma")
+
+# Subjects assigned round-robin to search suite chunks
+SUBJECTS = ("math", "reading", "writing", "science")
+
+# Percentiles reported for latency samples
+LATENCY_PERCENTILES = (50, 90, 99)
+
+# Vocabulary for synthetic documents and queries
+WORDS = (
+    "student reading fluency comprehension math fractions geometry algebra accommodation "
+    "goal progress assessment baseline objective intervention support classroom teacher "
+    "writing vocabulary phonics behavior attention schedule practice feedback mastery "
+    "skill lesson standard benchmark service speech therapy occupational transition"
+).split()
+
+class BenchmarkError(Exception):
+    """Exception raised when a benchmark cannot run."""
+    pass
+
+def latency_stats(samples: Sequence[float], prefix: str) -> Dict[str, float]:
+    """Summarize latency samples.
+
+    Args:
+        samples: Latencies in seconds
+        prefix: Metric name prefix
+
+    Returns:
+        Mapping of metric name to value (mean, percentiles and max in seconds)
+    """
+    if not samples:
+        return {}
+    values = np.asarray(samples, dtype=np.float64)
+    stats = {f"{prefix}_mean_seconds": float(values.mean())}
+    for p, value in zip(LATENCY_PERCENTILES, np.percentile(values, LATENCY_PERCENTILES)):
+        stats[f"{prefix}_p{p}_seconds"] = float(value)
+    stats[f"{prefix}_max_seconds"] = float(values.max())
+    return stats
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    """Generate deterministic filler text in sentences of 8 to 16 words."""
+    sentences = []
+    remaining = words
+    while remaining > 0:
+        length = min(remaining, rng.randint(8, 16))
+        sentence = " ".join(rng.choice(WORDS) for _ in range(length))
+        sentences.append(sentence.capitalize() + ".")
+        remaining -= length
+    return " ".join(sentences)
+
+class EmbeddingProvider:
+    """LangChain-style embeddings interface over the application's EmbeddingManager.
+
+    Routes FAISS embedding calls through the manager so the embedding cache
+    is part of what the ingest suite measures.
+    """
+
+    def __init__(self, embedding_manager: Any):
+        self.embedding_manager = embedding_manager
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_manager.get_embeddings(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embedding_manager.get_embeddings([text])[0]
+
+    def __call__(self, text: str) -> List[float]:
+        return self.embed_query(text)
+
+class BenchmarkRunner:
+    """Runs benchmark suites and collects their metrics."""
+
+    def __init__(self, server: Any, workdir: str, args: argparse.Namespace):
+        """Initialize the runner.
+
+        Args:
+            server: Running FakeOpenAIServer
+            workdir: Scratch directory the suites run in
+            args: Parsed command line arguments with workload sizes
+        """
+        self.server = server
+        self.workdir = workdir
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self._llm_client = None
+        self._embedding_manager = None
+        self.vector_store = None
+
+    @property
+    def llm_client(self) -> Any:
+        """Shared LLM client pointed at the fake server."""
+        if self._llm_client is None:
+            from core.llm.llm_client import LLMClient
+            self._llm_client = LLMClient()
+        return self._llm_client
+
+    @property
+    def embedding_manager(self) -> Any:
+        """Shared embedding manager (its cache persists across suites)."""
+        if self._embedding_manager is None:
+            from core.embeddings.embedding_manager import EmbeddingManager
+            self._embedding_manager = EmbeddingManager(llm_client=self.llm_client)
+        return self._embedding_manager
+
+    def _server_requests(self) -> Dict[str, int]:
+        """Snapshot of the fake server's request counters."""
+        return dict(self.server.requests)
+
+    def _requests_since(self, before: Dict[str, int], endpoint: str) -> int:
+        """Number of requests to an endpoint since a snapshot."""
+        return self.server.requests[endpoint] - before.get(endpoint, 0)
+
+    def run(self, suites: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Run suites in order.
+
+        Args:
+            suites: Suite names
+
+        Returns:
+            Mapping of suite name to metrics (or an error)
+        """
+        results = {}
+        for name in suites:
+            print(f"Running {name} benchmark...", file=sys.stderr)
+            start = time.perf_counter()
+            try:
+                results[name] = getattr(self, f"bench_{name}")()
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {str(e)}"}
+            print(f"  finished in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+        return results
+
+    def _write_documents(self, directory: str, count: int) -> List[str]:
+        """Write synthetic text documents.
+
+        Args:
+            directory: Output directory
+            count: Number of files
+
+        Returns:
+            File paths
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for i in range(count):
+            path = os.path.join(directory, f"document_{i:04d}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(synthetic_text(self.rng, self.args.words_per_file))
+            paths.append(path)
+        return paths
+
+    def _ingest(self, paths: List[str], index_dir: str) -> Dict[str, Any]:
+        """Load, chunk, embed and index files into a new FAISS store.
+
+        Args:
+            paths: Files to ingest
+            index_dir: Directory for the new index
+
+        Returns:
+            Dictionary with the store, chunk count and elapsed seconds
+        """
+        from core.document_processing.document_loader import DocumentLoader
+        from core.embeddings.vector_store import FAISSVectorStore
+
+        start = time.perf_counter()
+        loader = DocumentLoader()
+        documents = []
+        for path in paths:
+            result = loader.load_single_document(path)
+            if not result.success:
+                raise BenchmarkError(f"Could not load {path}: {result.error_message}")
+            documents.append(result.document)
+
+        chunks = self.embedding_manager.chunk_processor.split_documents(documents)
+        store = FAISSVectorStore(embedding_provider=EmbeddingProvider(self.embedding_manager), index_dir=index_dir)
+        if not store.add_documents(chunks):
+            raise BenchmarkError("Indexing failed")
+        return {"store": store, "chunks": len(chunks), "seconds": time.perf_counter() - start}
+
+    def bench_ingest(self) -> Dict[str, Any]:
+        """Ingest N files into a new index with a cold, then a warm embedding cache."""
+        paths = self._write_documents(os.path.join(self.workdir, "data"), self.args.files)
+
+        before = self._server_requests()
+        cold = self._ingest(paths, os.path.join(self.workdir, "index_cold"))
+        cold_requests = self._requests_since(before, "embeddings")
+
+        before = self._server_requests()
+        warm = self._ingest(paths, os.path.join(self.workdir, "index_warm"))
+        warm_requests = self._requests_since(before, "embeddings")
+
+        self.vector_store = warm["store"]
+        return {
+            "files": len(paths),
+            "chunks": cold["chunks"],
+            "cold_seconds": cold["seconds"],
+            "cold_chunks_per_second": cold["chunks"] / cold["seconds"],
+            "cold_embedding_requests": cold_requests,
+            "warm_seconds": warm["seconds"],
+            "warm_chunks_per_second": warm["chunks"] / warm["seconds"],
+            "warm_embedding_requests": warm_requests
+        }
+
+    def _build_rag_pipeline(self) -> Any:
+        """Build the RAG pipeline the way the application wires it."""
+        from config.app_config import config
+        from core.rag.rag_pipeline import RAGPipeline
+        from core.rag.rag_retriever import HybridRetriever
+        from core.rag.retrieval_cache import SemanticQueryCache
+        from core.rag.context_packer import ContextPacker
+
+        if self.vector_store is None:
+            paths = self._write_documents(os.path.join(self.workdir, "data"), self.args.files)
+            self.vector_store = self._ingest(paths, os.path.join(self.workdir, "index_chat"))["store"]
+
+        retrieval_cache = SemanticQueryCache() if config.vector_store.query_cache_enabled else None
+        retriever = HybridRetriever(
+            vector_store=self.vector_store,
+            k_documents=config.vector_store.rerank_candidates,
+            retrieval_cache=retrieval_cache
+        )
+        context_packer = ContextPacker(vector_store=self.vector_store, retrieval_cache=retrieval_cache)
+        return RAGPipeline(
+            llm=self.llm_client,
+            retriever=retriever.as_retriever(),
+            context_packer=context_packer
+        )
+
+    def bench_chat(self) -> Dict[str, Any]:
+        """Answer queries one at a time for latency, then concurrently for throughput."""
+        pipeline = self._build_rag_pipeline()
+        queries = [
+            f"How can {synthetic_text(self.rng, 6).rstrip('.').lower()}? ({i})"
+            for i in range(self.args.queries * 2)
+        ]
+        sequential, concurrent = queries[:self.args.queries], queries[self.args.queries:]
+
+        # Sequential latency per stage
+        totals, retrievals, generations, errors = [], [], [], 0
+        for query in sequential:
+            response = pipeline.run(query)
+            if "error" in response:
+                errors += 1
+                continue
+            totals.append(response["execution_time"])
+            retrievals.append(response["retrieval_time"])
+            generations.append(response["generation_time"])
+
+        # Concurrent throughput
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as executor:
+            responses = list(executor.map(pipeline.run, concurrent))
+        wall = time.perf_counter() - start
+        errors += sum(1 for response in responses if "error" in response)
+
+        metrics = {"queries": len(queries), "errors": errors, "concurrency": self.args.concurrency}
+        metrics.update(latency_stats(totals, "query"))
+        metrics.update(latency_stats(retrievals, "retrieval"))
+        metrics.update(latency_stats(generations, "generation"))
+        metrics["concurrent_seconds"] = wall
+        metrics["queries_per_second"] = len(concurrent) / wall
+        return metrics
+
+    def _search_documents(self) -> List[Any]:
+        """Synthetic chunks with the metadata the search suite filters on.
+
+        Subjects are spread evenly (each matches a quarter of the chunks) and
+        upload timestamps are one hour apart, so the filters below select
+        fixed fractions of the corpus.
+        """
+        from langchain.schema import Document
+
+        base = 1704067200  # 2024-01-01T00:00:00Z
+        return [
+            Document(
+                page_content=synthetic_text(self.rng, 60),
+                metadata={
+                    "source": f"search_document_{i:05d}.txt",
+                    "id": f"search_{i}",
+                    "subject": SUBJECTS[i % len(SUBJECTS)],
+                    "grade": i % 12 + 1,
+                    "upload_timestamp": base + i * 3600
+                }
+            )
+            for i in range(self.args.search_documents)
+        ]
+
+    def _search_filters(self, documents: List[Any]) -> Dict[str, Dict[str, Any]]:
+        """Filters of increasing selectivity over the search suite chunks."""
+        timestamps = sorted(document.metadata["upload_timestamp"] for document in documents)
+        recent = timestamps[int(len(timestamps) * 0.9)]
+        return {
+            "subject": {"subject": "math"},
+            "recent": {"upload_timestamp": {"$gte": recent}},
+            "combined": {"subject": "reading", "grade": {"$in": [3, 4, 5]}, "upload_timestamp": {"$gte": recent}}
+        }
+
+    def _create_search_store(self, backend: str) -> Any:
+        """Create an empty vector store of a backend in the scratch directory."""
+        provider = EmbeddingProvider(self.embedding_manager)
+        directory = os.path.join(self.workdir, f"search_{backend}")
+        if backend == "faiss":
+            from core.embeddings.vector_store import FAISSVectorStore
+            return FAISSVectorStore(embedding_provider=provider, index_dir=directory)
+        from core.embeddings.chroma_store import ChromaVectorStore
+        return ChromaVectorStore(embedding_provider=provider, persist_directory=directory)
+
+    def bench_search(self) -> Dict[str, Any]:
+        """Time unfiltered and metadata-filtered vector search on each backend.
+
+        Query embeddings are computed once up front and searched with
+        `search_by_vector`, so the latencies cover only the store and its
+        filter handling, not the embedding API.
+        """
+        documents = self._search_documents()
+        filters = self._search_filters(documents)
+        queries = [synthetic_text(self.rng, 8) for _ in range(self.args.search_queries)]
+        vectors = self.embedding_manager.get_embeddings(queries)
+        k = self.args.search_k
+
+        metrics = {"documents": len(documents), "queries": len(queries), "k": k}
+        for backend in SEARCH_BACKENDS:
+            if backend == "chroma" and importlib.util.find_spec("langchain_chroma") is None:
+                metrics["chroma_skipped"] = "langchain_chroma is not installed"
+                continue
+
+            store = self._create_search_store(backend)
+            start = time.perf_counter()
+            if not store.add_documents(documents):
+                raise BenchmarkError(f"Indexing failed on {backend}")
+            metrics[f"{backend}_index_seconds"] = time.perf_counter() - start
+
+            runs = {"unfiltered": None}
+            runs.update(filters)
+            means = {}
+            for name, metadata_filter in runs.items():
+                latencies, results = [], 0
+                for vector in vectors:
+                    start = time.perf_counter()
+                    found = store.search_by_vector(vector, k=k, filter=metadata_filter)
+                    latencies.append(time.perf_counter() - start)
+                    results += len(found)
+                prefix = f"{backend}_{name}"
+                metrics.update(latency_stats(latencies, prefix))
+                metrics[f"{prefix}_results"] = results
+                means[name] = metrics[f"{prefix}_mean_seconds"]
+
+            # Informational: cost of each filter relative to the unfiltered search
+            for name in filters:
+                if means["unfiltered"]:
+                    metrics[f"{backend}_{name}_overhead"] = means[name] / means["unfiltered"]
+        return metrics
+
+    def bench_iep(self) -> Dict[str, Any]:
+        """Generate IEPs for a batch of documents on a thread pool."""
+        from langchain.schema import Document
+        from core.pipelines.iep_pipeline import IEPGenerationPipeline
+
+        pipeline = IEPGenerationPipeline(llm_client=self.llm_client)
+        documents = [
+            Document(
+                page_content=synthetic_text(self.rng, self.args.words_per_file),
+                metadata={"source": f"student_record_{i:04d}.txt", "id": f"record_{i}"}
+            )
+            for i in range(self.args.iep_documents)
+        ]
+
+        def generate(document):
+            start = time.perf_counter()
+            pipeline.generate_iep(document)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as executor:
+            latencies = list(executor.map(generate, documents))
+        wall = time.perf_counter() - start
+
+        metrics = {"documents": len(documents), "concurrency": self.args.concurrency, "batch_seconds": wall}
+        metrics.update(latency_stats(latencies, "iep"))
+        metrics["documents_per_second"] = len(documents) / wall
+        return metrics
+
+    def bench_assessment(self) -> Dict[str, Any]:
+        """Import a CSV gradebook export through the bulk response importer."""
+        from core.assessment.assessment_processor import AssessmentProcessor
+        from core.assessment.student_profile_manager import StudentProfileManager
+        from core.assessment.response_importer import ResponseImporter
+
+        choices = ["A", "B", "C", "D"]
+        questions = [
+            {
+                "question_id": f"q{i}",
+                "question_type": "multiple_choice",
+                "correct_answer": choices[i % len(choices)],
+                "difficulty": 0.3 + 0.4 * (i % 3) / 2,
+                "knowledge_components": [{"id": f"kc_{i % 5}", "name": f"Component {i % 5}"}]
+            }
+            for i in range(self.args.questions)
+        ]
+        assessment = {"assessment_id": "benchmark_assessment", "title": "Benchmark", "questions": questions}
+
+        # Build the export in memory so the suite measures import, not disk writes
+        export = io.StringIO()
+        writer = csv.DictWriter(export, fieldnames=["student_id", "student_name", "question_id", "response"])
+        writer.writeheader()
+        for s in range(self.args.students):
+            for question in questions:
+                writer.writerow({
+                    "student_id": f"student_{s:05d}",
+                    "student_name": f"Student {s}",
+                    "question_id": question["question_id"],
+                    "response": self.rng.choice(choices)
+                })
+        export.seek(0)
+
+        importer = ResponseImporter(AssessmentProcessor(), StudentProfileManager())
+        start = time.perf_counter()
+        summary = importer.import_file(assessment, export, file_format="csv")
+        elapsed = time.perf_counter() - start
+
+        return {
+            "students": summary["students"],
+            "responses": summary["imported"],
+            "skipped": summary["skipped"],
+            "import_seconds": elapsed,
+            "responses_per_second": summary["imported"] / elapsed if elapsed else 0.0
+        }
+
+    def bench_state(self) -> Dict[str, Any]:
+        """Time single and batched saves and loads on the SQLite state storage."""
+        from ui.state_manager import SQLiteStorage
+
+        storage = SQLiteStorage(db_path=os.path.join(self.workdir, ".state", "benchmark_state.db"))
+        operations = self.args.state_ops
+        values = [
+            {
+                "messages": [{"role": "user", "content": synthetic_text(self.rng, 40)} for _ in range(5)],
+                "scores": [self.rng.random() for _ in range(50)]
+            }
+            for _ in range(operations)
+        ]
+
+        saves, loads = [], []
+        for i, value in enumerate(values):
+            start = time.perf_counter()
+            storage.save(f"benchmark_key_{i}", value)
+            saves.append(time.perf_counter() - start)
+        for i in range(operations):
+            start = time.perf_counter()
+            storage.load(f"benchmark_key_{i}")
+            loads.append(time.perf_counter() - start)
+
+        batch = {f"benchmark_batch_{i}": value for i, value in enumerate(values)}
+        start = time.perf_counter()
+        storage.save_many(batch)
+        save_many_seconds = time.perf_counter() - start
+
+        metrics = {"operations": operations}
+        metrics.update(latency_stats(saves, "save"))
+        metrics.update(latency_stats(loads, "load"))
+        metrics["save_many_seconds"] = save_many_seconds
+        metrics["save_many_items_per_second"] = operations / save_many_seconds if save_many_seconds else 0.0
+        return metrics
+
+def compare_to_baseline(results: Dict[str, Any],
+                        baseline: Dict[str, Any],
+                        tolerance: float) -> List[Dict[str, Any]]:
+    """Find metrics that regressed against a baseline run.
+
+    Args:
+        results: Current benchmark output
+        baseline: Baseline benchmark output
+        tolerance: Allowed relative change in the worse direction (0.2 = 20%)
+
+    Returns:
+        One entry per regressed metric with the suite, metric, both values
+        and the relative change
+    """
+    regressions = []
+    for suite, metrics in results.get("suites", {}).items():
+        baseline_metrics = baseline.get("suites", {}).get(suite, {})
+        for name, value in metrics.items():
+            base = baseline_metrics.get(name)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+                continue
+            change = (value - base) / base
+            if name.endswith("_per_second"):
+                regressed = change < -tolerance
+            elif name.endswith("_seconds"):
+                regressed = change > tolerance
+            else:
+                continue
+            if regressed:
+                regressions.append({
+                    "suite": suite,
+                    "metric": name,
+                    "baseline": base,
+                    "current": value,
+                    "change": change
+                })
+    return regressions
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Run end-to-end performance benchmarks.")
+    parser.add_argument("--suite", action="append", choices=SUITE_NAMES + ["all"],
+                        help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--baseline",
+                        help="Baseline results JSON to compare against "
+                             "(default: benchmarks/baseline.json when it exists)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Write this run's results to the baseline path instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative regression before failing (default: 0.2)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake API base latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Fake API random extra latency in seconds")
+    parser.add_argument("--token-latency", type=float, default=0.0,
+                        help="Fake API extra latency per completion token in seconds")
+    parser.add_argument("--files", type=int, default=50, help="Files to ingest")
+    parser.add_argument("--words-per-file", type=int, default=600, help="Words per synthetic document")
+    parser.add_argument("--queries", type=int, default=20,
+                        help="Chat queries per phase (sequential and concurrent)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Worker threads for concurrent phases")
+    parser.add_argument("--search-documents", type=int, default=2000,
+                        help="Chunks indexed per backend by the search suite")
+    parser.add_argument("--search-queries", type=int, default=100,
+                        help="Queries per filter in the search suite")
+    parser.add_argument("--search-k", type=int, default=10, help="Results per search in the search suite")
+    parser.add_argument("--iep-documents", type=int, default=20, help="Documents in the IEP batch")
+    parser.add_argument("--students", type=int, default=500, help="Students in the assessment import")
+    parser.add_argument("--questions", type=int, default=20, help="Questions in the assessment import")
+    parser.add_argument("--state-ops", type=int, default=500, help="Keys written and read by the state suite")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic data")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the scratch directory for inspection")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmarks.
+
+    Args:
+        argv: Command line arguments (default: sys.argv)
+
+    Returns:
+        Exit status
+    """
+    args = parse_args(argv)
+    suites = SUITE_NAMES if not args.suite or "all" in args.suite else [s for s in SUITE_NAMES if s in args.suite]
+
+    # Configure the application before any of its modules read the environment
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-key")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["LLM_RATE_LIMIT"] = "1000000"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    if args.baseline:
+        baseline_path = os.path.abspath(args.baseline)
+    elif args.update_baseline or os.path.exists(DEFAULT_BASELINE):
+        baseline_path = DEFAULT_BASELINE
+    else:
+        baseline_path = None
+
+    # Relative data, index, cache and state paths all resolve inside the scratch directory
+    workdir = tempfile.mkdtemp(prefix="benchmark_")
+    original_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    from benchmarks.fake_openai_server import FakeOpenAIServer
+
+    server = FakeOpenAIServer(latency=args.latency, jitter=args.jitter, per_token_latency=args.token_latency,
+                              seed=args.seed)
+    try:
+        with server:
+            os.environ["OPENAI_BASE_URL"] = server.base_url
+            os.environ["OPENAI_API_BASE"] = server.base_url
+
+            runner = BenchmarkRunner(server, workdir, args)
+            suite_results = runner.run(suites)
+    finally:
+        os.chdir(original_cwd)
+        if not args.keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "fake_latency": args.latency,
+            "fake_jitter": args.jitter,
+            "fake_token_latency": args.token_latency
+        },
+        "workload": {
+            name: getattr(args, name)
+            for name in ("files", "words_per_file", "queries", "concurrency", "search_documents",
+                         "search_queries", "search_k", "iep_documents", "students", "questions",
+                         "state_ops", "seed")
+        },
+        "suites": suite_results
+    }
+
+    exit_code = 0
+    if any("error" in metrics for metrics in suite_results.values()):
+        exit_code = 1
+
+    if args.update_baseline:
+        if exit_code:
+            print("Not updating the baseline because a suite failed", file=sys.stderr)
+        else:
+            # Keep the stored results of suites this run skipped
+            if os.path.exists(baseline_path):
+                with open(baseline_path, "r", encoding="utf-8") as f:
+                    previous = json.load(f)
+                if previous.get("workload") == results["workload"]:
+                    for suite, metrics in previous.get("suites", {}).items():
+                        suite_results.setdefault(suite, metrics)
+            with open(baseline_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(results, indent=2) + "\n")
+            print(f"Updated baseline {baseline_path}", file=sys.stderr)
+    elif baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("workload") != results["workload"]:
+            print("Warning: baseline was recorded with a different workload", file=sys.stderr)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        results["baseline"] = {"path": baseline_path, "tolerance": args.tolerance, "regressions": regressions}
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['suite']}.{regression['metric']}: "
+                f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['change']:+.1%})",
+                file=sys.stderr
+            )
+        if regressions:
+            exit_code = 1
+
+    text = json.dumps(results, indent=2)
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"Wrote results to {output_path}", file=sys.stderr)
+    else:
+        print(text)
+
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
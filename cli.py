@@ -0,0 +1,250 @@
+# cli.py
+
+"""Headless command line entry point for batch jobs.
+
+    python cli.py ingest data/ --workers 8
+    python cli.py reindex
+    python cli.py generate-ieps records/ --output-dir output/ieps
+    python cli.py import-responses assessment.json gradebook.csv
+    python cli.py eval dataset.jsonl --workers 8
+
+Jobs use the core modules directly, without Streamlit. Progress is
+checkpointed (see BATCH_CHECKPOINT_DIR), so rerunning an interrupted command
+resumes where it stopped; pass --restart to start over. Every command ends
+with a throughput report.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Any, List, Optional
+
+from config.logging_config import get_module_logger, setup_logging
+
+# Create a logger for this module
+logger = get_module_logger("cli")
+
+def _vector_store() -> Any:
+    """Create the configured vector store; its index loads on first use."""
+    from core.embeddings.vector_store_factory import VectorStoreFactory
+
+    store_type = os.environ.get("VECTOR_STORE_TYPE", "faiss")
+    return VectorStoreFactory.create_vector_store(store_type=store_type, lazy=True)
+
+def _checkpoint(args: argparse.Namespace, job_name: str) -> Any:
+    """Open the checkpoint of a job, discarding it when --restart was given."""
+    from core.jobs.batch import JobCheckpoint
+
+    checkpoint = JobCheckpoint(job_name, checkpoint_dir=args.checkpoint_dir)
+    if args.restart:
+        checkpoint.clear()
+    return checkpoint
+
+def _chunk_processor(args: argparse.Namespace) -> Optional[Any]:
+    """Create a chunk processor when --chunk was given."""
+    if not args.chunk:
+        return None
+    from core.embeddings.text_chunker import TextChunkProcessor
+    return TextChunkProcessor()
+
+def _rag_pipeline(llm_client: Any, vector_store: Any) -> Any:
+    """Build the RAG pipeline the way the application wires it."""
+    from config.app_config import config
+    from core.rag.rag_pipeline import RAGPipeline
+    from core.rag.rag_retriever import HybridRetriever
+    from core.rag.retrieval_cache import SemanticQueryCache
+    from core.rag.context_packer import ContextPacker
+
+    retrieval_cache = SemanticQueryCache() if config.vector_store.query_cache_enabled else None
+    retriever = HybridRetriever(
+        vector_store=vector_store,
+        k_documents=config.vector_store.rerank_candidates,
+        retrieval_cache=retrieval_cache
+    )
+    context_packer = ContextPacker(vector_store=vector_store, retrieval_cache=retrieval_cache)
+    return RAGPipeline(llm=llm_client, retriever=retriever.as_retriever(), context_packer=context_packer)
+
+def cmd_ingest(args: argparse.Namespace, stats: Any) -> Dict[str, Any]:
+    """Add files to the vector store."""
+    from core.jobs.batch import ingest_documents
+
+    ingest_documents(
+        args.paths,
+        _vector_store(),
+        _checkpoint(args, "ingest"),
+        workers=args.workers,
+        batch_size=args.batch_size,
+        chunk_processor=_chunk_processor(args),
+        stats=stats
+    )
+    return {}
+
+def cmd_reindex(args: argparse.Namespace, stats: Any) -> Dict[str, Any]:
+    """Rebuild the vector store from the data directory."""
+    from config.app_config import config
+    from core.jobs.batch import reindex
+
+    reindex(
+        args.data_dir or config.document.data_dir,
+        _vector_store(),
+        _checkpoint(args, "reindex"),
+        stats=stats,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        chunk_processor=_chunk_processor(args)
+    )
+    return {}
+
+def cmd_generate_ieps(args: argparse.Namespace, stats: Any) -> Dict[str, Any]:
+    """Generate IEPs from student documents."""
+    from core.jobs.batch import generate_ieps
+    from core.llm.llm_client import LLMClient
+    from core.pipelines.iep_pipeline import IEPGenerationPipeline
+
+    generate_ieps(
+        args.paths,
+        IEPGenerationPipeline(llm_client=LLMClient()),
+        args.output_dir,
+        _checkpoint(args, "generate-ieps"),
+        workers=args.workers,
+        stats=stats
+    )
+    return {}
+
+def cmd_import_responses(args: argparse.Namespace, stats: Any) -> Dict[str, Any]:
+    """Import gradebook exports into knowledge state and student profiles."""
+    from core.assessment.assessment_processor import AssessmentProcessor
+    from core.assessment.student_profile_manager import StudentProfileManager
+    from core.assessment.response_importer import ResponseImporter
+    from core.jobs.batch import BatchJobError, import_responses
+
+    try:
+        with open(args.assessment, "r", encoding="utf-8") as f:
+            assessment = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BatchJobError(f"Could not read assessment {args.assessment}: {str(e)}")
+
+    processor = AssessmentProcessor()
+    if not assessment.get("processed_at"):
+        assessment = processor.process_assessment(assessment)
+
+    importer = ResponseImporter(processor, StudentProfileManager(), batch_size=args.import_batch_size)
+    import_responses(assessment, args.files, importer, _checkpoint(args, "import-responses"), stats=stats)
+    return {}
+
+def cmd_eval(args: argparse.Namespace, stats: Any) -> Dict[str, Any]:
+    """Evaluate the RAG pipeline on a query dataset."""
+    from config.app_config import config
+    from core.jobs.batch import BatchJobError, evaluate_queries
+    from core.llm.llm_client import LLMClient
+    from core.rag.evaluation import RAGEvaluator, create_evaluation_queries, load_evaluation_dataset
+
+    try:
+        dataset = load_evaluation_dataset(args.dataset) if args.dataset else create_evaluation_queries()
+    except (OSError, ValueError) as e:
+        raise BatchJobError(f"Could not read dataset {args.dataset}: {str(e)}")
+
+    evaluator = RAGEvaluator(save_dir=args.output_dir, max_workers=args.workers or config.batch.workers)
+    pipeline = _rag_pipeline(LLMClient(), _vector_store())
+    _, results = evaluate_queries(
+        dataset, pipeline, evaluator, _checkpoint(args, "eval"), batch_size=args.batch_size, stats=stats
+    )
+    return {"evaluation": evaluator.summarize(results, stats.elapsed)} if results else {}
+
+# Command name -> (handler, secondary stats unit)
+COMMANDS = {
+    "ingest": (cmd_ingest, "chunks"),
+    "reindex": (cmd_reindex, "chunks"),
+    "generate-ieps": (cmd_generate_ieps, None),
+    "import-responses": (cmd_import_responses, "responses"),
+    "eval": (cmd_eval, None)
+}
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(description="Run ingestion, indexing and generation jobs without the web UI.")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    parser.add_argument("--json", action="store_true", help="Print the final report as JSON")
+
+    # Options shared by every command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--workers", type=int, help="Worker threads (default: BATCH_WORKERS)")
+    common.add_argument("--checkpoint-dir", help="Checkpoint directory (default: BATCH_CHECKPOINT_DIR)")
+    common.add_argument("--restart", action="store_true", help="Discard saved progress and start over")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser(
+        "ingest", parents=[common],
+        help="Add new files to the vector store (changed files need reindex)"
+    )
+    ingest.add_argument("paths", nargs="+", help="Files or directories to ingest")
+    ingest.add_argument("--batch-size", type=int, help="Files indexed together (default: BATCH_SIZE)")
+    ingest.add_argument("--chunk", action="store_true", help="Split documents into chunks before indexing")
+
+    reindex = subparsers.add_parser("reindex", parents=[common], help="Rebuild the vector store from the data directory")
+    reindex.add_argument("--data-dir", help="Directory with source documents (default: DATA_DIR)")
+    reindex.add_argument("--batch-size", type=int, help="Files indexed together (default: BATCH_SIZE)")
+    reindex.add_argument("--chunk", action="store_true", help="Split documents into chunks before indexing")
+
+    ieps = subparsers.add_parser("generate-ieps", parents=[common], help="Generate IEPs from student documents")
+    ieps.add_argument("paths", nargs="+", help="Files or directories with student documents")
+    ieps.add_argument("--output-dir", default="output/ieps", help="Directory for generated IEPs")
+
+    responses = subparsers.add_parser(
+        "import-responses", parents=[common],
+        help="Import gradebook exports (files are imported in order; --workers is unused)"
+    )
+    responses.add_argument("assessment", help="Assessment JSON file")
+    responses.add_argument("files", nargs="+", help="CSV or JSONL response files")
+    responses.add_argument("--import-batch-size", type=int, default=10000, help="Responses graded per batch")
+
+    evaluate = subparsers.add_parser("eval", parents=[common], help="Evaluate the RAG pipeline")
+    evaluate.add_argument("dataset", nargs="?", help="JSON or JSONL queries (default: built-in queries)")
+    evaluate.add_argument("--output-dir", default="rag_evaluation", help="Directory for evaluation results")
+    evaluate.add_argument("--batch-size", type=int, help="Queries per checkpointed batch (default: BATCH_SIZE)")
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a command and print its throughput report.
+
+    Args:
+        argv: Command line arguments (default: sys.argv)
+
+    Returns:
+        Exit status (1 if any item failed, 130 if interrupted)
+    """
+    args = build_parser().parse_args(argv)
+    setup_logging(args.log_level)
+
+    from core.jobs.batch import BatchJobError, JobStats
+
+    handler, unit = COMMANDS[args.command]
+    stats = JobStats(args.command, unit=unit)
+    report: Dict[str, Any] = {}
+    status = 0
+    try:
+        report = handler(args, stats)
+    except KeyboardInterrupt:
+        print("Interrupted; progress is saved and rerunning the command resumes it", file=sys.stderr)
+        status = 130
+    except BatchJobError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        status = 1
+
+    stats.finish()
+    if args.json:
+        print(json.dumps({"stats": stats.summary(), **report}, indent=2))
+    else:
+        print(stats.format())
+        for key, value in report.get("evaluation", {}).items():
+            print(f"  {key}: {value:.4f}" if isinstance(value, float) else f"  {key}: {value}")
+
+    if status == 0 and stats.failed:
+        status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 # config/app_config.py
 import os
-from dataclasses import dataclass
+import threading
+from dataclasses import dataclass, field
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
@@ -29,6 +30,12 @@ class VectorStoreConfig:
     chunk_overlap: int = 200
     similarity_top_k: int = 4
     cache_embeddings: bool = True
+    query_cache_enabled: bool = True
+    query_cache_size: int = 256  # Recent queries kept in the semantic cache
+    query_cache_threshold: float = 0.95  # Minimum cosine similarity for a cache hit
+    rerank_candidates: int = 12  # Candidates fetched before reranking and packing
+    mmr_lambda: float = 0.7  # Relevance vs. diversity trade-off for reranking
+    context_token_budget: int = 3000  # Maximum tokens of retrieved context per prompt
 
 @dataclass
 class DocumentConfig:
@@ -42,6 +49,45 @@ class DocumentConfig:
         if self.supported_formats is None:
             self.supported_formats = ['.pdf', '.docx', '.txt']
 
+@dataclass
+class ObservabilityConfig:
+    """Configuration for pipeline tracing and metrics."""
+    trace_log_dir: str = "logs/rag"
+    trace_buffer_size: int = 10000  # Events held in memory before new ones are dropped
+    trace_batch_size: int = 500  # Events that trigger an early flush
+    trace_flush_interval: float = 1.0  # Seconds between background flushes
+    trace_max_bytes: int = 10 * 1024 * 1024  # Trace file size before rotation
+    trace_backup_count: int = 5  # Rotated trace files kept
+    latency_window_seconds: float = 300.0  # Sliding window for latency percentiles
+    latency_window_slots: int = 10  # Sub-windows the latency window is divided into
+    metrics_port: int = 0  # Local port serving /metrics (0 disables the endpoint)
+    metrics_file: str = ""  # File periodically rewritten with metrics (empty disables)
+    metrics_dump_interval: float = 15.0  # Seconds between metrics file rewrites
+    profile_enabled: bool = False  # Dump span profiles of slow requests
+    profile_slow_seconds: float = 5.0  # Request duration at which a profile may be dumped
+    profile_sample_rate: float = 1.0  # Fraction of slow requests whose profile is dumped
+    profile_dir: str = "logs/profiles"  # Directory for folded-stack profile files
+    profile_max_files: int = 100  # Profile files kept before the oldest are deleted
+
+@dataclass
+class BatchConfig:
+    """Configuration for headless batch jobs."""
+    checkpoint_dir: str = ".checkpoints"  # Directory for job progress files
+    workers: int = 4  # Worker threads per job
+    batch_size: int = 50  # Items loaded and indexed together
+    checkpoint_interval: int = 10  # Completed items between progress saves
+
+@dataclass
+class JobQueueConfig:
+    """Configuration for the background job queue."""
+    db_path: str = ".state/jobs.db"
+    upload_dir: str = ".state/uploads"  # Uploaded files held until their job processes them
+    workers: int = 4  # Worker threads
+    max_attempts: int = 3  # Attempts per job before it fails
+    retry_delay: float = 5.0  # Seconds before the first retry (doubles per attempt)
+    poll_interval: float = 0.5  # Seconds an idle worker waits between queue checks
+    retention_seconds: float = 7 * 24 * 3600  # Age at which finished jobs are purged
+
 @dataclass
 class AppConfig:
     """Application configuration."""
@@ -49,6 +95,9 @@ class AppConfig:
     llm: LLMConfig
     vector_store: VectorStoreConfig
     document: DocumentConfig
+    observability: ObservabilityConfig = field(default_factory=ObservabilityConfig)
+    batch: BatchConfig = field(default_factory=BatchConfig)
+    jobs: JobQueueConfig = field(default_factory=JobQueueConfig)
     debug: bool = False
     
     @classmethod
@@ -82,7 +131,13 @@ class AppConfig:
             chunk_size=int(os.getenv("CHUNK_SIZE", "1000")),
             chunk_overlap=int(os.getenv("CHUNK_OVERLAP", "200")),
             similarity_top_k=int(os.getenv("SIMILARITY_TOP_K", "4")),
-            cache_embeddings=os.getenv("CACHE_EMBEDDINGS", "true").lower() == "true"
+            cache_embeddings=os.getenv("CACHE_EMBEDDINGS", "true").lower() == "true",
+            query_cache_enabled=os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true",
+            query_cache_size=int(os.getenv("QUERY_CACHE_SIZE", "256")),
+            query_cache_threshold=float(os.getenv("QUERY_CACHE_THRESHOLD", "0.95")),
+            rerank_candidates=int(os.getenv("RERANK_CANDIDATES", "12")),
+            mmr_lambda=float(os.getenv("MMR_LAMBDA", "0.7")),
+            context_token_budget=int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
         )
         
         # Create document config
@@ -92,14 +147,92 @@ class AppConfig:
             extraction_timeout=int(os.getenv("EXTRACTION_TIMEOUT", "30"))
         )
         
+        # Create observability config
+        observability_config = ObservabilityConfig(
+            trace_log_dir=os.getenv("TRACE_LOG_DIR", "logs/rag"),
+            trace_buffer_size=int(os.getenv("TRACE_BUFFER_SIZE", "10000")),
+            trace_batch_size=int(os.getenv("TRACE_BATCH_SIZE", "500")),
+            trace_flush_interval=float(os.getenv("TRACE_FLUSH_INTERVAL", "1.0")),
+            trace_max_bytes=int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024))),
+            trace_backup_count=int(os.getenv("TRACE_BACKUP_COUNT", "5")),
+            latency_window_seconds=float(os.getenv("LATENCY_WINDOW_SECONDS", "300")),
+            latency_window_slots=int(os.getenv("LATENCY_WINDOW_SLOTS", "10")),
+            metrics_port=int(os.getenv("METRICS_PORT", "0")),
+            metrics_file=os.getenv("METRICS_FILE", ""),
+            metrics_dump_interval=float(os.getenv("METRICS_DUMP_INTERVAL", "15")),
+            profile_enabled=os.getenv("PROFILE_ENABLED", "false").lower() == "true",
+            profile_slow_seconds=float(os.getenv("PROFILE_SLOW_SECONDS", "5")),
+            profile_sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "1.0")),
+            profile_dir=os.getenv("PROFILE_DIR", "logs/profiles"),
+            profile_max_files=int(os.getenv("PROFILE_MAX_FILES", "100"))
+        )
+        
+        # Create batch job config
+        batch_config = BatchConfig(
+            checkpoint_dir=os.getenv("BATCH_CHECKPOINT_DIR", ".checkpoints"),
+            workers=int(os.getenv("BATCH_WORKERS", "4")),
+            batch_size=int(os.getenv("BATCH_SIZE", "50")),
+            checkpoint_interval=int(os.getenv("BATCH_CHECKPOINT_INTERVAL", "10"))
+        )
+        
+        # Create job queue config
+        job_queue_config = JobQueueConfig(
+            db_path=os.getenv("JOB_QUEUE_DB_PATH", ".state/jobs.db"),
+            upload_dir=os.getenv("JOB_UPLOAD_DIR", ".state/uploads"),
+            workers=int(os.getenv("JOB_WORKERS", "4")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            retry_delay=float(os.getenv("JOB_RETRY_DELAY", "5")),
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "0.5")),
+            retention_seconds=float(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+        )
+        
         # Create app config
         return cls(
             environment=environment,
             llm=llm_config,
             vector_store=vector_config,
             document=document_config,
+            observability=observability_config,
+            batch=batch_config,
+            jobs=job_queue_config,
             debug=os.getenv("DEBUG", "false").lower() == "true"
         )
 
-# Default configuration singleton
-config = AppConfig.from_environment()
+_config: Optional[AppConfig] = None
+_config_lock = threading.Lock()
+
+def get_config() -> AppConfig:
+    """Get the application configuration, reading the environment on first use.
+    
+    Returns:
+        Application configuration
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = AppConfig.from_environment()
+    return _config
+
+def reset_config() -> None:
+    """Discard the resolved configuration so the next access re-reads the environment."""
+    global _config
+    with _config_lock:
+        _config = None
+
+class _LazyConfig:
+    """Proxy for the configuration singleton that resolves it on first attribute access.
+    
+    Importing a module that reads `config.<section>` at call time then costs
+    nothing until the value is actually needed, and entry points can adjust
+    the environment after importing application modules.
+    """
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_config(), name)
+    
+    def __repr__(self) -> str:
+        return repr(get_config()) if _config is not None else "<AppConfig (unresolved)>"
+
+# Default configuration singleton (resolved on first use)
+config = _LazyConfig()
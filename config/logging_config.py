@@ -1,16 +1,80 @@
 # config/logging_config.py
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Dict, Optional
 
+# Format shared by every handler
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the background listener.
+    
+    The stock QueueHandler runs the full formatter on the calling thread.
+    Here only the message arguments are merged (so later mutation of the
+    arguments cannot change the message); timestamps, traceback text and
+    layout are produced by the listener thread.
+    """
+    
+    def __init__(self, log_queue: queue.SimpleQueue, log_to_file: bool):
+        super().__init__(log_queue)
+        self.log_to_file = log_to_file
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        record.log_to_file = self.log_to_file
+        return record
+
+class _ModuleFileHandler(logging.Handler):
+    """Routes records to one rotating file per logger, opened on first use."""
+    
+    def __init__(self, log_dir: str, formatter: logging.Formatter):
+        super().__init__()
+        self.log_dir = log_dir
+        self.formatter = formatter
+        self._handlers: Dict[str, RotatingFileHandler] = {}
+    
+    def emit(self, record: logging.LogRecord):
+        if not getattr(record, "log_to_file", True):
+            return
+        
+        handler = self._handlers.get(record.name)
+        if handler is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            handler = RotatingFileHandler(
+                filename=f"{self.log_dir}/{record.name}.log",
+                maxBytes=10485760,  # 10MB
+                backupCount=5
+            )
+            handler.setFormatter(self.formatter)
+            self._handlers[record.name] = handler
+        handler.handle(record)
+    
+    def close(self):
+        for handler in self._handlers.values():
+            handler.close()
+        super().close()
+
 class LoggerFactory:
-    """Factory for creating configured loggers."""
+    """Factory for creating configured loggers.
+    
+    Module loggers only put records on a shared queue; a single
+    QueueListener thread formats them and does all console and file I/O.
+    """
     
     # Dictionary to store logger instances
     _loggers: Dict[str, logging.Logger] = {}
     
+    # Shared queue and background writer
+    _queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener: Optional[QueueListener] = None
+    _lock = threading.Lock()
+    
     @classmethod
     def get_logger(cls, name: str, log_to_file: bool = True) -> logging.Logger:
         """Get or create a logger with the specified name.
@@ -35,40 +99,49 @@ class LoggerFactory:
         cls._loggers[name] = logger
         return logger
     
-    @staticmethod
-    def _configure_logger(logger: logging.Logger, log_to_file: bool):
-        """Configure the logger with proper formatting and handlers."""
+    @classmethod
+    def _configure_logger(cls, logger: logging.Logger, log_to_file: bool):
+        """Configure the logger to hand records to the background writer."""
         # Set level based on environment
         log_level = os.getenv("LOG_LEVEL", "INFO")
         logger.setLevel(getattr(logging, log_level))
         
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
-        
-        # File handler (optional)
-        if log_to_file:
-            # Create logs directory if it doesn't exist
-            log_dir = "logs"
-            os.makedirs(log_dir, exist_ok=True)
-            
-            # Create file handler
-            file_handler = RotatingFileHandler(
-                filename=f"{log_dir}/{logger.name}.log",
-                maxBytes=10485760,  # 10MB
-                backupCount=5
-            )
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+        cls._start_listener()
+        logger.addHandler(_DeferredQueueHandler(cls._queue, log_to_file))
         
         # Disable propagation to avoid duplicate logs
         logger.propagate = False
+    
+    @classmethod
+    def _start_listener(cls):
+        """Start the background writer on first use."""
+        with cls._lock:
+            if cls._listener is not None:
+                return
+            
+            # Create formatter
+            formatter = logging.Formatter(LOG_FORMAT)
+            
+            # Console handler
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+            
+            # Per-module file handlers, created as modules first log
+            file_handler = _ModuleFileHandler("logs", formatter)
+            
+            cls._listener = QueueListener(cls._queue, console_handler, file_handler)
+            cls._listener.start()
+            atexit.register(cls.shutdown)
+    
+    @classmethod
+    def shutdown(cls):
+        """Write out queued records and stop the background writer."""
+        with cls._lock:
+            listener, cls._listener = cls._listener, None
+        if listener is not None:
+            listener.stop()
+            for handler in listener.handlers:
+                handler.close()
 
 # Global logger for general use
 logger = LoggerFactory.get_logger("educational_assistant")
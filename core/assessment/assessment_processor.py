@@ -4,10 +4,14 @@ import uuid
 import re
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
 
 from config.logging_config import get_module_logger
 from core.assessment.interfaces import AssessmentProcessorInterface
-from core.assessment.knowledge_tracing import BayesianKnowledgeTracer
+from core.assessment.knowledge_tracing import BayesianKnowledgeTracer, MasteryMatrix
+from core.assessment.keyword_matcher import CurriculumMatcher
+from core.assessment.bkt_fitter import load_parameters
+from core.assessment.item_selector import ItemIndex, AdaptiveItemSelector
 
 # Create a logger for this module
 logger = get_module_logger("assessment_processor")
@@ -21,10 +25,35 @@ class AssessmentProcessor(AssessmentProcessorInterface):
         Args:
             curriculum_data: Optional curriculum data dictionary
         """
-        self.knowledge_tracer = BayesianKnowledgeTracer()
+        # Use per-component parameters from the offline fitter when available
+        self.knowledge_tracer = BayesianKnowledgeTracer(component_params=load_parameters())
+        self._matcher: Optional[CurriculumMatcher] = None
         self.curriculum_data = curriculum_data or self._default_curriculum_data()
         logger.debug("Initialized Assessment Processor")
     
+    @property
+    def curriculum_data(self) -> Dict[str, Any]:
+        """Curriculum used for skill and component detection."""
+        return self._curriculum_data
+    
+    @curriculum_data.setter
+    def curriculum_data(self, curriculum_data: Dict[str, Any]) -> None:
+        """Replace the curriculum and invalidate the compiled matcher."""
+        self._curriculum_data = curriculum_data
+        self._matcher = None
+    
+    def invalidate_matcher(self) -> None:
+        """Discard the compiled matcher after modifying `curriculum_data` in place."""
+        self._matcher = None
+    
+    @property
+    def matcher(self) -> CurriculumMatcher:
+        """Matcher compiled from the current curriculum, built on first use."""
+        if self._matcher is None:
+            self._matcher = CurriculumMatcher(self._curriculum_data)
+            logger.debug("Compiled curriculum matcher")
+        return self._matcher
+    
     def _default_curriculum_data(self) -> Dict[str, Any]:
         """Provide default curriculum data structure."""
         return {
@@ -96,6 +125,33 @@ class AssessmentProcessor(AssessmentProcessorInterface):
             assessment["processing_error"] = str(e)
             return assessment
     
+    def process_assessments(self, assessments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process a batch of assessments, such as a whole item bank.
+        
+        The curriculum matcher is compiled once and shared by every question.
+        
+        Args:
+            assessments: Assessment data dictionaries
+            
+        Returns:
+            Processed assessments in input order
+        """
+        return [self.process_assessment(assessment) for assessment in assessments]
+    
+    def build_item_selector(self, assessments: List[Dict[str, Any]]) -> AdaptiveItemSelector:
+        """Build an adaptive item selector over the questions of processed assessments.
+        
+        Args:
+            assessments: Processed assessments forming the item bank
+            
+        Returns:
+            Selector sharing this processor's knowledge tracer
+        """
+        item_index = ItemIndex(
+            question for assessment in assessments for question in assessment.get("questions", [])
+        )
+        return AdaptiveItemSelector(item_index, self.knowledge_tracer)
+    
     def _process_question(self, question: Dict[str, Any], subject: str, grade_level: str) -> Dict[str, Any]:
         """Process a question to identify cognitive skills and knowledge components.
         
@@ -125,11 +181,10 @@ class AssessmentProcessor(AssessmentProcessorInterface):
             processed["knowledge_components"] = []
             return processed
         
-        # Identify cognitive skills
-        processed["cognitive_skills"] = self._identify_cognitive_skills(text)
-        
-        # Identify knowledge components
-        processed["knowledge_components"] = self._identify_knowledge_components(text, subject)
+        # Identify cognitive skills and knowledge components in one pass
+        skills, components = self.matcher.match(text, subject)
+        processed["cognitive_skills"] = skills or ["remember"]
+        processed["knowledge_components"] = components
         
         # Estimate difficulty if not provided
         if "difficulty" not in processed:
@@ -149,14 +204,7 @@ class AssessmentProcessor(AssessmentProcessorInterface):
         Returns:
             List of identified cognitive skills
         """
-        text = text.lower()
-        identified_skills = []
-        
-        for skill, indicators in self.curriculum_data["cognitive_skills"].items():
-            for indicator in indicators:
-                if indicator in text:
-                    identified_skills.append(skill)
-                    break
+        identified_skills, _ = self.matcher.match(text, "")
         
         # Default to "remember" if no skills identified
         if not identified_skills:
@@ -174,34 +222,7 @@ class AssessmentProcessor(AssessmentProcessorInterface):
         Returns:
             List of knowledge component dictionaries
         """
-        text = text.lower()
-        components = []
-        subject_data = self.curriculum_data["subjects"].get(subject.lower(), {})
-        
-        # If subject not found, return empty list
-        if not subject_data:
-            return components
-        
-        # Search for knowledge components
-        for category, skills in subject_data.get("categories", {}).items():
-            for skill in skills:
-                # Check if skill keywords are in the text
-                if skill.replace("_", " ") in text:
-                    # Create a unique ID for the component
-                    component_id = f"kc_{subject.lower()}_{category}_{skill}"
-                    
-                    # Create component structure
-                    component = {
-                        "id": component_id,
-                        "name": skill.replace("_", " ").title(),
-                        "category": category,
-                        "subject": subject.lower()
-                    }
-                    
-                    # Add to list if not already present
-                    if not any(c["id"] == component_id for c in components):
-                        components.append(component)
-        
+        _, components = self.matcher.match(text, subject)
         return components
     
     def _estimate_difficulty(self, cognitive_skills: List[str], knowledge_components: List[Dict[str, Any]]) -> float:
@@ -237,13 +258,15 @@ class AssessmentProcessor(AssessmentProcessorInterface):
         # Ensure difficulty is between 0 and 1
         return max(0.1, min(0.9, difficulty))
     
-    def process_student_response(self, student_id: str, question: Dict[str, Any], response: Any) -> Dict[str, Any]:
+    def process_student_response(self, student_id: str, question: Dict[str, Any], response: Any,
+                                 knowledge_state: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """Process a student's response to update knowledge state.
         
         Args:
             student_id: Student identifier
             question: Processed question dictionary
             response: Student's response
+            knowledge_state: Student's current mastery by component id, used as priors
             
         Returns:
             Trace with interaction data and knowledge updates
@@ -275,14 +298,17 @@ class AssessmentProcessor(AssessmentProcessorInterface):
                 if not component_id:
                     continue
                 
-                # Use default prior if not provided
-                prior = 0.5
+                # Use the student's stored mastery, or the initial prior for new components
+                prior = (knowledge_state or {}).get(component_id)
+                if prior is None:
+                    prior = self.knowledge_tracer.initial_mastery(component_id)
                 
                 # Update knowledge using Bayesian knowledge tracing
                 knowledge_update = self.knowledge_tracer.update_knowledge(
                     prior=prior,
                     is_correct=is_correct,
-                    difficulty=question.get("difficulty", 0.5)
+                    difficulty=question.get("difficulty", 0.5),
+                    component_id=component_id
                 )
                 
                 # Store updates
@@ -302,6 +328,182 @@ class AssessmentProcessor(AssessmentProcessorInterface):
             logger.error(f"Error processing student response: {str(e)}", exc_info=True)
             return {"error": str(e)}
     
+    def process_assessment_responses(self, 
+                                     assessment: Dict[str, Any], 
+                                     student_responses: Dict[str, Dict[str, Any]],
+                                     knowledge_states: Optional[Dict[str, Dict[str, float]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Process many students' responses to an assessment in one batch.
+        
+        All (student, component) knowledge updates are applied by a single
+        vectorized call to the knowledge tracer, in question order per
+        student, so a later question on the same component builds on the
+        earlier posterior exactly as sequential processing would.
+        
+        Args:
+            assessment: Processed assessment dictionary
+            student_responses: Mapping of student id to {question_id: response}
+            knowledge_states: Optional mapping of student id to current mastery
+                by component id, used as priors
+            
+        Returns:
+            Mapping of student id to traces, one per answered question, in the
+            same format as `process_student_response`
+        """
+        knowledge_states = knowledge_states or {}
+        questions = [q for q in assessment.get("questions", []) if q.get("question_id")]
+        
+        # Grade each question for all students at once
+        correctness_by_question: Dict[str, Dict[str, bool]] = {}
+        for question in questions:
+            question_id = question["question_id"]
+            respondents = [
+                student_id for student_id, responses in student_responses.items()
+                if question_id in responses
+            ]
+            if respondents:
+                graded = self.evaluate_responses(
+                    question, [student_responses[student_id][question_id] for student_id in respondents]
+                )
+                correctness_by_question[question_id] = dict(zip(respondents, graded.tolist()))
+        
+        # Seed the mastery matrix with stored priors
+        mastery = MasteryMatrix(student_ids=student_responses.keys())
+        for student_id, state in knowledge_states.items():
+            if student_id in student_responses:
+                mastery.set_student_state(student_id, state)
+        
+        # Cells without a stored prior start at the component's initial mastery
+        initial_cells: Dict[Tuple[int, int], float] = {}
+        
+        # Build one event per (response, component) in question order
+        traces: Dict[str, List[Dict[str, Any]]] = {}
+        event_traces = []
+        event_components = []
+        student_idx, component_idx, correctness, difficulty = [], [], [], []
+        timestamp = datetime.now().isoformat()
+        
+        for student_id, responses in student_responses.items():
+            row = mastery.add_student(student_id)
+            student_traces = traces.setdefault(student_id, [])
+            
+            for question in questions:
+                question_id = question["question_id"]
+                if question_id not in responses:
+                    continue
+                
+                response = responses[question_id]
+                is_correct = correctness_by_question[question_id][student_id]
+                trace = {
+                    "interaction": {
+                        "timestamp": timestamp,
+                        "student_id": student_id,
+                        "question_id": question_id,
+                        "is_correct": is_correct,
+                        "response": response
+                    },
+                    "knowledge_updates": {}
+                }
+                if assessment.get("assessment_id"):
+                    trace["interaction"]["assessment_id"] = assessment["assessment_id"]
+                student_traces.append(trace)
+                
+                for component in question.get("knowledge_components", []):
+                    component_id = component.get("id")
+                    if not component_id:
+                        continue
+                    col = mastery.add_component(component_id)
+                    if component_id not in knowledge_states.get(student_id, {}):
+                        initial_cells[(row, col)] = self.knowledge_tracer.initial_mastery(component_id)
+                    student_idx.append(row)
+                    component_idx.append(col)
+                    correctness.append(is_correct)
+                    difficulty.append(question.get("difficulty", 0.5))
+                    event_traces.append(trace)
+                    event_components.append(component_id)
+        
+        for (row, col), value in initial_cells.items():
+            mastery.values[row, col] = value
+        
+        updates = self.knowledge_tracer.update_knowledge_batch(
+            mastery.values,
+            np.asarray(student_idx, dtype=np.int64),
+            np.asarray(component_idx, dtype=np.int64),
+            np.asarray(correctness, dtype=bool),
+            np.asarray(difficulty, dtype=np.float64),
+            component_ids=list(mastery.component_index)
+        )
+        
+        # Attach per-event updates to their traces
+        for i, (trace, component_id) in enumerate(zip(event_traces, event_components)):
+            trace["knowledge_updates"][component_id] = {
+                "prior": float(updates["prior"][i]),
+                "new_value": float(updates["value"][i]),
+                "confidence": float(updates["confidence"][i])
+            }
+        
+        logger.debug(f"Processed {len(event_traces)} knowledge updates for {len(traces)} students")
+        return traces
+    
+    def evaluate_responses(self, question: Dict[str, Any], responses: List[Any]) -> np.ndarray:
+        """Evaluate many responses to one question with array operations.
+        
+        Gives the same results as `_evaluate_correctness` for each response.
+        
+        Args:
+            question: Question dictionary
+            responses: Student responses
+            
+        Returns:
+            Boolean array of correctness, aligned with responses
+        """
+        question_type = question.get("question_type", "")
+        correct_answer = question.get("correct_answer")
+        values = np.empty(len(responses), dtype=object)
+        values[:] = responses
+        
+        # If no correct answer specified, nothing is correct
+        if correct_answer is None or not len(values):
+            return np.zeros(len(values), dtype=bool)
+        
+        try:
+            if question_type == "multiple_choice":
+                return np.array([response == correct_answer for response in values], dtype=bool)
+            
+            elif question_type == "true_false":
+                # Strings compare case-insensitively, anything else by truthiness
+                is_text = np.array([isinstance(response, str) for response in values], dtype=bool)
+                result = np.array([bool(response) for response in values], dtype=bool) == bool(correct_answer)
+                if is_text.any():
+                    text = np.char.lower(values[is_text].astype(str))
+                    result[is_text] = text == str(correct_answer).lower()
+                return result
+            
+            elif question_type == "fill_in":
+                # Normalize text for comparison
+                text = np.char.lower(np.char.strip(values.astype(str)))
+                return text == str(correct_answer).strip().lower()
+            
+            elif question_type == "numeric":
+                # Unparseable responses become NaN, which never matches
+                tolerance = question.get("tolerance", 0.001)
+                numbers = np.array([self._to_float(response) for response in values], dtype=np.float64)
+                return np.abs(numbers - float(correct_answer)) <= tolerance
+            
+            # Default case
+            return np.zeros(len(values), dtype=bool)
+            
+        except Exception as e:
+            logger.error(f"Error evaluating correctness: {str(e)}")
+            return np.array([self._evaluate_correctness(question, response) for response in values], dtype=bool)
+    
+    @staticmethod
+    def _to_float(value: Any) -> float:
+        """Convert a response to float, or NaN if it is not numeric."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float("nan")
+    
     def _evaluate_correctness(self, question: Dict[str, Any], response: Any) -> bool:
         """Evaluate if a response is correct.
         
@@ -0,0 +1,267 @@
+# core/assessment/bkt_fitter.py
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from config.logging_config import get_module_logger
+from core.assessment.knowledge_state_store import KnowledgeStateStore
+
+# Create a logger for this module
+logger = get_module_logger("bkt_fitter")
+
+# Where fitted parameters are written and where the online tracer looks for them
+DEFAULT_PARAMETERS_PATH = ".state/bkt_parameters.json"
+
+# Bounds that keep fitted models identifiable (slip and guess below 0.5)
+PARAMETER_BOUNDS = {
+    "prior": (0.01, 0.99),
+    "learn": (0.0, 0.5),
+    "slip": (0.01, 0.3),
+    "guess": (0.01, 0.4)
+}
+
+# Starting point for EM
+INITIAL_PARAMETERS = {"prior": 0.5, "learn": 0.1, "slip": 0.1, "guess": 0.2}
+
+class BKTFitterError(Exception):
+    """Exception raised for BKT fitting errors."""
+    pass
+
+def _pad_sequences(sequences: List[List[bool]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Left-align response sequences into a students x steps matrix.
+
+    Args:
+        sequences: Per-student correctness sequences in time order
+
+    Returns:
+        Tuple of (correct matrix, mask of real observations)
+    """
+    lengths = np.array([len(sequence) for sequence in sequences])
+    steps = int(lengths.max())
+    mask = np.arange(steps)[None, :] < lengths[:, None]
+    correct = np.zeros(mask.shape, dtype=bool)
+    correct[mask] = np.concatenate([np.asarray(sequence, dtype=bool) for sequence in sequences])
+    return correct, mask
+
+def fit_component(sequences: List[List[bool]],
+                  max_iter: int = 100,
+                  tol: float = 1e-4) -> Dict[str, float]:
+    """Fit BKT parameters for one component with forward-backward EM.
+
+    Every student's sequence is processed at once: the forward and backward
+    passes step through time with array operations over all students.
+    Padding after a sequence ends is treated as missing observations, which
+    leaves the likelihood and the posteriors of real steps unchanged.
+
+    Args:
+        sequences: Per-student correctness sequences in time order
+        max_iter: Maximum EM iterations
+        tol: Stop when the log-likelihood improves by less than this
+
+    Returns:
+        Dictionary with prior, learn, slip, guess, log_likelihood, iterations,
+        students and observations
+    """
+    sequences = [sequence for sequence in sequences if len(sequence)]
+    if not sequences:
+        raise BKTFitterError("No responses to fit")
+
+    correct, mask = _pad_sequences(sequences)
+    num_students, steps = correct.shape
+    params = dict(INITIAL_PARAMETERS)
+    previous_ll = -np.inf
+    log_likelihood = -np.inf
+
+    # Transitions into step t + 1 count only where step t + 1 is observed
+    transition_mask = mask[:, 1:]
+
+    for iteration in range(1, max_iter + 1):
+        prior, learn, slip, guess = params["prior"], params["learn"], params["slip"], params["guess"]
+
+        # Emission probability of each observation given unknown (0) / known (1)
+        emit_known = np.where(correct, 1 - slip, slip)
+        emit_unknown = np.where(correct, guess, 1 - guess)
+        emit_known = np.where(mask, emit_known, 1.0)
+        emit_unknown = np.where(mask, emit_unknown, 1.0)
+
+        # Scaled forward pass: alpha holds P(known at t | observations up to t)
+        alpha = np.empty((num_students, steps))
+        scale = np.empty((num_students, steps))
+        known = np.full(num_students, prior)
+        for t in range(steps):
+            if t:
+                known = known + (1 - known) * learn
+            joint_known = known * emit_known[:, t]
+            joint_unknown = (1 - known) * emit_unknown[:, t]
+            scale[:, t] = joint_known + joint_unknown
+            known = joint_known / scale[:, t]
+            alpha[:, t] = known
+
+        log_likelihood = float(np.log(scale).sum())
+
+        # Scaled backward pass for (unknown, known)
+        beta_unknown = np.ones((num_students, steps))
+        beta_known = np.ones((num_students, steps))
+        for t in range(steps - 2, -1, -1):
+            next_known = emit_known[:, t + 1] * beta_known[:, t + 1]
+            next_unknown = emit_unknown[:, t + 1] * beta_unknown[:, t + 1]
+            beta_known[:, t] = next_known / scale[:, t + 1]
+            beta_unknown[:, t] = ((1 - learn) * next_unknown + learn * next_known) / scale[:, t + 1]
+
+        # State posteriors
+        gamma_known = alpha * beta_known
+        gamma_unknown = (1 - alpha) * beta_unknown
+        total = gamma_known + gamma_unknown
+        gamma_known /= total
+        gamma_unknown /= total
+
+        # Expected unknown -> known transitions
+        xi_learn = (
+            (1 - alpha[:, :-1]) * learn * emit_known[:, 1:] * beta_known[:, 1:] / scale[:, 1:]
+        )
+
+        # M-step
+        learn_denominator = (gamma_unknown[:, :-1] * transition_mask).sum()
+        known_weight = (gamma_known * mask).sum()
+        unknown_weight = (gamma_unknown * mask).sum()
+
+        params = {
+            "prior": float(gamma_known[:, 0].mean()),
+            "learn": float((xi_learn * transition_mask).sum() / learn_denominator) if learn_denominator > 0 else learn,
+            "slip": float((gamma_known * (mask & ~correct)).sum() / known_weight) if known_weight > 0 else slip,
+            "guess": float((gamma_unknown * (mask & correct)).sum() / unknown_weight) if unknown_weight > 0 else guess
+        }
+        for name, (low, high) in PARAMETER_BOUNDS.items():
+            params[name] = min(high, max(low, params[name]))
+
+        if log_likelihood - previous_ll < tol:
+            break
+        previous_ll = log_likelihood
+
+    params.update({
+        "log_likelihood": log_likelihood,
+        "iterations": iteration,
+        "students": num_students,
+        "observations": int(mask.sum())
+    })
+    return params
+
+def _fit_component_job(job: Tuple[str, List[List[bool]], int, float]) -> Tuple[str, Dict[str, float]]:
+    """Fit one component in a worker process."""
+    component_id, sequences, max_iter, tol = job
+    return component_id, fit_component(sequences, max_iter, tol)
+
+def save_parameters(parameters: Dict[str, Dict[str, float]], path: str = DEFAULT_PARAMETERS_PATH) -> None:
+    """Write fitted parameters to a JSON file.
+
+    Args:
+        parameters: Mapping of component id to fitted parameters
+        path: Output file path
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    document = {"fitted_at": datetime.now().isoformat(), "components": parameters}
+
+    # Write then rename so the online tracer never reads a partial file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(document, f, indent=2)
+    os.replace(temp_path, path)
+
+def load_parameters(path: str = DEFAULT_PARAMETERS_PATH) -> Dict[str, Dict[str, float]]:
+    """Read fitted parameters written by `save_parameters`.
+
+    Args:
+        path: Parameter file path
+
+    Returns:
+        Mapping of component id to parameters, or an empty dict if there is no file
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("components", {})
+    except Exception as e:
+        logger.error(f"Error loading BKT parameters from {path}: {str(e)}")
+        return {}
+
+class BKTFitter:
+    """Offline estimation of per-component BKT parameters from stored responses."""
+
+    def __init__(self,
+                 knowledge_store: Optional[KnowledgeStateStore] = None,
+                 max_iter: int = 100,
+                 tol: float = 1e-4,
+                 min_students: int = 5,
+                 max_workers: Optional[int] = None):
+        """Initialize the fitter.
+
+        Args:
+            knowledge_store: Store holding the response history (default: SQLite store)
+            max_iter: Maximum EM iterations per component
+            tol: Log-likelihood convergence tolerance
+            min_students: Components answered by fewer students are not fitted
+            max_workers: Worker processes for fitting components in parallel (1 or None runs inline)
+        """
+        self.knowledge_store = knowledge_store or KnowledgeStateStore()
+        self.max_iter = max_iter
+        self.tol = tol
+        self.min_students = min_students
+        self.max_workers = max_workers
+
+    def fit(self, component_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """Fit parameters for every component with enough data.
+
+        Args:
+            component_ids: Optional components to fit (default: all with history)
+
+        Returns:
+            Mapping of component id to fitted parameters
+        """
+        sequences = self.knowledge_store.get_response_sequences(component_ids)
+        jobs = [
+            (component_id, list(by_student.values()), self.max_iter, self.tol)
+            for component_id, by_student in sequences.items()
+            if len(by_student) >= self.min_students
+        ]
+        skipped = len(sequences) - len(jobs)
+        if skipped:
+            logger.info(f"Skipping {skipped} components with fewer than {self.min_students} students")
+
+        parameters: Dict[str, Dict[str, float]] = {}
+        if self.max_workers and self.max_workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                for component_id, fitted in executor.map(_fit_component_job, jobs):
+                    parameters[component_id] = fitted
+        else:
+            for job in jobs:
+                component_id, fitted = _fit_component_job(job)
+                parameters[component_id] = fitted
+
+        logger.info(f"Fitted BKT parameters for {len(parameters)} components")
+        return parameters
+
+    def fit_and_save(self,
+                     path: str = DEFAULT_PARAMETERS_PATH,
+                     component_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+        """Fit parameters and persist them for the online tracer.
+
+        Components not refitted keep their previously saved parameters.
+
+        Args:
+            path: Parameter file path
+            component_ids: Optional components to fit (default: all with history)
+
+        Returns:
+            Mapping of component id to fitted parameters
+        """
+        parameters = self.fit(component_ids)
+        merged = load_parameters(path)
+        merged.update(parameters)
+        save_parameters(merged, path)
+        logger.info(f"Saved BKT parameters for {len(merged)} components to {path}")
+        return parameters
@@ -14,7 +14,7 @@ class AssessmentProcessorInterface(ABC):
     
     @abstractmethod
     def process_student_response(self, student_id: str, question: Dict[str, Any], 
-                                response: Any) -> Dict[str, Any]:
+                                response: Any, knowledge_state: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """Process a student's response to update knowledge state."""
         pass
 
@@ -0,0 +1,272 @@
+# core/assessment/item_selector.py
+
+from typing import Dict, Any, List, Optional, Iterable, Set
+import numpy as np
+
+from config.logging_config import get_module_logger
+from core.assessment.knowledge_tracing import BayesianKnowledgeTracer
+
+# Create a logger for this module
+logger = get_module_logger("item_selector")
+
+# Difficulty grid used to find the most informative difficulty per component
+DIFFICULTY_GRID = np.linspace(0.0, 1.0, 51)
+
+
+def _binary_entropy(p: np.ndarray) -> np.ndarray:
+    """Entropy in bits of Bernoulli variables with probabilities p."""
+    p = np.clip(p, 1e-9, 1 - 1e-9)
+    return -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+
+
+def expected_information_gain(mastery: np.ndarray,
+                              slip: np.ndarray,
+                              guess: np.ndarray,
+                              difficulty: np.ndarray,
+                              adjust: Optional[np.ndarray] = None) -> np.ndarray:
+    """Expected reduction in mastery entropy from observing one response.
+
+    Slip and guess are adjusted by difficulty the same way as in
+    `BayesianKnowledgeTracer.update_knowledge`, which skips the adjustment
+    for components with fitted parameters. All arguments broadcast.
+
+    Args:
+        mastery: Current probability that the component is known
+        slip: Base slip probability
+        guess: Base guess probability
+        difficulty: Question difficulty (0 to 1)
+        adjust: Optional flags for where difficulty applies (default: everywhere)
+
+    Returns:
+        Mutual information between mastery and the response, in bits
+    """
+    mastery = np.clip(mastery, 0.01, 0.99)
+    adjusted_slip = slip * (0.5 + 0.5 * difficulty)
+    adjusted_guess = guess * (1.0 - 0.5 * difficulty)
+    if adjust is None:
+        slip, guess = adjusted_slip, adjusted_guess
+    else:
+        slip = np.where(adjust, adjusted_slip, slip)
+        guess = np.where(adjust, adjusted_guess, guess)
+
+    p_correct = mastery * (1 - slip) + (1 - mastery) * guess
+    posterior_correct = mastery * (1 - slip) / np.maximum(p_correct, 1e-9)
+    posterior_incorrect = mastery * slip / np.maximum(1 - p_correct, 1e-9)
+
+    expected_entropy = (
+        p_correct * _binary_entropy(posterior_correct)
+        + (1 - p_correct) * _binary_entropy(posterior_incorrect)
+    )
+    return _binary_entropy(mastery) - expected_entropy
+
+
+class ItemIndex:
+    """Item bank indexed by knowledge component and difficulty.
+
+    For every component the questions assessing it are kept as a pair of
+    arrays sorted by difficulty, so the items nearest a target difficulty
+    are found by binary search.
+    """
+
+    def __init__(self, questions: Iterable[Dict[str, Any]] = ()):
+        """Build the index.
+
+        Args:
+            questions: Processed questions with question_id, difficulty and knowledge_components
+        """
+        self.questions: List[Dict[str, Any]] = []
+        self.question_rows: Dict[str, int] = {}
+        self.component_index: Dict[str, int] = {}
+        self._build()
+        self.add_questions(questions)
+
+    def add_questions(self, questions: Iterable[Dict[str, Any]]) -> None:
+        """Add questions to the bank; questions already indexed are skipped.
+
+        Args:
+            questions: Processed questions
+        """
+        added = 0
+        for question in questions:
+            question_id = question.get("question_id")
+            if not question_id or question_id in self.question_rows:
+                continue
+            self.question_rows[question_id] = len(self.questions)
+            self.questions.append(question)
+            added += 1
+
+        if added:
+            self._build()
+
+    def _build(self) -> None:
+        """Rebuild the sorted per-component arrays."""
+        self.difficulty = np.array([q.get("difficulty", 0.5) for q in self.questions], dtype=np.float64)
+
+        # Question -> component columns in CSR form
+        pointers = [0]
+        columns: List[int] = []
+        for question in self.questions:
+            for component in question.get("knowledge_components", []):
+                component_id = component.get("id")
+                if not component_id:
+                    continue
+                col = self.component_index.setdefault(component_id, len(self.component_index))
+                columns.append(col)
+            pointers.append(len(columns))
+        self.component_pointers = np.array(pointers, dtype=np.int64)
+        self.component_columns = np.array(columns, dtype=np.int64)
+        self.component_ids = list(self.component_index)
+
+        # Component -> question rows sorted by difficulty
+        question_of_entry = np.repeat(np.arange(len(self.questions)), np.diff(self.component_pointers))
+        order = np.lexsort((self.difficulty[question_of_entry], self.component_columns))
+        sorted_columns = self.component_columns[order]
+        bounds = np.searchsorted(sorted_columns, np.arange(len(self.component_ids) + 1))
+        sorted_rows = question_of_entry[order]
+
+        self.rows_by_component = [sorted_rows[bounds[i]:bounds[i + 1]] for i in range(len(self.component_ids))]
+        self.difficulty_by_component = [self.difficulty[rows] for rows in self.rows_by_component]
+
+        logger.debug(f"Indexed {len(self.questions)} questions over {len(self.component_ids)} components")
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+
+class AdaptiveItemSelector:
+    """Chooses the next question that is most informative about a student's mastery."""
+
+    def __init__(self,
+                 item_index: ItemIndex,
+                 knowledge_tracer: Optional[BayesianKnowledgeTracer] = None,
+                 max_components: int = 8,
+                 window: int = 32):
+        """Initialize the selector.
+
+        Args:
+            item_index: Indexed item bank
+            knowledge_tracer: Tracer whose slip/guess parameters model responses
+            max_components: Number of most informative components searched per call (more
+                are searched while fewer than `window` unanswered items were found)
+            window: Unanswered items considered per component around its best difficulty
+        """
+        self.item_index = item_index
+        self.knowledge_tracer = knowledge_tracer or BayesianKnowledgeTracer()
+        self.max_components = max_components
+        self.window = window
+        self._column_params: Optional[np.ndarray] = None
+
+    def _get_column_params(self) -> np.ndarray:
+        """Get (initial mastery, base slip, base guess, difficulty applies) per component column, cached."""
+        component_ids = self.item_index.component_ids
+        if self._column_params is None or len(self._column_params) != len(component_ids):
+            tracer = self.knowledge_tracer
+            self._column_params = np.array([
+                (tracer.initial_mastery(component_id),) + tracer.component_probs(component_id)[:2]
+                + (not tracer.has_fitted_params(component_id),)
+                for component_id in component_ids
+            ]).reshape(-1, 4)
+        return self._column_params
+
+    def _mastery_vector(self, knowledge_state: Dict[str, float]) -> np.ndarray:
+        """Get the student's mastery for every component column."""
+        mastery = self._get_column_params()[:, 0].copy()
+        component_index = self.item_index.component_index
+        for component_id, value in knowledge_state.items():
+            col = component_index.get(component_id)
+            if col is not None:
+                mastery[col] = value
+        return mastery
+
+    def _nearest_rows(self, col: int, target: float, exclude: Set[str]) -> List[int]:
+        """Get up to `window` unanswered items of a component nearest a difficulty."""
+        rows = self.item_index.rows_by_component[col]
+        difficulties = self.item_index.difficulty_by_component[col]
+        questions = self.item_index.questions
+
+        # Walk outwards from the insertion point, taking the closer side each step
+        right = int(np.searchsorted(difficulties, target))
+        left = right - 1
+        chosen: List[int] = []
+        while len(chosen) < self.window and (left >= 0 or right < len(rows)):
+            if right >= len(rows) or (left >= 0 and target - difficulties[left] <= difficulties[right] - target):
+                row, left = int(rows[left]), left - 1
+            else:
+                row, right = int(rows[right]), right + 1
+            if questions[row]["question_id"] not in exclude:
+                chosen.append(row)
+        return chosen
+
+    def select_next(self,
+                    knowledge_state: Dict[str, float],
+                    answered: Optional[Iterable[str]] = None,
+                    component_ids: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Select the next question for a student.
+
+        Args:
+            knowledge_state: Student's mastery by component id
+            answered: Question ids already administered
+            component_ids: Optional components to target (default: all in the bank)
+
+        Returns:
+            Dictionary with the question and its expected information gain,
+            or None if no unanswered question remains
+        """
+        index = self.item_index
+        if not len(index):
+            return None
+        exclude = set(answered or ())
+
+        if component_ids is None:
+            columns = np.arange(len(index.component_ids))
+        else:
+            columns = np.array(
+                [index.component_index[c] for c in component_ids if c in index.component_index],
+                dtype=np.int64
+            )
+        if not len(columns):
+            return None
+
+        params = self._get_column_params()
+        all_mastery = self._mastery_vector(knowledge_state)
+        
+        # Best achievable gain and difficulty per component on a grid
+        grid_gain = expected_information_gain(
+            all_mastery[columns, None], params[columns, 1, None], params[columns, 2, None],
+            DIFFICULTY_GRID[None, :], params[columns, 3, None] > 0
+        )
+        best_gain = grid_gain.max(axis=1)
+        best_difficulty = DIFFICULTY_GRID[grid_gain.argmax(axis=1)]
+
+        # Search the most informative components first; past the first `max_components`,
+        # keep going only while fewer than `window` candidates were found, so components
+        # whose items were all answered don't hide the rest of the bank
+        candidates: List[int] = []
+        for rank, i in enumerate(np.argsort(-best_gain)):
+            if rank >= self.max_components and len(candidates) >= self.window:
+                break
+            candidates.extend(self._nearest_rows(int(columns[i]), best_difficulty[i], exclude))
+        if not candidates:
+            return None
+        candidates = np.unique(np.array(candidates, dtype=np.int64))
+
+        # Score every candidate by the total gain over all of its components
+        starts = index.component_pointers[candidates]
+        counts = index.component_pointers[candidates + 1] - starts
+        owner = np.repeat(np.arange(len(candidates)), counts)
+        entries = np.repeat(starts - np.cumsum(np.r_[0, counts[:-1]]), counts) + np.arange(counts.sum())
+        entry_columns = index.component_columns[entries]
+
+        entry_gain = expected_information_gain(
+            all_mastery[entry_columns], params[entry_columns, 1], params[entry_columns, 2],
+            index.difficulty[candidates][owner], params[entry_columns, 3] > 0
+        )
+        total_gain = np.bincount(owner, weights=entry_gain, minlength=len(candidates))
+
+        best = int(np.argmax(total_gain))
+        question = index.questions[candidates[best]]
+        return {
+            "question": question,
+            "question_id": question["question_id"],
+            "expected_information_gain": float(total_gain[best])
+        }
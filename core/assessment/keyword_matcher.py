@@ -0,0 +1,146 @@
+# core/assessment/keyword_matcher.py
+
+from collections import deque
+from typing import Dict, Any, List, Set, Tuple, Iterable, Hashable
+
+
+class AhoCorasickMatcher:
+    """Multi-pattern substring matcher built on an Aho-Corasick automaton.
+
+    All patterns are found in a single pass over the text, including
+    overlapping and nested occurrences, so matching cost depends on the
+    text length rather than the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, Hashable]]):
+        """Compile the automaton.
+
+        Args:
+            patterns: (pattern, payload) pairs; a pattern may carry several payloads
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Hashable]] = [[]]
+
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(payload)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # Patterns ending at the fallback state also end here
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Set[Hashable]:
+        """Find the payloads of every pattern occurring in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Set of payloads of matched patterns
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found: Set[Hashable] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class CurriculumMatcher:
+    """Curriculum-compiled matcher for cognitive skills and knowledge components.
+
+    Reproduces the substring semantics of checking each curriculum keyword
+    with `in`, and returns results in curriculum order, but scans each
+    question text once for every skill indicator and component keyword.
+    """
+
+    def __init__(self, curriculum_data: Dict[str, Any]):
+        """Compile matchers from curriculum data.
+
+        Args:
+            curriculum_data: Curriculum dictionary with subjects and cognitive skills
+        """
+        patterns: List[Tuple[str, Hashable]] = []
+
+        # Cognitive skills, ranked by curriculum order
+        self._skills: List[str] = []
+        for rank, (skill, indicators) in enumerate(curriculum_data.get("cognitive_skills", {}).items()):
+            self._skills.append(skill)
+            for indicator in indicators:
+                patterns.append((indicator.lower(), ("skill", rank)))
+
+        # Knowledge components, ranked by curriculum order
+        self._components: List[Dict[str, Any]] = []
+        for subject, subject_data in curriculum_data.get("subjects", {}).items():
+            subject = subject.lower()
+            for category, skills in subject_data.get("categories", {}).items():
+                for skill in skills:
+                    rank = len(self._components)
+                    self._components.append({
+                        "id": f"kc_{subject}_{category}_{skill}",
+                        "name": skill.replace("_", " ").title(),
+                        "category": category,
+                        "subject": subject
+                    })
+                    patterns.append((skill.replace("_", " ").lower(), ("component", rank)))
+
+        self._matcher = AhoCorasickMatcher(patterns)
+
+    def match(self, text: str, subject: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Find cognitive skills and knowledge components in one pass.
+
+        Args:
+            text: Question text
+            subject: Subject area used to select components
+
+        Returns:
+            Tuple of (skills, components), both in curriculum order
+        """
+        hits = self._matcher.find_all(text.lower())
+        subject = subject.lower()
+
+        skill_ranks = sorted(rank for kind, rank in hits if kind == "skill")
+        component_ranks = sorted(rank for kind, rank in hits if kind == "component")
+
+        skills = [self._skills[rank] for rank in skill_ranks]
+
+        # Component ids are unique per rank; keep the first occurrence of each id
+        components = []
+        seen_ids = set()
+        for rank in component_ranks:
+            component = self._components[rank]
+            if component["subject"] != subject or component["id"] in seen_ids:
+                continue
+            seen_ids.add(component["id"])
+            components.append(dict(component))
+
+        return skills, components
@@ -0,0 +1,568 @@
+# core/assessment/knowledge_state_store.py
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from config.logging_config import get_module_logger
+
+# Create a logger for this module
+logger = get_module_logger("knowledge_state_store")
+
+# Mastery at which a student counts as having mastered a component in class summaries
+MASTERED_THRESHOLD = 0.8
+
+class KnowledgeStateStoreError(Exception):
+    """Exception raised for knowledge state store errors."""
+    pass
+
+class KnowledgeStateStore:
+    """SQLite store for student mastery and knowledge-update history.
+
+    Current mastery lives in a `mastery` table keyed by (student_id,
+    component_id); every update is also appended to an `events` table.
+    Both are indexed for point lookups, cohort slices by component and
+    time-range history queries, so callers never need to load a whole
+    student profile to read or write knowledge state. Class-level totals
+    per component are kept in `component_summary` by triggers on `mastery`.
+    """
+
+    def __init__(self, db_path: str = ".state/knowledge_state.db"):
+        """Initialize with database path.
+
+        Args:
+            db_path: Path to SQLite database
+        """
+        self.db_path = db_path
+
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        # Initialize database
+        self._init_db()
+
+        logger.debug(f"Initialized knowledge state store at {db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        """Initialize database with schema."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                # WAL lets readers proceed while updates are written
+                conn.execute("PRAGMA journal_mode=WAL")
+
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS mastery (
+                        student_id TEXT NOT NULL,
+                        component_id TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        confidence REAL NOT NULL,
+                        initial_value REAL NOT NULL,
+                        updated_at TEXT NOT NULL,
+                        PRIMARY KEY (student_id, component_id)
+                    ) WITHOUT ROWID
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_mastery_component
+                    ON mastery (component_id, value)
+                """)
+
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS events (
+                        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        student_id TEXT NOT NULL,
+                        component_id TEXT NOT NULL,
+                        timestamp TEXT NOT NULL,
+                        value REAL NOT NULL,
+                        confidence REAL NOT NULL,
+                        is_correct INTEGER NOT NULL,
+                        question_id TEXT,
+                        assessment_id TEXT
+                    )
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_events_student
+                    ON events (student_id, component_id, timestamp)
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_events_timestamp
+                    ON events (timestamp)
+                """)
+
+                self._init_summary(conn)
+                self._init_versions(conn)
+        except Exception as e:
+            logger.error(f"Failed to initialize knowledge state database: {str(e)}")
+            raise KnowledgeStateStoreError(f"Failed to initialize database: {str(e)}")
+
+    def _init_summary(self, conn: sqlite3.Connection) -> None:
+        """Create the class-level component summary and the triggers that maintain it.
+
+        Args:
+            conn: Open connection inside a transaction
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'component_summary'"
+        ).fetchone()
+
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS component_summary (
+                component_id TEXT PRIMARY KEY,
+                student_count INTEGER NOT NULL,
+                mastery_sum REAL NOT NULL,
+                mastered_count INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS mastery_summary_insert AFTER INSERT ON mastery
+            BEGIN
+                INSERT INTO component_summary (component_id, student_count, mastery_sum, mastered_count)
+                VALUES (NEW.component_id, 1, NEW.value, NEW.value >= {MASTERED_THRESHOLD})
+                ON CONFLICT (component_id) DO UPDATE SET
+                    student_count = student_count + 1,
+                    mastery_sum = mastery_sum + NEW.value,
+                    mastered_count = mastered_count + (NEW.value >= {MASTERED_THRESHOLD});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS mastery_summary_update AFTER UPDATE OF value ON mastery
+            BEGIN
+                UPDATE component_summary SET
+                    mastery_sum = mastery_sum + NEW.value - OLD.value,
+                    mastered_count = mastered_count + (NEW.value >= {MASTERED_THRESHOLD})
+                                                    - (OLD.value >= {MASTERED_THRESHOLD})
+                WHERE component_id = NEW.component_id;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS mastery_summary_delete AFTER DELETE ON mastery
+            BEGIN
+                UPDATE component_summary SET
+                    student_count = student_count - 1,
+                    mastery_sum = mastery_sum - OLD.value,
+                    mastered_count = mastered_count - (OLD.value >= {MASTERED_THRESHOLD})
+                WHERE component_id = OLD.component_id;
+            END
+        """)
+
+        # Seed the summary from mastery recorded before it existed
+        if not exists:
+            conn.execute(f"""
+                INSERT INTO component_summary (component_id, student_count, mastery_sum, mastered_count)
+                SELECT component_id, COUNT(*), SUM(value), SUM(value >= {MASTERED_THRESHOLD})
+                FROM mastery GROUP BY component_id
+            """)
+
+    def _init_versions(self, conn: sqlite3.Connection) -> None:
+        """Create the per-student version counters and the triggers that bump them.
+
+        Every insert, update or delete of a student's mastery rows increments
+        the student's version, whatever timestamps the writer supplies.
+
+        Args:
+            conn: Open connection inside a transaction
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS student_versions (
+                student_id TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS mastery_version_{event.lower()} AFTER {event} ON mastery
+                BEGIN
+                    INSERT INTO student_versions (student_id, version) VALUES ({row}.student_id, 1)
+                    ON CONFLICT (student_id) DO UPDATE SET version = version + 1;
+                END
+            """)
+
+    def apply_trace(self, student_id: str, trace: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Record the knowledge updates of a single trace.
+
+        Args:
+            student_id: Student identifier
+            trace: Trace with interaction and knowledge updates
+
+        Returns:
+            New mastery state for each updated component
+        """
+        return self.apply_traces([(student_id, trace)]).get(student_id, {})
+
+    def apply_traces(self, traces: Iterable[Tuple[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Record the knowledge updates of many traces in one transaction.
+
+        Args:
+            traces: (student_id, trace) pairs in the order they occurred
+
+        Returns:
+            Mapping of student id to new mastery state per updated component
+        """
+        mastery_rows = {}
+        event_rows = []
+
+        for student_id, trace in traces:
+            interaction = trace.get("interaction", {})
+            timestamp = interaction.get("timestamp") or datetime.now().isoformat()
+
+            for component_id, update in trace.get("knowledge_updates", {}).items():
+                value = update.get("new_value", 0.5)
+                confidence = update.get("confidence", 0.5)
+
+                # Later updates to the same cell replace earlier ones; the first one sets initial_value
+                key = (student_id, component_id)
+                initial = mastery_rows[key][4] if key in mastery_rows else value
+                mastery_rows[key] = (student_id, component_id, value, confidence, initial, timestamp)
+
+                event_rows.append((
+                    student_id,
+                    component_id,
+                    timestamp,
+                    value,
+                    confidence,
+                    int(bool(interaction.get("is_correct", False))),
+                    interaction.get("question_id"),
+                    interaction.get("assessment_id")
+                ))
+
+        if not event_rows:
+            return {}
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("""
+                    INSERT INTO mastery (student_id, component_id, value, confidence, initial_value, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (student_id, component_id) DO UPDATE SET
+                        value = excluded.value,
+                        confidence = excluded.confidence,
+                        updated_at = excluded.updated_at
+                """, list(mastery_rows.values()))
+                conn.executemany("""
+                    INSERT INTO events (student_id, component_id, timestamp, value, confidence,
+                                        is_correct, question_id, assessment_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, event_rows)
+        except Exception as e:
+            logger.error(f"Failed to record knowledge updates: {str(e)}", exc_info=True)
+            raise KnowledgeStateStoreError(f"Failed to record knowledge updates: {str(e)}")
+
+        result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for student_id, component_id, value, confidence, _, timestamp in mastery_rows.values():
+            result.setdefault(student_id, {})[component_id] = {
+                "value": value,
+                "confidence": confidence,
+                "updated_at": timestamp
+            }
+        return result
+
+    def import_state(self, student_id: str, knowledge_state: Dict[str, Dict[str, Any]]) -> None:
+        """Import a legacy profile knowledge state, including its history lists.
+
+        The import merges with mastery already recorded for the student: a
+        component keeps whichever value was updated most recently.
+
+        Args:
+            student_id: Student identifier
+            knowledge_state: Profile-style knowledge state dictionary
+        """
+        mastery_rows = []
+        event_rows = []
+        for component_id, state in knowledge_state.items():
+            updated_at = state.get("last_updated") or datetime.now().isoformat()
+            value = state.get("current_value", 0.5)
+            mastery_rows.append((
+                student_id,
+                component_id,
+                value,
+                state.get("confidence", 0.5),
+                state.get("initial_value", value),
+                updated_at
+            ))
+            for entry in state.get("history", []):
+                event_rows.append((
+                    student_id,
+                    component_id,
+                    entry.get("timestamp", updated_at),
+                    entry.get("value", 0.5),
+                    entry.get("confidence", 0.5),
+                    int(bool(entry.get("is_correct", False))),
+                    None,
+                    None
+                ))
+
+        try:
+            with closing(self._connect()) as conn, conn:
+                # Upsert rather than REPLACE so the summary triggers see an update;
+                # rows written since the legacy state was saved are kept
+                conn.executemany("""
+                    INSERT INTO mastery (student_id, component_id, value, confidence, initial_value, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (student_id, component_id) DO UPDATE SET
+                        value = excluded.value,
+                        confidence = excluded.confidence,
+                        initial_value = excluded.initial_value,
+                        updated_at = excluded.updated_at
+                    WHERE excluded.updated_at > mastery.updated_at
+                """, mastery_rows)
+                conn.executemany("""
+                    INSERT INTO events (student_id, component_id, timestamp, value, confidence,
+                                        is_correct, question_id, assessment_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, event_rows)
+            logger.info(f"Imported {len(mastery_rows)} components and {len(event_rows)} events for student {student_id}")
+        except Exception as e:
+            logger.error(f"Failed to import knowledge state: {str(e)}", exc_info=True)
+            raise KnowledgeStateStoreError(f"Failed to import knowledge state: {str(e)}")
+
+    def get_mastery(self, student_id: str, component_id: str) -> Optional[Dict[str, Any]]:
+        """Get the current mastery of one student for one component.
+
+        Args:
+            student_id: Student identifier
+            component_id: Knowledge component identifier
+
+        Returns:
+            Mastery row dictionary or None
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM mastery WHERE student_id = ? AND component_id = ?",
+                (student_id, component_id)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def get_student_state(self, student_id: str, subject: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Get all current mastery rows for a student.
+
+        Args:
+            student_id: Student identifier
+            subject: Optional subject filter (matched against the component id)
+
+        Returns:
+            Mapping of component id to mastery row dictionary
+        """
+        query = "SELECT * FROM mastery WHERE student_id = ?"
+        params: List[Any] = [student_id]
+        if subject:
+            query += " AND component_id LIKE ?"
+            params.append(f"%{subject.lower()}%")
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return {row["component_id"]: dict(row) for row in rows}
+
+    def get_student_version(self, student_id: str) -> int:
+        """Get a counter that goes up on every change to a student's mastery.
+
+        Bumped by triggers on each written row, so it changes even when a
+        writer supplies an older `updated_at` (such as a gradebook import
+        keeping the export's timestamps). Comparing versions tells whether
+        data derived from the mastery is stale.
+
+        Args:
+            student_id: Student identifier
+
+        Returns:
+            Current version (0 if nothing was ever recorded)
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT version FROM student_versions WHERE student_id = ?", (student_id,)
+            ).fetchone()
+        return row["version"] if row else 0
+
+    def has_student(self, student_id: str) -> bool:
+        """Check whether any mastery is recorded for a student."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM mastery WHERE student_id = ? LIMIT 1", (student_id,)
+            ).fetchone()
+        return row is not None
+
+    def get_cohort_mastery(self,
+                           student_ids: Optional[List[str]] = None,
+                           component_ids: Optional[List[str]] = None,
+                           component_prefix: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Get mastery values for a slice of students and components.
+
+        Args:
+            student_ids: Optional students to include (default: all)
+            component_ids: Optional components to include (default: all)
+            component_prefix: Optional component id prefix, e.g. "kc_reading_"
+
+        Returns:
+            Mapping of student id to {component_id: value}
+        """
+        query = "SELECT student_id, component_id, value FROM mastery WHERE 1 = 1"
+        params: List[Any] = []
+        if student_ids is not None:
+            query += f" AND student_id IN ({','.join('?' * len(student_ids))})"
+            params.extend(student_ids)
+        if component_ids is not None:
+            query += f" AND component_id IN ({','.join('?' * len(component_ids))})"
+            params.extend(component_ids)
+        if component_prefix:
+            # Range scan on the component index instead of LIKE
+            query += " AND component_id >= ? AND component_id < ?"
+            params.extend([component_prefix, component_prefix + "\uffff"])
+
+        cohort: Dict[str, Dict[str, float]] = {}
+        with closing(self._connect()) as conn:
+            for student_id, component_id, value in conn.execute(query, params):
+                cohort.setdefault(student_id, {})[component_id] = value
+        return cohort
+
+    def get_class_summary(self,
+                          component_ids: Optional[List[str]] = None,
+                          component_prefix: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Get class-level mastery aggregates per component.
+
+        Args:
+            component_ids: Optional components to include (default: all)
+            component_prefix: Optional component id prefix, e.g. "kc_reading_"
+
+        Returns:
+            Mapping of component id to student count, mean mastery and share mastered
+        """
+        query = "SELECT * FROM component_summary WHERE student_count > 0"
+        params: List[Any] = []
+        if component_ids is not None:
+            query += f" AND component_id IN ({','.join('?' * len(component_ids))})"
+            params.extend(component_ids)
+        if component_prefix:
+            query += " AND component_id >= ? AND component_id < ?"
+            params.extend([component_prefix, component_prefix + "\uffff"])
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        return {
+            row["component_id"]: {
+                "student_count": row["student_count"],
+                "mean_mastery": row["mastery_sum"] / row["student_count"],
+                "mastered_share": row["mastered_count"] / row["student_count"]
+            }
+            for row in rows
+        }
+
+    def get_history(self,
+                    student_id: str,
+                    component_id: Optional[str] = None,
+                    start: Optional[str] = None,
+                    end: Optional[str] = None,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get a student's knowledge-update history in time order.
+
+        Args:
+            student_id: Student identifier
+            component_id: Optional component filter
+            start: Optional inclusive ISO timestamp lower bound
+            end: Optional exclusive ISO timestamp upper bound
+            limit: Optional maximum number of events (most recent kept)
+
+        Returns:
+            List of event dictionaries, oldest first
+        """
+        query = "SELECT * FROM events WHERE student_id = ?"
+        params: List[Any] = [student_id]
+        if component_id:
+            query += " AND component_id = ?"
+            params.append(component_id)
+        if start:
+            query += " AND timestamp >= ?"
+            params.append(start)
+        if end:
+            query += " AND timestamp < ?"
+            params.append(end)
+        query += " ORDER BY timestamp DESC, event_id DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        events = [dict(row) for row in reversed(rows)]
+        for event in events:
+            event["is_correct"] = bool(event["is_correct"])
+        return events
+
+    def get_response_sequences(self,
+                               component_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, List[bool]]]:
+        """Get every student's correctness sequence per component, for model fitting.
+
+        Args:
+            component_ids: Optional components to include (default: all)
+
+        Returns:
+            Mapping of component id to {student_id: correctness in time order}
+        """
+        query = "SELECT component_id, student_id, is_correct FROM events"
+        params: List[Any] = []
+        if component_ids is not None:
+            query += f" WHERE component_id IN ({','.join('?' * len(component_ids))})"
+            params.extend(component_ids)
+        query += " ORDER BY component_id, student_id, timestamp, event_id"
+
+        sequences: Dict[str, Dict[str, List[bool]]] = {}
+        with closing(self._connect()) as conn:
+            for component_id, student_id, is_correct in conn.execute(query, params):
+                sequences.setdefault(component_id, {}).setdefault(student_id, []).append(bool(is_correct))
+        return sequences
+
+    def delete_student(self, student_id: str) -> None:
+        """Remove all mastery and history for a student.
+
+        Args:
+            student_id: Student identifier
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM mastery WHERE student_id = ?", (student_id,))
+            conn.execute("DELETE FROM events WHERE student_id = ?", (student_id,))
+
+    def export_parquet(self, directory: str) -> Dict[str, str]:
+        """Write columnar Parquet snapshots of both tables.
+
+        Args:
+            directory: Output directory
+
+        Returns:
+            Mapping of table name to written file path
+
+        Raises:
+            KnowledgeStateStoreError: If pyarrow is not installed or export fails
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise KnowledgeStateStoreError("pyarrow is required for Parquet export")
+
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+
+        try:
+            with closing(self._connect()) as conn:
+                for table in ("mastery", "events"):
+                    cursor = conn.execute(f"SELECT * FROM {table}")
+                    columns = [description[0] for description in cursor.description]
+                    rows = cursor.fetchall()
+                    data = {column: [row[i] for row in rows] for i, column in enumerate(columns)}
+
+                    path = os.path.join(directory, f"{table}.parquet")
+                    pq.write_table(pa.table(data), path)
+                    paths[table] = path
+        except Exception as e:
+            logger.error(f"Failed to export knowledge state: {str(e)}", exc_info=True)
+            raise KnowledgeStateStoreError(f"Parquet export failed: {str(e)}")
+
+        logger.info(f"Exported knowledge state snapshot to {directory}")
+        return paths
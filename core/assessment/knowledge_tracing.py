@@ -1,29 +1,170 @@
 # core/assessment/knowledge_tracing.py
 
 import math
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterable, Tuple, Sequence
+import numpy as np
+
+
+class MasteryMatrix:
+    """Dense students x components matrix of mastery values.
+
+    Student and component ids are mapped to row and column indexes; the
+    matrix grows geometrically as new ids are added so it can be filled
+    incrementally.
+    """
+    
+    def __init__(self, 
+                 student_ids: Iterable[str] = (), 
+                 component_ids: Iterable[str] = (), 
+                 default_value: float = 0.5):
+        """Initialize the matrix.
+        
+        Args:
+            student_ids: Initial student ids (rows)
+            component_ids: Initial component ids (columns)
+            default_value: Mastery assumed for unseen (student, component) pairs
+        """
+        self.default_value = default_value
+        self.student_index: Dict[str, int] = {}
+        self.component_index: Dict[str, int] = {}
+        self.values = np.full((0, 0), default_value, dtype=np.float64)
+        
+        for student_id in student_ids:
+            self.add_student(student_id)
+        for component_id in component_ids:
+            self.add_component(component_id)
+    
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Number of (students, components) in use."""
+        return len(self.student_index), len(self.component_index)
+    
+    def _ensure_capacity(self, rows: int, cols: int) -> None:
+        """Grow the backing arrays to hold at least rows x cols entries."""
+        current_rows, current_cols = self.values.shape
+        if rows <= current_rows and cols <= current_cols:
+            return
+        
+        new_rows = max(rows, current_rows * 2 if rows > current_rows else current_rows)
+        new_cols = max(cols, current_cols * 2 if cols > current_cols else current_cols)
+        
+        values = np.full((new_rows, new_cols), self.default_value, dtype=np.float64)
+        values[:current_rows, :current_cols] = self.values
+        self.values = values
+    
+    def add_student(self, student_id: str) -> int:
+        """Get the row of a student, adding it if needed."""
+        index = self.student_index.get(student_id)
+        if index is None:
+            index = len(self.student_index)
+            self.student_index[student_id] = index
+            self._ensure_capacity(index + 1, len(self.component_index))
+        return index
+    
+    def add_component(self, component_id: str) -> int:
+        """Get the column of a component, adding it if needed."""
+        index = self.component_index.get(component_id)
+        if index is None:
+            index = len(self.component_index)
+            self.component_index[component_id] = index
+            self._ensure_capacity(len(self.student_index), index + 1)
+        return index
+    
+    def set_student_state(self, student_id: str, knowledge_state: Dict[str, float]) -> None:
+        """Load a student's stored mastery values.
+        
+        Args:
+            student_id: Student identifier
+            knowledge_state: Mapping of component ids to mastery values
+        """
+        row = self.add_student(student_id)
+        for component_id, value in knowledge_state.items():
+            # Resolve the column first, since adding it may reallocate the array
+            col = self.add_component(component_id)
+            self.values[row, col] = value
+    
+    def get(self, student_id: str, component_id: str) -> float:
+        """Get the mastery of a student for a component."""
+        row = self.student_index.get(student_id)
+        col = self.component_index.get(component_id)
+        if row is None or col is None:
+            return self.default_value
+        return float(self.values[row, col])
+    
+    def student_state(self, student_id: str) -> Dict[str, float]:
+        """Get a student's mastery values by component id."""
+        row = self.student_index.get(student_id)
+        if row is None:
+            return {}
+        return {
+            component_id: float(self.values[row, col])
+            for component_id, col in self.component_index.items()
+        }
 
 class BayesianKnowledgeTracer:
     """Bayesian Knowledge Tracing for estimating student knowledge state."""
     
-    def __init__(self, slip_prob: float = 0.1, guess_prob: float = 0.2):
+    def __init__(self, 
+                 slip_prob: float = 0.1, 
+                 guess_prob: float = 0.2,
+                 component_params: Optional[Dict[str, Dict[str, float]]] = None):
         """Initialize the knowledge tracer.
         
         Args:
             slip_prob: Probability of slipping (answering incorrectly despite knowing)
             guess_prob: Probability of guessing (answering correctly despite not knowing)
+            component_params: Optional fitted prior/learn/slip/guess per component id,
+                used instead of the defaults for those components. Fitted slip and
+                guess already reflect the difficulty of the questions they were fit
+                on, so question difficulty only adjusts the defaults.
         """
         self.slip_prob = max(0.01, min(0.5, slip_prob))  # Constrain between 0.01 and 0.5
         self.guess_prob = max(0.01, min(0.5, guess_prob))  # Constrain between 0.01 and 0.5
+        self.component_params = component_params or {}
+    
+    def component_probs(self, component_id: Optional[str]) -> Tuple[float, float, float]:
+        """Get (slip, guess, learn) for a component, falling back to the defaults.
+        
+        Without fitted parameters there is no learning transition, so the
+        update is the plain Bayesian posterior.
+        """
+        params = self.component_params.get(component_id) if component_id else None
+        if not params:
+            return self.slip_prob, self.guess_prob, 0.0
+        return (
+            max(0.01, min(0.5, params.get("slip", self.slip_prob))),
+            max(0.01, min(0.5, params.get("guess", self.guess_prob))),
+            max(0.0, min(1.0, params.get("learn", 0.0)))
+        )
+    
+    def has_fitted_params(self, component_id: Optional[str]) -> bool:
+        """Check whether a component has fitted parameters."""
+        return bool(component_id and self.component_params.get(component_id))
+    
+    def initial_mastery(self, component_id: Optional[str] = None, default: float = 0.5) -> float:
+        """Get the prior mastery for a student with no history on a component.
+        
+        Args:
+            component_id: Knowledge component identifier
+            default: Prior used when the component has no fitted parameters
+            
+        Returns:
+            Initial mastery
+        """
+        params = self.component_params.get(component_id) if component_id else None
+        return params.get("prior", default) if params else default
     
     def update_knowledge(self, prior: float, is_correct: bool, 
-                         difficulty: Optional[float] = None) -> Dict[str, float]:
+                         difficulty: Optional[float] = None,
+                         component_id: Optional[str] = None) -> Dict[str, float]:
         """Update knowledge state using Bayesian update.
         
         Args:
             prior: Prior probability of knowing (0 to 1)
             is_correct: Whether the response was correct
-            difficulty: Optional question difficulty to adjust slip/guess probabilities
+            difficulty: Optional question difficulty to adjust the default slip/guess
+                probabilities (ignored for components with fitted parameters)
+            component_id: Optional component whose fitted parameters to use
             
         Returns:
             Updated knowledge state with value and confidence
@@ -31,14 +172,15 @@ class BayesianKnowledgeTracer:
         # Validate inputs
         prior = max(0.01, min(0.99, prior))  # Ensure prior is between 0.01 and 0.99
         
-        # Adjust slip and guess probabilities based on difficulty if provided
-        slip = self.slip_prob
-        guess = self.guess_prob
+        # Adjust default slip and guess probabilities based on difficulty if provided
+        base_slip, base_guess, learn = self.component_probs(component_id)
+        slip = base_slip
+        guess = base_guess
         
-        if difficulty is not None:
+        if difficulty is not None and not self.has_fitted_params(component_id):
             difficulty = max(0.0, min(1.0, difficulty))  # Ensure difficulty is between 0 and 1
-            slip = self.slip_prob * (0.5 + 0.5 * difficulty)  # Higher difficulty = higher slip probability
-            guess = self.guess_prob * (1.0 - 0.5 * difficulty)  # Higher difficulty = lower guess probability
+            slip = base_slip * (0.5 + 0.5 * difficulty)  # Higher difficulty = higher slip probability
+            guess = base_guess * (1.0 - 0.5 * difficulty)  # Higher difficulty = lower guess probability
         
         # Calculate the posterior probability using Bayes' rule
         if is_correct:
@@ -53,6 +195,9 @@ class BayesianKnowledgeTracer:
         # Avoid division by zero
         posterior = numerator / max(denominator, 0.001)
         
+        # Chance of learning the component from this practice opportunity
+        posterior = posterior + (1 - posterior) * learn
+        
         # Ensure posterior is between 0.01 and 0.99
         posterior = max(0.01, min(0.99, posterior))
         
@@ -69,4 +214,109 @@ class BayesianKnowledgeTracer:
         return {
             "value": posterior,
             "confidence": confidence
-        }
\ No newline at end of file
+        }
+    
+    def update_knowledge_batch(self, 
+                               mastery: np.ndarray, 
+                               student_idx: np.ndarray, 
+                               component_idx: np.ndarray, 
+                               is_correct: np.ndarray, 
+                               difficulty: Optional[np.ndarray] = None,
+                               component_ids: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Apply Bayesian updates for a batch of response events.
+        
+        Produces the same values as calling `update_knowledge` once per event
+        in order, feeding each posterior in as the next prior for that
+        (student, component) cell. Events are grouped by how many earlier
+        events touch the same cell, and every group is updated with one set
+        of array operations, so the number of Python-level steps is the
+        largest number of events for a single cell rather than the number
+        of events.
+        
+        Args:
+            mastery: Dense students x components prior matrix, updated in place
+            student_idx: Row index of each event
+            component_idx: Column index of each event
+            is_correct: Correctness of each event
+            difficulty: Optional difficulty of each event (NaN for none), applied
+                as in `update_knowledge`
+            component_ids: Optional component id of each column, for fitted parameters
+            
+        Returns:
+            Dictionary of per-event arrays: prior, value and confidence
+        """
+        student_idx = np.asarray(student_idx, dtype=np.int64)
+        component_idx = np.asarray(component_idx, dtype=np.int64)
+        is_correct = np.asarray(is_correct, dtype=bool)
+        num_events = len(student_idx)
+        
+        priors = np.empty(num_events)
+        values = np.empty(num_events)
+        confidence = np.empty(num_events)
+        if not num_events:
+            return {"prior": priors, "value": values, "confidence": confidence}
+        
+        # Slip, guess and learn per event from each column's parameters
+        if component_ids is not None and self.component_params:
+            column_probs = np.array([self.component_probs(cid) for cid in component_ids]).reshape(-1, 3)
+            base_slip, base_guess, learn = column_probs[component_idx].T
+            column_fitted = np.array([self.has_fitted_params(cid) for cid in component_ids], dtype=bool)
+            fitted = column_fitted[component_idx]
+        else:
+            base_slip = np.full(num_events, self.slip_prob)
+            base_guess = np.full(num_events, self.guess_prob)
+            learn = np.zeros(num_events)
+            fitted = np.zeros(num_events, dtype=bool)
+        
+        # Adjust default slip and guess by difficulty where given
+        slip, guess = base_slip, base_guess
+        if difficulty is not None:
+            difficulty = np.asarray(difficulty, dtype=np.float64)
+            has_difficulty = ~np.isnan(difficulty) & ~fitted
+            clipped = np.clip(np.nan_to_num(difficulty), 0.0, 1.0)
+            slip = np.where(has_difficulty, base_slip * (0.5 + 0.5 * clipped), base_slip)
+            guess = np.where(has_difficulty, base_guess * (1.0 - 0.5 * clipped), base_guess)
+        
+        # Rank of each event among earlier events for the same cell
+        cell = student_idx * mastery.shape[1] + component_idx
+        order = np.argsort(cell, kind="stable")
+        sorted_cells = cell[order]
+        group_start = np.r_[0, np.flatnonzero(sorted_cells[1:] != sorted_cells[:-1]) + 1]
+        group_lengths = np.diff(np.r_[group_start, num_events])
+        rank = np.empty(num_events, dtype=np.int64)
+        rank[order] = np.arange(num_events) - np.repeat(group_start, group_lengths)
+        
+        for level in range(int(rank.max()) + 1):
+            events = np.flatnonzero(rank == level)
+            rows, cols = student_idx[events], component_idx[events]
+            correct = is_correct[events]
+            event_slip, event_guess = slip[events], guess[events]
+            
+            priors[events] = mastery[rows, cols]
+            prior = np.clip(priors[events], 0.01, 0.99)
+            
+            numerator = np.where(correct, (1 - event_slip) * prior, event_slip * prior)
+            denominator = np.where(
+                correct,
+                (1 - event_slip) * prior + event_guess * (1 - prior),
+                event_slip * prior + (1 - event_guess) * (1 - prior)
+            )
+            posterior = numerator / np.maximum(denominator, 0.001)
+            posterior = np.clip(posterior + (1 - posterior) * learn[events], 0.01, 0.99)
+            
+            # Confidence rises when the outcome matches the prediction
+            matches = ((prior > 0.5) & correct) | ((prior < 0.5) & ~correct)
+            confidence[events] = np.where(
+                matches,
+                np.minimum(1.0, prior + 0.1 * (1 - prior)),
+                np.maximum(0.5, prior - 0.1)
+            )
+            
+            values[events] = posterior
+            mastery[rows, cols] = posterior
+        
+        return {
+            "prior": priors,
+            "value": values,
+            "confidence": confidence
+        }
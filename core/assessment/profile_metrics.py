@@ -0,0 +1,363 @@
+# core/assessment/profile_metrics.py
+
+from bisect import bisect_left, insort
+from typing import Dict, Any, List, Optional, Tuple
+
+# Mastery thresholds for strengths and areas for improvement
+STRENGTH_THRESHOLD = 0.8
+IMPROVEMENT_THRESHOLD = 0.6
+
+# Dashboard mastery categories with their minimum mastery, highest first
+MASTERY_CATEGORIES = [
+    (0.9, "Expert (90%+)"),
+    (0.8, "Proficient (80-90%)"),
+    (0.7, "Developing (70-80%)"),
+    (0.5, "Basic (50-70%)"),
+    (0.0, "Novice (0-50%)")
+]
+
+# Recommendation priorities with their upper mastery bound; mastered components get none
+RECOMMENDATION_PRIORITIES = [
+    (0.4, "high"),
+    (0.6, "medium"),
+    (0.8, "low")
+]
+
+
+def format_component_name(component_id: str) -> str:
+    """Format a knowledge component id for display."""
+    return component_id.replace("kc_", "").replace("_", " ").title()
+
+
+def mastery_category(mastery: float) -> str:
+    """Get the dashboard mastery category of a mastery value."""
+    for threshold, category in MASTERY_CATEGORIES:
+        if mastery >= threshold:
+            return category
+    return MASTERY_CATEGORIES[-1][1]
+
+
+def recommendation_priority(mastery: float) -> Optional[str]:
+    """Get the recommendation priority of a mastery value, or None if mastered."""
+    for bound, priority in RECOMMENDATION_PRIORITIES:
+        if mastery < bound:
+            return priority
+    return None
+
+
+def _remove_sorted(entries: List[Any], entry: Any) -> None:
+    """Remove an entry from a sorted list if present."""
+    index = bisect_left(entries, entry)
+    if index < len(entries) and entries[index] == entry:
+        del entries[index]
+
+
+def _sync_values(aggregates: Any, values: Dict[str, float]) -> None:
+    """Apply the differences between an aggregate's component values and a full set of values."""
+    for component_id in [component_id for component_id in aggregates._values if component_id not in values]:
+        aggregates.remove(component_id)
+    for component_id, mastery in values.items():
+        if aggregates._values.get(component_id) != mastery:
+            aggregates.update(component_id, mastery)
+
+
+class IncrementalProfileMetrics:
+    """Profile metrics maintained incrementally as components change.
+
+    Overall mastery is a running sum and count. Strengths and areas for
+    improvement are kept as sorted lists of (sort key, component id), so
+    changing one component costs a binary search and one insert/remove
+    rather than a full recompute and re-sort.
+    """
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self._values: Dict[str, float] = {}
+        self._sum = 0.0
+        # Strengths ordered highest mastery first, areas for improvement lowest first
+        self._strengths: List[Tuple[float, str]] = []
+        self._improvements: List[Tuple[float, str]] = []
+
+    @classmethod
+    def from_values(cls, values: Dict[str, float]) -> "IncrementalProfileMetrics":
+        """Build metrics from a full set of component mastery values.
+
+        Args:
+            values: Mapping of component id to mastery
+
+        Returns:
+            Metrics instance
+        """
+        metrics = cls()
+        for component_id, mastery in values.items():
+            metrics.update(component_id, mastery)
+        return metrics
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> Optional["IncrementalProfileMetrics"]:
+        """Restore metrics saved with `to_state`.
+
+        Args:
+            state: Saved state dictionary
+
+        Returns:
+            Metrics instance, or None if no state was saved
+        """
+        if not state:
+            return None
+        metrics = cls()
+        metrics._values = dict(state["values"])
+        metrics._sum = state["sum"]
+        metrics._strengths = [tuple(entry) for entry in state["strengths"]]
+        metrics._improvements = [tuple(entry) for entry in state["improvements"]]
+        return metrics
+
+    def to_state(self) -> Dict[str, Any]:
+        """Get a plain dictionary suitable for storing in the profile."""
+        return {
+            "values": dict(self._values),
+            "sum": self._sum,
+            "strengths": list(self._strengths),
+            "improvements": list(self._improvements)
+        }
+
+    def update(self, component_id: str, mastery: float) -> None:
+        """Set the mastery of one component.
+
+        Args:
+            component_id: Knowledge component identifier
+            mastery: New mastery value
+        """
+        self.remove(component_id)
+        self._values[component_id] = mastery
+        self._sum += mastery
+        if mastery >= STRENGTH_THRESHOLD:
+            insort(self._strengths, (-mastery, component_id))
+        elif mastery < IMPROVEMENT_THRESHOLD:
+            insort(self._improvements, (mastery, component_id))
+
+    def remove(self, component_id: str) -> None:
+        """Drop one component, if present.
+
+        Args:
+            component_id: Knowledge component identifier
+        """
+        previous = self._values.pop(component_id, None)
+        if previous is None:
+            return
+        self._sum -= previous
+        if previous >= STRENGTH_THRESHOLD:
+            _remove_sorted(self._strengths, (-previous, component_id))
+        elif previous < IMPROVEMENT_THRESHOLD:
+            _remove_sorted(self._improvements, (previous, component_id))
+
+    def sync(self, values: Dict[str, float]) -> None:
+        """Bring the metrics in line with a full set of mastery values.
+
+        Only components whose mastery differs are touched.
+
+        Args:
+            values: Mapping of component id to current mastery
+        """
+        _sync_values(self, values)
+
+    @property
+    def overall_mastery(self) -> float:
+        """Average mastery over all components."""
+        return self._sum / len(self._values) if self._values else 0.0
+
+    def to_metrics(self) -> Dict[str, Any]:
+        """Get metrics in the profile's `metrics` format.
+
+        Returns:
+            Dictionary with overall mastery, strengths and areas for improvement
+        """
+        return {
+            "overall_mastery": self.overall_mastery,
+            "strengths": [
+                {
+                    "component_id": component_id,
+                    "component_name": format_component_name(component_id),
+                    "mastery": -negative_mastery
+                }
+                for negative_mastery, component_id in self._strengths
+            ],
+            "areas_for_improvement": [
+                {
+                    "component_id": component_id,
+                    "component_name": format_component_name(component_id),
+                    "mastery": mastery
+                }
+                for mastery, component_id in self._improvements
+            ]
+        }
+
+
+class DashboardAggregates:
+    """Materialized dashboard data for one student, maintained as traces arrive.
+
+    Keeps components grouped by mastery category and recommendation
+    priority (as sorted lists, like `IncrementalProfileMetrics`) and
+    per-assessment interaction tallies, so rendering a dashboard never
+    walks the interaction history.
+    """
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self._values: Dict[str, float] = {}
+        self._categories: Dict[str, List[str]] = {category: [] for _, category in MASTERY_CATEGORIES}
+        self._priorities: Dict[str, List[Tuple[float, str]]] = {
+            priority: [] for _, priority in RECOMMENDATION_PRIORITIES
+        }
+        self._assessments: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_profile(cls, profile: Dict[str, Any]) -> "DashboardAggregates":
+        """Build aggregates from a profile's knowledge state and interaction history.
+
+        Args:
+            profile: Student profile
+
+        Returns:
+            Aggregates instance
+        """
+        aggregates = cls()
+        for component_id, state in profile.get("knowledge_state", {}).items():
+            aggregates.update(component_id, state.get("current_value", 0.5))
+        for interaction in profile.get("interaction_history", []):
+            aggregates.record_interaction(interaction)
+        return aggregates
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict[str, Any]]) -> Optional["DashboardAggregates"]:
+        """Restore aggregates saved with `to_state`.
+
+        Args:
+            state: Saved state dictionary
+
+        Returns:
+            Aggregates instance, or None if no state was saved
+        """
+        if not state:
+            return None
+        aggregates = cls()
+        aggregates._values = dict(state["values"])
+        aggregates._categories = {category: list(ids) for category, ids in state["categories"].items()}
+        aggregates._priorities = {
+            priority: [tuple(entry) for entry in entries]
+            for priority, entries in state["priorities"].items()
+        }
+        aggregates._assessments = {
+            assessment_id: dict(tally) for assessment_id, tally in state["assessments"].items()
+        }
+        return aggregates
+
+    def to_state(self) -> Dict[str, Any]:
+        """Get a plain dictionary suitable for storing in the profile."""
+        return {
+            "values": dict(self._values),
+            "categories": {category: list(ids) for category, ids in self._categories.items()},
+            "priorities": {priority: list(entries) for priority, entries in self._priorities.items()},
+            "assessments": {assessment_id: dict(tally) for assessment_id, tally in self._assessments.items()}
+        }
+
+    def update(self, component_id: str, mastery: float) -> None:
+        """Set the mastery of one component.
+
+        Args:
+            component_id: Knowledge component identifier
+            mastery: New mastery value
+        """
+        self.remove(component_id)
+        self._values[component_id] = mastery
+        insort(self._categories[mastery_category(mastery)], component_id)
+        priority = recommendation_priority(mastery)
+        if priority:
+            insort(self._priorities[priority], (mastery, component_id))
+
+    def remove(self, component_id: str) -> None:
+        """Drop one component, if present.
+
+        Args:
+            component_id: Knowledge component identifier
+        """
+        previous = self._values.pop(component_id, None)
+        if previous is None:
+            return
+        _remove_sorted(self._categories[mastery_category(previous)], component_id)
+        priority = recommendation_priority(previous)
+        if priority:
+            _remove_sorted(self._priorities[priority], (previous, component_id))
+
+    def sync(self, values: Dict[str, float]) -> None:
+        """Bring the component aggregates in line with a full set of mastery values.
+
+        Only components whose mastery differs are touched; assessment
+        tallies come from the profile's history and are left as they are.
+
+        Args:
+            values: Mapping of component id to current mastery
+        """
+        _sync_values(self, values)
+
+    def record_interaction(self, interaction: Dict[str, Any]) -> None:
+        """Add one interaction to its assessment's tally.
+
+        Args:
+            interaction: Interaction record
+        """
+        assessment_id = interaction.get("assessment_id")
+        if not assessment_id:
+            return
+
+        tally = self._assessments.setdefault(assessment_id, {
+            "correct_count": 0,
+            "total_count": 0,
+            "last_updated": ""
+        })
+        tally["total_count"] += 1
+        if interaction.get("is_correct", False):
+            tally["correct_count"] += 1
+        timestamp = interaction.get("timestamp", "")
+        if timestamp > tally["last_updated"]:
+            tally["last_updated"] = timestamp
+
+    def to_view(self, subject: Optional[str] = None) -> Dict[str, Any]:
+        """Get dashboard data, optionally restricted to one subject.
+
+        Args:
+            subject: Optional subject filter (matched against the component id)
+
+        Returns:
+            Dictionary with component mastery, mastery categories,
+            recommendations grouped by priority and assessment tallies
+        """
+        subject = subject.lower() if subject else None
+        include = (lambda component_id: subject in component_id) if subject else (lambda component_id: True)
+
+        return {
+            "components": {
+                component_id: mastery
+                for component_id, mastery in self._values.items()
+                if include(component_id)
+            },
+            "mastery_categories": {
+                category: [format_component_name(component_id) for component_id in ids if include(component_id)]
+                for category, ids in self._categories.items()
+            },
+            "recommendations": {
+                priority: [
+                    {
+                        "component_id": component_id,
+                        "component_name": format_component_name(component_id),
+                        "mastery": mastery,
+                        "priority": priority,
+                        "recommendation": f"Focus on {format_component_name(component_id)} to improve mastery"
+                    }
+                    for mastery, component_id in entries
+                    if include(component_id)
+                ]
+                for priority, entries in self._priorities.items()
+            },
+            "assessments": {assessment_id: dict(tally) for assessment_id, tally in self._assessments.items()}
+        }
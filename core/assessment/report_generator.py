@@ -1,8 +1,9 @@
 # core/assessment/report_generator.py
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator, Tuple
 from datetime import datetime
 import uuid
+import numpy as np
 
 from config.logging_config import get_module_logger
 from core.assessment.interfaces import ReportGeneratorInterface
@@ -10,6 +11,15 @@ from core.assessment.interfaces import ReportGeneratorInterface
 # Create a logger for this module
 logger = get_module_logger("report_generator")
 
+# Mastery level descriptors with their minimum mastery, highest first
+MASTERY_LEVELS = [
+    (0.9, "Expert"),
+    (0.8, "Proficient"),
+    (0.7, "Developing"),
+    (0.5, "Basic"),
+    (0.0, "Novice")
+]
+
 class ReportGenerator(ReportGeneratorInterface):
     """Generate assessment reports based on student performance."""
     
@@ -23,6 +33,20 @@ class ReportGenerator(ReportGeneratorInterface):
         self.mastery_threshold = 0.8  # Default mastery threshold
         logger.debug("Initialized Report Generator")
     
+    @property
+    def grading_scale(self) -> Dict[str, float]:
+        """Grading scale mapping grades to minimum score thresholds."""
+        return self._grading_scale
+    
+    @grading_scale.setter
+    def grading_scale(self, grading_scale: Dict[str, float]) -> None:
+        """Replace the grading scale and sort its thresholds once."""
+        self._grading_scale = grading_scale
+        self._grade_thresholds = sorted(
+            ((threshold, grade) for grade, threshold in grading_scale.items()),
+            reverse=True
+        )
+    
     def _default_grading_scale(self) -> Dict[str, float]:
         """Get default grading scale.
         
@@ -52,52 +76,268 @@ class ReportGenerator(ReportGeneratorInterface):
             Assessment report dictionary
         """
         try:
-            # Create report structure
-            report = {
-                "report_id": str(uuid.uuid4()),
-                "student_id": student_id,
-                "assessment_id": assessment.get("assessment_id"),
-                "assessment_title": assessment.get("title", "Untitled Assessment"),
-                "generated_at": datetime.now().isoformat(),
-                "overall_performance": {},
-                "question_performance": [],
-                "knowledge_components": [],
-                "recommendations": []
-            }
-            
-            # Calculate overall performance
-            correct_count = sum(1 for interaction in interactions if interaction.get("is_correct", False))
-            total_questions = len(interactions)
+            return self._build_report(student_id, assessment, self._index_assessment(assessment),
+                                      interactions, knowledge_state)
+        except Exception as e:
+            logger.error(f"Error generating assessment report: {str(e)}", exc_info=True)
+            return self._error_report(student_id, assessment, e)
+    
+    def generate_cohort_reports(self, assessment: Dict[str, Any],
+                                interactions_by_student: Dict[str, List[Dict[str, Any]]],
+                                knowledge_states: Dict[str, Dict[str, float]]
+                                ) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+        """Generate a cohort summary and per-student reports for one assessment.
+        
+        Assessment-level indexes are built once for the whole cohort. Per-question
+        p-values and per-component mastery distributions are computed with array
+        group-bys; per-student reports are produced lazily.
+        
+        Args:
+            assessment: Assessment dictionary
+            interactions_by_student: Mapping of student ID to that student's interactions
+            knowledge_states: Mapping of student ID to knowledge state
             
-            if total_questions > 0:
-                score = correct_count / total_questions
-                report["overall_performance"] = {
-                    "correct_count": correct_count,
-                    "total_questions": total_questions,
-                    "percentage": score * 100,
-                    "grade": self._calculate_grade(score)
-                }
+        Returns:
+            Tuple of (cohort summary, generator of per-student reports)
+        """
+        index = self._index_assessment(assessment)
+        student_ids = list(dict.fromkeys(list(interactions_by_student) + list(knowledge_states)))
+        
+        summary = {
+            "assessment_id": assessment.get("assessment_id"),
+            "assessment_title": assessment.get("title", "Untitled Assessment"),
+            "generated_at": datetime.now().isoformat(),
+            "student_count": len(student_ids)
+        }
+        
+        try:
+            summary.update(self._summarize_cohort(index, student_ids, interactions_by_student,
+                                                  knowledge_states))
+        except Exception as e:
+            logger.error(f"Error generating cohort summary: {str(e)}", exc_info=True)
+            summary["error"] = str(e)
+        
+        def reports() -> Iterator[Dict[str, Any]]:
+            for student_id in student_ids:
+                try:
+                    yield self._build_report(student_id, assessment, index,
+                                             interactions_by_student.get(student_id, []),
+                                             knowledge_states.get(student_id, {}))
+                except Exception as e:
+                    logger.error(f"Error generating report for student {student_id}: {str(e)}",
+                                 exc_info=True)
+                    yield self._error_report(student_id, assessment, e)
+        
+        return summary, reports()
+    
+    def _index_assessment(self, assessment: Dict[str, Any]) -> Dict[str, Any]:
+        """Build lookup tables for an assessment.
+        
+        Args:
+            assessment: Assessment dictionary
             
-            # Analyze per-question performance
-            report["question_performance"] = self._analyze_question_performance(assessment, interactions)
+        Returns:
+            Dictionary with the question map, question order and component map
+        """
+        questions = {}
+        component_map = {}
+        
+        for question in assessment.get("questions", []):
+            questions[question.get("question_id")] = question
+            for kc in question.get("knowledge_components", []):
+                component_id = kc.get("id")
+                if component_id and component_id not in component_map:
+                    component_map[component_id] = kc
+        
+        question_ids = list(questions)
+        component_ids = list(component_map)
+        
+        return {
+            "questions": questions,
+            "question_ids": question_ids,
+            "question_rows": {question_id: row for row, question_id in enumerate(question_ids)},
+            "component_map": component_map,
+            "component_ids": component_ids,
+            "component_rows": {component_id: row for row, component_id in enumerate(component_ids)}
+        }
+    
+    def _summarize_cohort(self, index: Dict[str, Any], student_ids: List[str],
+                          interactions_by_student: Dict[str, List[Dict[str, Any]]],
+                          knowledge_states: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+        """Compute cohort-level question and component statistics.
+        
+        Args:
+            index: Assessment index from `_index_assessment`
+            student_ids: Students in the cohort
+            interactions_by_student: Mapping of student ID to interactions
+            knowledge_states: Mapping of student ID to knowledge state
             
-            # Analyze knowledge components
-            report["knowledge_components"] = self._analyze_knowledge_components(assessment, knowledge_state)
+        Returns:
+            Dictionary with score, grade, question and component statistics
+        """
+        question_rows = index["question_rows"]
+        component_rows = index["component_rows"]
+        
+        # Flatten interactions into parallel (student, question, correct) arrays
+        student_column = []
+        question_column = []
+        correct_column = []
+        for row, student_id in enumerate(student_ids):
+            for interaction in interactions_by_student.get(student_id, []):
+                student_column.append(row)
+                question_column.append(question_rows.get(interaction.get("question_id"), -1))
+                correct_column.append(bool(interaction.get("is_correct", False)))
+        
+        students = np.asarray(student_column, dtype=np.int64)
+        questions = np.asarray(question_column, dtype=np.int64)
+        correct = np.asarray(correct_column, dtype=np.float64)
+        
+        # Student scores count every interaction, as in the per-student report
+        attempts_per_student = np.bincount(students, minlength=len(student_ids))
+        correct_per_student = np.bincount(students, weights=correct, minlength=len(student_ids))
+        answered = attempts_per_student > 0
+        scores = correct_per_student[answered] / attempts_per_student[answered]
+        
+        grade_distribution = {grade: 0 for _, grade in self._grade_thresholds}
+        for grade, count in zip(*np.unique(self._calculate_grades(scores), return_counts=True)):
+            grade_distribution[str(grade)] = int(count)
+        
+        # Per-question p-values over interactions with questions in the assessment
+        known = questions >= 0
+        attempts_per_question = np.bincount(questions[known], minlength=len(question_rows))
+        correct_per_question = np.bincount(questions[known], weights=correct[known],
+                                           minlength=len(question_rows))
+        p_values = np.divide(correct_per_question, attempts_per_question,
+                             out=np.full(len(question_rows), np.nan),
+                             where=attempts_per_question > 0)
+        
+        question_statistics = []
+        for row, question_id in enumerate(index["question_ids"]):
+            question = index["questions"][question_id]
+            question_statistics.append({
+                "question_id": question_id,
+                "text": question.get("text", ""),
+                "attempts": int(attempts_per_question[row]),
+                "correct_count": int(correct_per_question[row]),
+                "p_value": None if np.isnan(p_values[row]) else float(p_values[row])
+            })
+        
+        # Student x component mastery matrix, NaN where a student has no estimate
+        mastery = np.full((len(student_ids), len(component_rows)), np.nan)
+        for row, student_id in enumerate(student_ids):
+            for component_id, value in knowledge_states.get(student_id, {}).items():
+                column = component_rows.get(component_id)
+                if column is not None:
+                    mastery[row, column] = value
+        
+        component_statistics = []
+        observed = ~np.isnan(mastery)
+        counts = observed.sum(axis=0)
+        level_thresholds = np.array([threshold for threshold, _ in reversed(MASTERY_LEVELS[:-1])])
+        level_names = [name for _, name in reversed(MASTERY_LEVELS)]
+        
+        for column, component_id in enumerate(index["component_ids"]):
+            kc = index["component_map"][component_id]
+            statistics = {
+                "component_id": component_id,
+                "name": kc.get("name", component_id.replace("kc_", "").replace("_", " ").title()),
+                "category": kc.get("category", ""),
+                "subject": kc.get("subject", ""),
+                "student_count": int(counts[column])
+            }
             
-            # Generate recommendations
-            report["recommendations"] = self._generate_recommendations(report["knowledge_components"])
+            if counts[column]:
+                values = mastery[observed[:, column], column]
+                p25, median, p75 = np.percentile(values, [25, 50, 75])
+                levels = np.bincount(np.digitize(values, level_thresholds), minlength=len(level_names))
+                statistics.update({
+                    "mean": float(values.mean()),
+                    "std": float(values.std()),
+                    "min": float(values.min()),
+                    "p25": float(p25),
+                    "median": float(median),
+                    "p75": float(p75),
+                    "max": float(values.max()),
+                    "proportion_mastered": float((values >= self.mastery_threshold).mean()),
+                    "mastery_levels": {name: int(count) for name, count in zip(level_names, levels)}
+                })
             
-            return report
+            component_statistics.append(statistics)
+        
+        # Weakest components first, as in the per-student report
+        component_statistics.sort(key=lambda c: c.get("mean", float("inf")))
+        
+        return {
+            "students_with_responses": int(answered.sum()),
+            "average_percentage": float(scores.mean() * 100) if scores.size else None,
+            "grade_distribution": grade_distribution,
+            "question_statistics": question_statistics,
+            "component_statistics": component_statistics
+        }
+    
+    def _error_report(self, student_id: str, assessment: Dict[str, Any],
+                      error: Exception) -> Dict[str, Any]:
+        """Create the report returned when report generation fails."""
+        return {
+            "report_id": str(uuid.uuid4()),
+            "student_id": student_id,
+            "assessment_id": assessment.get("assessment_id", "unknown"),
+            "generated_at": datetime.now().isoformat(),
+            "error": str(error)
+        }
+    
+    def _build_report(self, student_id: str, assessment: Dict[str, Any],
+                      index: Dict[str, Any], interactions: List[Dict[str, Any]],
+                      knowledge_state: Dict[str, float]) -> Dict[str, Any]:
+        """Build one student's report from a prebuilt assessment index.
+        
+        Args:
+            student_id: Student identifier
+            assessment: Assessment dictionary
+            index: Assessment index from `_index_assessment`
+            interactions: List of student interactions
+            knowledge_state: Student knowledge state
             
-        except Exception as e:
-            logger.error(f"Error generating assessment report: {str(e)}", exc_info=True)
-            return {
-                "report_id": str(uuid.uuid4()),
-                "student_id": student_id,
-                "assessment_id": assessment.get("assessment_id", "unknown"),
-                "generated_at": datetime.now().isoformat(),
-                "error": str(e)
+        Returns:
+            Assessment report dictionary
+        """
+        # Create report structure
+        report = {
+            "report_id": str(uuid.uuid4()),
+            "student_id": student_id,
+            "assessment_id": assessment.get("assessment_id"),
+            "assessment_title": assessment.get("title", "Untitled Assessment"),
+            "generated_at": datetime.now().isoformat(),
+            "overall_performance": {},
+            "question_performance": [],
+            "knowledge_components": [],
+            "recommendations": []
+        }
+        
+        # Calculate overall performance
+        correct_count = sum(1 for interaction in interactions if interaction.get("is_correct", False))
+        total_questions = len(interactions)
+        
+        if total_questions > 0:
+            score = correct_count / total_questions
+            report["overall_performance"] = {
+                "correct_count": correct_count,
+                "total_questions": total_questions,
+                "percentage": score * 100,
+                "grade": self._calculate_grade(score)
             }
+        
+        # Analyze per-question performance
+        report["question_performance"] = self._analyze_question_performance(index["questions"], interactions)
+        
+        # Analyze knowledge components
+        report["knowledge_components"] = self._analyze_knowledge_components(index["component_map"],
+                                                                            knowledge_state)
+        
+        # Generate recommendations
+        report["recommendations"] = self._generate_recommendations(report["knowledge_components"])
+        
+        return report
     
     def _calculate_grade(self, score: float) -> str:
         """Calculate letter grade based on score.
@@ -112,19 +352,33 @@ class ReportGenerator(ReportGeneratorInterface):
         score = max(0.0, min(1.0, score))
         
         # Find the highest grade threshold that the score exceeds
-        for grade, threshold in sorted(self.grading_scale.items(), key=lambda x: x[1], reverse=True):
+        for threshold, grade in self._grade_thresholds:
             if score >= threshold:
                 return grade
         
         # Default to F if no threshold matched (shouldn't happen with proper scale)
         return "F"
+    
+    def _calculate_grades(self, scores: np.ndarray) -> np.ndarray:
+        """Calculate letter grades for an array of scores.
+        
+        Args:
+            scores: Scores as decimals (0 to 1)
+            
+        Returns:
+            Array of letter grades
+        """
+        # Thresholds ascending, with "F" for scores below the lowest threshold
+        thresholds = np.array([threshold for threshold, _ in reversed(self._grade_thresholds)])
+        grades = np.array(["F"] + [grade for _, grade in reversed(self._grade_thresholds)], dtype=object)
+        return grades[np.searchsorted(thresholds, np.clip(scores, 0.0, 1.0), side="right")]
 
-    def _analyze_question_performance(self, assessment: Dict[str, Any], 
+    def _analyze_question_performance(self, questions: Dict[str, Dict[str, Any]], 
                                      interactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Analyze per-question performance.
         
         Args:
-            assessment: Assessment dictionary
+            questions: Mapping of question IDs to questions
             interactions: List of student interactions
             
         Returns:
@@ -132,9 +386,6 @@ class ReportGenerator(ReportGeneratorInterface):
         """
         question_performance = []
         
-        # Create a mapping of question IDs to questions
-        questions = {q.get("question_id"): q for q in assessment.get("questions", [])}
-        
         # Process each interaction
         for interaction in interactions:
             question_id = interaction.get("question_id")
@@ -161,26 +412,18 @@ class ReportGenerator(ReportGeneratorInterface):
         
         return question_performance
     
-    def _analyze_knowledge_components(self, assessment: Dict[str, Any], 
+    def _analyze_knowledge_components(self, component_map: Dict[str, Dict[str, Any]], 
                                     knowledge_state: Dict[str, float]) -> List[Dict[str, Any]]:
         """Analyze knowledge components.
         
         Args:
-            assessment: Assessment dictionary
+            component_map: Mapping of component IDs to component details
             knowledge_state: Student knowledge state
             
         Returns:
             List of knowledge component analyses
         """
         components = []
-        component_map = {}
-        
-        # Create a mapping of component IDs to component details
-        for question in assessment.get("questions", []):
-            for kc in question.get("knowledge_components", []):
-                component_id = kc.get("id")
-                if component_id and component_id not in component_map:
-                    component_map[component_id] = kc
         
         # Process each component in the knowledge state
         for component_id, mastery in knowledge_state.items():
@@ -217,16 +460,10 @@ class ReportGenerator(ReportGeneratorInterface):
         Returns:
             Mastery level descriptor
         """
-        if mastery >= 0.9:
-            return "Expert"
-        elif mastery >= 0.8:
-            return "Proficient"
-        elif mastery >= 0.7:
-            return "Developing"
-        elif mastery >= 0.5:
-            return "Basic"
-        else:
-            return "Novice"
+        for threshold, level in MASTERY_LEVELS:
+            if mastery >= threshold:
+                return level
+        return "Novice"
     
     def _generate_recommendations(self, knowledge_components: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Generate learning recommendations based on knowledge components.
@@ -0,0 +1,194 @@
+# core/assessment/response_importer.py
+
+import csv
+import json
+import os
+from typing import Dict, Any, Optional, Iterable, Iterator, IO, Union
+
+from config.logging_config import get_module_logger
+from core.assessment.assessment_processor import AssessmentProcessor
+from core.assessment.student_profile_manager import StudentProfileManager
+
+# Create a logger for this module
+logger = get_module_logger("response_importer")
+
+# Students per mastery lookup, kept under SQLite's bound-parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+class ResponseImportError(Exception):
+    """Exception raised for response import errors."""
+    pass
+
+def iter_response_records(source: Union[str, IO[str]], file_format: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream response records from a CSV or JSONL gradebook export.
+
+    Each record needs `student_id`, `question_id` and `response`; `student_name`
+    and `timestamp` are optional.
+
+    Args:
+        source: File path or open text stream
+        file_format: "csv" or "jsonl" (default: inferred from the file extension)
+
+    Yields:
+        Record dictionaries, one at a time
+
+    Raises:
+        ResponseImportError: If the format is unknown or a line cannot be parsed
+    """
+    if file_format is None:
+        name = source if isinstance(source, str) else getattr(source, "name", "")
+        file_format = os.path.splitext(str(name))[1].lstrip(".").lower()
+    if file_format == "json":
+        file_format = "jsonl"
+    if file_format not in ("csv", "jsonl"):
+        raise ResponseImportError(f"Unsupported response file format: {file_format or 'unknown'}")
+
+    stream = open(source, "r", encoding="utf-8", newline="") if isinstance(source, str) else source
+    try:
+        if file_format == "csv":
+            for record in csv.DictReader(stream):
+                yield record
+        else:
+            for line_number, line in enumerate(stream, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ResponseImportError(f"Invalid JSON on line {line_number}: {str(e)}")
+    finally:
+        if isinstance(source, str):
+            stream.close()
+
+class ResponseImporter:
+    """Bulk import of assessment responses into knowledge state and profiles.
+
+    Records are consumed in batches: each batch is graded per question with
+    array operations, traced with one vectorized knowledge-tracing call, and
+    written with one knowledge-store transaction and one profile-storage
+    transaction.
+    """
+
+    def __init__(self,
+                 assessment_processor: AssessmentProcessor,
+                 profile_manager: StudentProfileManager,
+                 batch_size: int = 10000):
+        """Initialize the importer.
+
+        Args:
+            assessment_processor: Processor used to grade and trace responses
+            profile_manager: Profile manager that records the traces
+            batch_size: Responses per batch
+        """
+        self.assessment_processor = assessment_processor
+        self.profile_manager = profile_manager
+        self.batch_size = batch_size
+
+    def import_file(self,
+                    assessment: Dict[str, Any],
+                    source: Union[str, IO[str]],
+                    file_format: Optional[str] = None) -> Dict[str, Any]:
+        """Import responses to an assessment from a CSV or JSONL file.
+
+        Args:
+            assessment: Processed assessment the responses belong to
+            source: File path or open text stream
+            file_format: "csv" or "jsonl" (default: inferred from the file extension)
+
+        Returns:
+            Import summary
+        """
+        return self.import_records(assessment, iter_response_records(source, file_format))
+
+    def import_records(self, assessment: Dict[str, Any], records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Import response records to an assessment.
+
+        Args:
+            assessment: Processed assessment the responses belong to
+            records: Response records
+
+        Returns:
+            Dictionary with counts of records read, responses imported and
+            records skipped, and the number of students updated
+        """
+        question_ids = {q.get("question_id") for q in assessment.get("questions", []) if q.get("question_id")}
+        summary = {"records": 0, "imported": 0, "skipped": 0, "students": 0}
+        students = set()
+
+        batch: Dict[str, Dict[str, Any]] = {}
+        timestamps: Dict[tuple, str] = {}
+        names: Dict[str, str] = {}
+        batch_count = 0
+
+        for record in records:
+            summary["records"] += 1
+            student_id = str(record.get("student_id") or "").strip()
+            question_id = str(record.get("question_id") or "").strip()
+            if not student_id or question_id not in question_ids or "response" not in record:
+                summary["skipped"] += 1
+                continue
+
+            # A repeated answer starts a new batch so both are applied in order
+            if question_id in batch.get(student_id, {}):
+                summary["imported"] += self._apply_batch(assessment, batch, timestamps, names)
+                batch, timestamps, names, batch_count = {}, {}, {}, 0
+
+            batch.setdefault(student_id, {})[question_id] = record["response"]
+            if record.get("timestamp"):
+                timestamps[(student_id, question_id)] = str(record["timestamp"])
+            if record.get("student_name"):
+                names[student_id] = str(record["student_name"])
+            students.add(student_id)
+            batch_count += 1
+
+            if batch_count >= self.batch_size:
+                summary["imported"] += self._apply_batch(assessment, batch, timestamps, names)
+                batch, timestamps, names, batch_count = {}, {}, {}, 0
+
+        if batch:
+            summary["imported"] += self._apply_batch(assessment, batch, timestamps, names)
+
+        summary["students"] = len(students)
+        logger.info(
+            f"Imported {summary['imported']} of {summary['records']} responses "
+            f"for {summary['students']} students ({summary['skipped']} skipped)"
+        )
+        return summary
+
+    def _apply_batch(self,
+                     assessment: Dict[str, Any],
+                     responses: Dict[str, Dict[str, Any]],
+                     timestamps: Dict[tuple, str],
+                     names: Dict[str, str]) -> int:
+        """Grade, trace and record one batch of responses.
+
+        Args:
+            assessment: Processed assessment
+            responses: Mapping of student id to {question_id: response}
+            timestamps: Optional response timestamps by (student id, question id)
+            names: Optional student names by student id
+
+        Returns:
+            Number of responses recorded
+        """
+        # Current mastery of the batch's students, used as priors
+        student_ids = list(responses)
+        self.profile_manager.migrate_legacy_profiles(student_ids)
+        knowledge_states: Dict[str, Dict[str, float]] = {}
+        for start in range(0, len(student_ids), LOOKUP_CHUNK_SIZE):
+            knowledge_states.update(self.profile_manager.knowledge_store.get_cohort_mastery(
+                student_ids=student_ids[start:start + LOOKUP_CHUNK_SIZE]
+            ))
+
+        traces = self.assessment_processor.process_assessment_responses(assessment, responses, knowledge_states)
+
+        # Keep the export's own timestamps where it has them
+        for student_id, student_traces in traces.items():
+            for trace in student_traces:
+                interaction = trace["interaction"]
+                timestamp = timestamps.get((student_id, interaction["question_id"]))
+                if timestamp:
+                    interaction["timestamp"] = timestamp
+
+        return self.profile_manager.apply_traces(traces, student_names=names)
@@ -1,10 +1,15 @@
 # core/assessment/student_profile_manager.py
 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterable, Tuple
 from datetime import datetime
 
 from config.logging_config import get_module_logger
 from core.assessment.interfaces import StudentProfileManagerInterface
+from core.assessment.knowledge_state_store import KnowledgeStateStore, KnowledgeStateStoreError
+from core.assessment.profile_metrics import (
+    IncrementalProfileMetrics, DashboardAggregates, format_component_name, recommendation_priority
+)
+from core.assessment.student_roster import StudentRoster, get_student_roster
 from ui.state_manager import state_manager
 
 # Create a logger for this module
@@ -13,11 +18,117 @@ logger = get_module_logger("student_profile_manager")
 class StudentProfileManager(StudentProfileManagerInterface):
     """Manage student profiles and knowledge states."""
     
-    def __init__(self):
-        """Initialize the student profile manager."""
+    def __init__(self, 
+                 knowledge_store: Optional[KnowledgeStateStore] = None,
+                 roster: Optional[StudentRoster] = None):
+        """Initialize the student profile manager.
+        
+        Args:
+            knowledge_store: Store for mastery and knowledge history (default: SQLite store)
+            roster: Index of students for listing and search (default: shared SQLite roster)
+        """
         self.state_manager = state_manager
+        self.knowledge_store = knowledge_store or KnowledgeStateStore()
+        self.roster = roster or get_student_roster(self.knowledge_store.db_path)
+        
+        # Index profiles saved before the roster existed
+        if self.roster.count() == 0:
+            self._backfill_roster()
+        
         logger.debug("Initialized Student Profile Manager")
     
+    def _backfill_roster(self) -> None:
+        """Add persisted profiles to an empty roster with a one-time storage scan."""
+        try:
+            added = 0
+            for storage_key in self.state_manager.storage.list_keys():
+                # Profiles are stored under session-prefixed keys
+                if not storage_key.split(":", 1)[-1].startswith("student_profile_"):
+                    continue
+                profile = self.state_manager.storage.load(storage_key)
+                if profile and "student_id" in profile:
+                    self.roster.upsert(profile, storage_key)
+                    added += 1
+            if added:
+                logger.info(f"Added {added} existing student profiles to the roster")
+        except Exception as e:
+            logger.error(f"Error backfilling student roster: {str(e)}", exc_info=True)
+    
+    def _knowledge_snapshot(self, student_id: str) -> Dict[str, Any]:
+        """Build the profile-style knowledge state from the knowledge store.
+        
+        Args:
+            student_id: Student identifier
+            
+        Returns:
+            Mapping of component id to current state (without history)
+        """
+        return {
+            component_id: {
+                "initial_value": row["initial_value"],
+                "current_value": row["value"],
+                "confidence": row["confidence"],
+                "last_updated": row["updated_at"]
+            }
+            for component_id, row in self.knowledge_store.get_student_state(student_id).items()
+        }
+    
+    def _save_profile(self, profile: Dict[str, Any]) -> None:
+        """Persist a profile without its knowledge state, which lives in the knowledge store.
+        
+        Args:
+            profile: Student profile
+        """
+        self._save_profiles([profile])
+    
+    def _save_profiles(self, profiles: List[Dict[str, Any]]) -> None:
+        """Persist several profiles in one storage transaction.
+        
+        Args:
+            profiles: Student profiles
+        """
+        items = {
+            f"student_profile_{profile['student_id']}": {
+                key: value for key, value in profile.items() if key != "knowledge_state"
+            }
+            for profile in profiles
+        }
+        self.state_manager.set_many(items)
+        self.roster.upsert_many([
+            (stored, self.state_manager.get_storage_key(profile_key))
+            for profile_key, stored in items.items()
+        ])
+    
+    def save_profile(self, profile: Dict[str, Any]) -> None:
+        """Save edits to a student profile, such as a new name or grade level.
+        
+        Args:
+            profile: Student profile
+        """
+        profile["last_updated"] = datetime.now().isoformat()
+        self._save_profile(profile)
+    
+    def list_students(self, 
+                      page: int = 0, 
+                      page_size: int = 50, 
+                      search: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of the student roster without loading profiles.
+        
+        Args:
+            page: Zero-based page number
+            page_size: Number of students per page
+            search: Optional case-insensitive substring of name or id
+            
+        Returns:
+            Dictionary with the page's students and the total match count
+        """
+        return {
+            "students": self.roster.list_page(page, page_size, search),
+            "total": self.roster.count(search),
+            "page": page,
+            "page_size": page_size
+        }
+    
     def get_student_profile(self, student_id: str) -> Dict[str, Any]:
         """Get a student profile by ID, creating it if it doesn't exist.
         
@@ -27,11 +138,66 @@ class StudentProfileManager(StudentProfileManagerInterface):
         Returns:
             Student profile dictionary
         """
-        # Create a profile key for storage
-        profile_key = f"student_profile_{student_id}"
+        return self._load_profile(student_id)
+    
+    def _load_stored_profile(self, student_id: str) -> Optional[Dict[str, Any]]:
+        """Load a saved profile as stored, without creating one or attaching knowledge state.
         
-        # Try to get existing profile
-        profile = self.state_manager.get(profile_key)
+        Args:
+            student_id: Student identifier
+            
+        Returns:
+            Stored profile dictionary, or None if the student has no profile
+        """
+        # Try to get existing profile, falling back to one saved in another session
+        profile = self.state_manager.get(f"student_profile_{student_id}")
+        if not profile:
+            entry = self.roster.get(student_id)
+            if entry and entry.get("storage_key"):
+                profile = self.state_manager.storage.load(entry["storage_key"])
+        return profile
+    
+    def _migrate_legacy_state(self, profile: Dict[str, Any]) -> None:
+        """Move a legacy per-profile knowledge state and history into the knowledge store.
+        
+        The state is merged with mastery already in the store, and dropped from
+        the saved profile only once the import succeeded.
+        
+        Args:
+            profile: Stored profile that still has a "knowledge_state" field
+        """
+        try:
+            self.knowledge_store.import_state(profile["student_id"], profile["knowledge_state"])
+        except KnowledgeStateStoreError as e:
+            logger.error(f"Keeping legacy knowledge state of student {profile['student_id']}: {str(e)}")
+            return
+        self._save_profile(profile)
+    
+    def migrate_legacy_profiles(self, student_ids: Iterable[str]) -> None:
+        """Move legacy knowledge states of saved profiles into the knowledge store.
+        
+        Bulk writers call this before reading mastery from the store, so
+        priors and updates start from the legacy values.
+        
+        Args:
+            student_ids: Students to check
+        """
+        for student_id in student_ids:
+            profile = self._load_stored_profile(student_id)
+            if profile and profile.get("knowledge_state"):
+                self._migrate_legacy_state(profile)
+    
+    def _load_profile(self, student_id: str, persist_new: bool = True) -> Dict[str, Any]:
+        """Load a profile with its knowledge state attached, creating it if needed.
+        
+        Args:
+            student_id: Student identifier
+            persist_new: Whether to save a newly created profile immediately
+            
+        Returns:
+            Student profile dictionary
+        """
+        profile = self._load_stored_profile(student_id)
         
         # If no profile exists, create a new one
         if not profile:
@@ -42,15 +208,30 @@ class StudentProfileManager(StudentProfileManagerInterface):
                 "name": f"Student {student_id}",  # Default name
                 "grade_level": "Unknown",
                 "interaction_history": [],
-                "knowledge_state": {},
                 "metrics": {
                     "overall_mastery": 0.0,
                     "strengths": [],
                     "areas_for_improvement": []
                 }
             }
-            # Save the new profile
-            self.state_manager.set(profile_key, profile)
+            # Save the new profile, unless the caller saves it in a batch
+            if persist_new:
+                self._save_profile(profile)
+        elif profile.get("knowledge_state"):
+            self._migrate_legacy_state(profile)
+        
+        # Attach the current knowledge state for callers that read it from the profile.
+        # The version is read first, so a write landing in between leaves the stamp
+        # older than the snapshot and the next dashboard read refreshes again.
+        profile = dict(profile)
+        version = self.knowledge_store.get_student_version(student_id)
+        profile["knowledge_state"] = self._knowledge_snapshot(student_id)
+        
+        # Another session or a bulk import may have changed mastery since these aggregates were saved
+        if profile.get("metrics_state"):
+            metrics, dashboard = self._get_aggregates(profile)
+            self._store_aggregates(profile, metrics, dashboard)
+        profile["knowledge_version"] = version
         
         return profile
     
@@ -75,57 +256,18 @@ class StudentProfileManager(StudentProfileManagerInterface):
             
             # Extract interaction data
             interaction = trace.get("interaction", {})
-            knowledge_updates = trace.get("knowledge_updates", {})
             
             # Skip if interaction is empty
             if not interaction:
                 logger.warning("Trace contains no interaction data")
                 return profile
             
-            # Add interaction to history
-            if "interaction_history" not in profile:
-                profile["interaction_history"] = []
-            profile["interaction_history"].append(interaction)
-            
-            # Update knowledge state
-            if "knowledge_state" not in profile:
-                profile["knowledge_state"] = {}
+            # Record mastery and history in the knowledge store
+            changed = self.knowledge_store.apply_trace(student_id, trace)
             
-            # Process each knowledge component update
-            for component_id, update in knowledge_updates.items():
-                # Get current state or create new one
-                if component_id not in profile["knowledge_state"]:
-                    profile["knowledge_state"][component_id] = {
-                        "initial_value": update.get("new_value", 0.5),
-                        "current_value": update.get("new_value", 0.5),
-                        "confidence": update.get("confidence", 0.5),
-                        "last_updated": interaction.get("timestamp", datetime.now().isoformat()),
-                        "history": []
-                    }
-                else:
-                    # Update current values
-                    profile["knowledge_state"][component_id]["current_value"] = update.get("new_value", 0.5)
-                    profile["knowledge_state"][component_id]["confidence"] = update.get("confidence", 0.5)
-                    profile["knowledge_state"][component_id]["last_updated"] = interaction.get("timestamp", datetime.now().isoformat())
-                
-                # Add to history
-                history_entry = {
-                    "timestamp": interaction.get("timestamp", datetime.now().isoformat()),
-                    "value": update.get("new_value", 0.5),
-                    "confidence": update.get("confidence", 0.5),
-                    "is_correct": interaction.get("is_correct", False)
-                }
-                profile["knowledge_state"][component_id]["history"].append(history_entry)
-            
-            # Update metrics
-            profile["metrics"] = self._calculate_metrics(profile)
-            
-            # Update last updated timestamp
-            profile["last_updated"] = datetime.now().isoformat()
-            
-            # Save updated profile
-            profile_key = f"student_profile_{student_id}"
-            self.state_manager.set(profile_key, profile)
+            # Update history, metrics and dashboard aggregates, then save
+            self._apply_to_profile(profile, [interaction], changed)
+            self._save_profile(profile)
             
             return profile
             
@@ -133,6 +275,90 @@ class StudentProfileManager(StudentProfileManagerInterface):
             logger.error(f"Error updating student profile: {str(e)}", exc_info=True)
             return self.get_student_profile(student_id)
     
+    def apply_traces(self, 
+                     traces_by_student: Dict[str, List[Dict[str, Any]]],
+                     student_names: Optional[Dict[str, str]] = None) -> int:
+        """Apply many students' traces with one knowledge-store and one profile-storage transaction.
+        
+        Used for bulk imports; traces with errors or without an interaction are skipped.
+        
+        Args:
+            traces_by_student: Mapping of student id to traces in the order they occurred
+            student_names: Optional names for students whose profile still has the default name
+            
+        Returns:
+            Number of traces applied
+        """
+        valid = {
+            student_id: [trace for trace in traces if "error" not in trace and trace.get("interaction")]
+            for student_id, traces in traces_by_student.items()
+        }
+        valid = {student_id: traces for student_id, traces in valid.items() if traces}
+        if not valid:
+            return 0
+        
+        # Legacy state must reach the store before the traces are written over it
+        self.migrate_legacy_profiles(valid)
+        
+        # Record all mastery and history in one transaction
+        changed = self.knowledge_store.apply_traces(
+            (student_id, trace) for student_id, traces in valid.items() for trace in traces
+        )
+        
+        # Update every profile in memory, then save them together
+        profiles = []
+        for student_id, traces in valid.items():
+            profile = self._load_profile(student_id, persist_new=False)
+            name = (student_names or {}).get(student_id)
+            if name and profile.get("name") == f"Student {student_id}":
+                profile["name"] = name
+            self._apply_to_profile(
+                profile, [trace["interaction"] for trace in traces], changed.get(student_id, {})
+            )
+            profiles.append(profile)
+        self._save_profiles(profiles)
+        
+        applied = sum(len(traces) for traces in valid.values())
+        logger.info(f"Applied {applied} traces to {len(profiles)} student profiles")
+        return applied
+    
+    def _apply_to_profile(self, 
+                          profile: Dict[str, Any], 
+                          interactions: List[Dict[str, Any]], 
+                          changed: Dict[str, Dict[str, Any]]) -> None:
+        """Update a loaded profile in memory with new interactions and mastery.
+        
+        Args:
+            profile: Student profile with its knowledge state attached
+            interactions: New interactions in the order they occurred
+            changed: New mastery state per component from the knowledge store
+        """
+        # Load aggregates before the history changes
+        metrics, dashboard = self._get_aggregates(profile)
+        
+        # Add interactions to history
+        if "interaction_history" not in profile:
+            profile["interaction_history"] = []
+        for interaction in interactions:
+            profile["interaction_history"].append(interaction)
+            dashboard.record_interaction(interaction)
+        
+        # Update metrics for the changed components only
+        for component_id, state in changed.items():
+            previous = profile["knowledge_state"].get(component_id, {})
+            profile["knowledge_state"][component_id] = {
+                "initial_value": previous.get("initial_value", state["value"]),
+                "current_value": state["value"],
+                "confidence": state["confidence"],
+                "last_updated": state["updated_at"]
+            }
+            metrics.update(component_id, state["value"])
+            dashboard.update(component_id, state["value"])
+        self._store_aggregates(profile, metrics, dashboard)
+        
+        # Update last updated timestamp
+        profile["last_updated"] = datetime.now().isoformat()
+    
     def get_student_knowledge_state(self, student_id: str, subject: Optional[str] = None) -> Dict[str, float]:
         """Get a student's current knowledge state.
         
@@ -143,23 +369,65 @@ class StudentProfileManager(StudentProfileManagerInterface):
         Returns:
             Dictionary mapping knowledge component IDs to mastery values
         """
-        # Get student profile
-        profile = self.get_student_profile(student_id)
+        # Point lookup in the knowledge store, without loading the profile
+        rows = self.knowledge_store.get_student_state(student_id, subject)
+        return {component_id: row["value"] for component_id, row in rows.items()}
+    
+    def get_dashboard(self, student_id: str, subject: Optional[str] = None) -> Dict[str, Any]:
+        """Get a student's precomputed dashboard data.
         
-        # Extract knowledge state
-        knowledge_state = profile.get("knowledge_state", {})
-        result = {}
+        Served from the aggregates stored on the profile, so the cost does
+        not depend on the length of the interaction history. Aggregates are
+        brought up to date first if the knowledge store changed since they
+        were saved.
         
-        # Process each component
-        for component_id, state in knowledge_state.items():
-            # Apply subject filter if specified
-            if subject and subject.lower() not in component_id.lower():
-                continue
+        Args:
+            student_id: Student identifier
+            subject: Optional subject filter
             
-            # Extract current value
-            result[component_id] = state.get("current_value", 0.5)
+        Returns:
+            Dashboard view from `DashboardAggregates.to_view`
+        """
+        stored = self.state_manager.get(f"student_profile_{student_id}") or {}
+        dashboard = DashboardAggregates.from_state(stored.get("dashboard_state"))
         
-        return result
+        if dashboard is None or stored.get("knowledge_version") != self.knowledge_store.get_student_version(student_id):
+            # Materialize aggregates of older profiles once, and refresh stale ones
+            profile = self.get_student_profile(student_id)
+            metrics, dashboard = self._get_aggregates(profile)
+            self._store_aggregates(profile, metrics, dashboard)
+            self._save_profile(profile)
+        
+        return dashboard.to_view(subject)
+    
+    def get_class_summary(self, component_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Get class-level mastery aggregates per component.
+        
+        Args:
+            component_ids: Optional components to include (default: all)
+            
+        Returns:
+            Mapping of component id to student count, mean mastery and share mastered
+        """
+        return self.knowledge_store.get_class_summary(component_ids)
+    
+    def get_knowledge_history(self, 
+                              student_id: str, 
+                              component_id: Optional[str] = None,
+                              start: Optional[str] = None,
+                              end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a student's knowledge-update history.
+        
+        Args:
+            student_id: Student identifier
+            component_id: Optional component filter
+            start: Optional inclusive ISO timestamp lower bound
+            end: Optional exclusive ISO timestamp upper bound
+            
+        Returns:
+            List of history entries, oldest first
+        """
+        return self.knowledge_store.get_history(student_id, component_id, start, end)
     
     def get_learning_recommendations(self, student_id: str, subject: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get learning recommendations for a student.
@@ -177,20 +445,13 @@ class StudentProfileManager(StudentProfileManagerInterface):
         # Generate recommendations for components below mastery threshold
         recommendations = []
         for component_id, mastery in knowledge_state.items():
-            # Skip if mastery is already high
-            if mastery >= 0.8:
+            # Determine priority based on mastery level, skipping mastered components
+            priority = recommendation_priority(mastery)
+            if priority is None:
                 continue
             
-            # Determine priority based on mastery level
-            if mastery < 0.4:
-                priority = "high"
-            elif mastery < 0.6:
-                priority = "medium"
-            else:
-                priority = "low"
-            
             # Format component name for display
-            component_name = component_id.replace("kc_", "").replace("_", " ").title()
+            component_name = format_component_name(component_id)
             
             # Create recommendation
             recommendation = {
@@ -209,55 +470,50 @@ class StudentProfileManager(StudentProfileManagerInterface):
         
         return recommendations
     
-    def _calculate_metrics(self, profile: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate overall metrics for a student profile.
+    def _get_aggregates(self, profile: Dict[str, Any]) -> Tuple[IncrementalProfileMetrics, DashboardAggregates]:
+        """Get the metrics and dashboard aggregates of a profile, current with its knowledge state.
+        
+        Profiles saved before the aggregates existed are built once from
+        their knowledge state and history. Saved aggregates are synced to
+        the attached knowledge state, which only touches components whose
+        mastery changed since, for example by another session or a bulk
+        import.
         
         Args:
-            profile: Student profile
+            profile: Student profile with its knowledge state attached
             
         Returns:
-            Updated metrics
+            Tuple of metrics and dashboard aggregates
         """
-        metrics = {
-            "overall_mastery": 0.0,
-            "strengths": [],
-            "areas_for_improvement": []
+        values = {
+            component_id: state.get("current_value", 0.5)
+            for component_id, state in profile.get("knowledge_state", {}).items()
         }
+        metrics = IncrementalProfileMetrics.from_state(profile.get("metrics_state"))
+        if metrics is None:
+            metrics = IncrementalProfileMetrics.from_values(values)
+        dashboard = DashboardAggregates.from_state(profile.get("dashboard_state"))
+        if dashboard is None:
+            dashboard = DashboardAggregates.from_profile(profile)
         
-        # Extract knowledge state
-        knowledge_state = profile.get("knowledge_state", {})
-        
-        # Skip if no knowledge state exists
-        if not knowledge_state:
-            return metrics
+        metrics.sync(values)
+        dashboard.sync(values)
+        return metrics, dashboard
+    
+    def _store_aggregates(self, 
+                          profile: Dict[str, Any], 
+                          metrics: IncrementalProfileMetrics, 
+                          dashboard: DashboardAggregates) -> None:
+        """Put aggregates on a profile.
         
-        # Calculate overall mastery (average of all components)
-        values = [state.get("current_value", 0.5) for state in knowledge_state.values()]
-        if values:
-            metrics["overall_mastery"] = sum(values) / len(values)
+        The profile keeps the `knowledge_version` stamped when its knowledge
+        state was attached, which is never newer than the aggregates.
         
-        # Identify strengths (mastery >= 0.8)
-        for component_id, state in knowledge_state.items():
-            mastery = state.get("current_value", 0.5)
-            component_name = component_id.replace("kc_", "").replace("_", " ").title()
-            
-            if mastery >= 0.8:
-                metrics["strengths"].append({
-                    "component_id": component_id,
-                    "component_name": component_name,
-                    "mastery": mastery
-                })
-            elif mastery < 0.6:
-                metrics["areas_for_improvement"].append({
-                    "component_id": component_id,
-                    "component_name": component_name,
-                    "mastery": mastery
-                })
-        
-        # Sort strengths by mastery (highest first)
-        metrics["strengths"].sort(key=lambda s: s["mastery"], reverse=True)
-        
-        # Sort areas for improvement by mastery (lowest first)
-        metrics["areas_for_improvement"].sort(key=lambda a: a["mastery"])
-        
-        return metrics
\ No newline at end of file
+        Args:
+            profile: Student profile with its knowledge state attached
+            metrics: Metrics current with the knowledge state
+            dashboard: Dashboard aggregates current with the knowledge state
+        """
+        profile["metrics_state"] = metrics.to_state()
+        profile["metrics"] = metrics.to_metrics()
+        profile["dashboard_state"] = dashboard.to_state()
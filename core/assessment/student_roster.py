@@ -0,0 +1,269 @@
+# core/assessment/student_roster.py
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from typing import Dict, Any, List, Optional, Tuple
+
+from config.logging_config import get_module_logger
+
+# Create a logger for this module
+logger = get_module_logger("student_roster")
+
+class StudentRosterError(Exception):
+    """Exception raised for student roster errors."""
+    pass
+
+class StudentRoster:
+    """Lightweight SQLite index of students for listing and search.
+
+    Holds only the fields needed to list and pick students (id, name,
+    grade level and timestamps) plus the storage key of the full profile,
+    so student pickers never load whole profiles. Recently used pages and
+    counts are cached in memory (least recently used are evicted past
+    `max_cache_entries`, since every distinct search adds entries) and the
+    cache is invalidated on every write.
+    """
+
+    def __init__(self, db_path: str = ".state/knowledge_state.db", max_cache_entries: int = 256):
+        """Initialize with database path.
+
+        Args:
+            db_path: Path to SQLite database
+            max_cache_entries: Number of recently used pages and counts to keep
+        """
+        self.db_path = db_path
+        self.max_cache_entries = max_cache_entries
+        self._cache: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        # Initialize database
+        self._init_db()
+
+        logger.debug(f"Initialized student roster at {db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        """Initialize database with schema."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS roster (
+                        student_id TEXT PRIMARY KEY,
+                        name TEXT NOT NULL,
+                        name_key TEXT NOT NULL,
+                        grade_level TEXT,
+                        creation_date TEXT,
+                        last_updated TEXT,
+                        storage_key TEXT
+                    ) WITHOUT ROWID
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_roster_name
+                    ON roster (name_key, student_id)
+                """)
+        except Exception as e:
+            logger.error(f"Failed to initialize roster database: {str(e)}")
+            raise StudentRosterError(f"Failed to initialize database: {str(e)}")
+
+    def invalidate(self) -> None:
+        """Drop all cached pages and counts."""
+        with self._lock:
+            self._cache.clear()
+
+    def _cache_get(self, cache_key: Tuple[Any, ...]) -> Tuple[bool, Any]:
+        """Look up a cached page or count, marking it recently used.
+
+        Returns:
+            Tuple of (found, value)
+        """
+        with self._lock:
+            if cache_key not in self._cache:
+                return False, None
+            self._cache.move_to_end(cache_key)
+            return True, self._cache[cache_key]
+
+    def _cache_put(self, cache_key: Tuple[Any, ...], value: Any) -> None:
+        """Cache a page or count, evicting the least recently used past the limit."""
+        with self._lock:
+            self._cache[cache_key] = value
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.max_cache_entries:
+                self._cache.popitem(last=False)
+
+    def upsert(self, profile: Dict[str, Any], storage_key: Optional[str] = None) -> None:
+        """Add or update the roster entry for a profile.
+
+        Args:
+            profile: Student profile
+            storage_key: Storage key of the persisted full profile
+        """
+        self.upsert_many([(profile, storage_key)])
+
+    def upsert_many(self, entries: List[Tuple[Dict[str, Any], Optional[str]]]) -> None:
+        """Add or update roster entries in one transaction.
+
+        Args:
+            entries: (profile, storage key) pairs
+        """
+        rows = []
+        for profile, storage_key in entries:
+            name = profile.get("name") or f"Student {profile['student_id']}"
+            rows.append((
+                profile["student_id"],
+                name,
+                name.lower(),
+                profile.get("grade_level"),
+                profile.get("creation_date"),
+                profile.get("last_updated"),
+                storage_key
+            ))
+        if not rows:
+            return
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                """
+                INSERT INTO roster (student_id, name, name_key, grade_level,
+                                    creation_date, last_updated, storage_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (student_id) DO UPDATE SET
+                    name = excluded.name,
+                    name_key = excluded.name_key,
+                    grade_level = excluded.grade_level,
+                    creation_date = COALESCE(roster.creation_date, excluded.creation_date),
+                    last_updated = excluded.last_updated,
+                    storage_key = COALESCE(excluded.storage_key, roster.storage_key)
+                """,
+                rows
+            )
+        self.invalidate()
+
+    def remove(self, student_id: str) -> None:
+        """Remove a student from the roster.
+
+        Args:
+            student_id: Student identifier
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM roster WHERE student_id = ?", (student_id,))
+        self.invalidate()
+
+    def get(self, student_id: str) -> Optional[Dict[str, Any]]:
+        """Get one roster entry.
+
+        Args:
+            student_id: Student identifier
+
+        Returns:
+            Roster entry or None
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM roster WHERE student_id = ?", (student_id,)).fetchone()
+        return self._entry(row) if row else None
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convert a roster row to a dictionary."""
+        return {
+            "student_id": row["student_id"],
+            "name": row["name"],
+            "grade_level": row["grade_level"],
+            "creation_date": row["creation_date"],
+            "last_updated": row["last_updated"],
+            "storage_key": row["storage_key"]
+        }
+
+    @staticmethod
+    def _search_clause(search: Optional[str]) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause for a name or id search."""
+        search = (search or "").strip().lower()
+        if not search:
+            return "", []
+
+        # Escape LIKE wildcards so the search is a plain substring match
+        pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return "WHERE name_key LIKE ? ESCAPE '\\' OR student_id LIKE ? ESCAPE '\\'", [pattern, pattern]
+
+    def count(self, search: Optional[str] = None) -> int:
+        """Count students matching a search.
+
+        Args:
+            search: Optional case-insensitive substring of name or id
+
+        Returns:
+            Number of matching students
+        """
+        cache_key = ("count", (search or "").strip().lower())
+        found, total = self._cache_get(cache_key)
+        if found:
+            return total
+
+        where, params = self._search_clause(search)
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM roster {where}", params).fetchone()[0]
+
+        self._cache_put(cache_key, total)
+        return total
+
+    def list_page(self, page: int = 0, page_size: int = 50, search: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get one page of students ordered by name.
+
+        Args:
+            page: Zero-based page number
+            page_size: Number of students per page
+            search: Optional case-insensitive substring of name or id
+
+        Returns:
+            Roster entries for the page
+        """
+        page = max(0, page)
+        cache_key = ("page", (search or "").strip().lower(), page, page_size)
+        found, entries = self._cache_get(cache_key)
+        if found:
+            return list(entries)
+
+        where, params = self._search_clause(search)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM roster {where} ORDER BY name_key, student_id LIMIT ? OFFSET ?",
+                params + [page_size, page * page_size]
+            ).fetchall()
+        entries = [self._entry(row) for row in rows]
+
+        self._cache_put(cache_key, entries)
+        return list(entries)
+
+_rosters: Dict[str, StudentRoster] = {}
+_rosters_lock = threading.Lock()
+
+def get_student_roster(db_path: str = ".state/knowledge_state.db") -> StudentRoster:
+    """Get the process-wide roster for a database, creating it on first use.
+
+    The page and count cache must outlive Streamlit reruns to ever hit, and
+    the UI builds a new profile manager on every rerun.
+
+    Args:
+        db_path: Path to SQLite database
+
+    Returns:
+        Shared student roster for the database
+    """
+    roster = _rosters.get(db_path)
+    if roster is None:
+        with _rosters_lock:
+            roster = _rosters.get(db_path)
+            if roster is None:
+                roster = _rosters[db_path] = StudentRoster(db_path)
+    return roster
@@ -5,9 +5,7 @@ from langchain.schema import Document
 from config.logging_config import get_module_logger
 from core.document_processing.document_validator import DocumentValidator
 
-# Import specialized document loaders
-from PyPDF2 import PdfReader
-from docx import Document as DocxDocument
+# Specialized document loaders (PyPDF2, python-docx) are imported on first use
 #from pdfplumber import open
 
 # Create a logger for this module
@@ -56,6 +54,7 @@ class PDFLoader:
                 return None, f"File not found: {file_path}"
             
             # Extract text using PyPDF2
+            from PyPDF2 import PdfReader
             extracted_text = ""
             
             with open(file_path, "rb") as file:
@@ -101,6 +100,7 @@ class DocxLoader:
             A tuple of (extracted_text, error_message)
         """
         try:
+            from docx import Document as DocxDocument
             doc = DocxDocument(file_path)
             
             paragraphs = [paragraph.text for paragraph in doc.paragraphs]
@@ -1,13 +1,16 @@
 # core/embeddings/chroma_store.py
 
 import os
+import threading
 import time
 from typing import List, Optional, Dict, Any, Callable
 from langchain.schema import Document
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
 from config.app_config import config
 from config.logging_config import get_module_logger
+from core.embeddings.metadata_filter import to_chroma_where
+from core.embeddings.keyword_index import BM25Index
+from core.monitoring.metrics import VECTOR_STORE_SECONDS, VECTOR_STORE_DOCUMENTS
+from core.monitoring.tracing import traced
 
 # Create a logger for this module
 logger = get_module_logger("chroma_store")
@@ -30,19 +33,50 @@ class ChromaVectorStore:
         """
         self.persist_directory = persist_directory or os.path.join(config.vector_store.index_dir, "chroma_db")
         
-        # Use OpenAIEmbeddings as the default embedding provider
-        self.embedding_provider = embedding_provider or OpenAIEmbeddings(
-            model=config.vector_store.embedding_model
-        )
+        # Default OpenAIEmbeddings provider is created on first use
+        self._embedding_provider = embedding_provider
         
         self.collection_name = "documents"
         self.vectorstore = None
         
+        # BM25 keyword index over the same chunks, persisted next to the collection
+        self.keyword_index = BM25Index()
+        
+        # Bumped whenever the indexed documents change, so result caches can invalidate
+        self.generation = 0
+        
+        # Serializes changes to the collection; one store is shared by every
+        # session and background job of the process
+        self._lock = threading.RLock()
+        
         # Create persist directory if it doesn't exist
         os.makedirs(self.persist_directory, exist_ok=True)
         
         logger.debug(f"Initialized ChromaDB vector store with directory: {self.persist_directory}")
     
+    @property
+    def embedding_provider(self) -> Any:
+        """Embedding provider, defaulting to OpenAIEmbeddings created on first use."""
+        if self._embedding_provider is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._embedding_provider = OpenAIEmbeddings(model=config.vector_store.embedding_model)
+        return self._embedding_provider
+    
+    @embedding_provider.setter
+    def embedding_provider(self, embedding_provider: Any) -> None:
+        self._embedding_provider = embedding_provider
+    
+    def _ensure_index(self) -> bool:
+        """Make sure a collection is open, loading it from disk or creating an empty one.
+        
+        Returns:
+            True if a collection is available, False otherwise
+        """
+        with self._lock:
+            if self.vectorstore:
+                return True
+            return self.load_index() or self.build_index([])
+    
     def _index_exists(self) -> bool:
         """Check if index exists on disk.
         
@@ -84,6 +118,8 @@ class ChromaVectorStore:
         Returns:
             True if successful, False otherwise
         """
+        from langchain_chroma import Chroma
+        
         try:
             # Check if collection exists on disk
             if not self._index_exists():
@@ -97,6 +133,9 @@ class ChromaVectorStore:
                 persist_directory=self.persist_directory
             )
             
+            self._load_keyword_index()
+            self.generation += 1
+            
             logger.info(f"Loaded ChromaDB collection: {self.collection_name}")
             return True
             
@@ -104,6 +143,24 @@ class ChromaVectorStore:
             logger.error(f"Error loading ChromaDB: {str(e)}", exc_info=True)
             return False
     
+    def _load_keyword_index(self) -> None:
+        """Load the persisted keyword index, rebuilding it from the collection if missing."""
+        keyword_index = BM25Index.load(self.persist_directory)
+        if keyword_index is not None:
+            self.keyword_index = keyword_index
+            return
+        
+        # Collections created before keyword search existed only have vectors
+        logger.info("No keyword index found, rebuilding from collection")
+        stored = self.vectorstore.get(include=["documents", "metadatas"])
+        self.keyword_index = BM25Index()
+        self.keyword_index.add_documents([
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(stored["documents"], stored["metadatas"])
+            if (metadata or {}).get("id") != "placeholder_doc"
+        ])
+        self.keyword_index.save(self.persist_directory)
+    
     def build_index(self, documents: List[Document], force_rebuild: bool = False) -> bool:
         """Build a ChromaDB index from documents.
         
@@ -114,6 +171,8 @@ class ChromaVectorStore:
         Returns:
             True if successful, False otherwise
         """
+        from langchain_chroma import Chroma
+        
         try:
             # Check if index already exists
             if not force_rebuild and self._index_exists():
@@ -144,6 +203,10 @@ class ChromaVectorStore:
                 # Make sure changes are persisted
                 self.vectorstore.persist()
                 
+                self.keyword_index.clear()
+                self.keyword_index.save(self.persist_directory)
+                self.generation += 1
+                
                 logger.info("Created empty ChromaDB collection")
                 return True
             
@@ -174,6 +237,11 @@ class ChromaVectorStore:
             # Make sure changes are persisted
             self.vectorstore.persist()
             
+            self.keyword_index.clear()
+            self.keyword_index.add_documents(docs_with_ids)
+            self.keyword_index.save(self.persist_directory)
+            self.generation += 1
+            
             logger.info(f"Successfully built ChromaDB index with {len(documents)} documents")
             return True
             
@@ -181,6 +249,7 @@ class ChromaVectorStore:
             logger.error(f"Error building ChromaDB index: {str(e)}", exc_info=True)
             return False
     
+    @VECTOR_STORE_SECONDS.time(store="chroma", operation="add_documents")
     def add_documents(self, documents: List[Document]) -> bool:
         """Add documents to the vector store.
         
@@ -190,50 +259,134 @@ class ChromaVectorStore:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            if not documents:
-                logger.warning("No documents to add")
+        with self._lock:
+            try:
+                if not documents:
+                    logger.warning("No documents to add")
+                    return True
+                
+                # Load existing index or create a new one
+                if not self.vectorstore:
+                    if not self.load_index() and not self.build_index([]):
+                        logger.error("Failed to load or create index for adding documents")
+                        return False
+                
+                # Generate IDs for the documents if they don't have them in metadata
+                docs_with_ids = []
+                for i, doc in enumerate(documents):
+                    # Create a new document with the same content and metadata
+                    new_doc = Document(
+                        page_content=doc.page_content,
+                        metadata=dict(doc.metadata) if doc.metadata else {}
+                    )
+                    # Make sure the document has an ID in its metadata
+                    if 'id' not in new_doc.metadata:
+                        new_doc.metadata['id'] = f"doc_{int(time.time())}_{i}"
+                    docs_with_ids.append(new_doc)
+                
+                # Add documents with explicit IDs
+                ids = [doc.metadata['id'] for doc in docs_with_ids]
+                self.vectorstore.add_documents(docs_with_ids, ids=ids)
+                
+                self.keyword_index.add_documents(docs_with_ids)
+                self.keyword_index.save(self.persist_directory)
+                self.generation += 1
+                VECTOR_STORE_DOCUMENTS.inc(len(documents), store="chroma")
+                
+                # Remove the persist call - newer Chroma versions persist automatically
+                # No need to call self.vectorstore.persist()
+                
+                logger.info(f"Added {len(documents)} documents to ChromaDB")
                 return True
+                
+            except Exception as e:
+                logger.error(f"Error adding documents to ChromaDB: {str(e)}", exc_info=True)
+                return False
+    
+    @VECTOR_STORE_SECONDS.time(store="chroma", operation="search")
+    @traced("vector_store.search", store="chroma")
+    def search(self, 
+               query: str, 
+               k: int = None, 
+               filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search the index for similar documents.
+        
+        Args:
+            query: Query string
+            k: Number of results to return
+            filter: Optional metadata filter, pushed down as a Chroma `where` clause
             
-            # Load existing index or create a new one
-            if not self.vectorstore:
-                if not self.load_index() and not self.build_index([]):
-                    logger.error("Failed to load or create index for adding documents")
-                    return False
+        Returns:
+            List of similar documents
             
-            # Generate IDs for the documents if they don't have them in metadata
-            docs_with_ids = []
-            for i, doc in enumerate(documents):
-                # Create a new document with the same content and metadata
-                new_doc = Document(
-                    page_content=doc.page_content,
-                    metadata=dict(doc.metadata) if doc.metadata else {}
-                )
-                # Make sure the document has an ID in its metadata
-                if 'id' not in new_doc.metadata:
-                    new_doc.metadata['id'] = f"doc_{int(time.time())}_{i}"
-                docs_with_ids.append(new_doc)
+        Raises:
+            VectorStoreError: If search fails
+        """
+        try:
+            if not self._ensure_index():
+                raise VectorStoreError("No ChromaDB available for search")
             
-            # Add documents with explicit IDs
-            ids = [doc.metadata['id'] for doc in docs_with_ids]
-            self.vectorstore.add_documents(docs_with_ids, ids=ids)
+            # Use configurable k if not specified
+            k = k or config.vector_store.similarity_top_k
             
-            # Remove the persist call - newer Chroma versions persist automatically
-            # No need to call self.vectorstore.persist()
+            # Search documents using LangChain's implementation
+            where = to_chroma_where(filter)
+            if where:
+                results = self.vectorstore.similarity_search(query, k=k, filter=where)
+            else:
+                results = self.vectorstore.similarity_search(query, k=k)
             
-            logger.info(f"Added {len(documents)} documents to ChromaDB")
-            return True
+            logger.debug("Found %d documents for query: %.50s...", len(results), query)
+            return results
             
         except Exception as e:
-            logger.error(f"Error adding documents to ChromaDB: {str(e)}", exc_info=True)
-            return False
+            logger.error(f"Error searching ChromaDB: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Search failed: {str(e)}")
     
-    def search(self, query: str, k: int = None) -> List[Document]:
-        """Search the index for similar documents.
+    def get_document_vectors(self, documents: List[Document]) -> List[Optional[Any]]:
+        """Look up the stored vectors of documents without re-embedding them.
+        
+        Args:
+            documents: Documents previously returned by this store
+            
+        Returns:
+            Vector per document, or None for documents not in the collection
+        """
+        if not self.vectorstore:
+            return [None] * len(documents)
+        
+        ids = list({doc.metadata.get("id") for doc in documents if doc.metadata.get("id")})
+        if not ids:
+            return [None] * len(documents)
+        
+        stored = self.vectorstore._collection.get(ids=ids, include=["embeddings"])
+        vectors_by_id = dict(zip(stored["ids"], stored["embeddings"]))
+        return [vectors_by_id.get(doc.metadata.get("id")) for doc in documents]
+    
+    @traced("vector_store.embed_query", store="chroma")
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a single query with the configured embedding provider.
         
         Args:
             query: Query string
+            
+        Returns:
+            Query embedding
+        """
+        return self.embedding_provider.embed_query(query)
+    
+    @VECTOR_STORE_SECONDS.time(store="chroma", operation="search_by_vector")
+    @traced("vector_store.search_by_vector", store="chroma")
+    def search_by_vector(self, 
+                         embedding: List[float], 
+                         k: int = None, 
+                         filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search with a precomputed query embedding.
+        
+        Args:
+            embedding: Query embedding from `embed_query`
             k: Number of results to return
+            filter: Optional metadata filter, pushed down as a Chroma `where` clause
             
         Returns:
             List of similar documents
@@ -242,22 +395,111 @@ class ChromaVectorStore:
             VectorStoreError: If search fails
         """
         try:
-            if not self.vectorstore:
-                if not self.load_index():
-                    raise VectorStoreError("No ChromaDB available for search")
+            if not self._ensure_index():
+                raise VectorStoreError("No ChromaDB available for search")
             
             # Use configurable k if not specified
             k = k or config.vector_store.similarity_top_k
             
-            # Search documents using LangChain's implementation
-            results = self.vectorstore.similarity_search(query, k=k)
+            where = to_chroma_where(filter)
+            if where:
+                return self.vectorstore.similarity_search_by_vector(embedding, k=k, filter=where)
+            return self.vectorstore.similarity_search_by_vector(embedding, k=k)
+            
+        except Exception as e:
+            logger.error(f"Error searching ChromaDB by vector: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Search failed: {str(e)}")
+    
+    @VECTOR_STORE_SECONDS.time(store="chroma", operation="search_batch")
+    @traced("vector_store.search_batch", store="chroma")
+    def search_batch(self, 
+                     queries: List[str], 
+                     k: int = None, 
+                     filter: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """Search for several queries at once.
+        
+        All queries are embedded in one provider call and sent to Chroma as a
+        single multi-embedding query.
+        
+        Args:
+            queries: Query strings
+            k: Number of results per query
+            filter: Optional metadata filter applied to every query
+            
+        Returns:
+            List of result lists, one per query in input order
             
-            logger.debug(f"Found {len(results)} documents for query: {query[:50]}...")
+        Raises:
+            VectorStoreError: If search fails
+        """
+        try:
+            if not queries:
+                return []
+            
+            if not self._ensure_index():
+                raise VectorStoreError("No ChromaDB available for search")
+            
+            # Use configurable k if not specified
+            k = k or config.vector_store.similarity_top_k
+            
+            query_embeddings = self.embedding_provider.embed_documents(queries)
+            
+            query_kwargs = {
+                "query_embeddings": query_embeddings,
+                "n_results": k,
+                "include": ["documents", "metadatas", "distances"]
+            }
+            where = to_chroma_where(filter)
+            if where:
+                query_kwargs["where"] = where
+            
+            response = self.vectorstore._collection.query(**query_kwargs)
+            
+            results = []
+            for texts, metadatas in zip(response["documents"], response["metadatas"]):
+                results.append([
+                    Document(page_content=text, metadata=metadata or {})
+                    for text, metadata in zip(texts, metadatas)
+                ])
+            
+            logger.debug("Batch search returned results for %d queries", len(queries))
             return results
             
         except Exception as e:
-            logger.error(f"Error searching ChromaDB: {str(e)}", exc_info=True)
-            raise VectorStoreError(f"Search failed: {str(e)}")
+            logger.error(f"Error in batch search of ChromaDB: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Batch search failed: {str(e)}")
+    
+    @VECTOR_STORE_SECONDS.time(store="chroma", operation="keyword_search")
+    @traced("vector_store.keyword_search", store="chroma")
+    def keyword_search(self, 
+                       query: str, 
+                       k: int = None, 
+                       filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search the BM25 keyword index without an embedding call.
+        
+        Args:
+            query: Query string
+            k: Number of results to return
+            filter: Optional metadata filter
+            
+        Returns:
+            List of matching documents, best first
+            
+        Raises:
+            VectorStoreError: If search fails
+        """
+        try:
+            if not self._ensure_index():
+                raise VectorStoreError("No ChromaDB available for search")
+            
+            # Use configurable k if not specified
+            k = k or config.vector_store.similarity_top_k
+            
+            return [doc for doc, _ in self.keyword_index.search(query, k=k, filter=filter)]
+            
+        except Exception as e:
+            logger.error(f"Error in keyword search: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Keyword search failed: {str(e)}")
     
     def clear_index(self) -> bool:
         """Clear the index and remove all documents.
@@ -265,40 +507,44 @@ class ChromaVectorStore:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Delete the collection
-            import chromadb
-            
+        with self._lock:
             try:
-                client = chromadb.PersistentClient(path=self.persist_directory)
+                # Delete the collection
+                import chromadb
                 
-                # Get collection names
-                collections = client.list_collections()
-                collection_exists = False
+                try:
+                    client = chromadb.PersistentClient(path=self.persist_directory)
+                    
+                    # Get collection names
+                    collections = client.list_collections()
+                    collection_exists = False
+                    
+                    if isinstance(collections, list):
+                        # Check if collection exists
+                        if isinstance(collections[0], str) if collections else False:
+                            collection_exists = self.collection_name in collections
+                        else:
+                            collection_exists = self.collection_name in [c.name for c in collections]
+                    
+                    # Delete if exists
+                    if collection_exists:
+                        client.delete_collection(self.collection_name)
+                        logger.info(f"Deleted collection: {self.collection_name}")
+                except Exception as e:
+                    logger.warning(f"Error deleting collection: {str(e)}")
                 
-                if isinstance(collections, list):
-                    # Check if collection exists
-                    if isinstance(collections[0], str) if collections else False:
-                        collection_exists = self.collection_name in collections
-                    else:
-                        collection_exists = self.collection_name in [c.name for c in collections]
+                # Reset vectorstore and keyword index
+                self.vectorstore = None
+                self.keyword_index.clear()
+                BM25Index.remove(self.persist_directory)
+                self.generation += 1
+                
+                # Create a new empty collection
+                return self.build_index([])
                 
-                # Delete if exists
-                if collection_exists:
-                    client.delete_collection(self.collection_name)
-                    logger.info(f"Deleted collection: {self.collection_name}")
             except Exception as e:
-                logger.warning(f"Error deleting collection: {str(e)}")
-            
-            # Reset vectorstore reference
-            self.vectorstore = None
-            
-            # Create a new empty collection
-            return self.build_index([])
-            
-        except Exception as e:
-            logger.error(f"Error clearing ChromaDB index: {str(e)}", exc_info=True)
-            return False
+                logger.error(f"Error clearing ChromaDB index: {str(e)}", exc_info=True)
+                return False
     
     def as_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None) -> Any:
         """Get a retriever for the vector store.
@@ -313,14 +559,17 @@ class ChromaVectorStore:
             VectorStoreError: If retriever creation fails
         """
         try:
-            if not self.vectorstore:
-                if not self.load_index():
-                    raise VectorStoreError("No ChromaDB available for retrieval")
+            if not self._ensure_index():
+                raise VectorStoreError("No ChromaDB available for retrieval")
+            
+            search_kwargs = dict(search_kwargs or {"k": config.vector_store.similarity_top_k})
+            
+            # Translate metadata filters into a Chroma where clause
+            if search_kwargs.get("filter"):
+                search_kwargs["filter"] = to_chroma_where(search_kwargs["filter"])
             
             # Get the native retriever from LangChain
-            retriever = self.vectorstore.as_retriever(
-                search_kwargs=search_kwargs or {"k": config.vector_store.similarity_top_k}
-            )
+            retriever = self.vectorstore.as_retriever(search_kwargs=search_kwargs)
             
             return retriever
             
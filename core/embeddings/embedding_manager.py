@@ -6,15 +6,29 @@ import hashlib
 import time
 import threading
 import functools
+import contextvars
 from typing import List, Dict, Any, Optional, Tuple
 from langchain.schema import Document
 from config.app_config import config
 from config.logging_config import get_module_logger
 from core.llm.llm_client import LLMClient
+from core.monitoring.metrics import registry
+from core.monitoring.tracing import span, traced
 
 # Create a logger for this module
 logger = get_module_logger("embedding_manager")
 
+# Metrics
+EMBEDDING_SECONDS = registry.histogram("embedding_request_seconds", "Latency of get_embeddings calls")
+EMBEDDING_BATCH_SIZE = registry.histogram(
+    "embedding_batch_size", "Texts per embedding API call",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+EMBEDDING_CACHE_LOOKUPS = registry.counter("embedding_cache_lookups_total", "Embedding cache lookups", ["result"])
+EMBEDDING_FALLBACKS = registry.counter(
+    "embedding_zero_fallbacks_total", "Texts given a zero vector because the API call failed"
+)
+
 class EmbeddingCache:
     """Cache for document embeddings."""
     
@@ -67,7 +81,7 @@ class EmbeddingCache:
             try:
                 # Check if cache is still valid
                 if time.time() - os.path.getmtime(cache_path) > self.ttl:
-                    logger.debug(f"Cache expired for key {key}")
+                    logger.debug("Cache expired for key %s", key)
                     return None
                 
                 # Load cached embeddings
@@ -98,7 +112,7 @@ class EmbeddingCache:
             with open(cache_path, 'wb') as f:
                 pickle.dump(embeddings, f)
                 
-            logger.debug(f"Cached embeddings for key {key}")
+            logger.debug("Cached embeddings for key %s", key)
                 
         except Exception as e:
             logger.error(f"Error caching embeddings for key {key}: {str(e)}")
@@ -178,7 +192,7 @@ class TextChunkProcessor:
             if start >= len(text):
                 break
         
-        logger.debug(f"Split text into {len(chunks)} chunks")
+        logger.debug("Split text into %d chunks", len(chunks))
         return chunks
     
     def split_documents(self, documents: List[Document]) -> List[Document]:
@@ -226,7 +240,9 @@ def timeout_after(seconds):
                 except Exception as e:
                     exception[0] = e
             
-            thread = threading.Thread(target=target)
+            # Run in a copy of the caller's context so the call stays in its trace
+            context = contextvars.copy_context()
+            thread = threading.Thread(target=context.run, args=(target,))
             thread.daemon = True
             thread.start()
             thread.join(seconds)
@@ -263,6 +279,7 @@ class EmbeddingManager:
         logger.debug(f"Initialized embedding manager with cache={'enabled' if self.use_cache else 'disabled'}")
     
     @timeout_after(30)  # Apply 30 second timeout to prevent hanging
+    @traced("embedding.get_embeddings")
     def get_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Get embeddings for texts with caching.
         
@@ -280,13 +297,16 @@ class EmbeddingManager:
         # If cache disabled, get all embeddings from API
         if not self.use_cache:
             try:
+                EMBEDDING_BATCH_SIZE.observe(len(texts))
                 result = self.llm_client.embeddings(texts)
                 elapsed = time.time() - start_time
+                EMBEDDING_SECONDS.observe(elapsed)
                 if elapsed > 5.0:  # Log slow operations
                     logger.warning(f"Slow embedding generation (no cache): {elapsed:.2f}s for {len(texts)} texts")
                 return result
             except Exception as e:
                 logger.error(f"Error getting embeddings without cache: {str(e)}")
+                EMBEDDING_FALLBACKS.inc(len(texts))
                 # Return zero vectors as a fallback to prevent complete failure
                 return [[0.0] * 1536 for _ in range(len(texts))]
         
@@ -301,18 +321,21 @@ class EmbeddingManager:
         # Limit batch size to prevent timeouts with large requests
         max_batch_size = 10
         
-        for i, text in enumerate(texts):
-            cached_embedding = self.cache.get(text)
-            
-            if cached_embedding is not None:
-                # Use cached embedding
-                embeddings.append((i, cached_embedding))
-                cache_hits += 1
-                logger.debug(f"Using cached embedding for text {i}")
-            else:
-                # Need to get embedding from API
-                texts_to_embed.append(text)
-                cache_indices.append(i)
+        with span("embedding.cache_lookup", texts=len(texts)):
+            for i, text in enumerate(texts):
+                cached_embedding = self.cache.get(text)
+                
+                if cached_embedding is not None:
+                    # Use cached embedding
+                    embeddings.append((i, cached_embedding))
+                    cache_hits += 1
+                else:
+                    # Need to get embedding from API
+                    texts_to_embed.append(text)
+                    cache_indices.append(i)
+        
+        # One summary line per call rather than one per text
+        logger.debug("Using cached embeddings for %d of %d texts", cache_hits, len(texts))
         
         # Process embeddings in smaller batches if needed
         if texts_to_embed:
@@ -326,8 +349,9 @@ class EmbeddingManager:
                 batch_indices = cache_indices[start_idx:end_idx]
                 
                 try:
-                    logger.debug(f"Getting batch {batch_idx+1}/{num_batches} with {len(batch_texts)} embeddings from API")
+                    logger.debug("Getting batch %d/%d with %d embeddings from API", batch_idx + 1, num_batches, len(batch_texts))
                     api_time_start = time.time()
+                    EMBEDDING_BATCH_SIZE.observe(len(batch_texts))
                     api_embeddings = self.llm_client.embeddings(batch_texts)
                     api_time = time.time() - api_time_start
                     
@@ -341,10 +365,12 @@ class EmbeddingManager:
                 except Exception as e:
                     logger.error(f"Error getting batch {batch_idx+1}/{num_batches} embeddings: {str(e)}")
                     # Return zero vectors as a fallback to prevent complete failure
+                    EMBEDDING_FALLBACKS.inc(len(batch_indices))
                     for idx in batch_indices:
                         zero_embedding = [0.0] * 1536  # Standard OpenAI embedding size
                         embeddings.append((idx, zero_embedding))
-                        logger.warning(f"Using zero fallback embedding for text {idx}")
+                    logger.warning("Using zero fallback embeddings for %d texts in batch %d/%d",
+                                   len(batch_indices), batch_idx + 1, num_batches)
         
         # Sort by original index and return only embeddings
         embeddings.sort(key=lambda x: x[0])
@@ -352,6 +378,9 @@ class EmbeddingManager:
         
         # Log performance metrics
         elapsed = time.time() - start_time
+        EMBEDDING_SECONDS.observe(elapsed)
+        EMBEDDING_CACHE_LOOKUPS.inc(cache_hits, result="hit")
+        EMBEDDING_CACHE_LOOKUPS.inc(len(texts) - cache_hits, result="miss")
         if elapsed > 5.0:  # Log slow operations
             cache_rate = (cache_hits / len(texts)) * 100 if texts else 0
             logger.warning(f"Slow embedding generation: {elapsed:.2f}s for {len(texts)} texts (cache hit rate: {cache_rate:.1f}%)")
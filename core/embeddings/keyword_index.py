@@ -0,0 +1,339 @@
+# core/embeddings/keyword_index.py
+
+"""In-process BM25 keyword index kept alongside the vector stores."""
+
+import os
+import re
+import pickle
+import threading
+from array import array
+from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
+from langchain.schema import Document
+from config.logging_config import get_module_logger
+from core.embeddings.metadata_filter import matches_filter
+
+# Create a logger for this module
+logger = get_module_logger("keyword_index")
+
+# Lowercase alphanumeric runs, keeping codes such as "idea-2004" or "ccss.math.3.oa" intact
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+PART_SEPARATORS = re.compile(r"[-_.]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into index terms.
+
+    Compound codes are indexed both whole and by their parts, so a query for
+    "504" matches "section-504" as well as "504".
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms
+    """
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        if PART_SEPARATORS.search(token):
+            terms.extend(part for part in PART_SEPARATORS.split(token) if part)
+    return terms
+
+
+class BM25Index:
+    """BM25 inverted index with compact array-backed postings.
+
+    Each term maps to two parallel `array('i')` buffers holding document ids
+    and term frequencies. Documents are only ever appended, so postings stay
+    sorted by document id and new documents are indexed incrementally.
+
+    Persistence is incremental too: `save` appends documents added since the
+    last save to a log next to the snapshot, and only rewrites the snapshot
+    once the log holds more documents than it, so saving after every batch
+    costs time proportional to the batch rather than to the whole index.
+    """
+
+    FILE_NAME = "bm25_index.pkl"
+    LOG_FILE_NAME = "bm25_index.log"
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation parameter
+            b: Document length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_lengths = array("i")
+        self._documents: List[Document] = []
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+        # Where the index was last persisted, and how many documents the snapshot and log hold
+        self._saved_directory: Optional[str] = None
+        self._snapshot_count = 0
+        self._saved_count = 0
+
+    def __len__(self) -> int:
+        """Number of indexed documents."""
+        return len(self._documents)
+
+    def clear(self) -> None:
+        """Remove all documents from the index."""
+        with self._lock:
+            self._postings = {}
+            self._doc_lengths = array("i")
+            self._documents = []
+            self._total_length = 0
+            self._saved_directory = None
+            self._snapshot_count = 0
+            self._saved_count = 0
+
+    def add_documents(self, documents: List[Document]) -> None:
+        """Index documents, appending them after the existing ones.
+
+        Args:
+            documents: Documents to index
+        """
+        with self._lock:
+            for doc in documents:
+                doc_id = len(self._documents)
+                terms = tokenize(doc.page_content or "")
+
+                frequencies: Dict[str, int] = {}
+                for term in terms:
+                    frequencies[term] = frequencies.get(term, 0) + 1
+
+                for term, frequency in frequencies.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = (array("i"), array("i"))
+                        self._postings[term] = postings
+                    postings[0].append(doc_id)
+                    postings[1].append(frequency)
+
+                self._documents.append(doc)
+                self._doc_lengths.append(len(terms))
+                self._total_length += len(terms)
+
+        logger.debug(f"Indexed {len(documents)} documents for keyword search")
+
+    def search(self,
+               query: str,
+               k: int = 4,
+               filter: Optional[Dict[str, Any]] = None) -> List[Tuple[Document, float]]:
+        """Score documents against a query with BM25.
+
+        Args:
+            query: Query string
+            k: Number of results to return
+            filter: Optional metadata filter
+
+        Returns:
+            List of (document, score) tuples, best first
+        """
+        query_terms = set(tokenize(query))
+
+        with self._lock:
+            doc_count = len(self._documents)
+            if not doc_count or not query_terms:
+                return []
+
+            doc_lengths = np.frombuffer(self._doc_lengths, dtype=np.int32)
+            avg_length = self._total_length / doc_count
+            scores = np.zeros(doc_count, dtype=np.float32)
+
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                doc_ids = np.frombuffer(postings[0], dtype=np.int32)
+                frequencies = np.frombuffer(postings[1], dtype=np.int32).astype(np.float32)
+
+                idf = np.log(1.0 + (doc_count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[doc_ids] / avg_length)
+                scores[doc_ids] += idf * frequencies * (self.k1 + 1.0) / (frequencies + norm)
+
+            candidates = np.flatnonzero(scores)
+            if not len(candidates):
+                return []
+
+            # Without a filter only the top k candidates need ordering
+            if not filter and len(candidates) > k:
+                top = np.argpartition(-scores[candidates], k - 1)[:k]
+                candidates = candidates[top]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            results = []
+            for doc_id in candidates:
+                doc = self._documents[doc_id]
+                if filter and not matches_filter(doc.metadata, filter):
+                    continue
+                results.append((doc, float(scores[doc_id])))
+                if len(results) >= k:
+                    break
+
+            return results
+
+    def save(self, directory: str) -> bool:
+        """Persist the index next to a vector index.
+
+        Appends documents added since the last save to the log, or writes a
+        new snapshot (and drops the log) when nothing was saved to this
+        directory yet, documents were removed, or the log would outgrow the
+        snapshot.
+
+        Args:
+            directory: Directory holding the vector index
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            os.makedirs(directory, exist_ok=True)
+            directory = os.path.abspath(directory)
+            with self._lock:
+                count = len(self._documents)
+                incremental = (
+                    directory == self._saved_directory
+                    and self._snapshot_count <= self._saved_count <= count
+                    and count - self._snapshot_count <= self._snapshot_count
+                )
+                if incremental:
+                    self._append_log(directory, self._saved_count)
+                else:
+                    self._write_snapshot(directory)
+                self._saved_directory = directory
+                self._saved_count = count
+            return True
+        except Exception as e:
+            logger.error(f"Error saving keyword index: {str(e)}")
+            self._saved_directory = None
+            return False
+
+    def _write_snapshot(self, directory: str) -> None:
+        """Write every document to a new snapshot and remove the log (caller holds the lock).
+
+        Args:
+            directory: Absolute directory holding the vector index
+        """
+        state = {
+            "k1": self.k1,
+            "b": self.b,
+            "postings": self._postings,
+            "doc_lengths": self._doc_lengths,
+            "documents": [(doc.page_content, doc.metadata) for doc in self._documents],
+            "total_length": self._total_length
+        }
+        path = os.path.join(directory, self.FILE_NAME)
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+        log_path = os.path.join(directory, self.LOG_FILE_NAME)
+        if os.path.exists(log_path):
+            os.remove(log_path)
+        self._snapshot_count = len(self._documents)
+
+    def _append_log(self, directory: str, start: int) -> None:
+        """Append documents from a position onwards to the log (caller holds the lock).
+
+        Each record carries its document id, so records already covered by
+        the snapshot are skipped on load.
+
+        Args:
+            directory: Absolute directory holding the vector index
+            start: Id of the first document to append
+        """
+        if start >= len(self._documents):
+            return
+        with open(os.path.join(directory, self.LOG_FILE_NAME), "ab") as f:
+            for doc_id in range(start, len(self._documents)):
+                doc = self._documents[doc_id]
+                pickle.dump((doc_id, doc.page_content, doc.metadata), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BM25Index"]:
+        """Load a persisted index, replaying documents appended to its log.
+
+        Args:
+            directory: Directory holding the vector index
+
+        Returns:
+            Loaded index, or None if none exists or it cannot be read
+        """
+        path = os.path.join(directory, cls.FILE_NAME)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+
+            index = cls(k1=state["k1"], b=state["b"])
+            index._postings = state["postings"]
+            index._doc_lengths = state["doc_lengths"]
+            index._documents = [
+                Document(page_content=content, metadata=metadata)
+                for content, metadata in state["documents"]
+            ]
+            index._total_length = state["total_length"]
+            index._snapshot_count = len(index._documents)
+
+            complete = index._replay_log(directory)
+
+            # Append to this directory from now on, unless the log has to be rewritten
+            if complete:
+                index._saved_directory = os.path.abspath(directory)
+                index._saved_count = len(index._documents)
+
+            logger.debug(f"Loaded keyword index with {len(index)} documents from {directory}")
+            return index
+        except Exception as e:
+            logger.error(f"Error loading keyword index: {str(e)}")
+            return None
+
+    def _replay_log(self, directory: str) -> bool:
+        """Index documents recorded in the log after the snapshot was written.
+
+        Args:
+            directory: Directory holding the vector index
+
+        Returns:
+            True if the log was read to its end, False if it ends in a partial record
+        """
+        log_path = os.path.join(directory, self.LOG_FILE_NAME)
+        if not os.path.exists(log_path):
+            return True
+
+        documents = []
+        complete = True
+        size = os.path.getsize(log_path)
+        with open(log_path, "rb") as f:
+            while f.tell() < size:
+                try:
+                    doc_id, content, metadata = pickle.load(f)
+                except (EOFError, pickle.UnpicklingError, ValueError, TypeError):
+                    # A save interrupted mid-write; keep the records before it
+                    logger.warning(f"Ignoring a partial record at the end of {log_path}")
+                    complete = False
+                    break
+                if doc_id == len(self._documents) + len(documents):
+                    documents.append(Document(page_content=content, metadata=metadata))
+        self.add_documents(documents)
+        return complete
+
+    @classmethod
+    def remove(cls, directory: str) -> None:
+        """Delete a persisted index if present.
+
+        Args:
+            directory: Directory holding the vector index
+        """
+        for name in (cls.FILE_NAME, cls.LOG_FILE_NAME):
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                os.remove(path)
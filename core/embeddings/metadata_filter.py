@@ -0,0 +1,284 @@
+# core/embeddings/metadata_filter.py
+
+"""Metadata filtering shared by the vector store backends.
+
+Filters use a small Chroma-compatible syntax so they can be pushed down to
+Chroma unchanged and evaluated locally for FAISS:
+
+    {"source": "report.pdf"}                              # equality
+    {"file_type": {"$in": [".pdf", ".docx"]}}             # membership
+    {"upload_timestamp": {"$gte": 1704067200, "$lt": 1706745600}}  # range
+
+Multiple fields are combined with AND. Range operands must be numbers,
+because Chroma only compares numbers; times are filtered on epoch-second
+fields such as `upload_timestamp` rather than ISO strings like `upload_time`.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from config.logging_config import get_module_logger
+
+# Create a logger for this module
+logger = get_module_logger("metadata_filter")
+
+# Supported comparison operators
+EQUALITY_OPERATORS = {"$eq", "$ne", "$in", "$nin"}
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte"}
+SUPPORTED_OPERATORS = EQUALITY_OPERATORS | RANGE_OPERATORS
+
+
+class MetadataFilterError(Exception):
+    """Exception raised for invalid metadata filters."""
+    pass
+
+
+def normalize_filter(metadata_filter: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Normalize a filter into {field: {operator: value}} form.
+
+    Args:
+        metadata_filter: Filter dictionary (equality shorthand or operator form)
+
+    Returns:
+        Normalized filter dictionary
+
+    Raises:
+        MetadataFilterError: If the filter uses unsupported operators or a
+            non-numeric range operand
+    """
+    if not metadata_filter:
+        return {}
+
+    normalized = {}
+    for field, condition in metadata_filter.items():
+        if field.startswith("$"):
+            raise MetadataFilterError(f"Logical operator {field} is not supported; combine fields instead")
+
+        # Shorthand equality
+        if not isinstance(condition, dict):
+            normalized[field] = {"$eq": condition}
+            continue
+
+        for operator, operand in condition.items():
+            if operator not in SUPPORTED_OPERATORS:
+                raise MetadataFilterError(f"Unsupported filter operator: {operator}")
+            # Reject here what Chroma would reject, so filters behave the same on every backend
+            if operator in RANGE_OPERATORS and (isinstance(operand, bool) or not isinstance(operand, (int, float))):
+                raise MetadataFilterError(
+                    f"Range operator {operator} on {field} needs a number, got {type(operand).__name__}; "
+                    f"filter times on epoch seconds such as upload_timestamp"
+                )
+        normalized[field] = dict(condition)
+
+    return normalized
+
+
+def to_chroma_where(metadata_filter: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Convert a filter into a Chroma `where` clause.
+
+    Chroma requires a single operator per clause, so multi-operator and
+    multi-field conditions are wrapped in an `$and`.
+
+    Args:
+        metadata_filter: Filter dictionary
+
+    Returns:
+        Chroma where clause or None if there is nothing to filter on
+    """
+    normalized = normalize_filter(metadata_filter)
+
+    clauses = []
+    for field, condition in normalized.items():
+        for operator, value in condition.items():
+            clauses.append({field: {operator: value}})
+
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    """Evaluate a single comparison, treating type mismatches as non-matches."""
+    try:
+        if operator == "$eq":
+            return value == operand
+        if operator == "$ne":
+            return value != operand
+        if operator == "$in":
+            return value in operand
+        if operator == "$nin":
+            return value not in operand
+        if value is None:
+            return False
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    return False
+
+
+def matches_filter(metadata: Optional[Dict[str, Any]], metadata_filter: Optional[Dict[str, Any]]) -> bool:
+    """Check whether a metadata dictionary satisfies a filter.
+
+    Args:
+        metadata: Document metadata
+        metadata_filter: Filter dictionary
+
+    Returns:
+        True if all conditions match, False otherwise
+    """
+    metadata = metadata or {}
+    for field, condition in normalize_filter(metadata_filter).items():
+        value = metadata.get(field)
+        for operator, operand in condition.items():
+            if not _compare(value, operator, operand):
+                return False
+    return True
+
+
+class MetadataIndex:
+    """Inverted index from metadata values to vector positions.
+
+    Equality lookups are served from per-field posting sets. Range lookups
+    use a per-field sorted (value, position) list that is rebuilt lazily
+    after writes, so repeated range filters cost two binary searches.
+    """
+
+    def __init__(self, indexed_fields: Optional[List[str]] = None):
+        """Initialize an empty index.
+
+        Args:
+            indexed_fields: Fields to index (default: every scalar field)
+        """
+        self.indexed_fields = set(indexed_fields) if indexed_fields else None
+        self._postings: Dict[str, Dict[Any, Set[int]]] = {}
+        self._sorted: Dict[str, Tuple[List[Any], List[int]]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of indexed positions."""
+        return self._size
+
+    def clear(self) -> None:
+        """Remove all entries from the index."""
+        self._postings = {}
+        self._sorted = {}
+        self._size = 0
+
+    def add(self, position: int, metadata: Optional[Dict[str, Any]]) -> None:
+        """Index the metadata of the vector stored at a position.
+
+        Args:
+            position: Position of the vector in the underlying index
+            metadata: Metadata dictionary for the vector
+        """
+        for field, value in (metadata or {}).items():
+            if self.indexed_fields is not None and field not in self.indexed_fields:
+                continue
+            # Only scalar values can be used as posting keys
+            if not isinstance(value, (str, int, float, bool)):
+                continue
+            self._postings.setdefault(field, {}).setdefault(value, set()).add(position)
+            # Invalidate the sorted view for range queries
+            self._sorted.pop(field, None)
+
+        self._size = max(self._size, position + 1)
+
+    def _sorted_view(self, field: str) -> Tuple[List[Any], List[int]]:
+        """Get the sorted (values, positions) view for a field."""
+        view = self._sorted.get(field)
+        if view is None:
+            pairs = []
+            for value, positions in self._postings.get(field, {}).items():
+                pairs.extend((value, position) for position in positions)
+            try:
+                pairs.sort()
+            except TypeError:
+                # Mixed value types cannot be ordered; keep the comparable majority
+                kinds = {}
+                for pair in pairs:
+                    kinds.setdefault(type(pair[0]) in (int, float, bool), []).append(pair)
+                pairs = max(kinds.values(), key=len)
+                pairs.sort()
+            view = ([p[0] for p in pairs], [p[1] for p in pairs])
+            self._sorted[field] = view
+        return view
+
+    def _range_positions(self, field: str, condition: Dict[str, Any]) -> Set[int]:
+        """Get positions whose field value satisfies the range operators."""
+        values, positions = self._sorted_view(field)
+        start, end = 0, len(values)
+        try:
+            if "$gt" in condition:
+                start = max(start, bisect_right(values, condition["$gt"]))
+            if "$gte" in condition:
+                start = max(start, bisect_left(values, condition["$gte"]))
+            if "$lt" in condition:
+                end = min(end, bisect_left(values, condition["$lt"]))
+            if "$lte" in condition:
+                end = min(end, bisect_right(values, condition["$lte"]))
+        except TypeError:
+            return set()
+        return set(positions[start:end]) if start < end else set()
+
+    def _field_positions(self, field: str, condition: Dict[str, Any]) -> Set[int]:
+        """Get positions matching every operator for a single field."""
+        field_postings = self._postings.get(field, {})
+        result: Optional[Set[int]] = None
+
+        def intersect(current: Optional[Set[int]], other: Set[int]) -> Set[int]:
+            return set(other) if current is None else current & other
+
+        if "$eq" in condition:
+            result = intersect(result, field_postings.get(condition["$eq"], set()))
+        if "$in" in condition:
+            union = set()
+            for value in condition["$in"]:
+                union |= field_postings.get(value, set())
+            result = intersect(result, union)
+        if any(op in condition for op in RANGE_OPERATORS):
+            result = intersect(result, self._range_positions(field, condition))
+        if "$ne" in condition or "$nin" in condition:
+            excluded = set()
+            if "$ne" in condition:
+                excluded |= field_postings.get(condition["$ne"], set())
+            for value in condition.get("$nin", []):
+                excluded |= field_postings.get(value, set())
+            if result is None:
+                result = set(range(self._size))
+            result = result - excluded
+
+        return result if result is not None else set(range(self._size))
+
+    def lookup(self, metadata_filter: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+        """Resolve a filter to the sorted list of matching positions.
+
+        Args:
+            metadata_filter: Filter dictionary
+
+        Returns:
+            Sorted matching positions, or None if the filter is empty
+        """
+        normalized = normalize_filter(metadata_filter)
+        if not normalized:
+            return None
+
+        result: Optional[Set[int]] = None
+        # Evaluate the most selective equality fields first so intersections stay small
+        for field, condition in sorted(normalized.items(), key=lambda item: "$eq" not in item[1]):
+            if self.indexed_fields is not None and field not in self.indexed_fields:
+                raise MetadataFilterError(f"Field is not indexed: {field}")
+            positions = self._field_positions(field, condition)
+            result = positions if result is None else result & positions
+            if not result:
+                return []
+
+        return sorted(result)
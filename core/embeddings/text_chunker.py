@@ -3,8 +3,6 @@
 from typing import List, Optional, Dict, Any
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_experimental.text_splitter import SemanticChunker
-from langchain_openai import OpenAIEmbeddings
 from config.app_config import config
 from config.logging_config import get_module_logger
 
@@ -49,8 +47,11 @@ class TextChunkProcessor:
         
         # Initialize semantic chunker if specified
         if self.chunking_strategy == "semantic":
+            from langchain_experimental.text_splitter import SemanticChunker
+            
             # Create embeddings provider if not provided
             if not self.embedding_provider:
+                from langchain_openai import OpenAIEmbeddings
                 self.embedding_provider = OpenAIEmbeddings(
                     model=config.vector_store.embedding_model
                 )
@@ -81,7 +82,7 @@ class TextChunkProcessor:
                 # Use recursive chunking by default
                 chunks = self.recursive_chunker.split_text(text)
             
-            logger.debug(f"Split text into {len(chunks)} chunks using {self.chunking_strategy} strategy")
+            logger.debug("Split text into %d chunks using %s strategy", len(chunks), self.chunking_strategy)
             return chunks
             
         except Exception as e:
@@ -122,7 +123,7 @@ class TextChunkProcessor:
         if current_chunk:
             chunks.append(current_chunk)
         
-        logger.debug(f"Fallback split text into {len(chunks)} chunks")
+        logger.debug("Fallback split text into %d chunks", len(chunks))
         return chunks
     
     def split_documents(self, documents: List[Document]) -> List[Document]:
@@ -2,17 +2,24 @@
 
 import os
 import shutil
+import threading
 import time
 from typing import List, Optional, Dict, Any, Tuple, Callable, Union
+import numpy as np
 from langchain.schema import Document
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
 from config.app_config import config
 from config.logging_config import get_module_logger
+from core.embeddings.metadata_filter import MetadataIndex
+from core.embeddings.keyword_index import BM25Index
+from core.monitoring.metrics import VECTOR_STORE_SECONDS, VECTOR_STORE_DOCUMENTS
+from core.monitoring.tracing import traced
 
 # Create a logger for this module
 logger = get_module_logger("vector_store")
 
+# Id of the document an empty FAISS index is created with; never returned by searches
+PLACEHOLDER_ID = "placeholder_doc"
+
 class VectorStoreError(Exception):
     """Exception raised for vector store errors."""
     pass
@@ -31,18 +38,58 @@ class FAISSVectorStore:
         """
         self.index_dir = index_dir or config.vector_store.index_dir
         
-        # Use OpenAIEmbeddings as the default embedding provider
-        self.embedding_provider = embedding_provider or OpenAIEmbeddings(
-            model=config.vector_store.embedding_model
-        )
+        # Default OpenAIEmbeddings provider is created on first use
+        self._embedding_provider = embedding_provider
         
         self.vectorstore = None
         
+        # Inverted metadata index over vector positions for filtered search
+        self.metadata_index = MetadataIndex()
+        
+        # Vector position of each stored chunk, keyed by (id, content)
+        self._doc_positions: Dict[Tuple[Any, str], int] = {}
+        
+        # BM25 keyword index over the same chunks, persisted next to the vectors
+        self.keyword_index = BM25Index()
+        
+        # Bumped whenever the indexed documents change, so result caches can invalidate
+        self.generation = 0
+        
+        # Serializes index changes with each other and with index reads; one
+        # store is shared by every session and background job of the process
+        self._lock = threading.RLock()
+        
         # Create index directory if it doesn't exist
         os.makedirs(self.index_dir, exist_ok=True)
         
         logger.debug(f"Initialized FAISS vector store with index directory: {self.index_dir}")
     
+    @property
+    def embedding_provider(self) -> Any:
+        """Embedding provider, defaulting to OpenAIEmbeddings created on first use."""
+        if self._embedding_provider is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._embedding_provider = OpenAIEmbeddings(model=config.vector_store.embedding_model)
+        return self._embedding_provider
+    
+    @embedding_provider.setter
+    def embedding_provider(self, embedding_provider: Any) -> None:
+        self._embedding_provider = embedding_provider
+    
+    def _ensure_index(self) -> bool:
+        """Make sure an index is in memory, loading it from disk or creating an empty one.
+        
+        Returns:
+            True if an index is available, False otherwise
+        """
+        with self._lock:
+            if self.vectorstore:
+                return True
+            if self._index_exists():
+                return self.load_index()
+            logger.info("Creating empty FAISS index")
+            return self.build_index([])
+    
     def build_index(self, documents: List[Document], force_rebuild: bool = False) -> bool:
         """Build a FAISS index from documents.
         
@@ -53,6 +100,8 @@ class FAISSVectorStore:
         Returns:
             True if successful, False otherwise
         """
+        from langchain_community.vectorstores import FAISS
+        
         try:
             # Check if index already exists
             if not force_rebuild and self._index_exists():
@@ -66,7 +115,7 @@ class FAISSVectorStore:
                 # Create an empty vectorstore with a single placeholder document
                 placeholder_doc = Document(
                     page_content="This is a placeholder document for empty index",
-                    metadata={"source": "placeholder", "id": "placeholder_doc"}
+                    metadata={"source": "placeholder", "id": PLACEHOLDER_ID}
                 )
                 
                 # Extract texts and metadata separately for FAISS.from_texts
@@ -80,8 +129,12 @@ class FAISSVectorStore:
                     metadatas=metadatas
                 )
                 
+                self._rebuild_metadata_index()
+                self.keyword_index.clear()
+                
                 # Save the empty index
                 self.save_index()
+                self.generation += 1
                 logger.info("Created empty FAISS index")
                 return True
             
@@ -108,8 +161,16 @@ class FAISSVectorStore:
                 metadatas=metadatas
             )
             
+            self._rebuild_metadata_index()
+            self.keyword_index.clear()
+            self.keyword_index.add_documents([
+                Document(page_content=text, metadata=metadata)
+                for text, metadata in zip(texts, metadatas)
+            ])
+            
             # Save the index
             self.save_index()
+            self.generation += 1
             
             logger.info(f"Successfully built FAISS index with {len(documents)} documents")
             return True
@@ -135,6 +196,7 @@ class FAISSVectorStore:
             
             # Save index using LangChain's built-in method
             self.vectorstore.save_local(self.index_dir)
+            self.keyword_index.save(self.index_dir)
             logger.info(f"Saved FAISS index to {self.index_dir}")
             return True
             
@@ -148,6 +210,8 @@ class FAISSVectorStore:
         Returns:
             True if successful, False otherwise
         """
+        from langchain_community.vectorstores import FAISS
+        
         try:
             if not self._index_exists():
                 logger.error(f"Index directory not found: {self.index_dir}")
@@ -174,6 +238,10 @@ class FAISSVectorStore:
                 allow_dangerous_deserialization=True
             )
             
+            self._rebuild_metadata_index()
+            self._load_keyword_index()
+            self.generation += 1
+            
             logger.info(f"Loaded index from {self.index_dir}")
             return True
             
@@ -207,12 +275,181 @@ class FAISSVectorStore:
         except Exception as e:
             logger.error(f"Error creating index backup: {str(e)}")
     
-    def search(self, query: str, k: int = None) -> List[Document]:
+    def _rebuild_metadata_index(self) -> None:
+        """Rebuild the metadata index from the current docstore."""
+        self.metadata_index.clear()
+        self._doc_positions = {}
+        if self.vectorstore:
+            self._index_positions(0)
+    
+    def _load_keyword_index(self) -> None:
+        """Load the persisted keyword index, rebuilding it from the docstore if missing."""
+        keyword_index = BM25Index.load(self.index_dir)
+        if keyword_index is not None:
+            self.keyword_index = keyword_index
+            return
+        
+        # Indexes saved before keyword search existed only have vectors
+        logger.info("No keyword index found, rebuilding from docstore")
+        self.keyword_index = BM25Index()
+        self.keyword_index.add_documents([
+            doc for doc in self._documents_for_positions(range(self.vectorstore.index.ntotal))
+            if doc.metadata.get("id") != PLACEHOLDER_ID
+        ])
+        self.keyword_index.save(self.index_dir)
+    
+    def _index_positions(self, start_position: int) -> None:
+        """Add metadata for vectors from a position onwards to the metadata index.
+        
+        The placeholder document is left out, so no filter (including
+        `$ne`/`$nin`) can select it.
+        
+        Args:
+            start_position: First vector position to index
+        """
+        try:
+            index_to_docstore_id = self.vectorstore.index_to_docstore_id
+            for position in range(start_position, self.vectorstore.index.ntotal):
+                docstore_id = index_to_docstore_id.get(position)
+                doc = self.vectorstore.docstore.search(docstore_id) if docstore_id else None
+                if isinstance(doc, Document) and doc.metadata.get("id") != PLACEHOLDER_ID:
+                    self.metadata_index.add(position, doc.metadata)
+                    self._doc_positions[(doc.metadata.get("id"), doc.page_content)] = position
+        except Exception as e:
+            logger.warning(f"Could not index document metadata: {str(e)}")
+    
+    def get_document_vectors(self, documents: List[Document]) -> List[Optional[np.ndarray]]:
+        """Look up the stored vectors of documents without re-embedding them.
+        
+        Args:
+            documents: Documents previously returned by this store
+            
+        Returns:
+            Vector per document, or None for documents not in the index
+        """
+        with self._lock:
+            if not self.vectorstore:
+                return [None] * len(documents)
+            
+            vectors = []
+            for doc in documents:
+                position = self._doc_positions.get((doc.metadata.get("id"), doc.page_content))
+                vectors.append(None if position is None else self.vectorstore.index.reconstruct(position))
+            return vectors
+    
+    @traced("vector_store.embed_query", store="faiss")
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a single query with the configured embedding provider.
+        
+        Args:
+            query: Query string
+            
+        Returns:
+            Query embedding
+        """
+        if hasattr(self.embedding_provider, "embed_query"):
+            return self.embedding_provider.embed_query(query)
+        return self.embedding_provider.get_embeddings([query])[0]
+    
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed several queries in a single provider call.
+        
+        Args:
+            queries: Query strings
+            
+        Returns:
+            Query embeddings in input order
+        """
+        if hasattr(self.embedding_provider, "embed_documents"):
+            return self.embedding_provider.embed_documents(queries)
+        return self.embedding_provider.get_embeddings(queries)
+    
+    def _search_vectors(self, 
+                        vectors: np.ndarray, 
+                        k: int, 
+                        positions: Optional[List[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the FAISS index, optionally restricted to a subset of positions.
+        
+        Args:
+            vectors: Query vectors with shape (num_queries, dimension)
+            k: Number of results per query
+            positions: Optional vector positions the search is restricted to
+            
+        Returns:
+            Tuple of (distances, positions) arrays with shape (num_queries, k)
+        """
+        import faiss
+        
+        index = self.vectorstore.index
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if getattr(self.vectorstore, "_normalize_L2", False):
+            faiss.normalize_L2(vectors)
+        
+        if positions is None:
+            return index.search(vectors, min(k, index.ntotal))
+        
+        k = min(k, len(positions))
+        try:
+            # Let FAISS skip everything outside the id subset
+            selector = faiss.IDSelectorBatch(np.asarray(positions, dtype=np.int64))
+            return index.search(vectors, k, params=faiss.SearchParameters(sel=selector))
+        except (AttributeError, TypeError, RuntimeError):
+            # Older FAISS builds or index types without selector support:
+            # score the subset exactly from reconstructed vectors
+            subset_positions = np.asarray(positions, dtype=np.int64)
+            subset = np.vstack([index.reconstruct(int(p)) for p in subset_positions])
+            if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+                scores = -(vectors @ subset.T)
+            else:
+                scores = (
+                    (vectors ** 2).sum(axis=1, keepdims=True)
+                    - 2.0 * (vectors @ subset.T)
+                    + (subset ** 2).sum(axis=1)
+                )
+            top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+            order = np.take_along_axis(top, np.argsort(np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+            distances = np.take_along_axis(scores, order, axis=1)
+            if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+                distances = -distances
+            return distances, subset_positions[order]
+    
+    def _matches_any(self, filter: Dict[str, Any]) -> bool:
+        """Check whether any indexed document matches a metadata filter."""
+        with self._lock:
+            return bool(self.metadata_index.lookup(filter))
+    
+    def _documents_for_positions(self, positions: np.ndarray) -> List[Document]:
+        """Resolve vector positions to documents from the docstore.
+        
+        Args:
+            positions: Vector positions (negative values and the placeholder are ignored)
+            
+        Returns:
+            List of documents in position order
+        """
+        docs = []
+        for position in positions:
+            if position < 0:
+                continue
+            docstore_id = self.vectorstore.index_to_docstore_id.get(int(position))
+            doc = self.vectorstore.docstore.search(docstore_id) if docstore_id else None
+            if isinstance(doc, Document) and doc.metadata.get("id") != PLACEHOLDER_ID:
+                docs.append(doc)
+        return docs
+    
+    @VECTOR_STORE_SECONDS.time(store="faiss", operation="search")
+    @traced("vector_store.search", store="faiss")
+    def search(self, 
+               query: str, 
+               k: int = None, 
+               filter: Optional[Dict[str, Any]] = None) -> List[Document]:
         """Search for documents similar to the query.
         
         Args:
             query: Query string
             k: Number of results to return
+            filter: Optional metadata filter, e.g. {"source": "report.pdf"} or
+                {"upload_timestamp": {"$gte": 1704067200}}
             
         Returns:
             List of similar documents
@@ -221,118 +458,288 @@ class FAISSVectorStore:
             VectorStoreError: If search fails
         """
         try:
-            if not self.vectorstore:
-                if not self.load_index():
-                    raise VectorStoreError("No index available for search")
+            if not self._ensure_index():
+                raise VectorStoreError("No index available for search")
             
             # Use configurable k if not specified
             k = k or config.vector_store.similarity_top_k
             
-            # Use the built-in similarity_search method
-            results = self.vectorstore.similarity_search(query, k=k)
+            # Skip the embedding call when nothing can match
+            if filter and not self._matches_any(filter):
+                logger.debug("No documents match filter %s", filter)
+                return []
+            
+            # Embed outside the lock so slow provider calls don't block writers
+            query_vector = np.asarray([self.embed_query(query)], dtype=np.float32)
+            
+            with self._lock:
+                if not filter:
+                    results = [
+                        doc for doc in self.vectorstore.similarity_search_by_vector(query_vector[0].tolist(), k=k)
+                        if doc.metadata.get("id") != PLACEHOLDER_ID
+                    ]
+                else:
+                    # Resolve the filter to candidate positions, then search only those
+                    positions = self.metadata_index.lookup(filter)
+                    if not positions:
+                        logger.debug("No documents match filter %s", filter)
+                        return []
+                    
+                    _, result_positions = self._search_vectors(query_vector, k, positions)
+                    results = self._documents_for_positions(result_positions[0])
             
-            logger.debug(f"Found {len(results)} documents for query: {query[:50]}...")
+            logger.debug("Found %d documents for query: %.50s...", len(results), query)
             return results
             
         except Exception as e:
             logger.error(f"Error searching FAISS index: {str(e)}", exc_info=True)
             raise VectorStoreError(f"Search failed: {str(e)}")
     
-    def add_documents(self, documents: List[Document]) -> bool:
-        """Add documents to the vector store.
+    @VECTOR_STORE_SECONDS.time(store="faiss", operation="search_by_vector")
+    @traced("vector_store.search_by_vector", store="faiss")
+    def search_by_vector(self, 
+                         embedding: List[float], 
+                         k: int = None, 
+                         filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search with a precomputed query embedding.
         
         Args:
-            documents: Documents to add
+            embedding: Query embedding from `embed_query`
+            k: Number of results to return
+            filter: Optional metadata filter
             
         Returns:
-            True if successful, False otherwise
+            List of similar documents
+            
+        Raises:
+            VectorStoreError: If search fails
         """
         try:
-            if not documents:
-                logger.warning("No documents to add")
-                return True
+            if not self._ensure_index():
+                raise VectorStoreError("No index available for search")
             
-            # Extract texts and metadata
-            texts = []
-            metadatas = []
+            # Use configurable k if not specified
+            k = k or config.vector_store.similarity_top_k
             
-            for i, doc in enumerate(documents):
-                # Get document content
-                texts.append(doc.page_content)
+            with self._lock:
+                positions = None
+                if filter:
+                    positions = self.metadata_index.lookup(filter)
+                    if not positions:
+                        return []
                 
-                # Create metadata with ID if not present
-                metadata = dict(doc.metadata) if doc.metadata else {}
-                if 'id' not in metadata:
-                    metadata['id'] = f"doc_{int(time.time())}_{i}"
-                metadatas.append(metadata)
+                _, result_positions = self._search_vectors(
+                    np.asarray([embedding], dtype=np.float32), k, positions
+                )
+                return self._documents_for_positions(result_positions[0])
             
-            # If we have an existing index
-            if self.vectorstore:
-                try:
-                    # Try to add texts directly
-                    self.vectorstore.add_texts(texts, metadatas=metadatas)
-                    self.save_index()
-                    logger.info(f"Added {len(documents)} documents to existing FAISS index")
-                    return True
-                except Exception as e:
-                    logger.warning(f"Could not add to existing index: {str(e)}, rebuilding...")
-                    
-                    # Fall back to rebuilding the entire index
-                    # Try to get existing documents first
-                    existing_docs = []
-                    try:
-                        # This is a best effort attempt, may not work with all FAISS versions
-                        if hasattr(self.vectorstore, "docstore") and hasattr(self.vectorstore.docstore, "_dict"):
-                            for doc_id, doc_data in self.vectorstore.docstore._dict.items():
-                                page_content = doc_data.get("page_content", "")
-                                metadata = doc_data.get("metadata", {})
-                                existing_docs.append(Document(page_content=page_content, metadata=metadata))
-                    except Exception as ex:
-                        logger.warning(f"Could not retrieve existing documents: {str(ex)}")
-                    
-                    # Combine existing and new documents
-                    all_docs = existing_docs + documents
-                    
-                    # Rebuild with all documents
-                    return self.build_index(all_docs, force_rebuild=True)
-            else:
-                # No existing vectorstore, build from scratch
-                return self.build_index(documents)
-        
         except Exception as e:
-            logger.error(f"Error adding documents to FAISS index: {str(e)}", exc_info=True)
-            return False
+            logger.error(f"Error searching FAISS index by vector: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Search failed: {str(e)}")
     
-    def clear_index(self) -> bool:
-        """Clear the index and remove all documents.
+    @VECTOR_STORE_SECONDS.time(store="faiss", operation="search_batch")
+    @traced("vector_store.search_batch", store="faiss")
+    def search_batch(self, 
+                     queries: List[str], 
+                     k: int = None, 
+                     filter: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """Search for several queries at once.
+        
+        All queries are embedded in one provider call and answered by a
+        single matrix search against the FAISS index.
         
+        Args:
+            queries: Query strings
+            k: Number of results per query
+            filter: Optional metadata filter applied to every query
+            
         Returns:
-            True if successful, False otherwise
+            List of result lists, one per query in input order
+            
+        Raises:
+            VectorStoreError: If search fails
         """
         try:
-            # Create backup before clearing
-            if self._index_exists():
-                self._backup_index()
+            if not queries:
+                return []
             
-            # Remove index files
-            if os.path.exists(os.path.join(self.index_dir, "index.faiss")):
-                os.remove(os.path.join(self.index_dir, "index.faiss"))
+            if not self._ensure_index():
+                raise VectorStoreError("No index available for search")
             
-            if os.path.exists(os.path.join(self.index_dir, "index.pkl")):
-                os.remove(os.path.join(self.index_dir, "index.pkl"))
+            # Use configurable k if not specified
+            k = k or config.vector_store.similarity_top_k
             
-            # Reset vectorstore
-            self.vectorstore = None
+            if filter and not self._matches_any(filter):
+                return [[] for _ in queries]
             
-            # Create a new empty index
-            self.build_index([])
+            query_vectors = np.asarray(self._embed_queries(queries), dtype=np.float32)
             
-            logger.info("Cleared FAISS index")
-            return True
+            with self._lock:
+                positions = None
+                if filter:
+                    positions = self.metadata_index.lookup(filter)
+                    if not positions:
+                        return [[] for _ in queries]
+                
+                _, result_positions = self._search_vectors(query_vectors, k, positions)
+                results = [self._documents_for_positions(row) for row in result_positions]
+            
+            logger.debug("Batch search returned results for %d queries", len(queries))
+            return results
             
         except Exception as e:
-            logger.error(f"Error clearing FAISS index: {str(e)}", exc_info=True)
-            return False
+            logger.error(f"Error in batch search of FAISS index: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Batch search failed: {str(e)}")
+    
+    @VECTOR_STORE_SECONDS.time(store="faiss", operation="keyword_search")
+    @traced("vector_store.keyword_search", store="faiss")
+    def keyword_search(self, 
+                       query: str, 
+                       k: int = None, 
+                       filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Search the BM25 keyword index without an embedding call.
+        
+        Args:
+            query: Query string
+            k: Number of results to return
+            filter: Optional metadata filter
+            
+        Returns:
+            List of matching documents, best first
+            
+        Raises:
+            VectorStoreError: If search fails
+        """
+        try:
+            if not self._ensure_index():
+                raise VectorStoreError("No index available for search")
+            
+            # Use configurable k if not specified
+            k = k or config.vector_store.similarity_top_k
+            
+            with self._lock:
+                return [doc for doc, _ in self.keyword_index.search(query, k=k, filter=filter)]
+            
+        except Exception as e:
+            logger.error(f"Error in keyword search: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Keyword search failed: {str(e)}")
+    
+    @VECTOR_STORE_SECONDS.time(store="faiss", operation="add_documents")
+    def add_documents(self, documents: List[Document]) -> bool:
+        """Add documents to the vector store.
+        
+        Args:
+            documents: Documents to add
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        with self._lock:
+            try:
+                if not documents:
+                    logger.warning("No documents to add")
+                    return True
+                
+                # Extract texts and metadata
+                texts = []
+                metadatas = []
+                
+                for i, doc in enumerate(documents):
+                    # Get document content
+                    texts.append(doc.page_content)
+                    
+                    # Create metadata with ID if not present
+                    metadata = dict(doc.metadata) if doc.metadata else {}
+                    if 'id' not in metadata:
+                        metadata['id'] = f"doc_{int(time.time())}_{i}"
+                    metadatas.append(metadata)
+                
+                # Load an index persisted by an earlier run before adding to it
+                if not self.vectorstore and self._index_exists():
+                    self.load_index()
+                
+                # If we have an existing index
+                if self.vectorstore:
+                    try:
+                        # Try to add texts directly
+                        start_position = self.vectorstore.index.ntotal
+                        self.vectorstore.add_texts(texts, metadatas=metadatas)
+                        self._index_positions(start_position)
+                        self.keyword_index.add_documents([
+                            Document(page_content=text, metadata=metadata)
+                            for text, metadata in zip(texts, metadatas)
+                        ])
+                        self.generation += 1
+                        self.save_index()
+                        VECTOR_STORE_DOCUMENTS.inc(len(documents), store="faiss")
+                        logger.info(f"Added {len(documents)} documents to existing FAISS index")
+                        return True
+                    except Exception as e:
+                        logger.warning(f"Could not add to existing index: {str(e)}, rebuilding...")
+                        
+                        # Fall back to rebuilding the entire index
+                        # Try to get existing documents first
+                        existing_docs = []
+                        try:
+                            # This is a best effort attempt, may not work with all FAISS versions
+                            if hasattr(self.vectorstore, "docstore") and hasattr(self.vectorstore.docstore, "_dict"):
+                                for doc_id, doc_data in self.vectorstore.docstore._dict.items():
+                                    page_content = doc_data.get("page_content", "")
+                                    metadata = doc_data.get("metadata", {})
+                                    existing_docs.append(Document(page_content=page_content, metadata=metadata))
+                        except Exception as ex:
+                            logger.warning(f"Could not retrieve existing documents: {str(ex)}")
+                        
+                        # Combine existing and new documents
+                        all_docs = existing_docs + documents
+                        
+                        # Rebuild with all documents
+                        return self.build_index(all_docs, force_rebuild=True)
+                else:
+                    # No existing vectorstore, build from scratch
+                    return self.build_index(documents)
+            
+            except Exception as e:
+                logger.error(f"Error adding documents to FAISS index: {str(e)}", exc_info=True)
+                return False
+    
+    def clear_index(self) -> bool:
+        """Clear the index and remove all documents.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        with self._lock:
+            try:
+                # Create backup before clearing
+                if self._index_exists():
+                    self._backup_index()
+                
+                # Remove index files
+                if os.path.exists(os.path.join(self.index_dir, "index.faiss")):
+                    os.remove(os.path.join(self.index_dir, "index.faiss"))
+                
+                if os.path.exists(os.path.join(self.index_dir, "index.pkl")):
+                    os.remove(os.path.join(self.index_dir, "index.pkl"))
+                
+                BM25Index.remove(self.index_dir)
+                
+                # Reset vectorstore
+                self.vectorstore = None
+                self.metadata_index.clear()
+                self._doc_positions = {}
+                self.keyword_index.clear()
+                self.generation += 1
+                
+                # Create a new empty index
+                self.build_index([])
+                
+                logger.info("Cleared FAISS index")
+                return True
+                
+            except Exception as e:
+                logger.error(f"Error clearing FAISS index: {str(e)}", exc_info=True)
+                return False
     
     def as_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None) -> Callable:
         """Get a retriever function for the vector store.
@@ -348,7 +755,7 @@ class FAISSVectorStore:
         """
         try:
             # If DB doesn't exist, try to load it
-            if not self.vectorstore and not self.load_index():
+            if not self._ensure_index():
                 # If loading fails, create a dummy retriever
                 logger.warning("No index available. Returning empty retriever as fallback.")
                 return lambda query: []
@@ -361,11 +768,22 @@ class FAISSVectorStore:
             # Create retriever function
             def retriever(query: str) -> List[Document]:
                 try:
-                    return self.search(query, k=search_kwargs.get("k"))
+                    return self.search(
+                        query, 
+                        k=search_kwargs.get("k"), 
+                        filter=search_kwargs.get("filter")
+                    )
                 except Exception as e:
                     logger.error(f"Search error in retriever: {str(e)}")
                     return []  # Return empty list on error
             
+            # Expose batched search so callers with many queries can use one search call
+            retriever.search_batch = lambda queries: self.search_batch(
+                queries, 
+                k=search_kwargs.get("k"), 
+                filter=search_kwargs.get("filter")
+            )
+            
             return retriever
             
         except Exception as e:
@@ -1,14 +1,18 @@
 # core/embeddings/vector_store_factory.py
 
 import os
+import threading
 from typing import Optional, Any, Dict
-from langchain_openai import OpenAIEmbeddings
 from config.logging_config import get_module_logger
 from config.app_config import config
 
 # Create a logger for this module
 logger = get_module_logger("vector_store_factory")
 
+# Process-wide vector stores by type, shared by every session and background job
+_shared_stores: Dict[str, Any] = {}
+_shared_stores_lock = threading.Lock()
+
 class VectorStoreFactory:
     """Factory for creating vector store instances."""
     
@@ -16,13 +20,17 @@ class VectorStoreFactory:
     def create_vector_store(
         store_type: str = None, 
         embedding_provider: Optional[Any] = None,
+        lazy: bool = False,
         **kwargs
     ) -> Any:
         """Create a vector store instance based on type.
         
         Args:
             store_type: Type of vector store to create ('faiss', 'chroma', 'vertex')
-            embedding_provider: Provider for embeddings (default: OpenAIEmbeddings)
+            embedding_provider: Provider for embeddings (default: OpenAIEmbeddings,
+                created by the store on first use)
+            lazy: Defer loading or creating the FAISS/Chroma index until the
+                store is first searched or written
             **kwargs: Additional arguments for the vector store
             
         Returns:
@@ -31,12 +39,6 @@ class VectorStoreFactory:
         # Default to environment variable or configuration
         store_type = store_type or os.environ.get("VECTOR_STORE_TYPE", "faiss")
         
-        # Setup default embedding provider if not provided
-        if embedding_provider is None:
-            embedding_provider = OpenAIEmbeddings(
-                model=config.vector_store.embedding_model
-            )
-        
         try:
             logger.debug(f"Creating vector store of type: {store_type}")
             
@@ -45,11 +47,8 @@ class VectorStoreFactory:
                 store = FAISSVectorStore(embedding_provider=embedding_provider, **kwargs)
                 
                 # Load or create index on initialization
-                if not store._index_exists():
-                    logger.info("Creating empty FAISS index during initialization")
-                    store.build_index([])
-                else:
-                    store.load_index()
+                if not lazy:
+                    store._ensure_index()
                 return store
                 
             elif store_type.lower() == "chroma":
@@ -57,11 +56,8 @@ class VectorStoreFactory:
                 store = ChromaVectorStore(embedding_provider=embedding_provider, **kwargs)
                 
                 # Load or create index on initialization
-                if not store._index_exists():
-                    logger.info("Creating empty ChromaDB collection during initialization")
-                    store.build_index([])
-                else:
-                    store.load_index()
+                if not lazy:
+                    store._ensure_index()
                 return store
                 
             elif store_type.lower() == "vertex":
@@ -85,11 +81,8 @@ class VectorStoreFactory:
                 store = FAISSVectorStore(embedding_provider=embedding_provider, **kwargs)
                 
                 # Load or create index on initialization
-                if not store._index_exists():
-                    logger.info("Creating empty FAISS index during initialization")
-                    store.build_index([])
-                else:
-                    store.load_index()
+                if not lazy:
+                    store._ensure_index()
                 return store
         except Exception as e:
             logger.error(f"Error creating vector store: {str(e)}", exc_info=True)
@@ -100,6 +93,29 @@ class VectorStoreFactory:
             store.build_index([])
             return store
 
+    @staticmethod
+    def get_shared_vector_store(store_type: str = None) -> Any:
+        """Get the process-wide vector store of a type, creating it lazily on first use.
+        
+        Streamlit reruns and background jobs all go through this instance, so
+        writes are applied to one in-memory index (the stores serialize them)
+        and its generation counter tracks every change for result caches.
+        
+        Args:
+            store_type: Type of vector store ('faiss', 'chroma', 'vertex')
+            
+        Returns:
+            Shared vector store instance
+        """
+        store_type = (store_type or os.environ.get("VECTOR_STORE_TYPE", "faiss")).lower()
+        
+        with _shared_stores_lock:
+            if store_type not in _shared_stores:
+                _shared_stores[store_type] = VectorStoreFactory.create_vector_store(
+                    store_type=store_type, lazy=True
+                )
+            return _shared_stores[store_type]
+    
     @staticmethod
     def create_embeddings_provider(model: str = None) -> Any:
         """Create an embeddings provider.
@@ -110,6 +126,8 @@ class VectorStoreFactory:
         Returns:
             Embeddings provider
         """
+        from langchain_openai import OpenAIEmbeddings
+        
         try:
             # Use config model if not specified
             model = model or config.vector_store.embedding_model
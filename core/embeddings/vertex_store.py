@@ -11,6 +11,9 @@ from langchain.vectorstores.utils import DistanceStrategy
 from config.app_config import config
 from config.logging_config import get_module_logger
 from core.embeddings.embedding_manager import TextChunkProcessor
+from core.embeddings.metadata_filter import matches_filter
+from core.monitoring.metrics import VECTOR_STORE_SECONDS, VECTOR_STORE_DOCUMENTS
+from core.monitoring.tracing import traced
 
 # Create a logger for this module
 logger = get_module_logger("vertex_store")
@@ -155,6 +158,7 @@ class VertexVectorStore:
             logger.error(f"Error building Vertex index: {str(e)}", exc_info=True)
             return False
     
+    @VECTOR_STORE_SECONDS.time(store="vertex", operation="add_documents")
     def add_documents(self, documents: List[Document]) -> bool:
         """Add documents to the index.
         
@@ -192,6 +196,7 @@ class VertexVectorStore:
                 ids=ids
             )
             
+            VECTOR_STORE_DOCUMENTS.inc(len(documents), store="vertex")
             logger.info(f"Added {len(chunked_docs)} document chunks to Vertex AI index")
             return True
             
@@ -199,12 +204,21 @@ class VertexVectorStore:
             logger.error(f"Error adding documents to Vertex index: {str(e)}", exc_info=True)
             return False
     
-    def search(self, query: str, k: int = None) -> List[Document]:
+    @VECTOR_STORE_SECONDS.time(store="vertex", operation="search")
+    @traced("vector_store.search", store="vertex")
+    def search(self, 
+               query: str, 
+               k: int = None, 
+               filter: Optional[Dict[str, Any]] = None) -> List[Document]:
         """Search the index for similar documents.
         
+        Metadata filters are applied to an over-fetched candidate set, since
+        Vertex AI restricts namespaces rather than arbitrary metadata.
+        
         Args:
             query: Query string
             k: Number of results to return
+            filter: Optional metadata filter
             
         Returns:
             List of similar documents
@@ -231,15 +245,75 @@ class VertexVectorStore:
             )
             
             # Search documents
-            results = vector_store.similarity_search(query, k=k)
+            if filter:
+                candidates = vector_store.similarity_search(query, k=k * 4)
+                results = [doc for doc in candidates if matches_filter(doc.metadata, filter)][:k]
+            else:
+                results = vector_store.similarity_search(query, k=k)
             
-            logger.debug(f"Found {len(results)} documents for query: {query[:50]}...")
+            logger.debug("Found %d documents for query: %.50s...", len(results), query)
             return results
             
         except Exception as e:
             logger.error(f"Error searching Vertex index: {str(e)}", exc_info=True)
             raise VectorStoreError(f"Search failed: {str(e)}")
     
+    @VECTOR_STORE_SECONDS.time(store="vertex", operation="search_batch")
+    @traced("vector_store.search_batch", store="vertex")
+    def search_batch(self, 
+                     queries: List[str], 
+                     k: int = None, 
+                     filter: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """Search for several queries at once.
+        
+        Queries are embedded in one batch call; Vertex AI is then queried
+        per embedding since the LangChain wrapper has no multi-query search.
+        
+        Args:
+            queries: Query strings
+            k: Number of results per query
+            filter: Optional metadata filter applied to every query
+            
+        Returns:
+            List of result lists, one per query in input order
+            
+        Raises:
+            VectorStoreError: If search fails
+        """
+        try:
+            if not queries:
+                return []
+            
+            if not self._index_exists():
+                raise VectorStoreError("No index available for search")
+            
+            # Use configurable k if not specified
+            k = k or config.vector_store.similarity_top_k
+            
+            # Import here to avoid circular imports
+            from langchain_google_vertexai import VertexAIVector
+            
+            vector_store = VertexAIVector(
+                embedding=self.embeddings,
+                index_name=self.index_name,
+                project_id=self.project_id,
+                location=self.location
+            )
+            
+            results = []
+            for embedding in self.embeddings.embed_documents(queries):
+                if filter:
+                    candidates = vector_store.similarity_search_by_vector(embedding, k=k * 4)
+                    results.append([doc for doc in candidates if matches_filter(doc.metadata, filter)][:k])
+                else:
+                    results.append(vector_store.similarity_search_by_vector(embedding, k=k))
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error in batch search of Vertex index: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"Batch search failed: {str(e)}")
+    
     def as_retriever(self, search_kwargs: Optional[Dict[str, Any]] = None) -> Callable:
         """Get a retriever function for the vector store.
         
@@ -263,7 +337,18 @@ class VertexVectorStore:
             
             # Create retriever function
             def retriever(query: str) -> List[Document]:
-                return self.search(query, k=search_kwargs.get("k"))
+                return self.search(
+                    query, 
+                    k=search_kwargs.get("k"), 
+                    filter=search_kwargs.get("filter")
+                )
+            
+            # Expose batched search so callers with many queries can use one embedding call
+            retriever.search_batch = lambda queries: self.search_batch(
+                queries, 
+                k=search_kwargs.get("k"), 
+                filter=search_kwargs.get("filter")
+            )
             
             return retriever
             
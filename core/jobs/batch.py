@@ -0,0 +1,582 @@
+# core/jobs/batch.py
+
+"""Resumable batch jobs for ingestion, indexing and generation.
+
+Each job records finished items in a `JobCheckpoint`, so a rerun after an
+interruption skips them, and counts its work in a `JobStats` for the
+throughput report printed at the end.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Iterable, Iterator, Set, Tuple
+from langchain.schema import Document
+
+from config.app_config import config
+from config.logging_config import get_module_logger
+from core.document_processing.document_loader import DocumentLoader
+
+# Create a logger for this module
+logger = get_module_logger("batch_jobs")
+
+class BatchJobError(Exception):
+    """Exception raised when a batch job cannot run."""
+    pass
+
+def file_key(path: str) -> str:
+    """Get the checkpoint key of a file, which changes when the file does.
+
+    Args:
+        path: File path
+
+    Returns:
+        Key made of the absolute path, size and modification time
+    """
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+def document_id(path: str) -> str:
+    """Get a stable document id for a file, so re-ingesting it keeps its id."""
+    return "doc_" + hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+def collect_files(paths: Iterable[str], extensions: Iterable[str]) -> List[str]:
+    """Expand files and directories (recursively) into a sorted list of supported files.
+
+    Args:
+        paths: Files and directories
+        extensions: Supported file extensions, lowercase with the dot
+
+    Returns:
+        Sorted unique file paths
+
+    Raises:
+        BatchJobError: If a path does not exist
+    """
+    extensions = set(extensions)
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.update(
+                    os.path.join(root, name) for name in names
+                    if os.path.splitext(name)[1].lower() in extensions
+                )
+        elif os.path.isfile(path):
+            if os.path.splitext(path)[1].lower() in extensions:
+                files.add(path)
+            else:
+                logger.warning(f"Skipping unsupported file: {path}")
+        else:
+            raise BatchJobError(f"Path not found: {path}")
+    return sorted(files)
+
+def map_concurrently(func: Callable[[Any], Any],
+                     items: Iterable[Any],
+                     workers: int) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+    """Apply a function to items on a thread pool, yielding results as they complete.
+
+    Items not yet started are cancelled if the caller stops early or is
+    interrupted; items already running are allowed to finish.
+
+    Args:
+        func: Function of one item
+        items: Items to process
+        workers: Maximum concurrent calls
+
+    Yields:
+        Tuples of (item, result, exception), with result None on failure
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    try:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+class JobCheckpoint:
+    """Persistent record of a job's finished items.
+
+    Progress is kept in `<checkpoint_dir>/<job_name>.json`, rewritten
+    atomically every `save_interval` finished items and whenever `save` is
+    called. Jobs may keep extra resume information in `state`.
+    """
+
+    def __init__(self,
+                 job_name: str,
+                 checkpoint_dir: Optional[str] = None,
+                 save_interval: Optional[int] = None):
+        """Initialize the checkpoint, loading any saved progress.
+
+        Args:
+            job_name: Name identifying the job
+            checkpoint_dir: Directory for checkpoint files (default: from config)
+            save_interval: Finished items between saves (default: from config)
+        """
+        self.job_name = job_name
+        self.checkpoint_dir = checkpoint_dir or config.batch.checkpoint_dir
+        self.save_interval = max(1, save_interval or config.batch.checkpoint_interval)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", job_name)
+        self.path = os.path.join(self.checkpoint_dir, f"{safe_name}.json")
+
+        self.completed: Set[str] = set()
+        self.state: Dict[str, Any] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        self._load()
+
+    def _load(self) -> None:
+        """Load saved progress, ignoring an unreadable file."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.completed = set(data.get("completed", []))
+            self.state = data.get("state", {})
+            logger.info(f"Resuming {self.job_name} with {len(self.completed)} items already done")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {str(e)}")
+
+    def is_done(self, key: str) -> bool:
+        """Check whether an item was finished by this or an earlier run."""
+        return key in self.completed
+
+    def mark_done(self, key: str) -> None:
+        """Record a finished item, saving when the save interval is reached.
+
+        Args:
+            key: Item key
+        """
+        with self._lock:
+            self.completed.add(key)
+            self._unsaved += 1
+            due = self._unsaved >= self.save_interval
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        """Write progress to disk atomically."""
+        with self._lock:
+            data = {
+                "job": self.job_name,
+                "updated_at": datetime.now().isoformat(),
+                "completed": sorted(self.completed),
+                "state": self.state
+            }
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+            self._unsaved = 0
+
+    def clear(self) -> None:
+        """Forget all progress and delete the checkpoint file."""
+        with self._lock:
+            self.completed = set()
+            self.state = {}
+            self._unsaved = 0
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+class JobStats:
+    """Item counts and throughput of a batch job."""
+
+    def __init__(self, job_name: str, unit: Optional[str] = None):
+        """Start timing a job.
+
+        Args:
+            job_name: Name shown in the report
+            unit: Optional name of a secondary work unit (e.g. "chunks")
+        """
+        self.job_name = job_name
+        self.unit = unit
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.units = 0
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, success: bool = True, count: int = 1, units: int = 0) -> None:
+        """Count processed items.
+
+        Args:
+            success: Whether the items succeeded
+            count: Number of items
+            units: Secondary work units the items produced
+        """
+        with self._lock:
+            if success:
+                self.succeeded += count
+            else:
+                self.failed += count
+            self.units += units
+
+    def skip(self, count: int = 1) -> None:
+        """Count items skipped because an earlier run finished them."""
+        with self._lock:
+            self.skipped += count
+
+    def finish(self) -> "JobStats":
+        """Stop the clock (the first call wins).
+
+        Returns:
+            The stats, for chaining
+        """
+        if self.end is None:
+            self.end = time.perf_counter()
+        return self
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the job started (until it finished)."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def summary(self) -> Dict[str, Any]:
+        """Get counts and rates as a dictionary."""
+        elapsed = self.elapsed
+        processed = self.succeeded + self.failed
+        summary = {
+            "job": self.job_name,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_seconds": elapsed,
+            "items_per_second": processed / elapsed if elapsed else 0.0
+        }
+        if self.unit:
+            summary[self.unit] = self.units
+            summary[f"{self.unit}_per_second"] = self.units / elapsed if elapsed else 0.0
+        return summary
+
+    def format(self) -> str:
+        """Format the summary as one line of text."""
+        summary = self.summary()
+        text = (
+            f"{self.job_name}: {self.succeeded} succeeded, {self.failed} failed, "
+            f"{self.skipped} skipped in {summary['elapsed_seconds']:.2f}s "
+            f"({summary['items_per_second']:.2f} items/s"
+        )
+        if self.unit:
+            text += f"; {self.units} {self.unit}, {summary[f'{self.unit}_per_second']:.2f} {self.unit}/s"
+        return text + ")"
+
+def _pending_files(files: List[str],
+                   checkpoint: JobCheckpoint,
+                   stats: JobStats,
+                   key_func: Callable[[str], str] = file_key) -> List[Tuple[str, str]]:
+    """Pair files with their checkpoint keys, dropping (and counting) finished ones."""
+    pending = []
+    for path in files:
+        key = key_func(path)
+        if checkpoint.is_done(key):
+            stats.skip()
+        else:
+            pending.append((path, key))
+    return pending
+
+def _load_file(loader: DocumentLoader, path: str) -> Document:
+    """Load a file as a document with the application's source and id metadata.
+
+    Raises:
+        BatchJobError: If the file cannot be loaded
+    """
+    result = loader.load_single_document(path)
+    if not result.success:
+        raise BatchJobError(result.error_message)
+    document = result.document
+    document.metadata["source"] = os.path.basename(path)
+    document.metadata["id"] = document_id(path)
+    return document
+
+def ingest_documents(paths: List[str],
+                     vector_store: Any,
+                     checkpoint: JobCheckpoint,
+                     workers: Optional[int] = None,
+                     batch_size: Optional[int] = None,
+                     chunk_processor: Optional[Any] = None,
+                     stats: Optional[JobStats] = None) -> JobStats:
+    """Load files and add them to a vector store.
+
+    Files are loaded on a thread pool and indexed `batch_size` at a time;
+    each batch is checkpointed once the vector store has saved it. The
+    checkpoint is kept after the job finishes, so later runs only add new
+    files instead of indexing everything twice.
+
+    Ingestion only adds: the vector stores cannot remove a file's earlier
+    chunks, so files are checkpointed by path and a file that changed after
+    it was ingested is not added again (that would leave both versions in
+    the index). Use `reindex` to pick up changed files.
+
+    Args:
+        paths: Files and directories to ingest
+        vector_store: Vector store to add documents to
+        checkpoint: Progress record
+        workers: Concurrent file loads (default: from config)
+        batch_size: Files indexed together (default: from config)
+        chunk_processor: Optional TextChunkProcessor to split documents first
+        stats: Stats to record into (default: new)
+
+    Returns:
+        Job stats, with chunks as the secondary unit
+    """
+    workers = workers or config.batch.workers
+    batch_size = max(1, batch_size or config.batch.batch_size)
+    stats = stats or JobStats(checkpoint.job_name, unit="chunks")
+    loader = DocumentLoader()
+
+    pending = _pending_files(collect_files(paths, loader.loaders), checkpoint, stats, key_func=os.path.abspath)
+    logger.info(f"Ingesting {len(pending)} files ({stats.skipped} already done)")
+
+    try:
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+
+            loaded = []
+            for (path, key), document, error in map_concurrently(
+                lambda item: _load_file(loader, item[0]), batch, workers
+            ):
+                if error:
+                    logger.warning(f"Could not load {path}: {str(error)}")
+                    stats.record(False)
+                else:
+                    loaded.append((key, document))
+            if not loaded:
+                continue
+
+            documents = [document for _, document in loaded]
+            if chunk_processor:
+                documents = chunk_processor.split_documents(documents)
+                for document in documents:
+                    document.metadata["id"] = f"{document.metadata['id']}_{document.metadata['chunk']}"
+
+            if not vector_store.add_documents(documents):
+                logger.error(f"Indexing failed for a batch of {len(loaded)} files")
+                stats.record(False, count=len(loaded))
+                continue
+
+            for key, _ in loaded:
+                checkpoint.mark_done(key)
+            checkpoint.save()
+            stats.record(True, count=len(loaded), units=len(documents))
+            logger.info(f"Indexed {stats.succeeded} of {len(pending)} files")
+    finally:
+        checkpoint.save()
+
+    return stats.finish()
+
+def reindex(data_dir: str,
+            vector_store: Any,
+            checkpoint: JobCheckpoint,
+            stats: Optional[JobStats] = None,
+            **ingest_options) -> JobStats:
+    """Rebuild a vector store from every supported file in a directory.
+
+    The store is cleared once per rebuild; a resumed rebuild continues
+    adding files to the partly rebuilt store. The checkpoint is removed
+    when every file has been indexed.
+
+    Args:
+        data_dir: Directory with the source documents
+        vector_store: Vector store to rebuild
+        checkpoint: Progress record
+        stats: Stats to record into (default: new)
+        **ingest_options: Options passed to `ingest_documents`
+
+    Returns:
+        Job stats
+
+    Raises:
+        BatchJobError: If the store cannot be cleared
+    """
+    if not checkpoint.state.get("cleared"):
+        if not vector_store.clear_index():
+            raise BatchJobError("Could not clear the vector store")
+        checkpoint.completed = set()
+        checkpoint.state["cleared"] = True
+        checkpoint.save()
+        logger.info("Cleared the vector store for reindexing")
+
+    stats = ingest_documents([data_dir], vector_store, checkpoint, stats=stats, **ingest_options)
+    if not stats.failed:
+        checkpoint.clear()
+    return stats
+
+def generate_ieps(paths: List[str],
+                  iep_pipeline: Any,
+                  output_dir: str,
+                  checkpoint: JobCheckpoint,
+                  workers: Optional[int] = None,
+                  stats: Optional[JobStats] = None) -> JobStats:
+    """Generate an IEP for each file, writing each result as JSON.
+
+    Each result is written to `<output_dir>/<file name>_iep.json` and then
+    checkpointed, so an interrupted run only regenerates unfinished files.
+    The checkpoint is removed when every file succeeded.
+
+    Args:
+        paths: Files and directories with student documents
+        iep_pipeline: IEPGenerationPipeline
+        output_dir: Directory for the results
+        checkpoint: Progress record
+        workers: Concurrent generations (default: from config)
+        stats: Stats to record into (default: new)
+
+    Returns:
+        Job stats
+    """
+    workers = workers or config.batch.workers
+    stats = stats or JobStats(checkpoint.job_name)
+    loader = DocumentLoader()
+    os.makedirs(output_dir, exist_ok=True)
+
+    pending = _pending_files(collect_files(paths, loader.loaders), checkpoint, stats)
+    logger.info(f"Generating IEPs for {len(pending)} files ({stats.skipped} already done)")
+
+    def generate(item: Tuple[str, str]) -> str:
+        path, key = item
+        iep_result = iep_pipeline.generate_iep(_load_file(loader, path))
+
+        output_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(path))[0]}_iep.json")
+        temp_path = f"{output_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(iep_result, f, indent=2)
+        os.replace(temp_path, output_path)
+
+        checkpoint.mark_done(key)
+        return output_path
+
+    try:
+        for (path, _), output_path, error in map_concurrently(generate, pending, workers):
+            if error:
+                logger.error(f"IEP generation failed for {path}: {str(error)}")
+                stats.record(False)
+            else:
+                logger.debug(f"Wrote {output_path}")
+                stats.record(True)
+    finally:
+        checkpoint.save()
+
+    if not stats.failed:
+        checkpoint.clear()
+    return stats.finish()
+
+def import_responses(assessment: Dict[str, Any],
+                     files: List[str],
+                     importer: Any,
+                     checkpoint: JobCheckpoint,
+                     stats: Optional[JobStats] = None) -> JobStats:
+    """Import gradebook exports for an assessment, one file at a time.
+
+    Files are imported in the given order because each import updates the
+    mastery priors of the next; the importer batches responses within a
+    file. Each file is checkpointed once imported and the checkpoint is
+    removed when every file succeeded.
+
+    Args:
+        assessment: Processed assessment the responses belong to
+        files: CSV or JSONL response files
+        importer: ResponseImporter
+        checkpoint: Progress record
+        stats: Stats to record into (default: new)
+
+    Returns:
+        Job stats, with imported responses as the secondary unit
+    """
+    from core.assessment.response_importer import ResponseImportError
+
+    stats = stats or JobStats(checkpoint.job_name, unit="responses")
+    assessment_id = assessment.get("assessment_id", "")
+
+    try:
+        for path in files:
+            key = f"{assessment_id}:{file_key(path)}"
+            if checkpoint.is_done(key):
+                stats.skip()
+                continue
+
+            try:
+                summary = importer.import_file(assessment, path)
+            except (ResponseImportError, OSError) as e:
+                logger.error(f"Could not import {path}: {str(e)}")
+                stats.record(False)
+                continue
+
+            checkpoint.mark_done(key)
+            checkpoint.save()
+            stats.record(True, units=summary["imported"])
+    finally:
+        checkpoint.save()
+
+    if not stats.failed:
+        checkpoint.clear()
+    return stats.finish()
+
+def evaluate_queries(dataset: List[Dict[str, Any]],
+                     rag_pipeline: Any,
+                     evaluator: Any,
+                     checkpoint: JobCheckpoint,
+                     batch_size: Optional[int] = None,
+                     stats: Optional[JobStats] = None) -> Tuple[JobStats, List[Any]]:
+    """Evaluate a query dataset in checkpointed batches.
+
+    Each batch goes through `RAGEvaluator.evaluate_dataset`, which retrieves
+    for the whole batch at once and generates on the evaluator's worker
+    pool, and appends its results to the evaluator's results file. Only
+    queries that succeeded are checkpointed, so a rerun retries the failed
+    ones; the checkpoint is removed when every query succeeded.
+
+    Args:
+        dataset: Query dictionaries (see `load_evaluation_dataset`)
+        rag_pipeline: RAG pipeline to evaluate
+        evaluator: RAGEvaluator
+        checkpoint: Progress record
+        batch_size: Queries per batch (default: from config)
+        stats: Stats to record into (default: new)
+
+    Returns:
+        Tuple of (job stats, evaluation results of this run)
+    """
+    batch_size = max(1, batch_size or config.batch.batch_size)
+    stats = stats or JobStats(checkpoint.job_name)
+
+    pending = [(i, item) for i, item in enumerate(dataset) if not checkpoint.is_done(str(i))]
+    stats.skip(len(dataset) - len(pending))
+    logger.info(f"Evaluating {len(pending)} queries ({stats.skipped} already done)")
+
+    results = []
+    try:
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            batch_results = evaluator.evaluate_dataset(
+                [item["query"] for _, item in batch],
+                rag_pipeline,
+                ground_truths=[item.get("ground_truth") for _, item in batch],
+                expected_doc_ids=[item.get("expected_docs") for _, item in batch]
+            )
+            for (i, _), result in zip(batch, batch_results):
+                # Pipeline errors (including failed LLM calls) and raised queries set `error`
+                succeeded = result.error is None
+                stats.record(succeeded)
+                if succeeded:
+                    checkpoint.mark_done(str(i))
+            results.extend(batch_results)
+    finally:
+        checkpoint.save()
+
+    if not stats.failed:
+        checkpoint.clear()
+    return stats.finish(), results
@@ -0,0 +1,125 @@
+# core/jobs/handlers.py
+
+"""Background job handlers for the application's long-running work."""
+
+import os
+import shutil
+import uuid
+from datetime import datetime
+from typing import Dict, Any
+
+from config.app_config import config
+from config.logging_config import get_module_logger
+from core.jobs.job_queue import JobQueue, JobContext, JobCancelled, JobQueueError
+
+# Create a logger for this module
+logger = get_module_logger("job_handlers")
+
+# Job types
+IEP_JOB = "generate_iep"
+LESSON_PLAN_JOB = "generate_lesson_plan"
+DOCUMENT_UPLOAD_JOB = "process_documents"
+CLEAR_INDEX_JOB = "clear_index"
+
+def spool_upload(temp_path: str, original_name: str) -> str:
+    """Move an uploaded temporary file to the upload directory for a background job.
+
+    Args:
+        temp_path: Temporary file written by the file handler
+        original_name: Name of the uploaded file
+
+    Returns:
+        Path of the spooled file, removed by the job once processed
+    """
+    os.makedirs(config.jobs.upload_dir, exist_ok=True)
+    extension = os.path.splitext(original_name)[1].lower() or ".txt"
+    spool_path = os.path.join(config.jobs.upload_dir, f"{uuid.uuid4()}{extension}")
+    shutil.move(temp_path, spool_path)
+    return spool_path
+
+def _remove_uploads(payload: Dict[str, Any]) -> None:
+    """Delete a document job's spooled files."""
+    for upload in payload["files"]:
+        try:
+            if os.path.exists(upload["path"]):
+                os.remove(upload["path"])
+        except OSError as e:
+            logger.warning(f"Could not remove spooled upload {upload['path']}: {str(e)}")
+
+def register_application_jobs(job_queue: JobQueue, components: Dict[str, Any]) -> None:
+    """Register handlers that run IEP and lesson plan generation, document
+    processing and index resets on the job queue.
+
+    Handlers use the given components; registering again (on a later
+    initialization) replaces them. The vector store must be the process-wide
+    one from `VectorStoreFactory.get_shared_vector_store`, which serializes
+    writes, so every job and session works on the same index.
+
+    Args:
+        job_queue: Queue to register with
+        components: Application components
+    """
+    if "iep_pipeline" in components:
+        iep_pipeline = components["iep_pipeline"]
+
+        def generate_iep(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+            context.set_progress(0.0, "Generating IEP")
+            return iep_pipeline.generate_iep(payload["document"])
+
+        job_queue.register(IEP_JOB, generate_iep)
+
+    if "lesson_plan_pipeline" in components:
+        lesson_plan_pipeline = components["lesson_plan_pipeline"]
+
+        def generate_lesson_plan(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+            context.set_progress(0.0, "Generating lesson plan")
+            plan_data = lesson_plan_pipeline.generate_lesson_plan(**payload["inputs"])
+            plan_data.update(payload.get("metadata", {}))
+            return plan_data
+
+        job_queue.register(LESSON_PLAN_JOB, generate_lesson_plan)
+
+    if "vector_store" in components:
+        vector_store = components["vector_store"]
+
+        def process_documents(payload: Dict[str, Any], context: JobContext) -> Dict[str, Any]:
+            from core.document_processing.document_loader import DocumentLoader
+
+            loader = DocumentLoader()
+            files = payload["files"]
+            documents, errors = [], []
+            try:
+                for i, upload in enumerate(files):
+                    context.check_cancelled()
+                    context.set_progress(i / (len(files) + 1), f"Loading {upload['name']}")
+
+                    result = loader.load_single_document(upload["path"])
+                    if not result.success:
+                        errors.append({"name": upload["name"], "error": result.error_message})
+                        continue
+
+                    document = result.document
+                    document.metadata["source"] = upload["name"]
+                    document.metadata["upload_time"] = upload["upload_time"]
+                    document.metadata["upload_timestamp"] = datetime.fromisoformat(upload["upload_time"]).timestamp()
+                    documents.append(document)
+
+                context.check_cancelled()
+                if documents:
+                    context.set_progress(len(files) / (len(files) + 1), "Indexing documents")
+                    if not vector_store.add_documents(documents):
+                        raise JobQueueError("Failed to add documents to the vector store")
+            except JobCancelled:
+                _remove_uploads(payload)
+                raise
+
+            _remove_uploads(payload)
+            return {"documents": documents, "errors": errors}
+
+        def clear_index(payload: Any, context: JobContext) -> bool:
+            if not vector_store.clear_index():
+                raise JobQueueError("Failed to clear the vector store")
+            return True
+
+        job_queue.register(DOCUMENT_UPLOAD_JOB, process_documents)
+        job_queue.register(CLEAR_INDEX_JOB, clear_index)
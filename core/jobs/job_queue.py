@@ -0,0 +1,578 @@
+# core/jobs/job_queue.py
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Iterable
+
+from config.app_config import config
+from config.logging_config import get_module_logger
+from core.monitoring.metrics import registry
+
+# Create a logger for this module
+logger = get_module_logger("job_queue")
+
+# Metrics
+JOBS_FINISHED = registry.counter("jobs_finished_total", "Background jobs finished", ["job_type", "status"])
+JOB_SECONDS = registry.histogram("job_run_seconds", "Duration of background job attempts", ["job_type"])
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+class JobQueueError(Exception):
+    """Exception raised for job queue errors."""
+    pass
+
+class JobCancelled(Exception):
+    """Raised inside a job handler when cancellation was requested."""
+    pass
+
+class JobContext:
+    """Handle passed to a running job for progress reporting and cancellation checks."""
+
+    def __init__(self, job_queue: "JobQueue", job_id: str, attempt: int):
+        """Initialize the context.
+
+        Args:
+            job_queue: Queue running the job
+            job_id: Job id
+            attempt: Attempt number, starting at 1
+        """
+        self.job_queue = job_queue
+        self.job_id = job_id
+        self.attempt = attempt
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation of the job was requested."""
+        return self.job_queue._cancel_requested(self.job_id)
+
+    def check_cancelled(self) -> None:
+        """Stop the job if cancellation was requested.
+
+        Raises:
+            JobCancelled: If cancellation was requested
+        """
+        if self.cancelled:
+            raise JobCancelled(self.job_id)
+
+    def set_progress(self, progress: float, message: Optional[str] = None) -> None:
+        """Report progress for status polling.
+
+        Args:
+            progress: Fraction done, between 0 and 1
+            message: Optional description of the current step
+        """
+        self.job_queue._set_progress(self.job_id, progress, message)
+
+class JobQueue:
+    """Persistent queue of background jobs backed by SQLite, run by a thread pool.
+
+    Jobs are submitted with a type and a payload; a handler registered for
+    the type runs as `handler(payload, context)` on a worker thread and its
+    return value is stored as the job's result. Payloads and results are
+    pickled, like values in the application's state storage.
+
+    A failing job is retried after `retry_delay` seconds (doubling per
+    attempt) until `max_attempts` is reached. Queued jobs are cancelled
+    immediately; running jobs are asked to stop and do so at their next
+    `context.check_cancelled()`. Jobs left running by a process that
+    exited are queued again when workers start, so one process should run
+    the workers for a database.
+
+    Threads are used rather than processes because handlers call shared
+    in-process components (LLM client and rate limiter, vector store) and
+    spend most of their time waiting on the network.
+    """
+
+    def __init__(self,
+                 db_path: Optional[str] = None,
+                 workers: Optional[int] = None,
+                 max_attempts: Optional[int] = None,
+                 retry_delay: Optional[float] = None,
+                 poll_interval: Optional[float] = None):
+        """Initialize the queue (call `start` to run jobs).
+
+        Args:
+            db_path: Path to SQLite database (default: from config)
+            workers: Worker threads (default: from config)
+            max_attempts: Default attempts per job (default: from config)
+            retry_delay: Seconds before the first retry (default: from config)
+            poll_interval: Seconds an idle worker waits between checks (default: from config)
+        """
+        settings = config.jobs
+        self.db_path = db_path or settings.db_path
+        self.workers = workers or settings.workers
+        self.max_attempts = max_attempts or settings.max_attempts
+        self.retry_delay = settings.retry_delay if retry_delay is None else retry_delay
+        self.poll_interval = poll_interval or settings.poll_interval
+
+        self._handlers: Dict[str, Callable[[Any, JobContext], Any]] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._lock = threading.Lock()
+
+        # Ensure directory exists
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+
+        # Initialize database
+        self._init_db()
+
+        logger.debug(f"Initialized job queue at {self.db_path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        """Initialize database with schema."""
+        try:
+            with closing(self._connect()) as conn, conn:
+                # WAL lets status polling proceed while workers write
+                conn.execute("PRAGMA journal_mode=WAL")
+
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        job_id TEXT PRIMARY KEY,
+                        job_type TEXT NOT NULL,
+                        owner TEXT,
+                        status TEXT NOT NULL,
+                        payload BLOB,
+                        result BLOB,
+                        error TEXT,
+                        progress REAL NOT NULL DEFAULT 0,
+                        message TEXT,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        max_attempts INTEGER NOT NULL,
+                        cancel_requested INTEGER NOT NULL DEFAULT 0,
+                        delivered INTEGER NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL,
+                        available_at REAL NOT NULL,
+                        started_at REAL,
+                        finished_at REAL,
+                        updated_at REAL NOT NULL
+                    ) WITHOUT ROWID
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jobs_status
+                    ON jobs (status, available_at, created_at)
+                """)
+                conn.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_jobs_owner
+                    ON jobs (owner, created_at)
+                """)
+        except Exception as e:
+            logger.error(f"Failed to initialize job queue database: {str(e)}")
+            raise JobQueueError(f"Failed to initialize database: {str(e)}")
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row, include_payload: bool = False) -> Dict[str, Any]:
+        """Convert a database row to a job dictionary."""
+        def timestamp(value: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(value).isoformat() if value else None
+
+        job = {
+            "job_id": row["job_id"],
+            "job_type": row["job_type"],
+            "owner": row["owner"],
+            "status": row["status"],
+            "result": pickle.loads(row["result"]) if row["result"] is not None else None,
+            "error": row["error"],
+            "progress": row["progress"],
+            "message": row["message"],
+            "attempts": row["attempts"],
+            "max_attempts": row["max_attempts"],
+            "cancel_requested": bool(row["cancel_requested"]),
+            "delivered": bool(row["delivered"]),
+            "created_at": timestamp(row["created_at"]),
+            "started_at": timestamp(row["started_at"]),
+            "finished_at": timestamp(row["finished_at"])
+        }
+        if include_payload:
+            job["payload"] = pickle.loads(row["payload"]) if row["payload"] is not None else None
+        return job
+
+    def register(self, job_type: str, handler: Callable[[Any, JobContext], Any]) -> None:
+        """Register the handler for a job type, replacing any earlier one.
+
+        Args:
+            job_type: Job type name
+            handler: Function of (payload, context) returning the job's result
+        """
+        with self._lock:
+            self._handlers[job_type] = handler
+
+    def submit(self,
+               job_type: str,
+               payload: Any = None,
+               owner: Optional[str] = None,
+               max_attempts: Optional[int] = None) -> str:
+        """Queue a job.
+
+        Args:
+            job_type: Job type name
+            payload: Picklable input passed to the handler
+            owner: Optional owner (such as a session id) for listing jobs
+            max_attempts: Attempts before the job fails (default: queue default)
+
+        Returns:
+            Job id
+
+        Raises:
+            JobQueueError: If the payload cannot be stored
+        """
+        try:
+            pickled_payload = pickle.dumps(payload)
+        except Exception as e:
+            raise JobQueueError(f"Job payload cannot be stored: {str(e)}")
+
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO jobs (job_id, job_type, owner, status, payload, max_attempts,
+                                  created_at, available_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, job_type, owner, QUEUED, pickled_payload,
+                 max_attempts or self.max_attempts, now, now, now)
+            )
+
+        self._wake_event.set()
+        logger.info(f"Queued {job_type} job {job_id}")
+        return job_id
+
+    def get(self, job_id: str, include_payload: bool = False) -> Optional[Dict[str, Any]]:
+        """Get a job's status and, once it succeeded, its result.
+
+        Args:
+            job_id: Job id
+            include_payload: Whether to include the job's payload
+
+        Returns:
+            Job dictionary, or None if the job does not exist
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_job(row, include_payload) if row else None
+
+    def list_jobs(self,
+                  owner: Optional[str] = None,
+                  statuses: Optional[Iterable[str]] = None,
+                  undelivered_only: bool = False,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        """List jobs, newest first.
+
+        Args:
+            owner: Only jobs of this owner
+            statuses: Only jobs with these statuses
+            undelivered_only: Only jobs not yet marked delivered
+            limit: Maximum jobs returned
+
+        Returns:
+            List of job dictionaries
+        """
+        clauses, params = [], []
+        if owner is not None:
+            clauses.append("owner = ?")
+            params.append(owner)
+        if statuses:
+            statuses = list(statuses)
+            clauses.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if undelivered_only:
+            clauses.append("delivered = 0")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job: queued jobs stop at once, running jobs at their next check.
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            True if the job was cancelled or asked to stop, False if it had already finished
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ? WHERE job_id = ? AND status = ?",
+                (CANCELLED, now, now, job_id, QUEUED)
+            )
+            if cursor.rowcount:
+                JOBS_FINISHED.inc(job_type=self._job_type(conn, job_id), status=CANCELLED)
+                logger.info(f"Cancelled queued job {job_id}")
+                return True
+
+            cursor = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE job_id = ? AND status = ?",
+                (now, job_id, RUNNING)
+            )
+            if cursor.rowcount:
+                logger.info(f"Requested cancellation of running job {job_id}")
+                return True
+        return False
+
+    def mark_delivered(self, job_id: str) -> None:
+        """Record that a finished job's outcome was handed to its owner."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("UPDATE jobs SET delivered = 1, updated_at = ? WHERE job_id = ?", (time.time(), job_id))
+
+    def purge(self, max_age_seconds: Optional[float] = None) -> int:
+        """Delete finished jobs older than the retention period.
+
+        Args:
+            max_age_seconds: Age at which finished jobs are deleted (default: from config)
+
+        Returns:
+            Number of jobs deleted
+        """
+        max_age = config.jobs.retention_seconds if max_age_seconds is None else max_age_seconds
+        statuses = ", ".join("?" for _ in FINISHED_STATUSES)
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({statuses}) AND finished_at < ?",
+                list(FINISHED_STATUSES) + [time.time() - max_age]
+            )
+        if cursor.rowcount:
+            logger.info(f"Purged {cursor.rowcount} finished jobs")
+        return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get job counts by status and the number of running workers."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        stats = {status: 0 for status in (QUEUED, RUNNING) + FINISHED_STATUSES}
+        stats.update({row["status"]: row["count"] for row in rows})
+        stats["workers"] = sum(1 for thread in self._threads if thread.is_alive())
+        return stats
+
+    def start(self) -> "JobQueue":
+        """Start the worker threads (once); jobs interrupted by an earlier exit are queued again.
+
+        Returns:
+            The queue, for chaining
+        """
+        with self._lock:
+            if any(thread.is_alive() for thread in self._threads):
+                return self
+
+            self._recover_interrupted()
+            self.purge()
+
+            self._stop_event.clear()
+            self._threads = [
+                threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                for i in range(max(1, self.workers))
+            ]
+            for thread in self._threads:
+                thread.start()
+
+        logger.info(f"Started {len(self._threads)} job workers")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current jobs.
+
+        Args:
+            timeout: Seconds to wait for each worker (default: wait indefinitely)
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _recover_interrupted(self) -> None:
+        """Queue jobs left running by a process that exited, or fail them if out of attempts."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END,
+                    error = CASE WHEN attempts >= max_attempts THEN 'Interrupted' ELSE error END,
+                    finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END,
+                    available_at = ?,
+                    updated_at = ?
+                WHERE status = ?
+                """,
+                (FAILED, QUEUED, now, now, now, RUNNING)
+            )
+        if cursor.rowcount:
+            logger.warning(f"Recovered {cursor.rowcount} jobs interrupted by an earlier shutdown")
+
+    def _worker_loop(self) -> None:
+        """Claim and run jobs until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                job = self._claim()
+            except Exception as e:
+                logger.error(f"Error claiming job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wake_event.wait(self.poll_interval)
+                self._wake_event.clear()
+                continue
+
+            self._run(job)
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest available queued job.
+
+        Returns:
+            Job dictionary with its payload, or None if no job is available
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            # Take the write lock before reading so two workers cannot claim one job
+            conn.isolation_level = None
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    """
+                    SELECT job_id FROM jobs
+                    WHERE status = ? AND available_at <= ?
+                    ORDER BY available_at, created_at
+                    LIMIT 1
+                    """,
+                    (QUEUED, now)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        """
+                        UPDATE jobs
+                        SET status = ?, attempts = attempts + 1, started_at = ?, updated_at = ?,
+                            progress = 0, message = NULL
+                        WHERE job_id = ?
+                        """,
+                        (RUNNING, now, now, row["job_id"])
+                    )
+                    row = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (row["job_id"],)).fetchone()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self._to_job(row, include_payload=True) if row else None
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        """Run one attempt of a claimed job and record its outcome."""
+        job_id, job_type = job["job_id"], job["job_type"]
+        with self._lock:
+            handler = self._handlers.get(job_type)
+        if handler is None:
+            self._finish(job_id, job_type, FAILED, error=f"No handler registered for job type {job_type}")
+            return
+
+        context = JobContext(self, job_id, job["attempts"])
+        logger.debug(f"Running {job_type} job {job_id} (attempt {job['attempts']})")
+        try:
+            with JOB_SECONDS.time(job_type=job_type):
+                result = handler(job["payload"], context)
+        except JobCancelled:
+            self._finish(job_id, job_type, CANCELLED)
+        except Exception as e:
+            logger.error(f"{job_type} job {job_id} failed on attempt {job['attempts']}: {str(e)}", exc_info=True)
+            if job["attempts"] < job["max_attempts"] and not context.cancelled:
+                self._retry(job_id, str(e), self.retry_delay * 2 ** (job["attempts"] - 1))
+            else:
+                self._finish(job_id, job_type, CANCELLED if context.cancelled else FAILED, error=str(e))
+        else:
+            if context.cancelled:
+                self._finish(job_id, job_type, CANCELLED)
+            else:
+                self._finish(job_id, job_type, SUCCEEDED, result=result)
+
+    def _finish(self,
+                job_id: str,
+                job_type: str,
+                status: str,
+                result: Any = None,
+                error: Optional[str] = None) -> None:
+        """Record a running job's final status."""
+        try:
+            pickled_result = pickle.dumps(result) if result is not None else None
+        except Exception as e:
+            status, pickled_result, error = FAILED, None, f"Job result cannot be stored: {str(e)}"
+
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?, result = ?, error = ?, progress = CASE WHEN ? THEN 1 ELSE progress END,
+                    finished_at = ?, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (status, pickled_result, error, status == SUCCEEDED, now, now, job_id)
+            )
+        JOBS_FINISHED.inc(job_type=job_type, status=status)
+        logger.info(f"{job_type} job {job_id} {status}")
+
+    def _retry(self, job_id: str, error: str, delay: float) -> None:
+        """Queue a failed job for another attempt after a delay."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, updated_at = ? WHERE job_id = ?",
+                (QUEUED, error, now + delay, now, job_id)
+            )
+        logger.info(f"Retrying job {job_id} in {delay:.1f}s")
+
+    def _cancel_requested(self, job_id: str) -> bool:
+        """Check whether cancellation of a job was requested."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def _set_progress(self, job_id: str, progress: float, message: Optional[str]) -> None:
+        """Store a running job's progress."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = ?, updated_at = ? WHERE job_id = ?",
+                (min(1.0, max(0.0, progress)), message, time.time(), job_id)
+            )
+
+    @staticmethod
+    def _job_type(conn: sqlite3.Connection, job_id: str) -> str:
+        """Look up a job's type."""
+        row = conn.execute("SELECT job_type FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row["job_type"] if row else "unknown"
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    """Get the process-wide job queue, creating it on first use.
+
+    Returns:
+        Job queue (call `start` to run its workers)
+    """
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue()
+    return _job_queue
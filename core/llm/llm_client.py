@@ -3,18 +3,49 @@
 import time
 import threading
 from typing import Dict, Any, Optional, Callable, List, Union
-import backoff
-import openai
-from openai import OpenAI
 from config.app_config import config, LLMConfig
 from config.logging_config import get_module_logger
 from core.llm.rate_limiter import RateLimiter  # Import from dedicated module
-from langchain_openai import ChatOpenAI
+from core.monitoring.metrics import registry
+from core.monitoring.tracing import span
 import os
 
 # Create a logger for this module
 logger = get_module_logger("llm_client")
 
+# Metrics
+LLM_REQUEST_SECONDS = registry.histogram(
+    "llm_request_seconds", "Latency of LLM API calls", ["operation", "model", "outcome"]
+)
+LLM_TOKENS = registry.counter("llm_tokens_total", "Tokens used by chat completions", ["model", "kind"])
+LLM_FALLBACKS = registry.counter(
+    "llm_fallbacks_total", "Requests answered by a fallback model", ["operation", "model"]
+)
+LLM_CACHE_LOOKUPS = registry.counter("llm_cache_lookups_total", "Chat completion cache lookups", ["result"])
+
+# The openai and backoff packages are imported on first request to keep imports fast
+_retrying_call: Optional[Callable] = None
+
+def _attempt(func, *args, **kwargs):
+    """Make one API call attempt."""
+    # One span per attempt; backoff sleeps show as the enclosing span's self time
+    with span("llm.attempt"):
+        return func(*args, **kwargs)
+
+def _get_retrying_call() -> Callable:
+    """Get `_attempt` wrapped with exponential backoff on transient API errors."""
+    global _retrying_call
+    if _retrying_call is None:
+        import backoff
+        import openai
+        _retrying_call = backoff.on_exception(
+            backoff.expo,
+            (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError),
+            max_tries=5,
+            jitter=backoff.full_jitter
+        )(_attempt)
+    return _retrying_call
+
 class LLMClient:
     """Client for interacting with LLMs with retry, rate limiting, and model fallbacks."""
     
@@ -47,7 +78,8 @@ class LLMClient:
             llm_config: LLM configuration (default: from app config)
         """
         self.config = llm_config or config.llm
-        self.client = OpenAI(api_key=self.config.api_key)
+        self._client = None
+        self._client_lock = threading.Lock()
         self.rate_limiter = RateLimiter(self.config.rate_limit_rpm)
         
         # Configure backoff parameters
@@ -59,12 +91,16 @@ class LLMClient:
         
         logger.debug(f"Initialized LLM client with model {self.config.model_name}")
     
-    @backoff.on_exception(
-        backoff.expo,
-        (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError),
-        max_tries=5,
-        jitter=backoff.full_jitter
-    )
+    @property
+    def client(self) -> Any:
+        """OpenAI API client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from openai import OpenAI
+                    self._client = OpenAI(api_key=self.config.api_key)
+        return self._client
+    
     def _call_with_retry(self, func, *args, **kwargs):
         """Call a function with exponential backoff retry.
         
@@ -76,7 +112,7 @@ class LLMClient:
         Returns:
             Function result
         """
-        return func(*args, **kwargs)
+        return _get_retrying_call()(func, *args, **kwargs)
     
     def _get_cache_key(self, messages, model, temperature, max_tokens):
         """Generate a cache key for a request.
@@ -167,11 +203,16 @@ class LLMClient:
         models_to_try = [model] + self.MODEL_FALLBACKS.get(model, [])
         
         # Check cache first
-        cache_key = self._get_cache_key(messages, model, temperature, max_tokens)
-        cached_response = self._try_get_from_cache(cache_key)
+        with span("llm.cache_lookup"):
+            cache_key = self._get_cache_key(messages, model, temperature, max_tokens)
+            cached_response = self._try_get_from_cache(cache_key)
+        if self.config.cache_enabled:
+            LLM_CACHE_LOOKUPS.inc(result="hit" if cached_response else "miss")
         if cached_response:
             return cached_response
         
+        import openai
+        
         # Try models in fallback order
         last_exception = None
         for model_name in models_to_try:
@@ -179,13 +220,24 @@ class LLMClient:
                 logger.debug(f"Making chat completion request with model {model_name} and {len(messages)} messages")
                 
                 # Use retry wrapper
-                response = self._call_with_retry(
-                    self.client.chat.completions.create,
-                    model=model_name,
-                    messages=messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    timeout=self.config.request_timeout
+                request_start = time.perf_counter()
+                try:
+                    with span("llm.chat", model=model_name):
+                        response = self._call_with_retry(
+                            self.client.chat.completions.create,
+                            model=model_name,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=max_tokens,
+                            timeout=self.config.request_timeout
+                        )
+                except Exception:
+                    LLM_REQUEST_SECONDS.observe(
+                        time.perf_counter() - request_start, operation="chat", model=model_name, outcome="error"
+                    )
+                    raise
+                LLM_REQUEST_SECONDS.observe(
+                    time.perf_counter() - request_start, operation="chat", model=model_name, outcome="success"
                 )
                 
                 # Extract and return relevant information
@@ -200,9 +252,13 @@ class LLMClient:
                     }
                 }
                 
+                LLM_TOKENS.inc(response.usage.prompt_tokens, model=model_name, kind="prompt")
+                LLM_TOKENS.inc(response.usage.completion_tokens, model=model_name, kind="completion")
+                
                 # If we used a fallback model, log it
                 if model_name != model:
                     logger.info(f"Used fallback model {model_name} instead of {model}")
+                    LLM_FALLBACKS.inc(operation="chat", model=model_name)
                     result["used_fallback"] = True
                     result["original_model"] = model
                 
@@ -246,23 +302,35 @@ class LLMClient:
             logger.debug(f"Making embeddings request for {len(texts)} texts")
             
             # Try to use the smaller, faster embedding model first
+            request_start = time.perf_counter()
             try:
                 # Use retry wrapper
-                response = self._call_with_retry(
-                    self.client.embeddings.create,
-                    model="text-embedding-3-small",  # Try the smaller model first
-                    input=texts,
-                    timeout=self.config.request_timeout
-                )
+                with span("llm.embeddings", model="text-embedding-3-small", texts=len(texts)):
+                    response = self._call_with_retry(
+                        self.client.embeddings.create,
+                        model="text-embedding-3-small",  # Try the smaller model first
+                        input=texts,
+                        timeout=self.config.request_timeout
+                    )
             except Exception as e:
+                LLM_REQUEST_SECONDS.observe(
+                    time.perf_counter() - request_start,
+                    operation="embeddings", model="text-embedding-3-small", outcome="error"
+                )
                 logger.warning(f"Failed to use text-embedding-3-small, falling back to ada: {str(e)}")
+                LLM_FALLBACKS.inc(operation="embeddings", model="text-embedding-ada-002")
                 # Fall back to ada if the 3-small model fails
-                response = self._call_with_retry(
-                    self.client.embeddings.create,
-                    model="text-embedding-ada-002",  # Fallback embedding model
-                    input=texts,
-                    timeout=self.config.request_timeout
-                )
+                request_start = time.perf_counter()
+                with span("llm.embeddings", model="text-embedding-ada-002", texts=len(texts)):
+                    response = self._call_with_retry(
+                        self.client.embeddings.create,
+                        model="text-embedding-ada-002",  # Fallback embedding model
+                        input=texts,
+                        timeout=self.config.request_timeout
+                    )
+            LLM_REQUEST_SECONDS.observe(
+                time.perf_counter() - request_start, operation="embeddings", model=response.model, outcome="success"
+            )
             
             # Extract embeddings from response
             embeddings = [data.embedding for data in response.data]
@@ -4,10 +4,20 @@ import time
 import threading
 from typing import Callable, List
 from config.logging_config import get_module_logger
+from core.monitoring.metrics import registry
+from core.monitoring.tracing import span
 
 # Create a logger for this module
 logger = get_module_logger("rate_limiter")
 
+# Metrics
+RATE_LIMIT_WAIT_SECONDS = registry.histogram(
+    "rate_limiter_wait_seconds", "Time callers spent in the rate limiter, including lock waits", ["limiter"]
+)
+RATE_LIMIT_THROTTLED = registry.counter(
+    "rate_limiter_throttled_total", "Calls delayed because the limit was reached", ["limiter"]
+)
+
 class RateLimiter:
     """Thread-safe rate limiter for API calls."""
     
@@ -39,7 +49,7 @@ class RateLimiter:
     
     def wait_if_needed(self):
         """Wait if rate limit would be exceeded."""
-        with self.lock:
+        with span("rate_limiter.wait", limiter="calls"), RATE_LIMIT_WAIT_SECONDS.time(limiter="calls"), self.lock:
             now = time.time()
             
             # Remove calls outside the time window
@@ -51,6 +61,7 @@ class RateLimiter:
                 sleep_time = self.time_period - (now - oldest_call)
                 if sleep_time > 0:
                     logger.debug(f"Rate limit reached. Waiting {sleep_time:.2f} seconds")
+                    RATE_LIMIT_THROTTLED.inc(limiter="calls")
                     time.sleep(sleep_time)
             
             # Record this call
@@ -92,7 +103,7 @@ class TokenRateLimiter(RateLimiter):
         Args:
             estimated_tokens: Estimated tokens for the upcoming request
         """
-        with self.lock:
+        with span("rate_limiter.wait", limiter="tokens"), RATE_LIMIT_WAIT_SECONDS.time(limiter="tokens"), self.lock:
             now = time.time()
             
             # Remove tokens outside the time window
@@ -118,5 +129,6 @@ class TokenRateLimiter(RateLimiter):
                         wait_time = timestamp + self.time_period - now
                         if wait_time > 0:
                             logger.debug(f"Token limit reached. Waiting {wait_time:.2f} seconds")
+                            RATE_LIMIT_THROTTLED.inc(limiter="tokens")
                             time.sleep(wait_time)
                         break
@@ -0,0 +1,289 @@
+# core/monitoring/tracing.py
+
+import contextlib
+import contextvars
+import functools
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+
+from config.app_config import config
+from config.logging_config import get_module_logger
+
+# Create a logger for this module
+logger = get_module_logger("tracing")
+
+# Innermost open span of the current request (None outside a trace)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+# Shared no-op context for spans opened outside a trace
+_NO_SPAN = contextlib.nullcontext()
+
+class Span:
+    """One timed operation in a request's call tree."""
+
+    __slots__ = ("name", "attributes", "start", "end", "children")
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """Start a span.
+
+        Args:
+            name: Operation name
+            attributes: Optional details such as a model name or batch size
+        """
+        self.name = name
+        self.attributes = attributes or {}
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+
+    @property
+    def duration(self) -> float:
+        """Seconds from start to end (or to now while the span is open)."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def self_time(self) -> float:
+        """Seconds not covered by child spans (clipped at zero when children overlap)."""
+        return max(0.0, self.duration - sum(child.duration for child in self.children))
+
+    def walk(self, path: Tuple[str, ...] = ()) -> Iterator[Tuple[Tuple[str, ...], "Span"]]:
+        """Iterate over this span and its descendants with their name paths."""
+        path = path + (self.name,)
+        yield path, self
+        for child in list(self.children):
+            yield from child.walk(path)
+
+    def totals(self) -> Dict[str, Dict[str, float]]:
+        """Aggregate time by span name.
+
+        Returns:
+            Mapping of span name to count, total seconds and self seconds
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for _, span in self.walk():
+            entry = totals.setdefault(span.name, {"count": 0, "seconds": 0.0, "self_seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += span.duration
+            entry["self_seconds"] += span.self_time
+        return totals
+
+    def folded(self) -> List[str]:
+        """Render self time per call stack in the folded format used by flame graph tools.
+
+        Each line is `root;child;grandchild <microseconds>`, which
+        flamegraph.pl, inferno and speedscope read directly.
+
+        Returns:
+            Folded stack lines
+        """
+        stacks: Dict[str, int] = {}
+        for path, span in self.walk():
+            key = ";".join(name.replace(";", ":").replace(" ", "_") for name in path)
+            stacks[key] = stacks.get(key, 0) + int(span.self_time * 1e6)
+        return [f"{stack} {micros}" for stack, micros in stacks.items() if micros > 0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the span tree with start offsets relative to this span."""
+        def serialize(span: "Span") -> Dict[str, Any]:
+            return {
+                "name": span.name,
+                "offset": span.start - self.start,
+                "duration": span.duration,
+                "attributes": span.attributes,
+                "children": [serialize(child) for child in list(span.children)]
+            }
+        return serialize(self)
+
+class _SpanScope:
+    """Context manager that records a child of the current span."""
+
+    __slots__ = ("name", "attributes", "parent", "span", "token")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Span):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+
+    def __enter__(self) -> Span:
+        self.span = Span(self.name, self.attributes)
+        self.parent.children.append(self.span)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+        _current_span.reset(self.token)
+
+def current_span() -> Optional[Span]:
+    """Get the innermost open span of the current request, if any."""
+    return _current_span.get()
+
+def span(name: str, **attributes) -> Any:
+    """Time a block as a child of the current span.
+
+    Outside a trace this returns a shared no-op context, so instrumented
+    code costs one context variable lookup when nothing is being traced.
+
+    Args:
+        name: Operation name
+        **attributes: Details recorded on the span
+
+    Returns:
+        Context manager yielding the span (None outside a trace)
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _NO_SPAN
+    return _SpanScope(name, attributes, parent)
+
+def traced(name: str, **attributes) -> Callable:
+    """Decorator that records each call of a function as a span.
+
+    Args:
+        name: Operation name
+        **attributes: Details recorded on every span
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return func(*args, **kwargs)
+            with _SpanScope(name, dict(attributes), parent):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class Tracer:
+    """Starts request traces and dumps profiles of slow requests.
+
+    With profiling enabled, a finished request that took at least
+    `slow_seconds` is sampled with probability `sample_rate` and its
+    span tree is written to `profile_dir` as a folded-stack file that
+    flame graph tools can render. Only the newest `max_files` profiles
+    are kept.
+    """
+
+    def __init__(self,
+                 enabled: Optional[bool] = None,
+                 slow_seconds: Optional[float] = None,
+                 sample_rate: Optional[float] = None,
+                 profile_dir: Optional[str] = None,
+                 max_files: Optional[int] = None):
+        """Initialize the tracer.
+
+        Args:
+            enabled: Whether slow-request profiles are dumped (default: from config)
+            slow_seconds: Duration at which a request counts as slow (default: from config)
+            sample_rate: Fraction of slow requests dumped (default: from config)
+            profile_dir: Directory for profile files (default: from config)
+            max_files: Profile files kept (default: from config)
+        """
+        settings = config.observability
+        self.enabled = settings.profile_enabled if enabled is None else enabled
+        self.slow_seconds = settings.profile_slow_seconds if slow_seconds is None else slow_seconds
+        self.sample_rate = settings.profile_sample_rate if sample_rate is None else sample_rate
+        self.profile_dir = profile_dir or settings.profile_dir
+        self.max_files = max_files or settings.profile_max_files
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.traces = 0
+        self.dumped = 0
+
+    @contextlib.contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Span]:
+        """Trace a request, making its span the root of the call tree.
+
+        Inside an existing trace this records an ordinary child span
+        instead, and only the outermost trace is considered for dumping.
+
+        Args:
+            name: Request name
+            **attributes: Details recorded on the root span
+
+        Yields:
+            The request's span
+        """
+        parent = _current_span.get()
+        if parent is not None:
+            with _SpanScope(name, attributes, parent) as child:
+                yield child
+            return
+
+        root = Span(name, attributes)
+        token = _current_span.set(root)
+        try:
+            yield root
+        finally:
+            root.end = time.perf_counter()
+            _current_span.reset(token)
+            self.traces += 1
+            self._maybe_dump(root)
+
+    def _maybe_dump(self, root: Span) -> None:
+        """Dump a finished trace if profiling selects it."""
+        if not self.enabled or root.duration < self.slow_seconds:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        try:
+            path = self.dump(root)
+            logger.info(f"Slow request {root.name} took {root.duration:.2f}s; profile written to {path}")
+        except Exception as e:
+            logger.error(f"Error writing profile for {root.name}: {str(e)}")
+
+    def dump(self, root: Span) -> str:
+        """Write a trace as a folded-stack profile file.
+
+        Args:
+            root: Finished root span
+
+        Returns:
+            Path of the written file
+        """
+        os.makedirs(self.profile_dir, exist_ok=True)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", root.name)
+        file_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{safe_name}_{int(root.duration * 1000)}ms.folded"
+        path = os.path.join(self.profile_dir, file_name)
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(root.folded()) + "\n")
+
+        with self._lock:
+            self.dumped += 1
+            self._prune()
+        return path
+
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond `max_files`."""
+        files = sorted(f for f in os.listdir(self.profile_dir) if f.endswith(".folded"))
+        for file_name in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(os.path.join(self.profile_dir, file_name))
+            except OSError:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracer statistics."""
+        return {
+            "enabled": self.enabled,
+            "traces": self.traces,
+            "dumped": self.dumped,
+            "slow_seconds": self.slow_seconds,
+            "sample_rate": self.sample_rate,
+            "profile_dir": self.profile_dir
+        }
+
+# Default tracer used by the application's instrumentation
+tracer = Tracer()
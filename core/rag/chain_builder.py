@@ -2,7 +2,6 @@
 
 from typing import List, Dict, Any, Optional, Callable, Union
 from langchain.schema import Document
-from langchain_openai import ChatOpenAI
 from config.app_config import config
 from config.logging_config import get_module_logger
 from core.embeddings.vector_store_factory import VectorStoreFactory
@@ -40,6 +39,8 @@ class RAGChainBuilder:
         Returns:
             Configured RAG pipeline
         """
+        from langchain_openai import ChatOpenAI
+        
         # Initialize LLM
         llm = ChatOpenAI(
             model=model_name or config.llm.model_name,
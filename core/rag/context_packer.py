@@ -0,0 +1,313 @@
+# core/rag/context_packer.py
+
+import zlib
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from langchain.schema import Document
+from config.app_config import config
+from config.logging_config import get_module_logger
+from core.embeddings.keyword_index import tokenize
+
+# Create a logger for this module
+logger = get_module_logger("context_packer")
+
+# Dimension of the hashed term vectors used when embeddings are unavailable
+HASHED_DIMENSION = 1024
+
+# Shortest suffix/prefix match treated as chunk overlap rather than coincidence
+MIN_OVERLAP_CHARS = 20
+
+
+def _count_tokens_approx(text: str) -> int:
+    """Approximate token count at roughly four characters per token."""
+    return max(1, len(text) // 4)
+
+
+def get_token_counter():
+    """Get a token counting function, preferring tiktoken when installed.
+
+    Returns:
+        Function mapping text to a token count
+    """
+    try:
+        import tiktoken
+        encoding = tiktoken.encoding_for_model(config.llm.model_name)
+    except Exception:
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            logger.debug("tiktoken not available, approximating token counts")
+            return _count_tokens_approx
+
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _hashed_vectors(texts: List[str]) -> np.ndarray:
+    """Build L2-normalized hashed term-frequency vectors for texts."""
+    vectors = np.zeros((len(texts), HASHED_DIMENSION), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for term in tokenize(text):
+            vectors[row, zlib.crc32(term.encode("utf-8")) % HASHED_DIMENSION] += 1.0
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def _overlap_length(first: str, second: str, max_overlap: int) -> int:
+    """Length of the longest suffix of `first` that is a prefix of `second`."""
+    for length in range(min(len(first), len(second), max_overlap), MIN_OVERLAP_CHARS - 1, -1):
+        if first.endswith(second[:length]):
+            return length
+    return 0
+
+
+class ContextPacker:
+    """Post-retrieval stage that reranks, merges and packs documents into a prompt budget.
+
+    Candidates are reranked by maximal marginal relevance: cosine similarity to
+    the query traded off against similarity to the documents already chosen.
+    Embeddings come from the vector store when it can return stored vectors;
+    otherwise hashed term vectors are used, so no extra embedding calls are made
+    for documents. Adjacent or overlapping chunks of the same source are merged,
+    and documents are then added greedily until the token budget is spent.
+    """
+
+    def __init__(self,
+                 vector_store: Optional[Any] = None,
+                 token_budget: Optional[int] = None,
+                 mmr_lambda: Optional[float] = None,
+                 retrieval_cache: Optional[Any] = None,
+                 max_overlap: Optional[int] = None):
+        """Initialize the packer.
+
+        Args:
+            vector_store: Store used to embed queries and look up document vectors
+            token_budget: Maximum number of context tokens
+            mmr_lambda: Relevance weight for MMR (1.0 ignores diversity)
+            retrieval_cache: Semantic query cache holding recent query embeddings
+            max_overlap: Longest chunk overlap to detect, in characters
+        """
+        self.vector_store = vector_store
+        self.token_budget = token_budget or config.vector_store.context_token_budget
+        self.mmr_lambda = mmr_lambda if mmr_lambda is not None else config.vector_store.mmr_lambda
+        self.retrieval_cache = retrieval_cache
+        self.max_overlap = max_overlap or config.vector_store.chunk_overlap
+        self.count_tokens = get_token_counter()
+
+        logger.debug(
+            f"Initialized context packer with budget={self.token_budget} tokens, "
+            f"mmr_lambda={self.mmr_lambda}"
+        )
+
+    def _query_vector(self, query: str, query_embedding: Optional[List[float]] = None) -> Optional[np.ndarray]:
+        """Get the query embedding, reusing the retriever's or the retrieval cache's when possible."""
+        if query_embedding is not None:
+            return np.asarray(query_embedding, dtype=np.float32)
+
+        if self.retrieval_cache:
+            embedding = self.retrieval_cache.get_query_embedding(query)
+            if embedding is not None:
+                return np.asarray(embedding, dtype=np.float32)
+
+        if self.vector_store is not None and hasattr(self.vector_store, "embed_query"):
+            try:
+                return np.asarray(self.vector_store.embed_query(query), dtype=np.float32)
+            except Exception as e:
+                logger.warning(f"Could not embed query for reranking: {str(e)}")
+        return None
+
+    def _vectors(self,
+                 query: str,
+                 documents: List[Document],
+                 query_embedding: Optional[List[float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get normalized query and document vectors in a shared space.
+
+        Args:
+            query: Query string
+            documents: Candidate documents
+            query_embedding: Query embedding already computed by the retriever
+
+        Returns:
+            Tuple of (query vector, document matrix)
+        """
+        doc_vectors = None
+        if self.vector_store is not None and hasattr(self.vector_store, "get_document_vectors"):
+            try:
+                doc_vectors = self.vector_store.get_document_vectors(documents)
+            except Exception as e:
+                logger.warning(f"Could not look up document vectors: {str(e)}")
+
+        # Stored vectors are only usable if every candidate has one
+        if doc_vectors is not None and all(vector is not None for vector in doc_vectors):
+            query_vector = self._query_vector(query, query_embedding)
+            if query_vector is not None:
+                matrix = np.vstack(doc_vectors).astype(np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix = matrix / np.where(norms > 0, norms, 1.0)
+                query_norm = np.linalg.norm(query_vector)
+                return query_vector / (query_norm or 1.0), matrix
+
+        vectors = _hashed_vectors([query] + [doc.page_content for doc in documents])
+        return vectors[0], vectors[1:]
+
+    def rerank(self,
+               query: str,
+               documents: List[Document],
+               query_embedding: Optional[List[float]] = None) -> List[Document]:
+        """Order documents by maximal marginal relevance.
+
+        Args:
+            query: Query string
+            documents: Candidate documents
+            query_embedding: Query embedding already computed by the retriever
+
+        Returns:
+            Documents in MMR order
+        """
+        if len(documents) < 2:
+            return list(documents)
+
+        query_vector, doc_matrix = self._vectors(query, documents, query_embedding)
+        relevance = doc_matrix @ query_vector
+        pairwise = doc_matrix @ doc_matrix.T
+
+        selected: List[int] = []
+        remaining = np.ones(len(documents), dtype=bool)
+        max_similarity = np.full(len(documents), -np.inf, dtype=np.float32)
+
+        for _ in range(len(documents)):
+            if selected:
+                redundancy = np.where(np.isfinite(max_similarity), max_similarity, 0.0)
+                scores = self.mmr_lambda * relevance - (1.0 - self.mmr_lambda) * redundancy
+            else:
+                scores = relevance.copy()
+            scores[~remaining] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            remaining[best] = False
+            max_similarity = np.maximum(max_similarity, pairwise[best])
+
+        return [documents[i] for i in selected]
+
+    def _merge_pair(self, existing: Document, doc: Document) -> Optional[Document]:
+        """Merge two documents of the same source if they overlap or are adjacent chunks.
+
+        Args:
+            existing: Higher-ranked document
+            doc: Lower-ranked document
+
+        Returns:
+            Merged document (carrying the higher-ranked metadata), or None
+        """
+        if doc.page_content in existing.page_content:
+            return existing
+        if existing.page_content in doc.page_content:
+            return Document(page_content=doc.page_content, metadata=dict(existing.metadata))
+
+        existing_chunk = existing.metadata.get("chunk")
+        chunk = doc.metadata.get("chunk")
+        has_chunks = isinstance(existing_chunk, int) and isinstance(chunk, int)
+
+        # Order the pair as it appears in the source
+        if has_chunks:
+            pairs = [(existing, doc)] if existing_chunk < chunk else [(doc, existing)]
+        else:
+            pairs = [(existing, doc), (doc, existing)]
+
+        for first, second in pairs:
+            # Chunks from the splitter share `chunk_overlap` characters at their boundary
+            overlap = _overlap_length(first.page_content, second.page_content, self.max_overlap)
+            if overlap or (has_chunks and abs(existing_chunk - chunk) == 1):
+                metadata = dict(existing.metadata)
+                if has_chunks:
+                    metadata["chunk"] = min(existing_chunk, chunk)
+                    metadata["merged_chunks"] = sorted(
+                        set(existing.metadata.get("merged_chunks", [existing_chunk])) | {chunk}
+                    )
+                separator = "" if overlap else "\n"
+                return Document(
+                    page_content=first.page_content + separator + second.page_content[overlap:],
+                    metadata=metadata
+                )
+
+        return None
+
+    def merge(self, documents: List[Document]) -> List[Document]:
+        """Merge adjacent or overlapping chunks of the same source.
+
+        Merged documents take the position of their highest-ranked part, and
+        documents whose text is contained in another of the same source are dropped.
+
+        Args:
+            documents: Ranked documents
+
+        Returns:
+            Ranked documents with overlaps merged
+        """
+        merged: List[Document] = []
+        by_source: Dict[Any, List[int]] = {}
+
+        for doc in documents:
+            source = doc.metadata.get("source")
+            for index in by_source.get(source, []):
+                combined = self._merge_pair(merged[index], doc)
+                if combined is not None:
+                    merged[index] = combined
+                    break
+            else:
+                by_source.setdefault(source, []).append(len(merged))
+                merged.append(doc)
+
+        if len(merged) < len(documents):
+            logger.debug("Merged %d retrieved documents into %d", len(documents), len(merged))
+        return merged
+
+    def pack(self,
+             query: str,
+             documents: List[Document],
+             query_embedding: Optional[List[float]] = None) -> List[Document]:
+        """Rerank, merge and pack documents into the token budget.
+
+        Args:
+            query: Query string
+            documents: Retrieved candidate documents
+            query_embedding: Query embedding already computed by the retriever
+
+        Returns:
+            Documents to place in the prompt, best first
+        """
+        if not documents:
+            return []
+
+        ranked = self.merge(self.rerank(query, documents, query_embedding))
+
+        packed = []
+        used_tokens = 0
+        for doc in ranked:
+            tokens = self.count_tokens(doc.page_content)
+            if used_tokens + tokens <= self.token_budget:
+                packed.append(doc)
+                used_tokens += tokens
+            elif not packed:
+                # Always keep the best document, truncated to the budget
+                ratio = self.token_budget / tokens
+                truncated = doc.page_content[:int(len(doc.page_content) * ratio)]
+                packed.append(Document(page_content=truncated, metadata=dict(doc.metadata)))
+                used_tokens = self.token_budget
+
+        logger.debug(
+            f"Packed {len(packed)} of {len(documents)} candidates into "
+            f"{used_tokens}/{self.token_budget} tokens"
+        )
+        return packed
+
+    def format(self, documents: List[Document]) -> str:
+        """Join packed documents into a context string.
+
+        Args:
+            documents: Packed documents
+
+        Returns:
+            Context string
+        """
+        return "\n\n".join(doc.page_content for doc in documents)
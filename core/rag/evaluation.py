@@ -4,11 +4,14 @@
 
 import os
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional, Callable, Union
 from dataclasses import dataclass, field, asdict
 import uuid
 from datetime import datetime
+import numpy as np
 
 from langchain.schema import Document
 from config.logging_config import get_module_logger
@@ -30,39 +33,155 @@ class EvaluationResult:
     document_scores: List[float] = field(default_factory=list)
     metrics: Dict[str, float] = field(default_factory=dict)
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    # Set when the pipeline reported an error or the evaluation raised
+    error: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
         return asdict(self)
 
+# Retrieval metrics computed from expected document ids
+RETRIEVAL_METRICS = ("retrieval_precision", "retrieval_recall", "mrr", "ndcg")
+
+# Latency percentiles reported in aggregates
+LATENCY_PERCENTILES = (50, 90, 99)
+
+def _document_ids(documents: List[Document]) -> List[str]:
+    """Get the ids of documents that have one, in rank order."""
+    return [doc.metadata["id"] for doc in documents if doc.metadata.get("id")]
+
+def compute_retrieval_metrics(retrieved_ids: List[List[str]],
+                              expected_ids: List[Optional[List[str]]]) -> Dict[str, np.ndarray]:
+    """Compute retrieval metrics for many queries at once.
+    
+    Relevance is binary: a retrieved document is relevant if its id is
+    expected. Queries are laid out as rows of a padded relevance matrix so
+    every metric is one array expression over all queries.
+    
+    Args:
+        retrieved_ids: Retrieved document ids per query, in rank order
+        expected_ids: Expected document ids per query (None or empty if unknown)
+        
+    Returns:
+        Mapping of metric name to per-query values; NaN where a query has
+        no expected ids
+    """
+    num_queries = len(retrieved_ids)
+    depth = max((len(ids) for ids in retrieved_ids), default=0)
+    
+    relevant = np.zeros((num_queries, max(depth, 1)), dtype=bool)
+    retrieved_count = np.zeros(num_queries)
+    expected_count = np.zeros(num_queries)
+    for i, (ids, expected) in enumerate(zip(retrieved_ids, expected_ids)):
+        expected = set(expected or ())
+        expected_count[i] = len(expected)
+        retrieved_count[i] = len(ids)
+        if expected and ids:
+            relevant[i, :len(ids)] = [doc_id in expected for doc_id in ids]
+    
+    hits = relevant.sum(axis=1)
+    has_expected = expected_count > 0
+    ranks = np.arange(1, relevant.shape[1] + 1)
+    discounts = 1.0 / np.log2(ranks + 1)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(retrieved_count > 0, hits / retrieved_count, 0.0)
+        recall = np.where(has_expected, hits / expected_count, 0.0)
+        
+        # Reciprocal rank of the first relevant document
+        first_hit = relevant.argmax(axis=1)
+        mrr = np.where(relevant.any(axis=1), 1.0 / (first_hit + 1), 0.0)
+        
+        # Binary-gain nDCG at each query's retrieved depth
+        dcg = (relevant * discounts).sum(axis=1)
+        ideal_hits = np.minimum(expected_count, retrieved_count).astype(int)
+        idcg = np.concatenate(([0.0], np.cumsum(discounts)))[ideal_hits]
+        ndcg = np.where(idcg > 0, dcg / idcg, 0.0)
+    
+    return {
+        name: np.where(has_expected, values, np.nan)
+        for name, values in zip(RETRIEVAL_METRICS, (precision, recall, mrr, ndcg))
+    }
+
 class RAGEvaluator:
     """Evaluator for measuring RAG pipeline performance."""
     
     def __init__(self, 
                  save_dir: Optional[str] = None,
-                 metrics: Optional[List[str]] = None):
+                 metrics: Optional[List[str]] = None,
+                 max_workers: int = 4):
         """Initialize the evaluator.
         
         Args:
             save_dir: Directory to save evaluation results
             metrics: List of metrics to compute
+            max_workers: Maximum queries evaluated concurrently
         """
         self.save_dir = save_dir or "rag_evaluation"
-        self.metrics = metrics or ["retrieval_precision", "answer_relevance"]
+        self.metrics = metrics or list(RETRIEVAL_METRICS) + ["answer_relevance"]
+        self.max_workers = max_workers
         
         # Create save directory if it doesn't exist
         os.makedirs(self.save_dir, exist_ok=True)
         
         # Initialize evaluation results
         self.results = []
+        self._lock = threading.Lock()
         
         logger.debug(f"Initialized RAG evaluator with metrics: {self.metrics}")
     
+    def _run_query(self,
+                   query: str,
+                   rag_pipeline: Any,
+                   source_docs: Optional[List[Document]] = None,
+                   retrieval_time: Optional[float] = None) -> EvaluationResult:
+        """Run one query through the pipeline and time it, without metrics.
+        
+        Args:
+            query: The query to evaluate
+            rag_pipeline: The RAG pipeline to evaluate
+            source_docs: Optional documents already retrieved for the query
+            retrieval_time: Retrieval time to record with pre-retrieved documents
+            
+        Returns:
+            Evaluation result with empty metrics
+        """
+        # The pipeline reuses pre-retrieved documents instead of retrieving again
+        result = rag_pipeline.run(query, source_documents=source_docs)
+        retrieved_docs = result.get("source_documents", source_docs or [])
+        
+        if source_docs is None:
+            retrieval_time = result.get("retrieval_time", 0.0)
+        elif retrieval_time is None:
+            retrieval_time = 0.0
+        generation_time = result.get("generation_time", result.get("execution_time", 0.0))
+        
+        # Some implementations store relevance scores in metadata
+        doc_scores = [
+            doc.metadata["score"] for doc in retrieved_docs
+            if doc.metadata.get("score") is not None
+        ]
+        
+        return EvaluationResult(
+            query_id=str(uuid.uuid4()),
+            query=query,
+            response=result["result"],
+            retrieval_time=retrieval_time,
+            generation_time=generation_time,
+            total_time=retrieval_time + generation_time,
+            document_count=len(retrieved_docs),
+            document_ids=_document_ids(retrieved_docs),
+            document_scores=doc_scores,
+            error=result.get("error")
+        )
+    
     def evaluate_query(self, 
                        query: str,
                        rag_pipeline: Any,
                        ground_truth: Optional[str] = None,
-                       expected_doc_ids: Optional[List[str]] = None) -> EvaluationResult:
+                       expected_doc_ids: Optional[List[str]] = None,
+                       source_docs: Optional[List[Document]] = None,
+                       retrieval_time: Optional[float] = None) -> EvaluationResult:
         """Evaluate a single query.
         
         Args:
@@ -70,69 +189,21 @@ class RAGEvaluator:
             rag_pipeline: The RAG pipeline to evaluate
             ground_truth: Optional ground truth answer
             expected_doc_ids: Optional list of expected document IDs
+            source_docs: Optional documents already retrieved for the query
+            retrieval_time: Retrieval time to record with pre-retrieved documents
             
         Returns:
             Evaluation result
         """
-        # Generate a query ID
-        query_id = str(uuid.uuid4())
-        
-        # Start timing
-        start_time = time.time()
-        
-        # Track retrieval time
-        retrieval_start = time.time()
-        context, source_docs = rag_pipeline._retrieval_step(query)
-        retrieval_time = time.time() - retrieval_start
-        
-        # Track generation time
-        generation_start = time.time()
-        result = rag_pipeline.run(query)
-        generation_time = time.time() - generation_start
-        
-        # Calculate total time
-        total_time = time.time() - start_time
-        
-        # Extract retrieved document IDs and scores
-        doc_ids = []
-        doc_scores = []
-        for doc in source_docs:
-            doc_id = doc.metadata.get('id', None)
-            if doc_id:
-                doc_ids.append(doc_id)
-            # Some implementations store relevance scores in metadata
-            score = doc.metadata.get('score', None)
-            if score is not None:
-                doc_scores.append(score)
-        
-        # Compute metrics
-        metrics = self._compute_metrics(
-            query=query,
-            response=result['result'],
-            retrieved_docs=source_docs,
-            ground_truth=ground_truth,
-            expected_doc_ids=expected_doc_ids
-        )
-        
-        # Create evaluation result
-        eval_result = EvaluationResult(
-            query_id=query_id,
-            query=query,
-            response=result['result'],
-            retrieval_time=retrieval_time,
-            generation_time=generation_time,
-            total_time=total_time,
-            document_count=len(source_docs),
-            document_ids=doc_ids,
-            document_scores=doc_scores,
-            metrics=metrics
-        )
+        eval_result = self._run_query(query, rag_pipeline, source_docs, retrieval_time)
+        self._compute_metrics([eval_result], [ground_truth], [expected_doc_ids])
         
         # Add to results
-        self.results.append(eval_result)
+        with self._lock:
+            self.results.append(eval_result)
         
         # Save result
-        self._save_result(eval_result)
+        self._save_results([eval_result])
         
         return eval_result
     
@@ -143,6 +214,11 @@ class RAGEvaluator:
                          expected_doc_ids: Optional[List[List[str]]] = None) -> List[EvaluationResult]:
         """Evaluate a dataset of queries.
         
+        Documents for all queries are retrieved in one batch, then queries
+        run concurrently (at most `max_workers` at a time) reusing those
+        documents. Metrics are computed over all queries at once and the
+        results are written to one JSONL file.
+        
         Args:
             queries: List of queries to evaluate
             rag_pipeline: The RAG pipeline to evaluate
@@ -150,163 +226,221 @@ class RAGEvaluator:
             expected_doc_ids: Optional list of lists of expected document IDs
             
         Returns:
-            List of evaluation results
+            List of evaluation results, in query order
         """
-        results = []
-        
-        # Process each query
-        for i, query in enumerate(queries):
-            # Get corresponding ground truth and expected docs if available
-            ground_truth = ground_truths[i] if ground_truths and i < len(ground_truths) else None
-            expected_docs = expected_doc_ids[i] if expected_doc_ids and i < len(expected_doc_ids) else None
-            
-            # Evaluate query
-            result = self.evaluate_query(
-                query=query,
-                rag_pipeline=rag_pipeline,
-                ground_truth=ground_truth,
-                expected_doc_ids=expected_docs
-            )
-            
-            results.append(result)
-            
-            # Log progress
-            logger.info(f"Evaluated query {i+1}/{len(queries)}: {query[:50]}...")
+        if not queries:
+            logger.warning("No queries to evaluate")
+            return []
+        
+        wall_start = time.perf_counter()
+        
+        # Retrieve documents for all queries in one batch when the pipeline supports it
+        batch_docs = None
+        batch_retrieval_time = None
+        if hasattr(rag_pipeline, "retrieve_batch"):
+            batch_start = time.perf_counter()
+            batch_docs = rag_pipeline.retrieve_batch(queries)
+            batch_retrieval_time = (time.perf_counter() - batch_start) / len(queries)
+            logger.debug(f"Batch retrieval for {len(queries)} queries took {batch_retrieval_time * len(queries):.4f}s")
+        
+        # Generate concurrently with bounded parallelism; generation is I/O bound
+        results: List[Optional[EvaluationResult]] = [None] * len(queries)
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            futures = {
+                executor.submit(
+                    self._run_query,
+                    query,
+                    rag_pipeline,
+                    batch_docs[i] if batch_docs is not None else None,
+                    batch_retrieval_time
+                ): i
+                for i, query in enumerate(queries)
+            }
+            for completed, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.error(f"Error evaluating query {i+1}: {str(e)}", exc_info=True)
+                    results[i] = EvaluationResult(
+                        query_id=str(uuid.uuid4()),
+                        query=queries[i],
+                        response=f"Error evaluating query: {str(e)}",
+                        retrieval_time=0.0,
+                        generation_time=0.0,
+                        total_time=0.0,
+                        document_count=0,
+                        error=str(e)
+                    )
+                logger.info(f"Evaluated query {completed}/{len(queries)}: {queries[i][:50]}...")
+        
+        wall_time = time.perf_counter() - wall_start
+        
+        # Get corresponding ground truths and expected docs if available
+        ground_truths = [
+            ground_truths[i] if ground_truths and i < len(ground_truths) else None
+            for i in range(len(queries))
+        ]
+        expected_doc_ids = [
+            expected_doc_ids[i] if expected_doc_ids and i < len(expected_doc_ids) else None
+            for i in range(len(queries))
+        ]
+        self._compute_metrics(results, ground_truths, expected_doc_ids)
+        
+        with self._lock:
+            self.results.extend(results)
+        self._save_results(results)
         
         # Compute and log aggregate metrics
-        self._log_aggregate_metrics(results)
+        self._log_aggregate_metrics(results, wall_time)
         
         return results
     
     def _compute_metrics(self,
-                         query: str,
-                         response: str,
-                         retrieved_docs: List[Document],
-                         ground_truth: Optional[str] = None,
-                         expected_doc_ids: Optional[List[str]] = None) -> Dict[str, float]:
-        """Compute evaluation metrics.
+                         results: List[EvaluationResult],
+                         ground_truths: List[Optional[str]],
+                         expected_doc_ids: List[Optional[List[str]]]) -> None:
+        """Compute evaluation metrics for a set of results in place.
+        
+        Retrieval metrics are only recorded for queries with expected
+        document ids.
         
         Args:
-            query: The query
-            response: The response
-            retrieved_docs: Retrieved documents
-            ground_truth: Optional ground truth answer
-            expected_doc_ids: Optional list of expected document IDs
-            
-        Returns:
-            Dictionary of metrics
+            results: Evaluation results
+            ground_truths: Ground truth answer per result (may be None)
+            expected_doc_ids: Expected document IDs per result (may be None)
         """
-        metrics = {}
-        
-        # Simple retrieval precision if expected_doc_ids is provided
-        if "retrieval_precision" in self.metrics and expected_doc_ids:
-            # Get retrieved document IDs
-            retrieved_ids = []
-            for doc in retrieved_docs:
-                doc_id = doc.metadata.get('id', None)
-                if doc_id:
-                    retrieved_ids.append(doc_id)
-            
-            # Calculate precision
-            if expected_doc_ids and retrieved_ids:
-                correct = sum(1 for doc_id in retrieved_ids if doc_id in expected_doc_ids)
-                metrics["retrieval_precision"] = correct / len(retrieved_ids) if retrieved_ids else 0
-            else:
-                metrics["retrieval_precision"] = 0
+        requested = [name for name in RETRIEVAL_METRICS if name in self.metrics]
+        if requested and any(expected_doc_ids):
+            values = compute_retrieval_metrics([r.document_ids for r in results], expected_doc_ids)
+            for name in requested:
+                for result, value in zip(results, values[name]):
+                    if not np.isnan(value):
+                        result.metrics[name] = float(value)
         
         # For a real implementation, you would integrate with an LLM to compute answer relevance
         # Here we're just providing a placeholder
         if "answer_relevance" in self.metrics:
             # Placeholder for answer relevance score (0-1)
             # In a real implementation, this would use an LLM to evaluate answer quality
-            metrics["answer_relevance"] = 0.5
-        
-        return metrics
+            for result in results:
+                result.metrics["answer_relevance"] = 0.5
     
-    def _save_result(self, result: EvaluationResult):
-        """Save evaluation result to file.
+    def _save_results(self, results: List[EvaluationResult]):
+        """Append evaluation results to the results file, one JSON object per line.
         
         Args:
-            result: Evaluation result
+            results: Evaluation results
         """
-        # Create filename
-        filename = f"{result.query_id}.json"
-        filepath = os.path.join(self.save_dir, filename)
-        
-        # Save as JSON
-        with open(filepath, 'w') as f:
-            json.dump(result.to_dict(), f, indent=2)
+        filepath = os.path.join(self.save_dir, "results.jsonl")
+        data = "".join(json.dumps(result.to_dict()) + "\n" for result in results)
+        with self._lock, open(filepath, "a") as f:
+            f.write(data)
     
-    def _log_aggregate_metrics(self, results: List[EvaluationResult]):
-        """Compute and log aggregate metrics.
+    def summarize(self, results: List[EvaluationResult], wall_time: Optional[float] = None) -> Dict[str, Any]:
+        """Compute aggregate quality, latency and throughput figures.
         
         Args:
             results: List of evaluation results
+            wall_time: Elapsed time of the whole evaluation, for throughput
+            
+        Returns:
+            Dictionary of aggregate metrics
         """
-        if not results:
-            logger.warning("No results to compute aggregate metrics")
-            return
+        timings = {
+            name: np.array([getattr(r, f"{name}_time") for r in results], dtype=np.float64)
+            for name in ("retrieval", "generation", "total")
+        }
         
-        # Compute averages
-        avg_retrieval_time = sum(r.retrieval_time for r in results) / len(results)
-        avg_generation_time = sum(r.generation_time for r in results) / len(results)
-        avg_total_time = sum(r.total_time for r in results) / len(results)
-        avg_doc_count = sum(r.document_count for r in results) / len(results)
+        summary = {
+            "query_count": len(results),
+            "avg_retrieval_time": float(timings["retrieval"].mean()),
+            "avg_generation_time": float(timings["generation"].mean()),
+            "avg_total_time": float(timings["total"].mean()),
+            "avg_document_count": float(np.mean([r.document_count for r in results])),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        # Latency distributions
+        for name, values in timings.items():
+            for p, value in zip(LATENCY_PERCENTILES, np.percentile(values, LATENCY_PERCENTILES)):
+                summary[f"p{p}_{name}_time"] = float(value)
+        
+        # Throughput
+        if wall_time:
+            summary["wall_time"] = wall_time
+            summary["queries_per_second"] = len(results) / wall_time
         
-        # Compute average metrics
+        # Add average specific metrics
         metric_keys = set()
         for result in results:
             metric_keys.update(result.metrics.keys())
         
-        avg_metrics = {}
-        for key in metric_keys:
-            values = [r.metrics.get(key, 0) for r in results if key in r.metrics]
+        for key in sorted(metric_keys):
+            values = [r.metrics[key] for r in results if key in r.metrics]
             if values:
-                avg_metrics[key] = sum(values) / len(values)
+                summary[f"avg_{key}"] = float(np.mean(values))
         
-        # Log results
-        logger.info(f"Evaluation complete: {len(results)} queries")
-        logger.info(f"Average retrieval time: {avg_retrieval_time:.4f}s")
-        logger.info(f"Average generation time: {avg_generation_time:.4f}s")
-        logger.info(f"Average total time: {avg_total_time:.4f}s")
-        logger.info(f"Average document count: {avg_doc_count:.2f}")
-        
-        for key, value in avg_metrics.items():
-            logger.info(f"Average {key}: {value:.4f}")
-        
-        # Save aggregate metrics
-        self._save_aggregate_metrics(results)
+        return summary
     
-    def _save_aggregate_metrics(self, results: List[EvaluationResult]):
-        """Save aggregate metrics to file.
+    def _log_aggregate_metrics(self, results: List[EvaluationResult], wall_time: Optional[float] = None):
+        """Compute, log and save aggregate metrics.
         
         Args:
             results: List of evaluation results
+            wall_time: Elapsed time of the whole evaluation
         """
-        # Compute aggregates
-        metrics = {
-            "query_count": len(results),
-            "avg_retrieval_time": sum(r.retrieval_time for r in results) / len(results),
-            "avg_generation_time": sum(r.generation_time for r in results) / len(results),
-            "avg_total_time": sum(r.total_time for r in results) / len(results),
-            "avg_document_count": sum(r.document_count for r in results) / len(results),
-            "timestamp": datetime.now().isoformat()
-        }
+        if not results:
+            logger.warning("No results to compute aggregate metrics")
+            return
         
-        # Add average specific metrics
-        metric_keys = set()
-        for result in results:
-            metric_keys.update(result.metrics.keys())
+        summary = self.summarize(results, wall_time)
         
-        for key in metric_keys:
-            values = [r.metrics.get(key, 0) for r in results if key in r.metrics]
-            if values:
-                metrics[f"avg_{key}"] = sum(values) / len(values)
+        # Log results
+        logger.info(f"Evaluation complete: {len(results)} queries")
+        if wall_time:
+            logger.info(f"Throughput: {summary['queries_per_second']:.2f} queries/s over {wall_time:.2f}s")
+        for name in ("retrieval", "generation", "total"):
+            logger.info(
+                f"{name.title()} time: avg {summary[f'avg_{name}_time']:.4f}s, "
+                f"p50 {summary[f'p50_{name}_time']:.4f}s, p90 {summary[f'p90_{name}_time']:.4f}s, "
+                f"p99 {summary[f'p99_{name}_time']:.4f}s"
+            )
+        logger.info(f"Average document count: {summary['avg_document_count']:.2f}")
+        
+        for key, value in summary.items():
+            if key.startswith("avg_") and not key.endswith(("_time", "_count")):
+                logger.info(f"Average {key[4:]}: {value:.4f}")
         
-        # Save as JSON
+        # Save aggregate metrics
         filepath = os.path.join(self.save_dir, "aggregate_metrics.json")
         with open(filepath, 'w') as f:
-            json.dump(metrics, f, indent=2)
+            json.dump(summary, f, indent=2)
+
+def load_evaluation_dataset(path: str) -> List[Dict[str, Any]]:
+    """Load evaluation queries from a JSON list or a JSONL file.
+    
+    Each entry needs a `query`; `ground_truth` and `expected_docs` (a list of
+    document ids) are optional, as in `create_evaluation_queries`.
+    
+    Args:
+        path: Dataset file path
+        
+    Returns:
+        List of query dictionaries
+        
+    Raises:
+        ValueError: If the file is not a list of entries with queries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".jsonl"):
+            dataset = [json.loads(line) for line in f if line.strip()]
+        else:
+            dataset = json.load(f)
+    
+    if not isinstance(dataset, list) or not all(isinstance(item, dict) and item.get("query") for item in dataset):
+        raise ValueError(f"Evaluation dataset {path} must be a list of objects with a 'query'")
+    return dataset
 
 def create_evaluation_queries() -> List[Dict[str, Any]]:
     """Create a set of test queries for RAG evaluation.
@@ -0,0 +1,251 @@
+# core/rag/latency.py
+
+import math
+import threading
+import time
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+
+from config.app_config import config
+from config.logging_config import get_module_logger
+
+# Create a logger for this module
+logger = get_module_logger("latency")
+
+# Percentiles reported by default
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram over a sliding time window.
+
+    Bucket bounds grow geometrically from `min_value` to `max_value`, so
+    every recorded value is known to within `growth - 1` relative error
+    (5% by default) regardless of magnitude. The window is split into
+    fixed slots that are reused round-robin; each slot holds one count
+    array, so memory is `slots x buckets` counters no matter how many
+    values are recorded. Counts since creation are kept separately.
+    """
+
+    def __init__(self,
+                 window_seconds: float = 300.0,
+                 slots: int = 10,
+                 min_value: float = 1e-4,
+                 max_value: float = 600.0,
+                 growth: float = 1.05):
+        """Initialize an empty histogram.
+
+        Args:
+            window_seconds: Length of the sliding window
+            slots: Number of slots the window is divided into
+            min_value: Smallest distinguished latency in seconds
+            max_value: Largest distinguished latency in seconds
+            growth: Ratio between consecutive bucket bounds
+        """
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.slot_seconds = window_seconds / slots
+        self.min_value = min_value
+        self._log_min = math.log(min_value)
+        self._log_growth = math.log(growth)
+
+        # Bucket 0 holds values below min_value, the last bucket values above max_value
+        num_buckets = int(math.ceil((math.log(max_value) - self._log_min) / self._log_growth)) + 2
+        edges = min_value * growth ** np.arange(num_buckets - 1)
+        self._representative = np.concatenate((
+            [min_value / 2],
+            np.sqrt(edges[:-1] * edges[1:]),
+            [edges[-1]]
+        ))
+        self.num_buckets = num_buckets
+
+        self._window_counts = np.zeros((slots, num_buckets), dtype=np.int64)
+        self._slot_epochs = np.full(slots, -1, dtype=np.int64)
+        self._total_counts = np.zeros(num_buckets, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _bucket(self, value: float) -> int:
+        """Get the bucket index of a value."""
+        if value < self.min_value:
+            return 0
+        return min(self.num_buckets - 1, 1 + int((math.log(value) - self._log_min) / self._log_growth))
+
+    def record(self, value: float, now: Optional[float] = None) -> None:
+        """Record one latency.
+
+        Args:
+            value: Latency in seconds
+            now: Monotonic time of the observation (default: time.monotonic())
+        """
+        bucket = self._bucket(value)
+        epoch = int((time.monotonic() if now is None else now) // self.slot_seconds)
+        slot = epoch % self.slots
+
+        with self._lock:
+            # Reuse a slot whose data has aged out of the window
+            if self._slot_epochs[slot] != epoch:
+                self._window_counts[slot] = 0
+                self._slot_epochs[slot] = epoch
+            self._window_counts[slot, bucket] += 1
+            self._total_counts[bucket] += 1
+            self.count += 1
+            self.total += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+
+    def _counts(self, window: bool, now: Optional[float]) -> np.ndarray:
+        """Get bucket counts over the window or since creation."""
+        with self._lock:
+            if not window:
+                return self._total_counts.copy()
+            epoch = int((time.monotonic() if now is None else now) // self.slot_seconds)
+            live = self._slot_epochs > epoch - self.slots
+            return self._window_counts[live].sum(axis=0)
+
+    def percentiles(self,
+                    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                    window: bool = True,
+                    now: Optional[float] = None) -> Dict[float, Optional[float]]:
+        """Estimate latency percentiles.
+
+        Args:
+            percentiles: Percentiles to report (0 to 100)
+            window: Use only the sliding window (False: everything since creation)
+            now: Monotonic time to evaluate the window at
+
+        Returns:
+            Mapping of percentile to latency in seconds (None if nothing was recorded)
+        """
+        counts = self._counts(window, now)
+        total = int(counts.sum())
+        if not total:
+            return {p: None for p in percentiles}
+
+        # Rank of each percentile, located with one search over the cumulative counts
+        cumulative = np.cumsum(counts)
+        ranks = np.maximum(1, np.ceil(np.asarray(percentiles, dtype=np.float64) / 100.0 * total))
+        buckets = np.searchsorted(cumulative, ranks)
+        # Bucket midpoints can fall just outside the observed range
+        values = np.clip(self._representative[buckets], self.min, self.max)
+        return {p: float(v) for p, v in zip(percentiles, values)}
+
+    def window_count(self, now: Optional[float] = None) -> int:
+        """Get the number of values recorded within the sliding window."""
+        return int(self._counts(True, now).sum())
+
+    def reset(self) -> None:
+        """Remove all recorded values."""
+        with self._lock:
+            self._window_counts[:] = 0
+            self._slot_epochs[:] = -1
+            self._total_counts[:] = 0
+            self.count = 0
+            self.total = 0.0
+            self.min = math.inf
+            self.max = 0.0
+
+class LatencyTracker:
+    """Per-stage latency histograms for the RAG pipeline."""
+
+    def __init__(self,
+                 stages: Optional[List[str]] = None,
+                 window_seconds: Optional[float] = None,
+                 slots: Optional[int] = None):
+        """Initialize the tracker.
+
+        Args:
+            stages: Stages created up front so they always appear in summaries
+            window_seconds: Sliding window length (default: from config)
+            slots: Slots per window (default: from config)
+        """
+        self.window_seconds = window_seconds or config.observability.latency_window_seconds
+        self.slots = slots or config.observability.latency_window_slots
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+        for stage in stages or []:
+            self.histogram(stage)
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        """Get the histogram for a stage, creating it if needed.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            The stage's histogram
+        """
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(
+                    stage, LatencyHistogram(window_seconds=self.window_seconds, slots=self.slots)
+                )
+        return histogram
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record a stage latency.
+
+        Args:
+            stage: Stage name
+            seconds: Latency in seconds
+        """
+        self.histogram(stage).record(seconds)
+
+    def summary(self,
+                percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+                window: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Summarize every stage.
+
+        Args:
+            percentiles: Percentiles to report
+            window: Report percentiles over the sliding window (False: since creation)
+
+        Returns:
+            Mapping of stage to count, window_count, mean, min, max and p<N> values in seconds
+        """
+        summary = {}
+        for stage, histogram in list(self._histograms.items()):
+            stats = {
+                "count": histogram.count,
+                "window_count": histogram.window_count(),
+                "mean": histogram.total / histogram.count if histogram.count else None,
+                "min": histogram.min if histogram.count else None,
+                "max": histogram.max if histogram.count else None
+            }
+            for p, value in histogram.percentiles(percentiles, window=window).items():
+                stats[f"p{p:g}"] = value
+            summary[stage] = stats
+        return summary
+
+    def reset(self) -> None:
+        """Clear every stage's histogram."""
+        for histogram in list(self._histograms.values()):
+            histogram.reset()
+
+_latency_tracker: Optional[LatencyTracker] = None
+_latency_tracker_lock = threading.Lock()
+
+def get_latency_tracker(stages: Optional[List[str]] = None) -> LatencyTracker:
+    """Get the process-wide latency tracker, creating it on first use.
+
+    Sliding-window percentiles only mean something across requests, so
+    every session and rerun records into this one tracker.
+
+    Args:
+        stages: Stages to make sure exist in the tracker
+
+    Returns:
+        Shared latency tracker
+    """
+    global _latency_tracker
+    if _latency_tracker is None:
+        with _latency_tracker_lock:
+            if _latency_tracker is None:
+                _latency_tracker = LatencyTracker()
+    for stage in stages or []:
+        _latency_tracker.histogram(stage)
+    return _latency_tracker
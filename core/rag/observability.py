@@ -1,15 +1,22 @@
 # core/rag/observability.py
 
 from typing import Dict, Any, List, Optional, Callable, Union
-import json
 import time
 import os
+import uuid
+from contextvars import ContextVar
 from functools import wraps
 from datetime import datetime
+from config.app_config import config
 from config.logging_config import get_module_logger
+from core.rag.latency import LatencyTracker, get_latency_tracker
+from core.rag.trace_sink import BufferedTraceSink, get_trace_sink
 
 logger = get_module_logger("rag_observability")
 
+# Stages with latency histograms; each spans from the run's previous step
+PIPELINE_STAGES = ("retrieval", "prompt", "generation", "end_to_end")
+
 class RagObservability:
     """Utilities for RAG pipeline observability."""
     
@@ -17,26 +24,40 @@ class RagObservability:
                  log_dir: Optional[str] = None, 
                  enable_timing: bool = True,
                  enable_logging: bool = True,
-                 enable_tracing: bool = False):
+                 enable_tracing: bool = False,
+                 trace_sink: Optional[BufferedTraceSink] = None,
+                 latency_tracker: Optional[LatencyTracker] = None):
         """Initialize observability utils.
         
         Args:
-            log_dir: Directory for log files (default: logs/rag)
+            log_dir: Directory for log files (default: configured trace directory)
             enable_timing: Whether to record timing
             enable_logging: Whether to log events
             enable_tracing: Whether to enable tracing
+            trace_sink: Sink for step events, owned by this instance from then on
+                and stopped by `close` (default: the process-wide sink for
+                rag_traces.jsonl in log_dir, which `close` only flushes)
+            latency_tracker: Per-stage latency histograms (default: the
+                process-wide tracker, so windows span requests and sessions)
         """
-        self.log_dir = log_dir or "logs/rag"
+        self.log_dir = log_dir or config.observability.trace_log_dir
         self.enable_timing = enable_timing
         self.enable_logging = enable_logging
         self.enable_tracing = enable_tracing
         
-        # Create log directory if it doesn't exist
-        if self.enable_logging and not os.path.exists(self.log_dir):
-            os.makedirs(self.log_dir, exist_ok=True)
+        # Step events are buffered and written in batches off the request path;
+        # instances created on each rerun share one sink, closed at exit.
+        # A sink passed in is taken over, so `close` stops it.
+        self._closes_sink = trace_sink is not None
+        self.trace_sink = trace_sink
+        if self.enable_logging and self.trace_sink is None:
+            self.trace_sink = get_trace_sink(os.path.join(self.log_dir, "rag_traces.jsonl"))
+        
+        # Per-stage latency histograms with bounded memory
+        self.latency = latency_tracker or get_latency_tracker(stages=list(PIPELINE_STAGES))
         
-        # Initialize timing data
-        self.timings = {}
+        # Current run of the pipeline in this thread/context, used to correlate steps
+        self._current_run: ContextVar[Optional[Dict[str, Any]]] = ContextVar("rag_current_run", default=None)
         
         logger.debug(f"Initialized RAG observability with logging to {self.log_dir}")
     
@@ -49,39 +70,44 @@ class RagObservability:
         def callback(step: str, input: Any, output: Any):
             # Record timestamp
             timestamp = datetime.now().isoformat()
+            now = time.perf_counter()
+            duration = None
             
-            # Log step
-            if self.enable_logging:
-                self._log_step(step, input, output, timestamp)
+            # Steps of one run share the run id set at "start"
+            if step == "start":
+                run = {"run_id": uuid.uuid4().hex, "start": now, "last": now}
+                self._current_run.set(run)
+            else:
+                run = self._current_run.get()
             
-            # Record timing if it's the start or end of a run
-            if self.enable_timing:
-                if step == "start":
-                    self.timings[self._get_query_id(input)] = {
-                        "start_time": time.time(),
-                        "steps": {}
-                    }
-                elif step == "end":
-                    query_id = self._get_query_id(input)
-                    if query_id in self.timings:
-                        self.timings[query_id]["end_time"] = time.time()
-                        self.timings[query_id]["total_time"] = (
-                            self.timings[query_id]["end_time"] - 
-                            self.timings[query_id]["start_time"]
-                        )
+            # Each stage lasts from the previous step of the run to this one
+            if run is not None and step != "start":
+                if step == "end":
+                    duration = now - run["start"]
+                    stage = "end_to_end"
+                    self._current_run.set(None)
                 else:
-                    # Record timing for intermediate steps
-                    query_id = self._get_query_id(input)
-                    if query_id in self.timings:
-                        step_key = f"{step}_{int(time.time() * 1000)}"
-                        self.timings[query_id]["steps"][step_key] = {
-                            "timestamp": timestamp,
-                            "step": step
-                        }
+                    duration = now - run["last"]
+                    stage = step
+                run["last"] = now
+                
+                if self.enable_timing:
+                    self.latency.record(stage, duration)
+            
+            # Log step
+            if self.enable_logging:
+                run_id = run["run_id"] if run is not None else None
+                self._log_step(step, input, output, timestamp, run_id, duration)
         
         return callback
     
-    def _log_step(self, step: str, input: Any, output: Any, timestamp: str):
+    def _log_step(self,
+                  step: str,
+                  input: Any,
+                  output: Any,
+                  timestamp: str,
+                  run_id: Optional[str] = None,
+                  duration: Optional[float] = None):
         """Log a RAG pipeline step.
         
         Args:
@@ -89,14 +115,19 @@ class RagObservability:
             input: Step input
             output: Step output
             timestamp: ISO timestamp
+            run_id: Correlation id of the pipeline run (None outside a run)
+            duration: Seconds since the run's previous step, or since start for "end"
         """
         try:
             # Create log entry
             log_entry = {
+                "run_id": run_id,
                 "timestamp": timestamp,
                 "step": step,
                 "input_type": type(input).__name__
             }
+            if duration is not None:
+                log_entry["duration_ms"] = round(duration * 1000, 3)
             
             # Add appropriate data based on step
             if step == "retrieval":
@@ -111,77 +142,57 @@ class RagObservability:
                     log_entry["execution_time"] = output["execution_time"]
                     log_entry["doc_count"] = len(output.get("source_documents", []))
             
-            # Write to log file
-            query_id = self._get_query_id(input)
-            log_file = os.path.join(self.log_dir, f"rag_{query_id}_{step}.json")
+            # Hand off to the sink; serialization and file writes happen in the background
+            self.trace_sink.emit(log_entry)
             
-            with open(log_file, "w") as f:
-                json.dump(log_entry, f, default=str)
-                
         except Exception as e:
             logger.error(f"Error logging RAG step: {str(e)}")
     
-    def _get_query_id(self, input: Any) -> str:
-        """Generate a query ID from input.
-        
-        Args:
-            input: Query input
-            
-        Returns:
-            Query ID string
-        """
-        # Handle different input types
-        if isinstance(input, str):
-            query = input
-        elif isinstance(input, dict) and "question" in input:
-            query = input["question"]
-        else:
-            query = str(input)
-        
-        # Create a simple hash
-        query_hash = hash(query) % 10000
-        timestamp = int(time.time())
-        
-        return f"{timestamp}_{query_hash}"
-    
     def get_timing_summary(self) -> Dict[str, Any]:
         """Get a summary of timing data.
         
         Returns:
-            Dictionary with timing summary
+            Dictionary with end-to-end totals and per-stage latency
+            percentiles (in seconds) over the sliding window
         """
         if not self.enable_timing:
             return {"error": "Timing is not enabled"}
         
-        # Calculate summary statistics
-        summary = {
-            "total_queries": len(self.timings),
-            "average_time": 0,
-            "max_time": 0,
-            "min_time": float("inf") if self.timings else 0
+        stages = self.latency.summary()
+        end_to_end = stages.get("end_to_end", {})
+        return {
+            "total_queries": end_to_end.get("count", 0),
+            "average_time": end_to_end.get("mean") or 0,
+            "max_time": end_to_end.get("max") or 0,
+            "min_time": end_to_end.get("min") or 0,
+            "window_seconds": self.latency.window_seconds,
+            "stages": stages
         }
-        
-        if self.timings:
-            total_times = []
-            for query_id, timing in self.timings.items():
-                if "total_time" in timing:
-                    total_time = timing["total_time"]
-                    total_times.append(total_time)
-                    
-                    # Update max and min
-                    summary["max_time"] = max(summary["max_time"], total_time)
-                    summary["min_time"] = min(summary["min_time"], total_time)
-            
-            # Calculate average
-            if total_times:
-                summary["average_time"] = sum(total_times) / len(total_times)
-        
-        return summary
     
     def clear_timing_data(self):
-        """Clear all timing data."""
-        self.timings = {}
+        """Clear all timing data (for every session when using the shared tracker)."""
+        self.latency.reset()
         logger.debug("Cleared RAG timing data")
+    
+    def get_trace_stats(self) -> Dict[str, int]:
+        """Get trace sink counters, including events dropped under backpressure.
+        
+        Returns:
+            Dictionary with sink counters (empty if logging is disabled)
+        """
+        return self.trace_sink.get_stats() if self.trace_sink else {}
+    
+    def close(self):
+        """Flush buffered step events, stopping the trace sink if it was passed in.
+        
+        A sink passed to the constructor is owned by this instance and is
+        closed here; the shared default sink keeps running for other instances.
+        """
+        if self.trace_sink:
+            if self._closes_sink:
+                self.trace_sink.close()
+            else:
+                self.trace_sink.flush()
 
 def time_rag_function(func):
     """Decorator to time RAG functions with logging.
@@ -195,7 +206,7 @@ def time_rag_function(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
         # Log start
-        logger.debug(f"Starting {func.__name__}")
+        logger.debug("Starting %s", func.__name__)
         start_time = time.time()
         
         # Call function
@@ -205,7 +216,7 @@ def time_rag_function(func):
         execution_time = time.time() - start_time
         
         # Log completion
-        logger.debug(f"Completed {func.__name__} in {execution_time:.4f}s")
+        logger.debug("Completed %s in %.4fs", func.__name__, execution_time)
         
         # Add timing to result if it's a dictionary
         if isinstance(result, dict):
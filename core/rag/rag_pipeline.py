@@ -1,14 +1,19 @@
 # core/rag/rag_pipeline.py
 
+import time
 from typing import List, Dict, Any, Optional, Callable, Union, Tuple
 from langchain.schema import Document
 from config.app_config import config
 from config.logging_config import get_module_logger
 from core.llm.llm_client import LLMClient
+from core.monitoring.tracing import span, traced, tracer
 
 # Create a logger for this module
 logger = get_module_logger("rag_pipeline")
 
+# Response returned when the LLM call fails
+GENERATION_ERROR_MESSAGE = "Sorry, I encountered an error while generating a response."
+
 class RAGPipeline:
     """RAG pipeline with standardized components and observability."""
     
@@ -17,7 +22,8 @@ class RAGPipeline:
                  retriever: Optional[Any] = None,
                  prompt_template: Optional[str] = None,
                  k_documents: int = None,
-                 observability_callbacks: List[Callable] = None):
+                 observability_callbacks: List[Callable] = None,
+                 context_packer: Optional[Any] = None):
         """Initialize with components.
         
         Args:
@@ -26,6 +32,8 @@ class RAGPipeline:
             prompt_template: Prompt template for RAG
             k_documents: Number of documents to retrieve
             observability_callbacks: Callbacks for pipeline observability
+            context_packer: Optional ContextPacker that reranks, merges and
+                budgets retrieved documents before they reach the prompt
         """
         # Initialize LLM
         self.llm = llm
@@ -42,6 +50,9 @@ class RAGPipeline:
         # Initialize observability callbacks
         self.observability_callbacks = observability_callbacks or []
         
+        # Set context packer
+        self.context_packer = context_packer
+        
         # Define format docs function
         self.format_docs = lambda docs: "\n\n".join(doc.page_content for doc in docs)
         
@@ -84,6 +95,7 @@ class RAGPipeline:
         
         self.rag_chain = chain_runner
     
+    @traced("rag.retrieval")
     def _retrieval_step(self, query: str) -> Tuple[str, List[Document]]:
         """Retrieval step with observability.
         
@@ -101,14 +113,24 @@ class RAGPipeline:
         try:
             # Retrieve documents using the correct method based on retriever type
             # VectorStoreRetriever has a get_relevant_documents method, not callable directly
-            if hasattr(self.retriever, 'get_relevant_documents'):
-                docs = self.retriever.get_relevant_documents(query)
-            else:
-                # Fallback for other retriever types
-                docs = self.retriever(query)
+            query_embedding = None
+            with span("rag.retriever"):
+                if hasattr(self.retriever, 'get_relevant_documents'):
+                    docs = self.retriever.get_relevant_documents(query)
+                elif hasattr(self.retriever, 'retrieve_with_embedding'):
+                    # Keep the query embedding so reranking doesn't embed the query again
+                    docs, query_embedding = self.retriever.retrieve_with_embedding(query)
+                else:
+                    # Fallback for other retriever types
+                    docs = self.retriever(query)
             
             # Log retrieved documents
-            logger.debug(f"Retrieved {len(docs)} documents for query: {query[:50]}...")
+            logger.debug("Retrieved %d documents for query: %.50s...", len(docs), query)
+            
+            # Rerank, merge overlapping chunks and fit the token budget
+            if self.context_packer:
+                with span("rag.context_pack", documents=len(docs)):
+                    docs = self.context_packer.pack(query, docs, query_embedding)
             
             # Call observability callbacks for retrieval step
             for callback in self.observability_callbacks:
@@ -123,6 +145,36 @@ class RAGPipeline:
             logger.error(f"Error in retrieval step: {str(e)}", exc_info=True)
             return "Error retrieving context.", []
     
+    def retrieve_batch(self, queries: List[str]) -> List[List[Document]]:
+        """Retrieve source documents for several queries at once.
+        
+        Uses the retriever's `search_batch` when it provides one, falling back
+        to one retrieval step per query otherwise. Either way the documents
+        are packed as in a normal run, so they can be passed to `run` as
+        `source_documents`.
+        
+        Args:
+            queries: User queries
+            
+        Returns:
+            List of document lists, one per query in input order
+        """
+        if not self.retriever:
+            logger.warning("No retriever available for RAG pipeline")
+            return [[] for _ in queries]
+        
+        if hasattr(self.retriever, "search_batch"):
+            try:
+                batch_docs = self.retriever.search_batch(queries)
+                if self.context_packer:
+                    batch_docs = [self.context_packer.pack(query, docs) for query, docs in zip(queries, batch_docs)]
+                return batch_docs
+            except Exception as e:
+                logger.warning(f"Batch retrieval failed, retrieving queries individually: {str(e)}")
+        
+        return [self._retrieval_step(query)[1] for query in queries]
+    
+    @traced("rag.prompt")
     def _prompt_step(self, inputs: Dict[str, Any]) -> str:
         """Prompt formatting step with observability.
         
@@ -150,51 +202,73 @@ class RAGPipeline:
             logger.error(f"Error in prompt step: {str(e)}", exc_info=True)
             return f"Error formatting prompt. Question: {inputs.get('question', 'Unknown')}"
     
-    def _generation_step(self, prompt: str) -> str:
-        """Generation step with observability.
+    @traced("rag.generation")
+    def _generate(self, prompt: str) -> str:
+        """Generate a response with observability.
         
         Args:
             prompt: Formatted prompt
             
         Returns:
             Generated response
-        """
-        try:
-            # Generate response - handle different LLM types
-            if hasattr(self.llm, 'invoke'):
-                # Native LangChain ChatModel
-                response = self.llm.invoke(prompt)
-                content = response.content if hasattr(response, "content") else str(response)
-            elif hasattr(self.llm, 'chat_completion'):
-                # Custom LLMClient
-                response = self.llm.chat_completion(
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                content = response["content"] if isinstance(response, dict) and "content" in response else str(response)
-            else:
-                # Fallback
-                logger.warning("Unknown LLM type, attempting to call directly")
-                response = self.llm(prompt)
-                content = str(response)
-            
-            # Call observability callbacks for generation step
-            for callback in self.observability_callbacks:
-                callback(step="generation", input=prompt, output=content)
             
-            return content
+        Raises:
+            Exception: Whatever the LLM raised
+        """
+        # Generate response - handle different LLM types
+        if hasattr(self.llm, 'invoke'):
+            # Native LangChain ChatModel
+            response = self.llm.invoke(prompt)
+            content = response.content if hasattr(response, "content") else str(response)
+        elif hasattr(self.llm, 'chat_completion'):
+            # Custom LLMClient
+            response = self.llm.chat_completion(
+                messages=[{"role": "user", "content": prompt}]
+            )
+            content = response["content"] if isinstance(response, dict) and "content" in response else str(response)
+        else:
+            # Fallback
+            logger.warning("Unknown LLM type, attempting to call directly")
+            response = self.llm(prompt)
+            content = str(response)
+        
+        # Call observability callbacks for generation step
+        for callback in self.observability_callbacks:
+            callback(step="generation", input=prompt, output=content)
+        
+        return content
+    
+    def _generation_step(self, prompt: str) -> str:
+        """Generation step that answers with an apology instead of raising.
+        
+        Args:
+            prompt: Formatted prompt
             
+        Returns:
+            Generated response, or `GENERATION_ERROR_MESSAGE` if generation failed
+        """
+        try:
+            return self._generate(prompt)
         except Exception as e:
             logger.error(f"Error in generation step: {str(e)}", exc_info=True)
-            return "Sorry, I encountered an error while generating a response."
+            return GENERATION_ERROR_MESSAGE
     
-    def run(self, query: str) -> Dict[str, Any]:
+    def run(self, query: str, source_documents: Optional[List[Document]] = None) -> Dict[str, Any]:
         """Run the RAG pipeline on a query.
         
+        Retrieval happens once per run and its documents feed the prompt.
+        The run is traced, and the response's "profile" attributes its time
+        to the spans recorded below it (retrieval, embedding, vector search,
+        rate limiting, LLM attempts and so on).
+        
         Args:
             query: User query
+            source_documents: Documents already retrieved (and packed) for the
+                query, e.g. by `retrieve_batch`; retrieval is skipped when given
             
         Returns:
-            Dictionary with response and additional info
+            Dictionary with response and additional info, plus an "error"
+            message when the run or its LLM call failed
         """
         try:
             # Log the query
@@ -205,27 +279,48 @@ class RAGPipeline:
                 callback(step="start", input=query, output=None)
             
             # Start timers and metrics
-            start_time = __import__('time').time()
-            
-            # Run the retrieval step separately to get documents
-            context, source_docs = self._retrieval_step(query)
+            start_time = time.perf_counter()
             
-            # Run the chain
-            result = self.rag_chain(query)
+            with tracer.trace("rag.run") as root:
+                # Retrieve documents unless the caller already has them
+                if source_documents is None:
+                    context, source_docs = self._retrieval_step(query)
+                else:
+                    source_docs = source_documents
+                    context = self.format_docs(source_docs)
+                    for callback in self.observability_callbacks:
+                        callback(step="retrieval", input=query, output=source_docs)
+                retrieval_time = time.perf_counter() - start_time
+                
+                # Format the prompt and generate from the retrieved context; a failed
+                # generation still answers, but the response carries its error
+                prompt = self._prompt_step({"context": context, "question": query})
+                generation_error = None
+                try:
+                    result = self._generate(prompt)
+                except Exception as e:
+                    logger.error(f"Error in generation step: {str(e)}", exc_info=True)
+                    result = GENERATION_ERROR_MESSAGE
+                    generation_error = str(e)
             
             # Calculate execution time
-            execution_time = __import__('time').time() - start_time
+            execution_time = time.perf_counter() - start_time
             
             # Create response
             response = {
                 "result": result,
                 "source_documents": source_docs,
                 "execution_time": execution_time,
+                "retrieval_time": retrieval_time,
+                "generation_time": execution_time - retrieval_time,
+                "profile": root.totals(),
                 "metadata": {
                     "query": query,
                     "num_docs": len(source_docs) if source_docs else 0
                 }
             }
+            if generation_error is not None:
+                response["error"] = generation_error
             
             # Call observability callbacks for run end
             for callback in self.observability_callbacks:
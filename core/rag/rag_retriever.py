@@ -1,10 +1,11 @@
 # core/rag/retriever.py
 
-from typing import List, Dict, Any, Optional, Callable, Union
+from typing import List, Dict, Any, Optional, Callable, Tuple, Union
 from langchain.schema import Document
 from config.app_config import config
 from config.logging_config import get_module_logger
 from core.embeddings.vector_store_factory import VectorStoreFactory
+from core.rag.retrieval_cache import SemanticQueryCache
 
 # Create a logger for this module
 logger = get_module_logger("rag_retriever")
@@ -17,19 +18,57 @@ class VectorStoreError(Exception):
     """Exception raised for vector store errors."""
     pass
 
+def reciprocal_rank_fusion(result_lists: List[List[Document]], 
+                           k: int = 60, 
+                           limit: Optional[int] = None) -> List[Document]:
+    """Merge ranked result lists with reciprocal rank fusion.
+    
+    Each document scores sum(1 / (k + rank)) over the lists it appears in,
+    so agreement between rankers outweighs a high rank in a single one.
+    
+    Args:
+        result_lists: Ranked document lists, best first
+        k: Rank smoothing constant
+        limit: Maximum number of documents to return
+        
+    Returns:
+        Fused list of unique documents, best first
+    """
+    scores: Dict[Any, float] = {}
+    documents: Dict[Any, Document] = {}
+    
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            # Identify chunks by id and content, since ids may be shared by a document's chunks
+            key = (doc.metadata.get("id"), doc.page_content)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, doc)
+    
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    if limit is not None:
+        ranked = ranked[:limit]
+    return [documents[key] for key in ranked]
+
+
 class HybridRetriever:
-    """Retrieves documents using hybrid search methods."""
+    """Retrieves documents by fusing semantic and BM25 keyword search."""
     
     def __init__(self, 
                 vector_store: Optional[Any] = None,
                 k_documents: int = None,
-                store_type: str = None):
+                store_type: str = None,
+                keyword_search_enabled: bool = True,
+                rrf_k: int = 60,
+                retrieval_cache: Optional[SemanticQueryCache] = None):
         """Initialize with vector store.
         
         Args:
             vector_store: Any vector store implementation
             k_documents: Number of documents to retrieve
             store_type: Type of vector store to create if one isn't provided
+            keyword_search_enabled: Whether to fuse in keyword search results
+            rrf_k: Rank smoothing constant for reciprocal rank fusion
+            retrieval_cache: Optional semantic cache for semantic search results
         """
         if vector_store:
             self.vector_store = vector_store
@@ -38,59 +77,213 @@ class HybridRetriever:
             self.vector_store = VectorStoreFactory.create_vector_store(store_type=store_type)
             
         self.k_documents = k_documents or config.vector_store.similarity_top_k
-        logger.debug(f"Initialized hybrid retriever with k={self.k_documents}")
+        self.rrf_k = rrf_k
+        
+        # Keyword search needs a store that maintains a keyword index
+        self.keyword_search_enabled = (
+            keyword_search_enabled and hasattr(self.vector_store, "keyword_search")
+        )
+        # The cache needs to embed queries and search by vector separately
+        self.retrieval_cache = retrieval_cache
+        if retrieval_cache and not (
+            hasattr(self.vector_store, "embed_query") and hasattr(self.vector_store, "search_by_vector")
+        ):
+            logger.warning("Vector store does not support search by vector; retrieval cache disabled")
+            self.retrieval_cache = None
+        
+        logger.debug(
+            f"Initialized hybrid retriever with k={self.k_documents}, "
+            f"keyword_search={self.keyword_search_enabled}, "
+            f"cache={self.retrieval_cache is not None}"
+        )
     
-    def retrieve(self, query: str) -> List[Document]:
+    def retrieve(self, query: str, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
         """Retrieve relevant documents for a query.
         
         Args:
             query: Query string
+            filter: Optional metadata filter (e.g. {"source": "report.pdf"})
             
         Returns:
             List of relevant documents
             
+        Raises:
+            RetrievalError: If retrieval fails
+        """
+        return self.retrieve_with_embedding(query, filter)[0]
+    
+    def retrieve_with_embedding(self, 
+                                query: str, 
+                                filter: Optional[Dict[str, Any]] = None) -> Tuple[List[Document], Optional[List[float]]]:
+        """Retrieve relevant documents along with the query embedding used to find them.
+        
+        Lets later stages such as reranking reuse the embedding instead of
+        embedding the query again.
+        
+        Args:
+            query: Query string
+            filter: Optional metadata filter (e.g. {"source": "report.pdf"})
+            
+        Returns:
+            Tuple of (relevant documents, query embedding or None if the store embedded internally)
+            
         Raises:
             RetrievalError: If retrieval fails
         """
         try:
             # Semantic search using vector store
-            semantic_docs = self._semantic_search(query)
+            semantic_docs, embedding = self._semantic_search(query, filter)
             
-            # Could add keyword search, web search, etc. here
-            
-            # For now, just return semantic search results
-            return semantic_docs
+            # Fuse with keyword matches for exact terms such as codes and names
+            return self._fuse(semantic_docs, self._keyword_search(query, filter)), embedding
             
         except Exception as e:
             logger.error(f"Error in retrieval: {str(e)}", exc_info=True)
             raise RetrievalError(f"Retrieval failed: {str(e)}")
     
-    def _semantic_search(self, query: str) -> List[Document]:
+    def retrieve_batch(self, 
+                       queries: List[str], 
+                       filter: Optional[Dict[str, Any]] = None) -> List[List[Document]]:
+        """Retrieve relevant documents for several queries at once.
+        
+        Uses the vector store's batched search when available so all queries
+        share one embedding call and one index search.
+        
+        Args:
+            queries: Query strings
+            filter: Optional metadata filter applied to every query
+            
+        Returns:
+            List of document lists, one per query in input order
+            
+        Raises:
+            RetrievalError: If retrieval fails
+        """
+        try:
+            if hasattr(self.vector_store, "search_batch"):
+                semantic_results = self.vector_store.search_batch(queries, k=self.k_documents, filter=filter)
+                return [
+                    self._fuse(semantic_docs, self._keyword_search(query, filter))
+                    for query, semantic_docs in zip(queries, semantic_results)
+                ]
+            
+            # Stores without batch support are queried one at a time
+            return [self.retrieve(query, filter=filter) for query in queries]
+            
+        except Exception as e:
+            logger.error(f"Error in batch retrieval: {str(e)}", exc_info=True)
+            raise RetrievalError(f"Batch retrieval failed: {str(e)}")
+    
+    def _semantic_search(self, 
+                         query: str, 
+                         filter: Optional[Dict[str, Any]] = None) -> Tuple[List[Document], Optional[List[float]]]:
         """Perform semantic search using vector store.
         
+        Stores that can embed queries and search by vector are searched with
+        an embedding computed here, so it can be returned for reuse.
+        
         Args:
             query: Query string
+            filter: Optional metadata filter
             
         Returns:
-            List of relevant documents
+            Tuple of (relevant documents, query embedding or None)
             
         Raises:
             RetrievalError: If semantic search fails
         """
         try:
-            return self.vector_store.search(query, k=self.k_documents)
+            if self.retrieval_cache:
+                return self._cached_semantic_search(query, filter)
+            if hasattr(self.vector_store, "embed_query") and hasattr(self.vector_store, "search_by_vector"):
+                embedding = self.vector_store.embed_query(query)
+                return self.vector_store.search_by_vector(embedding, k=self.k_documents, filter=filter), embedding
+            if filter:
+                return self.vector_store.search(query, k=self.k_documents, filter=filter), None
+            return self.vector_store.search(query, k=self.k_documents), None
         except VectorStoreError as e:
             logger.error(f"Vector store search failed: {str(e)}")
             raise RetrievalError(f"Semantic search failed: {str(e)}")
     
-    def as_retriever(self) -> Callable:
+    def _cached_semantic_search(self, 
+                                query: str, 
+                                filter: Optional[Dict[str, Any]] = None) -> Tuple[List[Document], List[float]]:
+        """Perform semantic search through the semantic query cache.
+        
+        Args:
+            query: Query string
+            filter: Optional metadata filter
+            
+        Returns:
+            Tuple of (relevant documents, query embedding)
+        """
+        embedding = self.retrieval_cache.get_query_embedding(query)
+        if embedding is None:
+            embedding = self.vector_store.embed_query(query)
+            self.retrieval_cache.put_query_embedding(query, embedding)
+        
+        generation = getattr(self.vector_store, "generation", 0)
+        cached_docs = self.retrieval_cache.lookup(embedding, generation, filter, query=query)
+        if cached_docs is not None:
+            return cached_docs, embedding
+        
+        docs = self.vector_store.search_by_vector(embedding, k=self.k_documents, filter=filter)
+        self.retrieval_cache.store(embedding, generation, docs, filter, query=query)
+        return docs, embedding
+    
+    def _keyword_search(self, query: str, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Perform BM25 keyword search using the vector store's keyword index.
+        
+        Keyword search is best effort; failures fall back to semantic results only.
+        
+        Args:
+            query: Query string
+            filter: Optional metadata filter
+            
+        Returns:
+            List of matching documents
+        """
+        if not self.keyword_search_enabled:
+            return []
+        
+        try:
+            return self.vector_store.keyword_search(query, k=self.k_documents, filter=filter)
+        except Exception as e:
+            logger.warning(f"Keyword search failed, using semantic results only: {str(e)}")
+            return []
+    
+    def _fuse(self, semantic_docs: List[Document], keyword_docs: List[Document]) -> List[Document]:
+        """Fuse semantic and keyword results into a single ranking.
+        
+        Args:
+            semantic_docs: Semantic search results
+            keyword_docs: Keyword search results
+            
+        Returns:
+            Fused list of at most k_documents documents
+        """
+        if not keyword_docs:
+            return semantic_docs
+        return reciprocal_rank_fusion(
+            [semantic_docs, keyword_docs], 
+            k=self.rrf_k, 
+            limit=self.k_documents
+        )
+    
+    def as_retriever(self, filter: Optional[Dict[str, Any]] = None) -> Callable:
         """Get a retriever function for use in RAG chains.
         
+        Args:
+            filter: Optional metadata filter applied to every query
+        
         Returns:
             Retriever function
         """
         def retriever(query: str) -> List[Document]:
-            return self.retrieve(query)
+            return self.retrieve(query, filter=filter)
+        
+        retriever.search_batch = lambda queries: self.retrieve_batch(queries, filter=filter)
+        retriever.retrieve_with_embedding = lambda query: self.retrieve_with_embedding(query, filter=filter)
         
         return retriever
 
@@ -118,30 +311,34 @@ class WebAugmentedRetriever(HybridRetriever):
         self.max_web_results = max_web_results
         logger.debug(f"Initialized web-augmented retriever with web_search={web_search_enabled}")
     
-    def retrieve(self, query: str) -> List[Document]:
-        """Retrieve relevant documents and augment with web search.
+    def retrieve_with_embedding(self, 
+                                query: str, 
+                                filter: Optional[Dict[str, Any]] = None) -> Tuple[List[Document], Optional[List[float]]]:
+        """Retrieve relevant documents augmented with web search, along with the query embedding.
         
         Args:
             query: Query string
+            filter: Optional metadata filter for the vector store results
             
         Returns:
-            List of relevant documents
+            Tuple of (relevant documents, query embedding or None)
             
         Raises:
             RetrievalError: If retrieval fails
         """
         try:
-            # Get documents from vector store
-            semantic_docs = self._semantic_search(query)
+            # Get documents from vector store, fused with keyword matches
+            semantic_docs, embedding = self._semantic_search(query, filter)
+            local_docs = self._fuse(semantic_docs, self._keyword_search(query, filter))
             
             # If web search is enabled
             if self.web_search_enabled:
                 web_docs = self._web_search(query)
                 
-                # Combine results (semantic search first, then web)
-                return semantic_docs + web_docs
+                # Combine results (local results first, then web)
+                return local_docs + web_docs, embedding
             
-            return semantic_docs
+            return local_docs, embedding
             
         except Exception as e:
             logger.error(f"Error in retrieval: {str(e)}", exc_info=True)
@@ -178,7 +375,7 @@ class WebAugmentedRetriever(HybridRetriever):
                     )
                     web_docs.append(doc)
                 
-                logger.debug(f"Found {len(web_docs)} web search results for query: {query[:50]}...")
+                logger.debug("Found %d web search results for query: %.50s...", len(web_docs), query)
                 return web_docs
                 
             except ImportError:
@@ -0,0 +1,284 @@
+# core/rag/retrieval_cache.py
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+import numpy as np
+from langchain.schema import Document
+from config.app_config import config
+from config.logging_config import get_module_logger
+from core.monitoring.tracing import traced
+
+# Create a logger for this module
+logger = get_module_logger("retrieval_cache")
+
+# Words, numbers and identifiers, plus sentence-ending punctuation
+_TOKEN_PATTERN = re.compile(r"[A-Za-z0-9][\w'-]*|[.?!]")
+
+def entity_key(query: str) -> str:
+    """Get a canonical string of the names and identifiers in a query.
+
+    Capitalized words that don't start a sentence and tokens containing a
+    digit are taken as entities, e.g. student names and ids.
+
+    Args:
+        query: Query string
+
+    Returns:
+        Sorted, lowercased entities joined by spaces
+    """
+    entities = set()
+    sentence_start = True
+    for token in _TOKEN_PATTERN.findall(query):
+        if token in ".?!":
+            sentence_start = True
+            continue
+        if any(c.isdigit() for c in token) or (not sentence_start and token[0].isupper() and token != "I"):
+            entities.add(token.lower())
+        sentence_start = False
+    return " ".join(sorted(entities))
+
+class SemanticQueryCache:
+    """Caches retrieval results keyed by query embedding.
+
+    Recent query embeddings are kept L2-normalized in a fixed-size ring
+    buffer, so a lookup is one matrix-vector product giving the cosine
+    similarity to every cached query. A lookup hits when the closest query
+    with the same metadata filter and the same entities (see `entity_key`)
+    is above the similarity threshold.
+
+    Queries that differ only in a name embed almost identically, so the
+    entity check keeps "goals for Maria" from returning the results of
+    "goals for Daniel". Names are detected by capitalization only, so a
+    query without detected entities could still contain a lowercase or
+    sentence-initial name; such queries only hit on the same query text
+    (ignoring case, spacing and punctuation other than sentence ends).
+
+    Entries are tagged with the vector store's index generation; when the
+    store reports a new generation every entry is dropped.
+    """
+
+    def __init__(self,
+                 max_entries: Optional[int] = None,
+                 similarity_threshold: Optional[float] = None,
+                 max_query_embeddings: int = 1024):
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Number of recent queries to keep
+            similarity_threshold: Minimum cosine similarity for a hit
+            max_query_embeddings: Number of exact query strings whose embeddings are kept
+        """
+        self.max_entries = max_entries or config.vector_store.query_cache_size
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None
+            else config.vector_store.query_cache_threshold
+        )
+        self.max_query_embeddings = max_query_embeddings
+
+        self._embeddings: Optional[np.ndarray] = None
+        self._valid = np.zeros(self.max_entries, dtype=bool)
+        self._entries: List[Optional[Dict[str, Any]]] = [None] * self.max_entries
+        self._next_slot = 0
+        self._generation: Optional[int] = None
+
+        # Exact repeats skip the embedding call entirely
+        self._query_embeddings: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        logger.debug(
+            f"Initialized semantic query cache with {self.max_entries} entries, "
+            f"threshold={self.similarity_threshold}"
+        )
+
+    @staticmethod
+    def _filter_key(filter: Optional[Dict[str, Any]]) -> str:
+        """Get a canonical string for a metadata filter."""
+        return json.dumps(filter, sort_keys=True, default=str) if filter else ""
+
+    @staticmethod
+    def _match_key(filter: Optional[Dict[str, Any]], query: Optional[str]) -> str:
+        """Get the key that cached results must share with a lookup besides similarity.
+
+        Without detected entities the query may still name someone in
+        lowercase, so it only matches the same query text.
+        """
+        if not query:
+            return SemanticQueryCache._filter_key(filter) + "|"
+        entities = entity_key(query)
+        if not entities:
+            entities = "=" + " ".join(_TOKEN_PATTERN.findall(query.lower()))
+        return SemanticQueryCache._filter_key(filter) + "|" + entities
+
+    def _check_generation(self, generation: int) -> None:
+        """Drop all entries if the index generation has changed."""
+        if generation != self._generation:
+            if self._generation is not None:
+                logger.debug(f"Index generation changed to {generation}, clearing query cache")
+            self._reset()
+            self._generation = generation
+
+    def _reset(self) -> None:
+        """Remove all cached results."""
+        self._embeddings = None
+        self._valid[:] = False
+        self._entries = [None] * self.max_entries
+        self._next_slot = 0
+
+    def clear(self) -> None:
+        """Remove all cached results and query embeddings."""
+        with self._lock:
+            self._reset()
+            self._query_embeddings.clear()
+
+    def get_query_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Get the embedding of a previously seen query string.
+
+        Args:
+            query: Query string
+
+        Returns:
+            Cached embedding or None
+        """
+        with self._lock:
+            embedding = self._query_embeddings.get(query)
+            if embedding is not None:
+                self._query_embeddings.move_to_end(query)
+            return embedding
+
+    def put_query_embedding(self, query: str, embedding: List[float]) -> None:
+        """Remember the embedding of a query string.
+
+        Args:
+            query: Query string
+            embedding: Query embedding
+        """
+        with self._lock:
+            self._query_embeddings[query] = np.asarray(embedding, dtype=np.float32)
+            self._query_embeddings.move_to_end(query)
+            while len(self._query_embeddings) > self.max_query_embeddings:
+                self._query_embeddings.popitem(last=False)
+
+    @traced("retrieval_cache.lookup")
+    def lookup(self,
+               embedding: List[float],
+               generation: int,
+               filter: Optional[Dict[str, Any]] = None,
+               query: Optional[str] = None) -> Optional[List[Document]]:
+        """Find cached results for a semantically equivalent query.
+
+        Args:
+            embedding: Query embedding
+            generation: Current index generation of the vector store
+            filter: Metadata filter used for the search
+            query: Query string, whose entities must match the cached query's
+
+        Returns:
+            Cached documents, or None on a miss
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+
+        with self._lock:
+            self._check_generation(generation)
+
+            if self._embeddings is None or not norm or vector.shape[0] != self._embeddings.shape[1]:
+                self.misses += 1
+                return None
+
+            similarities = self._embeddings @ (vector / norm)
+            similarities[~self._valid] = -1.0
+
+            match_key = self._match_key(filter, query)
+            candidates = np.flatnonzero(similarities >= self.similarity_threshold)
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                entry = self._entries[slot]
+                if entry["match_key"] == match_key:
+                    self.hits += 1
+                    logger.debug(
+                        f"Query cache hit (similarity {similarities[slot]:.3f}) "
+                        f"returning {len(entry['doc_ids'])} documents"
+                    )
+                    return list(entry["documents"])
+
+            self.misses += 1
+            return None
+
+    def store(self,
+              embedding: List[float],
+              generation: int,
+              documents: List[Document],
+              filter: Optional[Dict[str, Any]] = None,
+              query: Optional[str] = None) -> None:
+        """Cache the results of a query.
+
+        Args:
+            embedding: Query embedding
+            generation: Index generation the results were retrieved from
+            documents: Retrieved documents
+            filter: Metadata filter used for the search
+            query: Query string the results were retrieved for
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return
+
+        with self._lock:
+            self._check_generation(generation)
+
+            # Allocate the buffer on first use, or again if the embedding model changed
+            if self._embeddings is None or vector.shape[0] != self._embeddings.shape[1]:
+                self._reset()
+                self._embeddings = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            slot = self._next_slot
+            self._embeddings[slot] = vector / norm
+            self._valid[slot] = True
+            self._entries[slot] = {
+                "match_key": self._match_key(filter, query),
+                "doc_ids": [doc.metadata.get("id") for doc in documents],
+                "documents": list(documents)
+            }
+            self._next_slot = (slot + 1) % self.max_entries
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": int(self._valid.sum()),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "generation": self._generation
+            }
+
+_query_cache: Optional[SemanticQueryCache] = None
+_query_cache_lock = threading.Lock()
+
+def get_query_cache() -> SemanticQueryCache:
+    """Get the process-wide query cache, creating it on first use.
+
+    The cache must outlive Streamlit reruns to ever hit; it is meant to sit in
+    front of the shared vector store, whose generation invalidates it.
+
+    Returns:
+        Shared semantic query cache
+    """
+    global _query_cache
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                _query_cache = SemanticQueryCache()
+    return _query_cache
@@ -0,0 +1,203 @@
+# core/rag/trace_sink.py
+
+import atexit
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from config.app_config import config
+from config.logging_config import get_module_logger
+
+# Create a logger for this module
+logger = get_module_logger("trace_sink")
+
+class BufferedTraceSink:
+    """Buffers trace events in memory and writes them to a rotating JSONL file.
+
+    `emit` only appends to a bounded deque, so recording an event costs a
+    few microseconds on the request path. A background thread serializes
+    and writes events in batches, either every flush interval or as soon as
+    a batch's worth is waiting. When the buffer is full new events are
+    dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_buffer: Optional[int] = None,
+                 batch_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None,
+                 max_bytes: Optional[int] = None,
+                 backup_count: Optional[int] = None):
+        """Initialize the sink.
+
+        Args:
+            path: Trace file path (default: rag_traces.jsonl in the configured trace directory)
+            max_buffer: Events held in memory before new ones are dropped
+            batch_size: Buffered events that trigger an early flush
+            flush_interval: Seconds between background flushes
+            max_bytes: File size at which the trace file is rotated (0 disables rotation)
+            backup_count: Number of rotated files kept
+        """
+        settings = config.observability
+        self.path = path or os.path.join(settings.trace_log_dir, "rag_traces.jsonl")
+        self.max_buffer = max_buffer or settings.trace_buffer_size
+        self.batch_size = batch_size or settings.trace_batch_size
+        self.flush_interval = flush_interval or settings.trace_flush_interval
+        self.max_bytes = settings.trace_max_bytes if max_bytes is None else max_bytes
+        self.backup_count = settings.trace_backup_count if backup_count is None else backup_count
+
+        self._buffer: deque = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+
+        # Counters
+        self.emitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.flushes = 0
+        self.write_errors = 0
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        atexit.register(self.close)
+
+        logger.debug(f"Initialized buffered trace sink at {self.path}")
+
+    def emit(self, event: Dict[str, Any]) -> bool:
+        """Queue an event for writing.
+
+        Args:
+            event: JSON-serializable event (non-serializable values are written with str())
+
+        Returns:
+            True if the event was queued, False if it was dropped
+        """
+        if self._stop.is_set() or len(self._buffer) >= self.max_buffer:
+            self.dropped += 1
+            return False
+
+        self._buffer.append(event)
+        self.emitted += 1
+
+        if self._thread is None:
+            self._start()
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    def _start(self) -> None:
+        """Start the background flush thread on first use."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="trace-sink", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Flush the buffer until the sink is closed."""
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered events now.
+
+        Returns:
+            Number of events written
+        """
+        with self._write_lock:
+            events: List[Dict[str, Any]] = []
+            while self._buffer:
+                events.append(self._buffer.popleft())
+            if not events:
+                return 0
+
+            try:
+                data = "".join(json.dumps(event, default=str) + "\n" for event in events)
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write(data)
+                self._file.flush()
+                self.written += len(events)
+                self.flushes += 1
+
+                if self.max_bytes and self._file.tell() >= self.max_bytes:
+                    self._rotate()
+                return len(events)
+            except Exception as e:
+                self.write_errors += 1
+                self.dropped += len(events)
+                logger.error(f"Error writing {len(events)} trace events: {str(e)}")
+                return 0
+
+    def _rotate(self) -> None:
+        """Rotate the trace file, keeping `backup_count` old files."""
+        self._file.close()
+        self._file = None
+
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get sink counters.
+
+        Returns:
+            Dictionary with emitted, written, dropped, buffered, flushes and write_errors
+        """
+        return {
+            "emitted": self.emitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "buffered": len(self._buffer),
+            "flushes": self.flushes,
+            "write_errors": self.write_errors
+        }
+
+    def close(self) -> None:
+        """Stop the flush thread and write any remaining events."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+# Process-wide sinks by file path
+_sinks: Dict[str, BufferedTraceSink] = {}
+_sinks_lock = threading.Lock()
+
+def get_trace_sink(path: Optional[str] = None) -> BufferedTraceSink:
+    """Get the process-wide sink for a trace file, creating it on first use.
+
+    One sink per file keeps a single flush thread and a single writer
+    appending to and rotating the file.
+
+    Args:
+        path: Trace file path (default: rag_traces.jsonl in the configured trace directory)
+
+    Returns:
+        Shared trace sink
+    """
+    path = os.path.abspath(path or os.path.join(config.observability.trace_log_dir, "rag_traces.jsonl"))
+    with _sinks_lock:
+        if path not in _sinks:
+            _sinks[path] = BufferedTraceSink(path=path)
+        return _sinks[path]
@@ -10,20 +10,21 @@ from config.app_config import config
 from config.logging_config import get_module_logger, setup_logging
 from core.embeddings.vector_store_factory import VectorStoreFactory
 from core.llm.llm_client import LLMClient
-from core.rag.chain_builder import RAGChainBuilder
 from core.rag.rag_pipeline import RAGPipeline
+from core.rag.rag_retriever import HybridRetriever
+from core.rag.retrieval_cache import get_query_cache
+from core.rag.context_packer import ContextPacker
 from core.rag.observability import RagObservability
+from core.monitoring.metrics import registry
 from ui.state_manager import state_manager
 from fix_vector_store import verify_store_type
-from core.embeddings.embedding_manager import EmbeddingManager
-from core.embeddings.vector_store import FAISSVectorStore
-from core.assessment.assessment_processor import AssessmentProcessor
-from core.assessment.student_profile_manager import StudentProfileManager
-from core.assessment.report_generator import ReportGenerator
 
 # Create a logger for this module
 logger = get_module_logger("main")
 
+# Metrics
+INITIALIZATION_SECONDS = registry.gauge("app_initialization_seconds", "Time taken to load application components")
+
 def initialize_application() -> Dict[str, Any]:
     """Initialize the application components with improved error handling.
     
@@ -59,13 +60,9 @@ def initialize_application() -> Dict[str, Any]:
         # Step 2: Initialize vector store using factory
         logger.debug("Initializing vector store")
         try:
-            embedding_provider = VectorStoreFactory.create_embeddings_provider()
-            vector_store = VectorStoreFactory.create_vector_store(
-                store_type=store_type,
-                embedding_provider=embedding_provider
-            )
+            # One store per process; its index and embedding provider are loaded on first search or write
+            vector_store = VectorStoreFactory.get_shared_vector_store(store_type)
             components["vector_store"] = vector_store
-            components["embedding_provider"] = embedding_provider
             logger.debug(f"Vector store initialized successfully: {type(vector_store).__name__}")
         except Exception as e:
             logger.error(f"Error initializing vector store: {str(e)}", exc_info=True)
@@ -90,10 +87,25 @@ def initialize_application() -> Dict[str, Any]:
                 if "rag_observability" in components:
                     observability_callbacks.append(components["rag_observability"].rag_step_callback())
                 
+                # Shared across reruns and sessions; the shared store's generation invalidates it
+                retrieval_cache = get_query_cache() if config.vector_store.query_cache_enabled else None
+                
+                # Over-fetch candidates; the context packer reranks and trims them to the token budget
+                retriever = HybridRetriever(
+                    vector_store=components["vector_store"],
+                    k_documents=config.vector_store.rerank_candidates,
+                    retrieval_cache=retrieval_cache
+                )
+                context_packer = ContextPacker(
+                    vector_store=components["vector_store"],
+                    retrieval_cache=retrieval_cache
+                )
+                
                 rag_pipeline = RAGPipeline(
                     llm=components["llm_client"],
-                    retriever=components["vector_store"].as_retriever(),
-                    observability_callbacks=observability_callbacks
+                    retriever=retriever.as_retriever(),
+                    observability_callbacks=observability_callbacks,
+                    context_packer=context_packer
                 )
                 components["rag_chain"] = rag_pipeline
                 logger.debug("RAG pipeline initialized successfully")
@@ -122,6 +134,21 @@ def initialize_application() -> Dict[str, Any]:
             logger.error(f"Error initializing pipeline components: {str(e)}", exc_info=True)
             errors.append(f"Pipeline components initialization error: {str(e)}")
         
+        # Step 6: Start the background job queue for long-running work
+        logger.debug("Starting background job queue")
+        try:
+            from core.jobs.job_queue import get_job_queue
+            from core.jobs.handlers import register_application_jobs
+            
+            # The queue and its workers are shared by every session of this process
+            job_queue = get_job_queue()
+            register_application_jobs(job_queue, components)
+            components["job_queue"] = job_queue.start()
+            logger.debug("Background job queue started successfully")
+        except Exception as e:
+            logger.error(f"Error starting background job queue: {str(e)}", exc_info=True)
+            errors.append(f"Job queue initialization error: {str(e)}")
+        
         # Update system state
         update_system_state(components)
         
@@ -296,6 +323,10 @@ def load_app_components() -> Dict[str, Any]:
     
     # Store initialization time in state
     state_manager.set("initialization_time", initialization_time)
+    INITIALIZATION_SECONDS.set(initialization_time)
+    
+    # Expose metrics to a local scraper
+    start_metrics_exporters()
     
     # Check for initialization errors
     initialization_errors = state_manager.get("initialization_errors", [])
@@ -305,6 +336,17 @@ def load_app_components() -> Dict[str, Any]:
     
     return components
 
+def start_metrics_exporters():
+    """Start the configured metrics endpoint and file dump (each starts at most once)."""
+    settings = config.observability
+    try:
+        if settings.metrics_port:
+            registry.start_http_server(settings.metrics_port)
+        if settings.metrics_file:
+            registry.start_file_dump(settings.metrics_file, settings.metrics_dump_interval)
+    except Exception as e:
+        logger.error(f"Error starting metrics exporters: {str(e)}")
+
 def run_streamlit_app():
     """Entry point for the Streamlit application."""
     from ui.app import run_app
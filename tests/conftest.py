@@ -0,0 +1,22 @@
+# tests/conftest.py
+
+import pytest
+
+import ui.state_manager as state_module
+from core.assessment.knowledge_state_store import KnowledgeStateStore
+from core.assessment.student_profile_manager import StudentProfileManager
+from core.assessment.student_roster import StudentRoster
+
+@pytest.fixture
+def profile_manager(tmp_path, monkeypatch):
+    """Profile manager with its own knowledge store and state storage."""
+    monkeypatch.setattr(state_module, "_HEADLESS_SESSION_STATE", {})
+    db_path = str(tmp_path / "knowledge_state.db")
+    manager = StudentProfileManager(
+        knowledge_store=KnowledgeStateStore(db_path),
+        roster=StudentRoster(db_path)
+    )
+    manager.state_manager = state_module.AppStateManager(
+        state_module.SQLiteStorage(str(tmp_path / "state.db"))
+    )
+    return manager
@@ -0,0 +1,44 @@
+# tests/test_batch_evaluation.py
+
+from core.jobs.batch import JobCheckpoint, evaluate_queries
+from core.rag.evaluation import RAGEvaluator
+from core.rag.rag_pipeline import GENERATION_ERROR_MESSAGE, RAGPipeline
+
+class FailingLLM:
+    """LLM whose calls fail for queries mentioning "outage"."""
+
+    def invoke(self, prompt):
+        if "outage" in prompt:
+            raise ConnectionError("upstream unavailable")
+        return "An answer."
+
+def test_failed_generation_is_retried_on_resume(tmp_path):
+    pipeline = RAGPipeline(llm=FailingLLM(), retriever=lambda query: [])
+    evaluator = RAGEvaluator(save_dir=str(tmp_path / "results"), max_workers=1)
+    dataset = [{"query": "reading goals"}, {"query": "outage question"}]
+
+    checkpoint = JobCheckpoint("evaluation", checkpoint_dir=str(tmp_path / "checkpoints"))
+    stats, results = evaluate_queries(dataset, pipeline, evaluator, checkpoint)
+
+    # The pipeline answers with an apology rather than raising, but flags the error
+    assert results[1].response == GENERATION_ERROR_MESSAGE
+    assert results[1].error == "upstream unavailable"
+    assert results[0].error is None
+    assert (stats.succeeded, stats.failed) == (1, 1)
+
+    # Only the successful query is checkpointed, so a resumed run retries the failure
+    resumed = JobCheckpoint("evaluation", checkpoint_dir=str(tmp_path / "checkpoints"))
+    assert resumed.completed == {"0"}
+
+def test_pipeline_error_dict_is_not_checkpointed(tmp_path):
+    class BrokenPipeline:
+        def run(self, query, source_documents=None):
+            return {"result": "Error processing query: timeout", "source_documents": [], "error": "timeout"}
+
+    evaluator = RAGEvaluator(save_dir=str(tmp_path / "results"), max_workers=1)
+    checkpoint = JobCheckpoint("evaluation", checkpoint_dir=str(tmp_path / "checkpoints"))
+    stats, results = evaluate_queries([{"query": "q"}], BrokenPipeline(), evaluator, checkpoint)
+
+    assert results[0].error == "timeout"
+    assert stats.failed == 1
+    assert JobCheckpoint("evaluation", checkpoint_dir=str(tmp_path / "checkpoints")).completed == set()
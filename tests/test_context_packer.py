@@ -0,0 +1,46 @@
+# tests/test_context_packer.py
+
+from langchain.schema import Document
+
+from core.rag.context_packer import ContextPacker
+from core.rag.rag_pipeline import RAGPipeline
+from core.rag.rag_retriever import HybridRetriever
+
+DOCUMENTS = [
+    Document(page_content="Reading goals for the fall term", metadata={"id": "a", "source": "a.pdf"}),
+    Document(page_content="Math accommodations and supports", metadata={"id": "b", "source": "b.pdf"})
+]
+
+class CountingStore:
+    """Vector store that counts query embedding calls."""
+
+    def __init__(self):
+        self.embed_calls = 0
+
+    def embed_query(self, query):
+        self.embed_calls += 1
+        return [1.0, 0.0]
+
+    def search_by_vector(self, embedding, k=None, filter=None):
+        return list(DOCUMENTS)
+
+    def get_document_vectors(self, documents):
+        return [[1.0, 0.0] if doc.metadata["id"] == "a" else [0.0, 1.0] for doc in documents]
+
+class EchoLLM:
+    def invoke(self, prompt):
+        return "An answer."
+
+def test_pipeline_reranks_with_the_retrievers_query_embedding():
+    store = CountingStore()
+    retriever = HybridRetriever(vector_store=store, keyword_search_enabled=False)
+    pipeline = RAGPipeline(
+        llm=EchoLLM(),
+        retriever=retriever.as_retriever(),
+        context_packer=ContextPacker(vector_store=store)
+    )
+
+    response = pipeline.run("reading goals")
+
+    assert store.embed_calls == 1
+    assert [doc.metadata["id"] for doc in response["source_documents"]] == ["a", "b"]
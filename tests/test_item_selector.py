@@ -0,0 +1,24 @@
+# tests/test_item_selector.py
+
+from core.assessment.item_selector import AdaptiveItemSelector, ItemIndex
+
+def test_selection_skips_components_with_every_item_answered():
+    questions = [
+        {
+            "question_id": f"q{c}_{i}",
+            "difficulty": 0.2 + 0.3 * i,
+            "knowledge_components": [{"id": f"kc{c}"}]
+        }
+        for c in range(10)
+        for i in range(3)
+    ]
+    selector = AdaptiveItemSelector(ItemIndex(questions), max_components=8, window=4)
+
+    # Every item of kc0-kc7 is answered; kc0-kc7 are also the most uncertain components
+    answered = {question["question_id"] for question in questions if question["question_id"][1] in "01234567"}
+    knowledge_state = {f"kc{c}": 0.5 for c in range(8)}
+    knowledge_state.update({"kc8": 0.97, "kc9": 0.97})
+
+    selected = selector.select_next(knowledge_state, answered=answered)
+    assert selected is not None
+    assert selected["question_id"].split("_")[0] in ("q8", "q9")
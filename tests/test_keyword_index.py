@@ -0,0 +1,52 @@
+# tests/test_keyword_index.py
+
+import os
+
+from langchain.schema import Document
+
+from core.embeddings.keyword_index import BM25Index
+
+def batch(start, count):
+    """Documents with distinct searchable terms."""
+    return [
+        Document(page_content=f"reading goal term{i}", metadata={"id": f"doc_{i}"})
+        for i in range(start, start + count)
+    ]
+
+def test_saves_append_batches_and_load_replays_them(tmp_path):
+    directory = str(tmp_path)
+    index = BM25Index()
+    index.add_documents(batch(0, 10))
+    index.save(directory)
+    snapshot_mtime = os.path.getmtime(os.path.join(directory, BM25Index.FILE_NAME))
+
+    # Small batches go to the log without rewriting the snapshot
+    for start in (10, 13, 16):
+        index.add_documents(batch(start, 3))
+        index.save(directory)
+    assert os.path.getmtime(os.path.join(directory, BM25Index.FILE_NAME)) == snapshot_mtime
+    assert os.path.exists(os.path.join(directory, BM25Index.LOG_FILE_NAME))
+
+    loaded = BM25Index.load(directory)
+    assert len(loaded) == 19
+    assert [doc.metadata["id"] for doc, _ in loaded.search("term17")] == ["doc_17"]
+    assert len(loaded.search("reading", k=20)) == 19
+
+def test_partial_log_record_is_ignored_and_rewritten(tmp_path):
+    directory = str(tmp_path)
+    index = BM25Index()
+    index.add_documents(batch(0, 4))
+    index.save(directory)
+    index.add_documents(batch(4, 2))
+    index.save(directory)
+    with open(os.path.join(directory, BM25Index.LOG_FILE_NAME), "ab") as f:
+        f.write(b"\x80\x05partial")
+
+    loaded = BM25Index.load(directory)
+    assert len(loaded) == 6
+
+    # The next save writes a clean snapshot instead of appending after the damage
+    loaded.add_documents(batch(6, 1))
+    loaded.save(directory)
+    assert not os.path.exists(os.path.join(directory, BM25Index.LOG_FILE_NAME))
+    assert len(BM25Index.load(directory)) == 7
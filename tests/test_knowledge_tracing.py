@@ -0,0 +1,49 @@
+# tests/test_knowledge_tracing.py
+
+import numpy as np
+import pytest
+
+from core.assessment.item_selector import expected_information_gain
+from core.assessment.knowledge_tracing import BayesianKnowledgeTracer
+
+FITTED = {"kc_fitted": {"prior": 0.3, "learn": 0.1, "slip": 0.08, "guess": 0.25}}
+
+def test_difficulty_adjusts_defaults_but_not_fitted_parameters():
+    tracer = BayesianKnowledgeTracer(component_params=FITTED)
+
+    # Fitted slip and guess already reflect the questions they were fit on
+    easy = tracer.update_knowledge(0.5, True, difficulty=0.1, component_id="kc_fitted")
+    hard = tracer.update_knowledge(0.5, True, difficulty=0.9, component_id="kc_fitted")
+    assert easy["value"] == pytest.approx(hard["value"])
+
+    easy = tracer.update_knowledge(0.5, True, difficulty=0.1, component_id="kc_default")
+    hard = tracer.update_knowledge(0.5, True, difficulty=0.9, component_id="kc_default")
+    assert easy["value"] != pytest.approx(hard["value"])
+
+def test_batch_update_matches_sequential_updates():
+    tracer = BayesianKnowledgeTracer(component_params=FITTED)
+    component_ids = ["kc_fitted", "kc_default"]
+    rng = np.random.default_rng(0)
+    student_idx = rng.integers(0, 3, 40)
+    component_idx = rng.integers(0, 2, 40)
+    is_correct = rng.random(40) < 0.6
+    difficulty = rng.random(40)
+
+    mastery = np.full((3, 2), 0.5)
+    batch = tracer.update_knowledge_batch(
+        mastery, student_idx, component_idx, is_correct, difficulty, component_ids
+    )
+
+    expected = np.full((3, 2), 0.5)
+    for i in range(40):
+        row, col = student_idx[i], component_idx[i]
+        update = tracer.update_knowledge(
+            expected[row, col], bool(is_correct[i]), float(difficulty[i]), component_ids[col]
+        )
+        assert batch["value"][i] == pytest.approx(update["value"])
+        expected[row, col] = update["value"]
+
+def test_information_gain_ignores_difficulty_where_not_adjusted():
+    gain = expected_information_gain(np.array(0.5), np.array(0.1), np.array(0.2),
+                                     np.array([0.1, 0.9]), np.array(False))
+    assert gain[0] == pytest.approx(gain[1])
@@ -0,0 +1,105 @@
+# tests/test_metadata_filter.py
+
+import hashlib
+
+import numpy as np
+import pytest
+from langchain.schema import Document
+
+from core.embeddings.metadata_filter import MetadataFilterError, MetadataIndex, matches_filter, to_chroma_where
+
+DOCUMENTS = [
+    Document(page_content="Reading goals for the fall term",
+             metadata={"id": "a", "source": "a.pdf", "file_type": ".pdf", "upload_timestamp": 1704067200.0}),
+    Document(page_content="Math accommodations and supports",
+             metadata={"id": "b", "source": "b.docx", "file_type": ".docx", "upload_timestamp": 1706745600.0}),
+    Document(page_content="Science lesson plan on plants",
+             metadata={"id": "c", "source": "c.pdf", "file_type": ".pdf", "upload_timestamp": 1709251200.0})
+]
+
+FILTERS = [
+    {"source": "b.docx"},
+    {"file_type": {"$in": [".pdf"]}},
+    {"upload_timestamp": {"$gte": 1706745600}},
+    {"file_type": ".pdf", "upload_timestamp": {"$lt": 1709251200}}
+]
+
+class HashEmbeddings:
+    """Deterministic embeddings so tests need no API calls."""
+
+    def _embed(self, text):
+        seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).random(16).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+    def get_embeddings(self, texts):
+        return self.embed_documents(texts)
+
+def expected_sources(metadata_filter):
+    return sorted(doc.metadata["source"] for doc in DOCUMENTS if matches_filter(doc.metadata, metadata_filter))
+
+@pytest.mark.parametrize("metadata_filter", FILTERS)
+def test_metadata_index_matches_filter(metadata_filter):
+    index = MetadataIndex()
+    for position, doc in enumerate(DOCUMENTS):
+        index.add(position, doc.metadata)
+
+    sources = sorted(DOCUMENTS[position].metadata["source"] for position in index.lookup(metadata_filter))
+    assert sources == expected_sources(metadata_filter)
+
+@pytest.mark.parametrize("operand", ["2024-01-01", True, None])
+def test_range_operands_must_be_numbers(operand):
+    metadata_filter = {"upload_time": {"$gte": operand}}
+    with pytest.raises(MetadataFilterError):
+        to_chroma_where(metadata_filter)
+    with pytest.raises(MetadataFilterError):
+        MetadataIndex().lookup(metadata_filter)
+
+@pytest.fixture(params=["faiss", "chroma"])
+def vector_store(request, tmp_path):
+    """Each backend, holding DOCUMENTS."""
+    if request.param == "faiss":
+        pytest.importorskip("faiss")
+        pytest.importorskip("langchain_community")
+        from core.embeddings.vector_store import FAISSVectorStore
+        store = FAISSVectorStore(embedding_provider=HashEmbeddings(), index_dir=str(tmp_path / "faiss"))
+    else:
+        pytest.importorskip("chromadb")
+        pytest.importorskip("langchain_chroma")
+        from core.embeddings.chroma_store import ChromaVectorStore
+        store = ChromaVectorStore(embedding_provider=HashEmbeddings(), persist_directory=str(tmp_path / "chroma"))
+
+    assert store.add_documents(DOCUMENTS)
+    return store
+
+@pytest.mark.parametrize("metadata_filter", FILTERS)
+def test_filtered_search_is_the_same_on_every_backend(vector_store, metadata_filter):
+    results = vector_store.search("lesson goals", k=len(DOCUMENTS), filter=metadata_filter)
+    assert sorted(doc.metadata["source"] for doc in results) == expected_sources(metadata_filter)
+
+def test_string_range_filter_fails_on_every_backend(vector_store):
+    from core.embeddings.vector_store import VectorStoreError as FAISSError
+    from core.embeddings.chroma_store import VectorStoreError as ChromaError
+
+    with pytest.raises((FAISSError, ChromaError), match="needs a number"):
+        vector_store.search("lesson goals", filter={"upload_time": {"$gte": "2024-01-01"}})
+
+def test_faiss_placeholder_is_never_returned(tmp_path):
+    pytest.importorskip("faiss")
+    pytest.importorskip("langchain_community")
+    from core.embeddings.vector_store import PLACEHOLDER_ID, FAISSVectorStore
+
+    # An empty index is created with a placeholder document that later additions keep
+    store = FAISSVectorStore(embedding_provider=HashEmbeddings(), index_dir=str(tmp_path / "faiss"))
+    assert store.build_index([])
+    assert store.add_documents(DOCUMENTS)
+
+    for metadata_filter in ({"source": {"$ne": "a.pdf"}}, {"source": {"$nin": ["b.docx"]}}, None):
+        results = store.search("placeholder document", k=len(DOCUMENTS) + 1, filter=metadata_filter)
+        assert PLACEHOLDER_ID not in [doc.metadata["id"] for doc in results]
+        assert sorted(doc.metadata["source"] for doc in results) == expected_sources(metadata_filter)
@@ -0,0 +1,72 @@
+# tests/test_response_importer.py
+
+import io
+
+import pytest
+
+from core.assessment.assessment_processor import AssessmentProcessor
+from core.assessment.response_importer import ResponseImporter
+
+ASSESSMENT = {
+    "assessment_id": "quiz_1",
+    "questions": [{
+        "question_id": "q1",
+        "question_type": "multiple_choice",
+        "correct_answer": "a",
+        "difficulty": 0.5,
+        "knowledge_components": [{"id": "kc_y"}]
+    }]
+}
+
+def test_import_migrates_legacy_profile_state(profile_manager):
+    # A profile saved before knowledge state moved into the store
+    profile_manager.state_manager.set("student_profile_s1", {
+        "student_id": "s1",
+        "name": "Student s1",
+        "interaction_history": [],
+        "knowledge_state": {
+            "kc_x": {"initial_value": 0.5, "current_value": 0.93, "confidence": 0.8,
+                     "last_updated": "2024-01-01T00:00:00"},
+            "kc_y": {"initial_value": 0.5, "current_value": 0.9, "confidence": 0.8,
+                     "last_updated": "2024-01-01T00:00:00"}
+        }
+    })
+
+    importer = ResponseImporter(AssessmentProcessor(), profile_manager)
+    records = io.StringIO('{"student_id": "s1", "question_id": "q1", "response": "a"}\n')
+    summary = importer.import_file(ASSESSMENT, records, "jsonl")
+    assert summary["imported"] == 1
+
+    state = profile_manager.get_student_knowledge_state("s1")
+
+    # Components the import did not touch keep their legacy mastery
+    assert state["kc_x"] == pytest.approx(0.93)
+
+    # The import used the legacy mastery as its prior
+    assert state["kc_y"] > 0.9
+
+    # The legacy field is gone from the saved profile once migrated
+    stored = profile_manager.state_manager.get("student_profile_s1")
+    assert "knowledge_state" not in stored
+    assert len(stored["interaction_history"]) == 1
+
+def test_import_merges_legacy_state_with_existing_rows(profile_manager):
+    # Store rows written after the legacy state was saved take precedence
+    profile_manager.knowledge_store.apply_trace("s2", {
+        "interaction": {"timestamp": "2024-06-01T00:00:00", "question_id": "q0", "is_correct": True},
+        "knowledge_updates": {"kc_y": {"new_value": 0.4, "confidence": 0.6}}
+    })
+    profile_manager.state_manager.set("student_profile_s2", {
+        "student_id": "s2",
+        "name": "Student s2",
+        "interaction_history": [],
+        "knowledge_state": {
+            "kc_x": {"current_value": 0.93, "confidence": 0.8, "last_updated": "2024-01-01T00:00:00"},
+            "kc_y": {"current_value": 0.9, "confidence": 0.8, "last_updated": "2024-01-01T00:00:00"}
+        }
+    })
+
+    profile_manager.migrate_legacy_profiles(["s2"])
+
+    state = profile_manager.get_student_knowledge_state("s2")
+    assert state == {"kc_x": pytest.approx(0.93), "kc_y": pytest.approx(0.4)}
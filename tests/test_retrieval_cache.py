@@ -0,0 +1,17 @@
+# tests/test_retrieval_cache.py
+
+from langchain.schema import Document
+
+from core.rag.retrieval_cache import SemanticQueryCache
+
+def test_lowercase_names_do_not_share_results():
+    cache = SemanticQueryCache(max_entries=8, similarity_threshold=0.9)
+    # Queries differing only in a name embed almost identically
+    embedding = [1.0, 0.0, 0.0]
+    cache.store(embedding, 1, [Document(page_content="Daniel's goals", metadata={"id": "d1"})], query="goals for daniel")
+
+    assert cache.lookup([1.0, 0.01, 0.0], 1, query="goals for maria") is None
+
+    # The same query text still hits
+    hit = cache.lookup([1.0, 0.01, 0.0], 1, query="Goals for  daniel")
+    assert [doc.metadata["id"] for doc in hit] == ["d1"]
@@ -0,0 +1,42 @@
+# tests/test_student_profile_manager.py
+
+import pytest
+
+def trace(timestamp, component_id, value):
+    """Performance trace that sets one component's mastery."""
+    return {
+        "interaction": {"timestamp": timestamp, "assessment_id": "quiz_1", "question_id": "q1", "is_correct": True},
+        "knowledge_updates": {component_id: {"new_value": value, "confidence": 0.7}}
+    }
+
+def test_aggregates_refresh_after_store_changes_elsewhere(profile_manager):
+    profile_manager.update_profile_with_trace("s1", trace("2024-01-01T00:00:00", "kc_fractions", 0.95))
+    assert profile_manager.get_dashboard("s1")["components"] == {"kc_fractions": pytest.approx(0.95)}
+
+    # Another writer (bulk import, CLI) changes the store but not this session's profile copy
+    profile_manager.knowledge_store.apply_trace("s1", trace("2024-02-01T00:00:00", "kc_fractions", 0.3))
+    profile_manager.knowledge_store.apply_trace("s1", trace("2024-02-01T00:00:00", "kc_geometry", 0.85))
+
+    dashboard = profile_manager.get_dashboard("s1")
+    assert dashboard["components"] == {
+        "kc_fractions": pytest.approx(0.3),
+        "kc_geometry": pytest.approx(0.85)
+    }
+
+    metrics = profile_manager.get_student_profile("s1")["metrics"]
+    assert metrics["overall_mastery"] == pytest.approx(0.575)
+    assert [entry["component_id"] for entry in metrics["strengths"]] == ["kc_geometry"]
+    assert [entry["component_id"] for entry in metrics["areas_for_improvement"]] == ["kc_fractions"]
+
+    # The refreshed aggregates were saved, so the next read is served from them
+    stored = profile_manager.state_manager.get("student_profile_s1")
+    assert stored["knowledge_version"] == profile_manager.knowledge_store.get_student_version("s1")
+
+def test_dashboard_refreshes_after_write_with_older_timestamp(profile_manager):
+    profile_manager.update_profile_with_trace("s2", trace("2024-05-01T00:00:00", "kc_b", 0.9))
+    assert profile_manager.get_dashboard("s2")["components"] == {"kc_b": pytest.approx(0.9)}
+
+    # Gradebook imports keep the export's historical timestamps
+    profile_manager.knowledge_store.apply_trace("s2", trace("2024-01-01T00:00:00", "kc_b", 0.2))
+
+    assert profile_manager.get_dashboard("s2")["components"] == {"kc_b": pytest.approx(0.2)}
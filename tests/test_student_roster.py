@@ -0,0 +1,29 @@
+# tests/test_student_roster.py
+
+from core.assessment.student_roster import StudentRoster, get_student_roster
+
+def test_cache_keeps_only_recently_used_entries(tmp_path):
+    roster = StudentRoster(str(tmp_path / "roster.db"), max_cache_entries=3)
+    roster.upsert_many([({"student_id": f"s{i}", "name": f"Student {i}"}, None) for i in range(5)])
+
+    for search in ("1", "2", "3"):
+        roster.count(search)
+    roster.count("1")
+    roster.count("4")
+
+    # "2" was least recently used when "4" pushed the cache past its limit
+    assert list(roster._cache) == [("count", "3"), ("count", "1"), ("count", "4")]
+
+def test_writes_invalidate_cached_pages(tmp_path):
+    roster = StudentRoster(str(tmp_path / "roster.db"))
+    roster.upsert({"student_id": "s1", "name": "Ada"})
+    assert [entry["name"] for entry in roster.list_page()] == ["Ada"]
+
+    roster.upsert({"student_id": "s2", "name": "Ben"})
+    assert [entry["name"] for entry in roster.list_page()] == ["Ada", "Ben"]
+    assert roster.count() == 2
+
+def test_shared_roster_is_reused_per_database(tmp_path):
+    path = str(tmp_path / "roster.db")
+    assert get_student_roster(path) is get_student_roster(path)
+    assert get_student_roster(str(tmp_path / "other.db")) is not get_student_roster(path)
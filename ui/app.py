@@ -16,6 +16,8 @@ from core.document_processing.file_handler import FileHandler, FileHandlerError
 from core.document_processing.document_loader import DocumentLoader
 # Add this import at the top of ui/app.py
 from ui.components.assessments import render_assessment_tab
+from ui.components.jobs import submit_job, deliver_finished_jobs, render_job_status
+from core.jobs.handlers import IEP_JOB, LESSON_PLAN_JOB, DOCUMENT_UPLOAD_JOB, CLEAR_INDEX_JOB, spool_upload
 from core.embeddings.vector_store import FAISSVectorStore
 from core.rag.chain_builder import RAGChainBuilder
 
@@ -45,6 +47,9 @@ def run_app():
             st.error("Failed to initialize application. Please check the logs.")
             return
         
+        # Pick up results of background jobs that finished since the last run
+        deliver_finished_jobs(app_components)
+        
         # Create sidebar for API Key and File Upload
         create_sidebar(app_components)
         
@@ -100,6 +105,9 @@ def create_sidebar(app_components: Dict[str, Any]):
         # System status section
         st.title("System Status")
         display_system_status(app_components)
+        
+        # Background job progress
+        render_job_status(app_components)
 
 def process_uploaded_files(uploaded_files, app_components: Dict[str, Any]):
     """Process uploaded files and update state."""
@@ -114,7 +122,27 @@ def process_uploaded_files(uploaded_files, app_components: Dict[str, Any]):
     document_loader = DocumentLoader()
     
     # Process only if not already processed
-    if not state_manager.get("documents_processed", False):
+    if not state_manager.get("documents_processed", False) and app_components.get("job_queue"):
+        # Hand the files to a background job so the session stays responsive
+        uploads = []
+        for file in uploaded_files:
+            try:
+                uploaded_file = file_handler.process_uploaded_file(file)
+                uploads.append({
+                    "path": spool_upload(uploaded_file.temp_path, file.name),
+                    "name": file.name,
+                    "upload_time": datetime.now().isoformat()
+                })
+            except FileHandlerError as e:
+                st.error(f"Error handling {file.name}: {str(e)}")
+        
+        if uploads:
+            submit_job(app_components, DOCUMENT_UPLOAD_JOB, {"files": uploads})
+            st.info(f"Processing {len(uploads)} documents in the background.")
+        
+        # Mark as handled so reruns do not submit the same files again
+        state_manager.set("documents_processed", True)
+    elif not state_manager.get("documents_processed", False):
         processing_success = True
         
         with st.spinner("Processing documents..."):
@@ -139,7 +167,9 @@ def process_uploaded_files(uploaded_files, app_components: Dict[str, Any]):
                     # Add to state
                     document = result.document
                     document.metadata["source"] = file.name
-                    document.metadata["upload_time"] = datetime.now().isoformat()
+                    upload_time = datetime.now()
+                    document.metadata["upload_time"] = upload_time.isoformat()
+                    document.metadata["upload_timestamp"] = upload_time.timestamp()
                     
                     state_manager.append("documents", document)
                     
@@ -175,8 +205,9 @@ def clear_documents(app_components: Dict[str, Any]):
     # Get vector store from components
     vector_store = app_components.get("vector_store")
     if vector_store:
-        # Clear vector store index
-        vector_store.clear_index()
+        # Clear vector store index, in the background when possible
+        if not submit_job(app_components, CLEAR_INDEX_JOB, None):
+            vector_store.clear_index()
     
     # Reset state
     state_manager.set("documents_processed", False)
@@ -335,6 +366,11 @@ def handle_iep_generation(selected_doc: Dict[str, Any], app_components: Dict[str
                 st.error("Could not retrieve document for processing.")
                 return
             
+            # Generate in the background when the pipeline can run as a job
+            if "iep_pipeline" in app_components and submit_job(app_components, IEP_JOB, {"document": document}):
+                st.info("IEP generation started. The IEP appears below when it is ready.")
+                return
+            
             # Check if pipeline component is available
             if "iep_pipeline" in app_components:
                 # Use the pipeline component
@@ -564,6 +600,27 @@ def handle_lesson_plan_generation(
         materials_list = materials.strip().split("\n") if materials else []
         accommodations_list = additional_accommodations.strip().split("\n") if additional_accommodations else []
 
+        # Generate in the background when the pipeline can run as a job
+        if "lesson_plan_pipeline" in app_components and submit_job(app_components, LESSON_PLAN_JOB, {
+            "inputs": {
+                "subject": subject,
+                "grade_level": grade_level,
+                "timeframe": timeframe,
+                "duration": duration,
+                "days_per_week": days_per_week,
+                "specific_goals": goals_list,
+                "materials": materials_list,
+                "additional_accommodations": accommodations_list,
+                "iep_content": selected_iep["content"]
+            },
+            "metadata": {
+                "source_iep_id": selected_iep_id,
+                "source_iep_source": selected_iep["source"]
+            }
+        }):
+            st.info("Lesson plan generation started. The plan appears below when it is ready.")
+            return
+        
         # Check if pipeline component is available
         if "lesson_plan_pipeline" in app_components:
             # Use the pipeline component
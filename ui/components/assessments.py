@@ -1,11 +1,11 @@
 # ui/components/assessment.py
 
 import streamlit as st
-import pandas as pd
+import io
 import json
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Optional
 
 from config.logging_config import get_module_logger
 from ui.state_manager import state_manager
@@ -13,6 +13,8 @@ from ui.components.common import display_error, display_success, display_info
 from core.assessment.assessment_processor import AssessmentProcessor
 from core.assessment.student_profile_manager import StudentProfileManager
 from core.assessment.report_generator import ReportGenerator
+from core.assessment.response_importer import ResponseImporter, ResponseImportError
+from core.assessment.profile_metrics import format_component_name
 
 # Create a logger for this module
 logger = get_module_logger("assessment_component")
@@ -254,21 +256,17 @@ def render_response_recorder(app_components: Dict[str, Any]):
     assessment_processor = app_components["assessment_processor"]
     profile_manager = app_components["student_profile_manager"]
     
+    # Bulk import from gradebook exports
+    with st.expander("Bulk Import Responses"):
+        render_bulk_import(app_components)
+    
     # Select student
-    student_profiles = get_student_profiles()
+    selected_student = select_student(profile_manager, "recorder")
     
-    if not student_profiles:
+    if not selected_student:
         st.info("No student profiles available. Create a profile in the Student Profiles tab.")
         return
     
-    student_names = [p.get("name", f"Student {p.get('student_id', '')}") for p in student_profiles]
-    selected_student_index = st.selectbox(
-        "Select Student",
-        range(len(student_profiles)),
-        format_func=lambda i: student_names[i]
-    )
-    selected_student = student_profiles[selected_student_index]
-    
     # Select assessment
     assessments = state_manager.get("assessments", [])
     
@@ -343,32 +341,21 @@ def render_response_recorder(app_components: Dict[str, Any]):
             # Process each response
             student_id = selected_student.get("student_id")
             assessment_id = selected_assessment.get("assessment_id")
-            successful_updates = 0
-            
-            for question_id, response in responses.items():
-                # Find matching question
-                question = next(
-                    (q for q in selected_assessment.get("questions", []) 
-                     if q.get("question_id") == question_id),
-                    None
-                )
-                
-                if not question:
-                    continue
-                
-                # Process response
-                trace = assessment_processor.process_student_response(
-                    student_id, question, response
-                )
-                
-                # Add assessment ID to interaction
-                if "interaction" in trace:
+            
+            # Score all responses in one batch, starting from the student's stored mastery
+            traces = assessment_processor.process_assessment_responses(
+                selected_assessment,
+                {student_id: responses},
+                {student_id: profile_manager.get_student_knowledge_state(student_id)}
+            ).get(student_id, [])
+            
+            # Add assessment ID to each interaction
+            for trace in traces:
+                if trace.get("interaction"):
                     trace["interaction"]["assessment_id"] = assessment_id
-                
-                # Update student profile
-                if "error" not in trace:
-                    profile_manager.update_profile_with_trace(student_id, trace)
-                    successful_updates += 1
+            
+            # Update the student profile once for all responses
+            successful_updates = profile_manager.apply_traces({student_id: traces})
             
             # Display success message
             if successful_updates > 0:
@@ -376,12 +363,61 @@ def render_response_recorder(app_components: Dict[str, Any]):
             else:
                 display_error("No responses were successfully recorded")
 
+def render_bulk_import(app_components: Dict[str, Any]):
+    """Render interface for importing responses from a CSV or JSONL gradebook export.
+    
+    Args:
+        app_components: Dictionary with application components
+    """
+    assessments = state_manager.get("assessments", [])
+    
+    if not assessments:
+        st.info("No assessments available. Create an assessment in the Assessment Manager tab.")
+        return
+    
+    st.markdown(
+        "Upload a CSV or JSONL file with `student_id`, `question_id` and `response` "
+        "columns (optional: `student_name`, `timestamp`)."
+    )
+    
+    assessment_titles = [a.get("title", "Untitled") for a in assessments]
+    selected_assessment_index = st.selectbox(
+        "Assessment",
+        range(len(assessments)),
+        format_func=lambda i: assessment_titles[i],
+        key="bulk_import_assessment"
+    )
+    uploaded_file = st.file_uploader("Responses File", type=["csv", "jsonl"], key="bulk_import_file")
+    
+    if uploaded_file and st.button("Import Responses"):
+        importer = ResponseImporter(
+            app_components["assessment_processor"],
+            app_components["student_profile_manager"]
+        )
+        file_format = "csv" if uploaded_file.name.lower().endswith(".csv") else "jsonl"
+        
+        try:
+            with st.spinner("Importing responses..."):
+                # Decode the upload as a stream rather than reading it into memory
+                stream = io.TextIOWrapper(uploaded_file, encoding="utf-8", newline="")
+                summary = importer.import_file(assessments[selected_assessment_index], stream, file_format)
+            
+            display_success(
+                f"Imported {summary['imported']} responses for {summary['students']} students"
+            )
+            if summary["skipped"]:
+                st.warning(f"Skipped {summary['skipped']} records with missing fields or unknown questions")
+        except ResponseImportError as e:
+            display_error(f"Could not import responses: {str(e)}")
+
 def render_student_profiles(app_components: Dict[str, Any]):
     """Render student profile management interface.
     
     Args:
         app_components: Dictionary with application components
     """
+    import pandas as pd
+    
     st.subheader("Student Profiles")
     
     profile_manager = app_components["student_profile_manager"]
@@ -410,8 +446,7 @@ def render_student_profiles(app_components: Dict[str, Any]):
                 profile["grade_level"] = grade_level
                 
                 # Save profile
-                profile_key = f"student_profile_{student_id}"
-                state_manager.set(profile_key, profile)
+                profile_manager.save_profile(profile)
                 
                 display_success(f"Created student profile for {student_name}")
                 st.rerun()
@@ -419,27 +454,19 @@ def render_student_profiles(app_components: Dict[str, Any]):
         # Student selection
         st.markdown("### Select Student")
         
-        student_profiles = get_student_profiles()
+        roster_entry = select_student(profile_manager, "profiles")
         
-        if not student_profiles:
+        if not roster_entry:
             st.info("No student profiles available.")
-        else:
-            student_names = [p.get("name", f"Student {p.get('student_id', '')}") for p in student_profiles]
-            selected_student_index = st.selectbox(
-                "Select Student",
-                range(len(student_profiles)),
-                format_func=lambda i: student_names[i]
-            )
-            
-            if st.button("View Student"):
-                st.session_state.selected_student_index = selected_student_index
-                st.rerun()
+        elif st.button("View Student"):
+            st.session_state.selected_student_id = roster_entry["student_id"]
+            st.rerun()
     
     with col2:
-        # Display selected student profile
-        if hasattr(st.session_state, "selected_student_index") and student_profiles:
-            selected_student = student_profiles[st.session_state.selected_student_index]
-            student_id = selected_student.get("student_id")
+        # Load the full profile only for the selected student
+        if st.session_state.get("selected_student_id"):
+            student_id = st.session_state.selected_student_id
+            selected_student = profile_manager.get_student_profile(student_id)
             
             st.markdown(f"### Student: {selected_student.get('name', 'Unnamed')}")
             st.markdown(f"**Grade Level:** {selected_student.get('grade_level', 'Not specified')}")
@@ -480,37 +507,12 @@ def render_student_profiles(app_components: Dict[str, Any]):
             else:
                 st.info("No knowledge data available for this student yet.")
             
-            # Assessment history
-            interaction_history = selected_student.get("interaction_history", [])
+            # Assessment history, from tallies maintained as responses are recorded
+            assessment_data = profile_manager.get_dashboard(student_id)["assessments"]
             
-            if interaction_history:
+            if assessment_data:
                 st.markdown("### Assessment History")
                 
-                # Group by assessment
-                assessment_data = {}
-                for interaction in interaction_history:
-                    assessment_id = interaction.get("assessment_id")
-                    if not assessment_id:
-                        continue
-                    
-                    if assessment_id not in assessment_data:
-                        assessment_data[assessment_id] = {
-                            "interactions": [],
-                            "correct_count": 0,
-                            "total_count": 0,
-                            "last_updated": ""
-                        }
-                    
-                    assessment_data[assessment_id]["interactions"].append(interaction)
-                    assessment_data[assessment_id]["total_count"] += 1
-                    if interaction.get("is_correct", False):
-                        assessment_data[assessment_id]["correct_count"] += 1
-                    
-                    # Track latest timestamp
-                    timestamp = interaction.get("timestamp", "")
-                    if timestamp > assessment_data[assessment_id]["last_updated"]:
-                        assessment_data[assessment_id]["last_updated"] = timestamp
-                
                 # Get assessment titles
                 assessments = state_manager.get("assessments", [])
                 assessment_map = {a.get("assessment_id"): a.get("title", "Untitled") for a in assessments}
@@ -534,7 +536,7 @@ def render_student_profiles(app_components: Dict[str, Any]):
                 st.info("No assessment history available for this student.")
             
             # Generate report button
-            if interaction_history and st.button("Generate Assessment Report"):
+            if assessment_data and st.button("Generate Assessment Report"):
                 render_assessment_report(app_components, student_id)
 
 def render_knowledge_dashboard(app_components: Dict[str, Any]):
@@ -543,48 +545,44 @@ def render_knowledge_dashboard(app_components: Dict[str, Any]):
     Args:
         app_components: Dictionary with application components
     """
+    import pandas as pd
+    
     st.subheader("Knowledge Dashboard")
     
     profile_manager = app_components["student_profile_manager"]
     
-    # Get student profiles
-    student_profiles = get_student_profiles()
+    # Student selection
+    selected_student = select_student(profile_manager, "dashboard")
     
-    if not student_profiles:
+    if not selected_student:
         st.info("No student profiles available.")
         return
     
-    # Student selection
-    student_names = [p.get("name", f"Student {p.get('student_id', '')}") for p in student_profiles]
-    selected_student_index = st.selectbox(
-        "Select Student",
-        range(len(student_profiles)),
-        format_func=lambda i: student_names[i]
-    )
-    selected_student = student_profiles[selected_student_index]
     student_id = selected_student.get("student_id")
     
     # Subject filter
     subjects = ["All Subjects", "Mathematics", "Reading", "Science", "Social Studies"]
     selected_subject = st.selectbox("Subject Filter", subjects)
     
-    # Get knowledge state
-    if selected_subject == "All Subjects":
-        knowledge_state = profile_manager.get_student_knowledge_state(student_id)
-    else:
-        knowledge_state = profile_manager.get_student_knowledge_state(student_id, selected_subject)
+    # Precomputed dashboard data for the student
+    subject_filter = None if selected_subject == "All Subjects" else selected_subject
+    dashboard = profile_manager.get_dashboard(student_id, subject_filter)
+    knowledge_state = dashboard["components"]
     
     if not knowledge_state:
         st.info(f"No knowledge data available for {selected_student.get('name', 'this student')}.")
         return
     
+    # Compare with class averages from the class-level summary
+    class_summary = profile_manager.get_class_summary(list(knowledge_state))
+    
     # Prepare data for visualization
     component_data = []
     for component_id, mastery in knowledge_state.items():
-        component_name = component_id.replace("kc_", "").replace("_", " ").title()
         component_data.append({
-            "Component": component_name,
-            "Mastery": mastery * 100
+            "Component": format_component_name(component_id),
+            "Mastery": mastery * 100,
+            "Class Average": class_summary.get(component_id, {}).get("mean_mastery", mastery) * 100
         })
     
     # Sort by mastery (ascending for bar chart)
@@ -599,30 +597,7 @@ def render_knowledge_dashboard(app_components: Dict[str, Any]):
     
     # Mastery categories
     st.markdown("### Mastery Categories")
-    
-    # Group by mastery level
-    mastery_categories = {
-        "Expert (90%+)": [],
-        "Proficient (80-90%)": [],
-        "Developing (70-80%)": [],
-        "Basic (50-70%)": [],
-        "Novice (0-50%)": []
-    }
-    
-    for component in component_data:
-        mastery = component["Mastery"]
-        component_name = component["Component"]
-        
-        if mastery >= 90:
-            mastery_categories["Expert (90%+)"].append(component_name)
-        elif mastery >= 80:
-            mastery_categories["Proficient (80-90%)"].append(component_name)
-        elif mastery >= 70:
-            mastery_categories["Developing (70-80%)"].append(component_name)
-        elif mastery >= 50:
-            mastery_categories["Basic (50-70%)"].append(component_name)
-        else:
-            mastery_categories["Novice (0-50%)"].append(component_name)
+    mastery_categories = dashboard["mastery_categories"]
     
     # Create columns for categories
     cols = st.columns(5)
@@ -639,24 +614,12 @@ def render_knowledge_dashboard(app_components: Dict[str, Any]):
     # Learning recommendations
     st.markdown("### Learning Recommendations")
     
-    # Get recommendations
-    subject_filter = None if selected_subject == "All Subjects" else selected_subject
-    recommendations = profile_manager.get_learning_recommendations(student_id, subject_filter)
+    # Recommendations are stored grouped by priority
+    priority_groups = dashboard["recommendations"]
     
-    if not recommendations:
+    if not any(priority_groups.values()):
         st.success("No recommendations needed! All skills at mastery level.")
     else:
-        # Group by priority
-        priority_groups = {
-            "high": [],
-            "medium": [],
-            "low": []
-        }
-        
-        for rec in recommendations:
-            priority = rec.get("priority", "low")
-            priority_groups[priority].append(rec)
-        
         # Display high priority recommendations
         if priority_groups["high"]:
             st.markdown("#### High Priority Focus Areas")
@@ -690,6 +653,8 @@ def render_assessment_report(app_components: Dict[str, Any], student_id: str):
         app_components: Dictionary with application components
         student_id: Student identifier
     """
+    import pandas as pd
+    
     # Get components
     profile_manager = app_components["student_profile_manager"]
     report_generator = app_components["report_generator"]
@@ -809,28 +774,51 @@ def render_assessment_report(app_components: Dict[str, Any], student_id: str):
             mime="application/json"
         )
 
-def get_student_profiles() -> List[Dict[str, Any]]:
-    """Get all student profiles from state.
+def select_student(profile_manager: StudentProfileManager, 
+                   key: str, 
+                   page_size: int = 50) -> Optional[Dict[str, Any]]:
+    """Render a searchable, paginated student picker backed by the roster.
+    
+    Only roster entries (id, name, grade level) are read; callers load the
+    full profile for the selected student if they need it.
     
+    Args:
+        profile_manager: Student profile manager
+        key: Widget key prefix, unique per picker
+        page_size: Number of students per page
+        
     Returns:
-        List of student profile dictionaries
+        Roster entry of the selected student, or None if there are no students
     """
-    profiles = []
-    
-    # Get all keys that match the profile pattern
-    for key in state_manager.storage.list_keys():
-        if key.startswith("student_profile_"):
-            # Extract student ID from key
-            student_id = key.replace("student_profile_", "")
-            
-            # Get profile from state
-            profile = state_manager.get(key)
-            
-            # Add to list if valid
-            if profile and "student_id" in profile:
-                profiles.append(profile)
-    
-    return profiles
+    search = st.text_input("Search Students", key=f"{key}_student_search")
+    total = profile_manager.roster.count(search)
+    
+    if total == 0:
+        if search:
+            st.caption("No students match the search.")
+        return None
+    
+    # Page through large rosters instead of listing everyone
+    page = 0
+    page_count = (total + page_size - 1) // page_size
+    if page_count > 1:
+        page = st.number_input(
+            f"Page (of {page_count})", 
+            min_value=1, 
+            max_value=page_count, 
+            value=1, 
+            key=f"{key}_student_page"
+        ) - 1
+    
+    students = profile_manager.list_students(page, page_size, search)["students"]
+    
+    selected_index = st.selectbox(
+        "Select Student",
+        range(len(students)),
+        format_func=lambda i: students[i]["name"],
+        key=f"{key}_student_select"
+    )
+    return students[selected_index] if selected_index is not None else None
 
 def format_datetime(timestamp: str) -> str:
     """Format ISO timestamp to readable date/time.
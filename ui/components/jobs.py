@@ -0,0 +1,148 @@
+# ui/components/jobs.py
+
+"""Background job submission, status and result delivery."""
+
+import uuid
+
+import streamlit as st
+from typing import Dict, Any, Optional
+
+from config.logging_config import get_module_logger
+from core.jobs.handlers import IEP_JOB, LESSON_PLAN_JOB, DOCUMENT_UPLOAD_JOB, CLEAR_INDEX_JOB
+from core.jobs.job_queue import QUEUED, RUNNING, SUCCEEDED, FAILED, FINISHED_STATUSES
+from ui.state_manager import state_manager
+
+# Create a logger for this module
+logger = get_module_logger("jobs_component")
+
+# Display names of job types
+JOB_LABELS = {
+    IEP_JOB: "IEP generation",
+    LESSON_PLAN_JOB: "Lesson plan generation",
+    DOCUMENT_UPLOAD_JOB: "Document processing",
+    CLEAR_INDEX_JOB: "Index reset"
+}
+
+def _job_owner() -> str:
+    """Get the job owner id of the current browser session, created on first use.
+
+    The state manager's session id is fixed when the module-level instance is
+    created, so it cannot tell browser sessions apart. Jobs are owned by an id
+    kept in the page's query parameters instead, so reloading the page keeps
+    the owner and jobs that finished meanwhile are still listed and delivered.
+    """
+    owner = st.query_params.get("job_owner") or st.session_state.get("job_owner")
+    try:
+        owner = str(uuid.UUID(owner))
+    except (TypeError, ValueError):
+        owner = str(uuid.uuid4())
+
+    st.session_state["job_owner"] = owner
+    if st.query_params.get("job_owner") != owner:
+        st.query_params["job_owner"] = owner
+    return owner
+
+def submit_job(app_components: Dict[str, Any], job_type: str, payload: Any) -> Optional[str]:
+    """Queue a job for the current session if the job queue can run it.
+
+    Args:
+        app_components: Dictionary with application components
+        job_type: Job type name
+        payload: Job input
+
+    Returns:
+        Job id, or None if no job queue is available (callers then work inline)
+    """
+    job_queue = app_components.get("job_queue")
+    if not job_queue:
+        return None
+    return job_queue.submit(job_type, payload, owner=_job_owner())
+
+def deliver_finished_jobs(app_components: Dict[str, Any]):
+    """Move outcomes of the session's finished jobs into session state.
+
+    Results are added to the same state keys the inline workflows used
+    ("iep_results", "lesson_plans", "documents"); failures become errors.
+    Each job is delivered once.
+
+    Args:
+        app_components: Dictionary with application components
+    """
+    job_queue = app_components.get("job_queue")
+    if not job_queue:
+        return
+
+    finished = job_queue.list_jobs(
+        owner=_job_owner(),
+        statuses=FINISHED_STATUSES,
+        undelivered_only=True
+    )
+
+    # Oldest first, so results keep their submission order
+    for job in reversed(finished):
+        label = JOB_LABELS.get(job["job_type"], job["job_type"])
+        try:
+            if job["status"] == SUCCEEDED:
+                _apply_result(job)
+            elif job["status"] == FAILED:
+                state_manager.add_error(f"{label} failed: {job['error']}")
+        except Exception as e:
+            logger.error(f"Error delivering job {job['job_id']}: {str(e)}", exc_info=True)
+            state_manager.add_error(f"Could not apply result of {label.lower()}: {str(e)}")
+        job_queue.mark_delivered(job["job_id"])
+
+def _apply_result(job: Dict[str, Any]):
+    """Add a succeeded job's result to session state."""
+    result = job["result"]
+
+    if job["job_type"] == IEP_JOB:
+        state_manager.append("iep_results", result)
+    elif job["job_type"] == LESSON_PLAN_JOB:
+        state_manager.append("lesson_plans", result)
+        state_manager.set("current_plan", result)
+    elif job["job_type"] == DOCUMENT_UPLOAD_JOB:
+        documents = state_manager.get("documents", []) + result["documents"]
+        state_manager.set("documents", documents)
+        for error in result["errors"]:
+            state_manager.add_warning(f"Error processing {error['name']}: {error['error']}")
+        if result["documents"]:
+            state_manager.update_system_state(vector_store_initialized=True)
+
+def render_job_status(app_components: Dict[str, Any]):
+    """Render the session's recent jobs with progress and cancel buttons.
+
+    Args:
+        app_components: Dictionary with application components
+    """
+    job_queue = app_components.get("job_queue")
+    if not job_queue:
+        return
+
+    jobs = job_queue.list_jobs(owner=_job_owner(), limit=10)
+    if not jobs:
+        return
+
+    st.title("Background Jobs")
+    active = False
+
+    for job in jobs:
+        label = JOB_LABELS.get(job["job_type"], job["job_type"])
+
+        if job["status"] in (QUEUED, RUNNING):
+            active = True
+            st.caption(f"{label}: {job['message'] or job['status']}")
+            st.progress(job["progress"])
+            if job["cancel_requested"]:
+                st.caption("Cancelling...")
+            elif st.button("Cancel", key=f"cancel_job_{job['job_id']}"):
+                job_queue.cancel(job["job_id"])
+                st.rerun()
+        elif job["status"] == SUCCEEDED:
+            st.success(f"{label}: done")
+        elif job["status"] == FAILED:
+            st.error(f"{label}: failed ({job['error']})")
+        else:
+            st.info(f"{label}: cancelled")
+
+    if active and st.button("Refresh Job Status"):
+        st.rerun()
@@ -1,9 +1,6 @@
 # ui/components/rag_visualization.py
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 import os
@@ -120,6 +117,8 @@ def create_pipeline_diagram():
     Returns:
         Plotly figure
     """
+    import plotly.graph_objects as go
+    
     # Create a Sankey diagram for the RAG pipeline
     labels = ["Document", "Chunking", "Embedding", "Vector DB", "Query", "Retrieval", "LLM", "Response"]
     
@@ -167,6 +166,9 @@ def render_retrieval_analysis(app_components: Dict[str, Any]):
     Args:
         app_components: Dictionary with application components
     """
+    import pandas as pd
+    import plotly.express as px
+    
     st.subheader("Document Retrieval Analysis")
     
     # Get queries from state
@@ -246,8 +248,14 @@ def render_performance_analysis(app_components: Dict[str, Any]):
     Args:
         app_components: Dictionary with application components
     """
+    import pandas as pd
+    import plotly.express as px
+    
     st.subheader("RAG Performance Analysis")
     
+    # Stage latency percentiles from the observability histograms
+    render_stage_latency(app_components)
+    
     # Get queries from state
     queries = state_manager.get("rag_queries", [])
     
@@ -307,6 +315,59 @@ def render_performance_analysis(app_components: Dict[str, Any]):
         fig.update_layout(xaxis_title="Execution Time (s)", yaxis_title="Frequency")
         st.plotly_chart(fig, use_container_width=True)
 
+def render_stage_latency(app_components: Dict[str, Any]):
+    """Render per-stage latency percentiles over the sliding window.
+    
+    Args:
+        app_components: Dictionary with application components
+    """
+    import pandas as pd
+    import plotly.express as px
+    
+    rag_observability = app_components.get("rag_observability")
+    if not rag_observability or not rag_observability.enable_timing:
+        return
+    
+    timing = rag_observability.get_timing_summary()
+    stages = timing.get("stages", {})
+    if not any(stats["count"] for stats in stages.values()):
+        return
+    
+    window_minutes = timing["window_seconds"] / 60
+    st.write(f"### Stage Latency (last {window_minutes:g} min)")
+    
+    # Prepare data in milliseconds
+    to_ms = lambda value: round(value * 1000, 1) if value is not None else None
+    latency_data = []
+    for stage, stats in stages.items():
+        latency_data.append({
+            "Stage": stage.replace("_", " ").title(),
+            "Runs (window)": stats["window_count"],
+            "p50 (ms)": to_ms(stats["p50"]),
+            "p90 (ms)": to_ms(stats["p90"]),
+            "p99 (ms)": to_ms(stats["p99"]),
+            "Max (ms)": to_ms(stats["max"])
+        })
+    
+    latency_df = pd.DataFrame(latency_data)
+    st.dataframe(latency_df, use_container_width=True, hide_index=True)
+    
+    chart_df = latency_df.melt(
+        id_vars="Stage",
+        value_vars=["p50 (ms)", "p90 (ms)", "p99 (ms)"],
+        var_name="Percentile",
+        value_name="Latency (ms)"
+    ).dropna()
+    if not chart_df.empty:
+        fig = px.bar(chart_df, x="Stage", y="Latency (ms)", color="Percentile", barmode="group",
+                     title="Latency Percentiles by Stage")
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Trace events dropped under backpressure
+    trace_stats = rag_observability.get_trace_stats()
+    if trace_stats.get("dropped"):
+        st.warning(f"{trace_stats['dropped']} trace events were dropped because the trace buffer was full.")
+
 def render_debug_info(app_components: Dict[str, Any]):
     """Render debug information for the RAG pipeline.
     
@@ -89,7 +89,9 @@ def process_uploaded_files(uploaded_files, app_components: Dict[str, Any]):
                 # Add to state
                 document = result.document
                 document.metadata["source"] = file.name
-                document.metadata["upload_time"] = datetime.now().isoformat()
+                upload_time = datetime.now()
+                document.metadata["upload_time"] = upload_time.isoformat()
+                document.metadata["upload_timestamp"] = upload_time.timestamp()
                 document.metadata["id"] = f"doc_{len(state_manager.get('documents', []))}"
                 
                 state_manager.append("documents", document)
@@ -1,7 +1,6 @@
 """Data visualization components for educational analytics."""
 
 import streamlit as st
-import pandas as pd
 import numpy as np
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
@@ -51,6 +50,8 @@ def render_overview_dashboard(lesson_plans: List[Dict[str, Any]], iep_results: L
         lesson_plans: List of lesson plan dictionaries
         iep_results: List of IEP result dictionaries
     """
+    import pandas as pd
+    
     st.subheader("Educational Overview Dashboard")
     
     # Create metrics row
@@ -133,6 +134,8 @@ def render_timeline_visualization(lesson_plans: List[Dict[str, Any]], iep_result
         lesson_plans: List of lesson plan dictionaries
         iep_results: List of IEP result dictionaries
     """
+    import pandas as pd
+    
     st.subheader("Activity Timeline")
     
     # Combine and prepare data
@@ -228,6 +231,8 @@ def render_goals_analysis(lesson_plans: List[Dict[str, Any]], iep_results: List[
         lesson_plans: List of lesson plan dictionaries
         iep_results: List of IEP result dictionaries
     """
+    import pandas as pd
+    
     st.subheader("Educational Goals Analysis")
     
     # Extract goals from lesson plans
@@ -307,6 +312,8 @@ def render_accommodations_analysis(lesson_plans: List[Dict[str, Any]], iep_resul
         lesson_plans: List of lesson plan dictionaries
         iep_results: List of IEP result dictionaries
     """
+    import pandas as pd
+    
     st.subheader("Accommodations Analysis")
     
     # Extract accommodations from lesson plans
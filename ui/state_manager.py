@@ -1,22 +1,47 @@
 # ui/state_manager.py
 
-import streamlit as st
 import sqlite3
 import json
 import pickle
 import os
+import sys
 import threading
 import uuid
 import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional, TypeVar, Generic, Callable, Union
 from config.logging_config import get_module_logger
+from core.monitoring.metrics import registry
 
 # Create a logger for this module
 logger = get_module_logger("state_manager")
 
+# Metrics
+STORAGE_SECONDS = registry.histogram(
+    "state_storage_operation_seconds", "Latency of SQLite state storage operations", ["operation"]
+)
+
 T = TypeVar('T')
 
+# Session state used when no Streamlit app is running (batch jobs, scripts)
+_HEADLESS_SESSION_STATE: Dict[str, Any] = {}
+
+def _get_session_state() -> Any:
+    """Get Streamlit's session state, or a process-wide dictionary outside a Streamlit run.
+    
+    Streamlit is only consulted when it has already been imported, so headless
+    entry points never pay for importing it.
+    
+    Returns:
+        Mapping that holds the session's state
+    """
+    streamlit = sys.modules.get("streamlit")
+    if streamlit is not None:
+        from streamlit import runtime
+        if runtime.exists():
+            return streamlit.session_state
+    return _HEADLESS_SESSION_STATE
+
 class StateValidationError(Exception):
     """Exception raised for state validation errors."""
     pass
@@ -65,6 +90,17 @@ class PersistentStorage:
             List of keys
         """
         raise NotImplementedError
+    
+    def save_many(self, items: Dict[str, Any]) -> bool:
+        """Save several values to storage.
+        
+        Args:
+            items: Mapping of storage keys to values
+            
+        Returns:
+            Success status
+        """
+        return all([self.save(key, value) for key, value in items.items()])
 
 
 class SQLiteStorage(PersistentStorage):
@@ -106,6 +142,7 @@ class SQLiteStorage(PersistentStorage):
         except Exception as e:
             logger.error(f"Failed to initialize database: {str(e)}")
     
+    @STORAGE_SECONDS.time(operation="save")
     def save(self, key: str, value: Any) -> bool:
         """Save value to SQLite storage.
         
@@ -137,6 +174,38 @@ class SQLiteStorage(PersistentStorage):
             logger.error(f"Failed to save to SQLite: {str(e)}")
             return False
     
+    @STORAGE_SECONDS.time(operation="save_many")
+    def save_many(self, items: Dict[str, Any]) -> bool:
+        """Save several values to SQLite storage in one transaction.
+        
+        Args:
+            items: Mapping of storage keys to values
+            
+        Returns:
+            Success status
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            # Pickle all values up front so the transaction stays short
+            updated_at = datetime.now().isoformat()
+            rows = [(key, pickle.dumps(value), updated_at) for key, value in items.items()]
+            
+            cursor.executemany(
+                "INSERT OR REPLACE INTO state (key, value, updated_at) VALUES (?, ?, ?)",
+                rows
+            )
+            
+            conn.commit()
+            conn.close()
+            
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save batch to SQLite: {str(e)}")
+            return False
+    
+    @STORAGE_SECONDS.time(operation="load")
     def load(self, key: str) -> Optional[Any]:
         """Load value from SQLite storage.
         
@@ -163,6 +232,7 @@ class SQLiteStorage(PersistentStorage):
             logger.error(f"Failed to load from SQLite: {str(e)}")
             return None
     
+    @STORAGE_SECONDS.time(operation="delete")
     def delete(self, key: str) -> bool:
         """Delete value from SQLite storage.
         
@@ -186,6 +256,7 @@ class SQLiteStorage(PersistentStorage):
             logger.error(f"Failed to delete from SQLite: {str(e)}")
             return False
     
+    @STORAGE_SECONDS.time(operation="list_keys")
     def list_keys(self) -> List[str]:
         """List all keys in SQLite storage.
         
@@ -282,6 +353,9 @@ class AppStateManager:
         # Create default storage if not provided
         self.storage = storage_backend or SQLiteStorage()
         
+        # Streamlit session state, or a plain dictionary when running headless
+        self.session_state = _get_session_state()
+        
         # Session ID for user-specific storage
         self.session_id = self._get_or_create_session_id()
         
@@ -296,10 +370,10 @@ class AppStateManager:
         Returns:
             Session ID
         """
-        if "session_id" not in st.session_state:
-            st.session_state.session_id = str(uuid.uuid4())
+        if "session_id" not in self.session_state:
+            self.session_state["session_id"] = str(uuid.uuid4())
         
-        return st.session_state.session_id
+        return self.session_state["session_id"]
     
     def _get_storage_key(self, key: str) -> str:
         """Get storage key with session ID prefix.
@@ -312,6 +386,17 @@ class AppStateManager:
         """
         return f"{self.session_id}:{key}"
     
+    def get_storage_key(self, key: str) -> str:
+        """Get the persistent storage key under which a state key is saved.
+        
+        Args:
+            key: State key
+            
+        Returns:
+            Storage key for the current session
+        """
+        return self._get_storage_key(key)
+    
     def _initialize_session_state(self):
         """Initialize Streamlit session state with default values."""
         defaults = {
@@ -335,15 +420,15 @@ class AppStateManager:
         
         # Initialize each key if not exists
         for key, default_value in defaults.items():
-            if key not in st.session_state:
+            if key not in self.session_state:
                 # Try to load from storage first
                 storage_key = self._get_storage_key(key)
                 stored_value = self.storage.load(storage_key)
                 
                 if stored_value is not None:
-                    st.session_state[key] = stored_value
+                    self.session_state[key] = stored_value
                 else:
-                    st.session_state[key] = default_value
+                    self.session_state[key] = default_value
     
     def _generate_user_id(self) -> str:
         """Generate a stable user ID based on session properties.
@@ -365,7 +450,7 @@ class AppStateManager:
         Returns:
             Value from session state
         """
-        return st.session_state.get(key, default)
+        return self.session_state.get(key, default)
     
     def set(self, key: str, value: Any, persist: bool = True) -> None:
         """Set a value in session state.
@@ -375,13 +460,27 @@ class AppStateManager:
             value: Value to set
             persist: Whether to persist to storage
         """
-        st.session_state[key] = value
+        self.session_state[key] = value
         
         # Persist to storage if requested
         if persist:
             storage_key = self._get_storage_key(key)
             self.storage.save(storage_key, value)
     
+    def set_many(self, items: Dict[str, Any], persist: bool = True) -> None:
+        """Set several values in session state, persisting them in one batch.
+        
+        Args:
+            items: Mapping of state keys to values
+            persist: Whether to persist to storage
+        """
+        for key, value in items.items():
+            self.session_state[key] = value
+        
+        # Persist to storage if requested
+        if persist:
+            self.storage.save_many({self._get_storage_key(key): value for key, value in items.items()})
+    
     def update(self, key: str, update_func: Callable[[Any], Any], persist: bool = True) -> None:
         """Update a value in session state using a function.
         
@@ -390,8 +489,8 @@ class AppStateManager:
             update_func: Function that takes old value and returns new value
             persist: Whether to persist to storage
         """
-        if key in st.session_state:
-            old_value = st.session_state[key]
+        if key in self.session_state:
+            old_value = self.session_state[key]
             new_value = update_func(old_value)
             self.set(key, new_value, persist=persist)
     
@@ -406,18 +505,18 @@ class AppStateManager:
         Raises:
             TypeError: If the key doesn't exist or isn't a list
         """
-        if key not in st.session_state:
-            st.session_state[key] = []
+        if key not in self.session_state:
+            self.session_state[key] = []
             
-        if not isinstance(st.session_state[key], list):
+        if not isinstance(self.session_state[key], list):
             raise TypeError(f"Key '{key}' is not a list")
             
-        st.session_state[key].append(value)
+        self.session_state[key].append(value)
         
         # Persist to storage if requested
         if persist:
             storage_key = self._get_storage_key(key)
-            self.storage.save(storage_key, st.session_state[key])
+            self.storage.save(storage_key, self.session_state[key])
     
     def clear(self, key: Optional[str] = None, persist: bool = True) -> None:
         """Clear a specific key or all session state.
@@ -428,17 +527,17 @@ class AppStateManager:
         """
         if key is None:
             # Preserve user ID and session info when clearing
-            user_id = st.session_state.get("user_id")
-            session_id = st.session_state.get("session_id")
-            session_start = st.session_state.get("session_start")
+            user_id = self.session_state.get("user_id")
+            session_id = self.session_state.get("session_id")
+            session_start = self.session_state.get("session_start")
             
             # Get list of keys to clear
-            keys_to_clear = list(st.session_state.keys())
+            keys_to_clear = list(self.session_state.keys())
             
             # Clear each key
             for k in keys_to_clear:
                 if k not in {"user_id", "session_id", "session_start"}:
-                    del st.session_state[k]
+                    del self.session_state[k]
                     
                     # Remove from storage if requested
                     if persist:
@@ -446,14 +545,14 @@ class AppStateManager:
                         self.storage.delete(storage_key)
             
             # Restore user and session info
-            st.session_state["user_id"] = user_id
-            st.session_state["session_id"] = session_id
-            st.session_state["session_start"] = session_start
+            self.session_state["user_id"] = user_id
+            self.session_state["session_id"] = session_id
+            self.session_state["session_start"] = session_start
             
             # Reinitialize with defaults
             self._initialize_session_state()
-        elif key in st.session_state:
-            del st.session_state[key]
+        elif key in self.session_state:
+            del self.session_state[key]
             
             # Remove from storage if requested
             if persist:
@@ -547,7 +646,7 @@ class AppStateManager:
         
         # Copy state
         state_copy = {}
-        for key, value in st.session_state.items():
+        for key, value in self.session_state.items():
             if key not in excluded_keys:
                 state_copy[key] = value
         
@@ -585,7 +684,7 @@ class AppStateManager:
             # Update session ID
             old_session_id = self.session_id
             self.session_id = session_id
-            st.session_state.session_id = session_id
+            self.session_state["session_id"] = session_id
             
             # Restore each key
             for storage_key in session_keys:
@@ -596,7 +695,7 @@ class AppStateManager:
                 value = self.storage.load(storage_key)
                 
                 if value is not None:
-                    st.session_state[key] = value
+                    self.session_state[key] = value
             
             logger.info(f"Restored session: {session_id}")
             return True